@@ -13,8 +13,10 @@ PRINT '========================================'
 PRINT ''
 PRINT 'This script will:'
 PRINT '  1. Create database schema (tables)'
-PRINT '  2. Create all stored procedures'
-PRINT '  3. Insert test data (optional)'
+PRINT '  2. Create views'
+PRINT '  3. Create all stored procedures'
+PRINT '  4. Create triggers'
+PRINT '  5. Insert test data (optional)'
 PRINT ''
 PRINT 'Starting deployment...'
 PRINT ''
@@ -38,10 +40,24 @@ PRINT 'Schema creation completed!'
 PRINT ''
 
 -- =============================================
--- Step 2: Create All Stored Procedures
+-- Step 2: Create Views
 -- =============================================
 PRINT '========================================'
-PRINT 'Step 2: Creating Stored Procedures'
+PRINT 'Step 2: Creating Views'
+PRINT '========================================'
+PRINT ''
+
+:r "views\99_Create_All_Views.sql"
+
+PRINT ''
+PRINT 'Views creation completed!'
+PRINT ''
+
+-- =============================================
+-- Step 3: Create All Stored Procedures
+-- =============================================
+PRINT '========================================'
+PRINT 'Step 3: Creating Stored Procedures'
 PRINT '========================================'
 PRINT ''
 
@@ -52,13 +68,27 @@ PRINT 'Stored procedures creation completed!'
 PRINT ''
 
 -- =============================================
--- Step 3: Insert Test Data (Optional)
+-- Step 4: Create Triggers
+-- =============================================
+PRINT '========================================'
+PRINT 'Step 4: Creating Triggers'
+PRINT '========================================'
+PRINT ''
+
+:r "triggers\99_Create_All_Triggers.sql"
+
+PRINT ''
+PRINT 'Triggers creation completed!'
+PRINT ''
+
+-- =============================================
+-- Step 5: Insert Test Data (Optional)
 -- =============================================
 -- Uncomment the section below to deploy test data
 -- WARNING: This will insert sample data. Only use for development/testing!
 
 PRINT '========================================'
-PRINT 'Step 3: Inserting Test Data'
+PRINT 'Step 5: Inserting Test Data'
 PRINT '========================================'
 PRINT ''
 
@@ -1,6 +1,6 @@
 -- =============================================
 -- Master Cleanup Script: Remove All JIT Framework Objects
--- This script removes all stored procedures and tables
+-- This script removes all stored procedures, views and tables
 -- =============================================
 -- WARNING: This will delete ALL data and objects!
 -- Use with caution. This script cannot be undone.
@@ -37,6 +37,21 @@ PRINT '========================================'
 PRINT ''
 
 -- Drop procedures in reverse dependency order
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Drift_Detect]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_Drift_Detect]
+GO
+PRINT 'Dropped: sp_Drift_Detect'
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_User_GetDashboard]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_User_GetDashboard]
+GO
+PRINT 'Dropped: sp_User_GetDashboard'
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_AuditLog_Archive]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_AuditLog_Archive]
+GO
+PRINT 'Dropped: sp_AuditLog_Archive'
+
 IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Request_Deny]') AND type in (N'P', N'PC'))
     DROP PROCEDURE [jit].[sp_Request_Deny]
 GO
@@ -67,6 +82,11 @@ IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Req
 GO
 PRINT 'Dropped: sp_Request_GetRoles'
 
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Request_RouteApprovers]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_Request_RouteApprovers]
+GO
+PRINT 'Dropped: sp_Request_RouteApprovers'
+
 IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Request_Create]') AND type in (N'P', N'PC'))
     DROP PROCEDURE [jit].[sp_Request_Create]
 GO
@@ -82,6 +102,11 @@ IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Gra
 GO
 PRINT 'Dropped: sp_Grant_Expire'
 
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Grant_IssueForRequest]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_Grant_IssueForRequest]
+GO
+PRINT 'Dropped: sp_Grant_IssueForRequest'
+
 IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Grant_Issue]') AND type in (N'P', N'PC'))
     DROP PROCEDURE [jit].[sp_Grant_Issue]
 GO
@@ -117,11 +142,85 @@ IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Use
 GO
 PRINT 'Dropped: sp_User_ResolveCurrentUser'
 
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_CacheVersion_Bump]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_CacheVersion_Bump]
+GO
+PRINT 'Dropped: sp_CacheVersion_Bump'
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Eligibility_CheckConsistency]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_Eligibility_CheckConsistency]
+GO
+PRINT 'Dropped: sp_Eligibility_CheckConsistency'
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Eligibility_RefreshDue]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_Eligibility_RefreshDue]
+GO
+PRINT 'Dropped: sp_Eligibility_RefreshDue'
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Eligibility_Rebuild]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_Eligibility_Rebuild]
+GO
+PRINT 'Dropped: sp_Eligibility_Rebuild'
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Eligibility_ProcessQueue]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_Eligibility_ProcessQueue]
+GO
+PRINT 'Dropped: sp_Eligibility_ProcessQueue'
+
 PRINT ''
 PRINT 'All stored procedures dropped successfully!'
 PRINT ''
 GO
 
+-- =============================================
+-- Drop All Views
+-- =============================================
+
+IF EXISTS (SELECT * FROM sys.views WHERE object_id = OBJECT_ID(N'[jit].[vw_Drift_ExpectedState]'))
+    DROP VIEW [jit].[vw_Drift_ExpectedState]
+GO
+PRINT 'Dropped: vw_Drift_ExpectedState'
+
+IF EXISTS (SELECT * FROM sys.views WHERE object_id = OBJECT_ID(N'[jit].[vw_Drift_ExpectedMembers]'))
+    DROP VIEW [jit].[vw_Drift_ExpectedMembers]
+GO
+PRINT 'Dropped: vw_Drift_ExpectedMembers'
+
+IF EXISTS (SELECT * FROM sys.views WHERE object_id = OBJECT_ID(N'[jit].[vw_AuditLog_All]'))
+    DROP VIEW [jit].[vw_AuditLog_All]
+GO
+PRINT 'Dropped: vw_AuditLog_All'
+
+IF EXISTS (SELECT * FROM sys.views WHERE object_id = OBJECT_ID(N'[jit].[vw_User_Role_Eligibility]'))
+    DROP VIEW [jit].[vw_User_Role_Eligibility]
+GO
+PRINT 'Dropped: vw_User_Role_Eligibility'
+
+PRINT ''
+PRINT 'All views dropped successfully!'
+PRINT ''
+GO
+
+-- =============================================
+-- Drop All Table Types
+-- (after the procedures that take them as parameters)
+-- =============================================
+
+IF TYPE_ID(N'[jit].[RoleIdList]') IS NOT NULL
+    DROP TYPE [jit].[RoleIdList]
+GO
+PRINT 'Dropped: RoleIdList'
+
+IF TYPE_ID(N'[jit].[DriftCheckList]') IS NOT NULL
+    DROP TYPE [jit].[DriftCheckList]
+GO
+PRINT 'Dropped: DriftCheckList'
+
+PRINT ''
+PRINT 'All table types dropped successfully!'
+PRINT ''
+GO
+
 
 -- =============================================
 -- Step 2: Drop All Tables (in reverse dependency order)
@@ -136,6 +235,54 @@ PRINT ''
 -- Drop tables in reverse dependency order (respecting foreign key dependencies)
 -- Start with tables that have foreign keys pointing to other tables
 
+-- Level 0: Standalone tables (no foreign keys)
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[Cache_Versions]') AND type in (N'U'))
+    DROP TABLE [jit].[Cache_Versions]
+GO
+PRINT 'Dropped: Cache_Versions'
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[AD_Staging]') AND type in (N'U'))
+    DROP TABLE [jit].[AD_Staging]
+GO
+PRINT 'Dropped: AD_Staging'
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[Drift_Findings]') AND type in (N'U'))
+    DROP TABLE [jit].[Drift_Findings]
+GO
+PRINT 'Dropped: Drift_Findings'
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[Drift_Database_State]') AND type in (N'U'))
+    DROP TABLE [jit].[Drift_Database_State]
+GO
+PRINT 'Dropped: Drift_Database_State'
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[Drift_Observed_Members]') AND type in (N'U'))
+    DROP TABLE [jit].[Drift_Observed_Members]
+GO
+PRINT 'Dropped: Drift_Observed_Members'
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[Eligibility_Refresh_Queue]') AND type in (N'U'))
+    DROP TABLE [jit].[Eligibility_Refresh_Queue]
+GO
+PRINT 'Dropped: Eligibility_Refresh_Queue'
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[AuditLog_Archive]') AND type in (N'U'))
+    DROP TABLE [jit].[AuditLog_Archive]
+GO
+PRINT 'Dropped: AuditLog_Archive'
+
+-- Materialized eligibility (depends on Users and Roles; its triggers are dropped with their tables)
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[User_Effective_Eligibility]') AND type in (N'U'))
+    DROP TABLE [jit].[User_Effective_Eligibility]
+GO
+PRINT 'Dropped: User_Effective_Eligibility'
+
+-- Approver routing (depends on Users and Requests; dropped before Requests)
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[Request_Approver_Routing]') AND type in (N'U'))
+    DROP TABLE [jit].[Request_Approver_Routing]
+GO
+PRINT 'Dropped: Request_Approver_Routing'
+
 -- Level 1: Tables that depend on Grants, Requests, Users, Roles
 IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[AuditLog]') AND type in (N'U'))
     DROP TABLE [jit].[AuditLog]
@@ -0,0 +1,72 @@
+-- =============================================
+-- Benchmark: login resolution at 100k users
+-- Compares the old leading-wildcard lookup used by get_current_user()
+-- with the LoginKey index seek
+-- =============================================
+-- Seeds 100,000 synthetic users inside a transaction and rolls it back at the
+-- end, so it can be run against a dev/test database without leaving data
+-- behind. Requires migrations\001_Add_Users_LoginKey.sql (or a fresh deploy).
+--
+-- Compare the "logical reads" lines in the Messages tab:
+--   Old: one clustered index scan of jit.Users per login (reads grow with the table)
+--   New: one seek on IX_Users_LoginKey + one key lookup (constant)
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET NOCOUNT ON;
+
+DECLARE @UserCount INT = 100000;
+DECLARE @ProbeLogin NVARCHAR(255) = N'bench.user.77777';
+DECLARE @ProbePattern NVARCHAR(255) = N'%\' + @ProbeLogin;
+
+BEGIN TRANSACTION;
+
+-- Don't refresh effective eligibility for the synthetic users (re-enabled by the rollback)
+IF OBJECT_ID(N'[jit].[trg_Users_RefreshEligibility]', N'TR') IS NOT NULL
+    DISABLE TRIGGER [jit].[trg_Users_RefreshEligibility] ON [jit].[Users];
+
+;WITH n AS (
+    SELECT TOP (@UserCount) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS i
+    FROM sys.all_objects a CROSS JOIN sys.all_objects b
+)
+INSERT INTO [jit].[Users] (UserId, LoginName, DisplayName, Division, Department, SeniorityLevel, CreatedBy, UpdatedBy)
+SELECT
+    N'bench.user.' + CAST(i AS NVARCHAR(10)),
+    N'BENCH\bench.user.' + CAST(i AS NVARCHAR(10)),
+    N'Bench User ' + CAST(i AS NVARCHAR(10)),
+    N'Division ' + CAST(i % 20 AS NVARCHAR(10)),
+    N'Department ' + CAST(i % 200 AS NVARCHAR(10)),
+    1 + i % 5,
+    N'BENCH', N'BENCH'
+FROM n;
+
+UPDATE STATISTICS [jit].[Users];
+
+PRINT '---- Old: LoginName = ? OR LoginName LIKE ''%\user'' OR LoginName = ? ----';
+SET STATISTICS IO ON;
+SET STATISTICS TIME ON;
+
+SELECT UserId, LoginName, IsAdmin, IsApprover, IsDataSteward
+FROM [jit].[Users]
+WHERE (LoginName = @ProbeLogin OR LoginName LIKE @ProbePattern OR LoginName = @ProbeLogin)
+AND IsActive = 1;
+
+SET STATISTICS TIME OFF;
+SET STATISTICS IO OFF;
+
+PRINT '---- New: LoginKey = ? ----';
+SET STATISTICS IO ON;
+SET STATISTICS TIME ON;
+
+SELECT UserId, LoginName, IsAdmin, IsApprover, IsDataSteward
+FROM [jit].[Users]
+WHERE LoginKey = @ProbeLogin
+AND IsActive = 1;
+
+SET STATISTICS TIME OFF;
+SET STATISTICS IO OFF;
+
+ROLLBACK TRANSACTION;
+GO
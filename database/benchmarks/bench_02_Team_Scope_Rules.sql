@@ -0,0 +1,134 @@
+-- =============================================
+-- Benchmark: Team-scope rule matching on a large rule set
+-- Compares the old CAST(ut.TeamId AS NVARCHAR(255)) = ScopeValue join
+-- with the typed ScopeTeamId join
+-- =============================================
+-- Seeds 5,000 teams, 200 roles and 200,000 Team-scope rules plus memberships
+-- for one probe user inside a transaction and rolls it back at the end.
+-- Requires migrations\003_Add_Role_Eligibility_Rules_ScopeTeamId.sql (or a fresh deploy).
+-- The eligibility triggers are disabled inside the transaction so seeding does
+-- not refresh jit.User_Effective_Eligibility; the rollback re-enables them.
+--
+-- Compare in the Messages tab and the STATISTICS XML plans
+-- (EstimatedTotalSubtreeCost on the root operator):
+--   Old: scan of Role_Eligibility_Rules, CAST evaluated per membership row
+--   New: seek on IX_Role_Eligibility_Rules_ScopeTeamId per membership
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET NOCOUNT ON;
+
+DECLARE @TeamCount INT = 5000;
+DECLARE @RoleCount INT = 200;
+DECLARE @RulesPerTeam INT = 40;
+DECLARE @ProbeUserId NVARCHAR(255) = N'bench.team.probe';
+DECLARE @CurrentUtc DATETIME2 = GETUTCDATE();
+
+BEGIN TRANSACTION;
+
+IF OBJECT_ID(N'[jit].[trg_Users_RefreshEligibility]', N'TR') IS NOT NULL
+    DISABLE TRIGGER [jit].[trg_Users_RefreshEligibility] ON [jit].[Users];
+IF OBJECT_ID(N'[jit].[trg_User_Teams_RefreshEligibility]', N'TR') IS NOT NULL
+    DISABLE TRIGGER [jit].[trg_User_Teams_RefreshEligibility] ON [jit].[User_Teams];
+IF OBJECT_ID(N'[jit].[trg_Role_Eligibility_Rules_RefreshEligibility]', N'TR') IS NOT NULL
+    DISABLE TRIGGER [jit].[trg_Role_Eligibility_Rules_RefreshEligibility] ON [jit].[Role_Eligibility_Rules];
+
+INSERT INTO [jit].[Users] (UserId, LoginName, DisplayName, Division, Department, SeniorityLevel, CreatedBy, UpdatedBy)
+VALUES (@ProbeUserId, N'BENCH\bench.team.probe', N'Bench Team Probe', N'Bench Division', N'Bench Department', 3, N'BENCH', N'BENCH');
+
+;WITH n AS (
+    SELECT TOP (@TeamCount) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS i
+    FROM sys.all_objects a CROSS JOIN sys.all_objects b
+)
+INSERT INTO [jit].[Teams] (TeamName, Description, CreatedBy, UpdatedBy)
+SELECT N'Bench Team ' + CAST(i AS NVARCHAR(10)), N'Benchmark', N'BENCH', N'BENCH'
+FROM n;
+
+;WITH n AS (
+    SELECT TOP (@RoleCount) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS i
+    FROM sys.all_objects
+)
+INSERT INTO [jit].[Roles] (RoleName, Description, MaxDurationMinutes, CreatedBy, UpdatedBy)
+SELECT N'Bench Role ' + CAST(i AS NVARCHAR(10)), N'Benchmark', 60, N'BENCH', N'BENCH'
+FROM n;
+
+-- Every team gets @RulesPerTeam rules spread over the bench roles
+;WITH n AS (
+    SELECT TOP (@RulesPerTeam) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS i
+    FROM sys.all_objects
+),
+BenchRoles AS (
+    SELECT RoleId, ROW_NUMBER() OVER (ORDER BY RoleId) - 1 AS k
+    FROM [jit].[Roles]
+    WHERE RoleName LIKE N'Bench Role %'
+)
+INSERT INTO [jit].[Role_Eligibility_Rules] (RoleId, ScopeType, ScopeValue, CanRequest, Priority, CreatedBy, UpdatedBy)
+SELECT br.RoleId, 'Team', CAST(t.TeamId AS NVARCHAR(255)), 1, 10 + n.i % 50, N'BENCH', N'BENCH'
+FROM [jit].[Teams] t
+CROSS JOIN n
+INNER JOIN BenchRoles br ON br.k = (t.TeamId + n.i) % @RoleCount
+WHERE t.TeamName LIKE N'Bench Team %';
+
+-- Probe user belongs to 10 teams
+INSERT INTO [jit].[User_Teams] (UserId, TeamId, IsActive)
+SELECT TOP (10) @ProbeUserId, TeamId, 1
+FROM [jit].[Teams]
+WHERE TeamName LIKE N'Bench Team %'
+ORDER BY TeamId;
+
+UPDATE STATISTICS [jit].[Role_Eligibility_Rules];
+UPDATE STATISTICS [jit].[User_Teams];
+
+PRINT '---- Old: CAST(ut.TeamId AS NVARCHAR(255)) = rer.ScopeValue ----';
+SET STATISTICS IO ON;
+SET STATISTICS TIME ON;
+SET STATISTICS XML ON;
+
+SELECT rer.RoleId, MAX(rer.Priority) AS BestPriority
+FROM [jit].[Role_Eligibility_Rules] rer
+INNER JOIN [jit].[User_Teams] ut ON CAST(ut.TeamId AS NVARCHAR(255)) = rer.ScopeValue
+WHERE rer.ScopeType = 'Team'
+AND ut.UserId = @ProbeUserId
+AND ut.IsActive = 1
+AND (rer.ValidFromUtc IS NULL OR rer.ValidFromUtc <= @CurrentUtc)
+AND (rer.ValidToUtc IS NULL OR rer.ValidToUtc >= @CurrentUtc)
+GROUP BY rer.RoleId;
+
+SET STATISTICS XML OFF;
+SET STATISTICS TIME OFF;
+SET STATISTICS IO OFF;
+
+PRINT '---- New: rer.ScopeTeamId = ut.TeamId ----';
+SET STATISTICS IO ON;
+SET STATISTICS TIME ON;
+SET STATISTICS XML ON;
+
+SELECT rer.RoleId, MAX(rer.Priority) AS BestPriority
+FROM [jit].[Role_Eligibility_Rules] rer
+INNER JOIN [jit].[User_Teams] ut ON rer.ScopeTeamId = ut.TeamId
+WHERE ut.UserId = @ProbeUserId
+AND ut.IsActive = 1
+AND (rer.ValidFromUtc IS NULL OR rer.ValidFromUtc <= @CurrentUtc)
+AND (rer.ValidToUtc IS NULL OR rer.ValidToUtc >= @CurrentUtc)
+GROUP BY rer.RoleId;
+
+SET STATISTICS XML OFF;
+SET STATISTICS TIME OFF;
+SET STATISTICS IO OFF;
+
+PRINT '---- Resolver: vw_User_Role_Eligibility for the probe user ----';
+SET STATISTICS IO ON;
+SET STATISTICS TIME ON;
+
+SELECT COUNT(*) AS EligibleRoles
+FROM [jit].[vw_User_Role_Eligibility]
+WHERE UserId = @ProbeUserId
+AND CanRequest = 1;
+
+SET STATISTICS TIME OFF;
+SET STATISTICS IO OFF;
+
+ROLLBACK TRANSACTION;
+GO
@@ -0,0 +1,207 @@
+-- =============================================
+-- Benchmark: Filtered/covering Grants and Requests indexes
+-- Compares the pre-005 narrow indexes with IX_Grants_Active_UserId_RoleId,
+-- IX_Grants_Active_ValidToUtc and IX_Requests_UserId_CreatedUtc on the
+-- dashboard and expiry hot paths
+-- =============================================
+-- Seeds 60,000 users, 100 roles, 1,200,000 requests and about 3,000,000 grants
+-- (about 3% Active) inside a transaction and rolls it back at the end.
+-- Requires migrations\005_Add_Covering_Grant_Request_Indexes.sql (or a fresh deploy).
+-- The old indexes are recreated inside the transaction and each query is
+-- pinned to its index with a table hint, so both shapes run on the same data.
+-- The Users triggers are disabled inside the transaction so seeding does not
+-- refresh eligibility or approver routing; the rollback re-enables them.
+--
+-- Compare logical reads in the Messages tab:
+--   Old: seek on the narrow index plus a key lookup per row into PK_Grants / PK_Requests
+--   New: seek on the filtered covering index, no lookups
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET NOCOUNT ON;
+
+DECLARE @UserCount INT = 60000;
+DECLARE @RoleCount INT = 100;
+DECLARE @RequestsPerUser INT = 20;
+DECLARE @GrantsPerRequest INT = 3;
+DECLARE @ProbeUserId NVARCHAR(255) = N'bench.user.1';
+DECLARE @CurrentUtc DATETIME2 = GETUTCDATE();
+
+BEGIN TRANSACTION;
+
+IF OBJECT_ID(N'[jit].[trg_Users_RefreshEligibility]', N'TR') IS NOT NULL
+    DISABLE TRIGGER [jit].[trg_Users_RefreshEligibility] ON [jit].[Users];
+IF OBJECT_ID(N'[jit].[trg_Users_RouteApprovers]', N'TR') IS NOT NULL
+    DISABLE TRIGGER [jit].[trg_Users_RouteApprovers] ON [jit].[Users];
+
+;WITH n AS (
+    SELECT TOP (@UserCount) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS i
+    FROM sys.all_objects a CROSS JOIN sys.all_objects b
+)
+INSERT INTO [jit].[Users] (UserId, LoginName, DisplayName, Division, Department, SeniorityLevel, CreatedBy, UpdatedBy)
+SELECT N'bench.user.' + CAST(i AS NVARCHAR(10)), N'BENCH\bench.user.' + CAST(i AS NVARCHAR(10)),
+       N'Bench User ' + CAST(i AS NVARCHAR(10)), N'Bench Division', N'Bench Department', 1 + i % 5, N'BENCH', N'BENCH'
+FROM n;
+
+;WITH n AS (
+    SELECT TOP (@RoleCount) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS i
+    FROM sys.all_objects
+)
+INSERT INTO [jit].[Roles] (RoleName, Description, MaxDurationMinutes, CreatedBy, UpdatedBy)
+SELECT N'Bench Role ' + CAST(i AS NVARCHAR(10)), N'Benchmark', 60, N'BENCH', N'BENCH'
+FROM n;
+
+-- Requests spread over the last ~400 days, most of them long closed
+;WITH n AS (
+    SELECT TOP (@RequestsPerUser) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS i
+    FROM sys.all_objects
+)
+INSERT INTO [jit].[Requests] (UserId, RequestedDurationMinutes, Justification, TicketRef, Status, CreatedUtc, UpdatedUtc, CreatedBy)
+SELECT u.UserId, 60, N'Benchmark', N'BENCH-' + CAST(n.i AS NVARCHAR(10)),
+       CASE WHEN n.i = 1 THEN 'Pending' WHEN n.i % 7 = 0 THEN 'Denied' ELSE 'Approved' END,
+       DATEADD(HOUR, -n.i * 480, @CurrentUtc), DATEADD(HOUR, -n.i * 480, @CurrentUtc), N'BENCH'
+FROM [jit].[Users] u
+CROSS JOIN n
+WHERE u.UserId LIKE N'bench.user.%';
+
+;WITH BenchRoles AS (
+    SELECT RoleId, ROW_NUMBER() OVER (ORDER BY RoleId) - 1 AS k
+    FROM [jit].[Roles]
+    WHERE RoleName LIKE N'Bench Role %'
+)
+INSERT INTO [jit].[Request_Roles] (RequestId, RoleId)
+SELECT r.RequestId, br.RoleId
+FROM [jit].[Requests] r
+INNER JOIN BenchRoles br ON br.k = r.RequestId % @RoleCount
+WHERE r.CreatedBy = N'BENCH';
+
+-- Approved requests carry @GrantsPerRequest grants each; roughly 1 in 33 is still Active
+;WITH n AS (
+    SELECT TOP (@GrantsPerRequest) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS i
+    FROM sys.all_objects
+),
+BenchRoles AS (
+    SELECT RoleId, ROW_NUMBER() OVER (ORDER BY RoleId) - 1 AS k
+    FROM [jit].[Roles]
+    WHERE RoleName LIKE N'Bench Role %'
+)
+INSERT INTO [jit].[Grants] (RequestId, UserId, RoleId, ValidFromUtc, ValidToUtc, RevokedUtc, IssuedByUserId, Status)
+SELECT r.RequestId, r.UserId, br.RoleId,
+       CASE WHEN (r.RequestId + n.i) % 33 = 0 THEN DATEADD(MINUTE, -30, @CurrentUtc) ELSE r.CreatedUtc END,
+       CASE WHEN (r.RequestId + n.i) % 33 = 0 THEN DATEADD(MINUTE, (r.RequestId + n.i) % 120 - 30, @CurrentUtc)
+            ELSE DATEADD(MINUTE, 60, r.CreatedUtc) END,
+       CASE WHEN (r.RequestId + n.i) % 33 = 0 THEN NULL ELSE DATEADD(MINUTE, 60, r.CreatedUtc) END,
+       r.UserId,
+       CASE WHEN (r.RequestId + n.i) % 33 = 0 THEN 'Active' ELSE 'Expired' END
+FROM [jit].[Requests] r
+CROSS JOIN n
+INNER JOIN BenchRoles br ON br.k = (r.RequestId + n.i) % @RoleCount
+WHERE r.CreatedBy = N'BENCH'
+AND r.Status = 'Approved';
+
+-- Pre-005 index shapes, dropped again by the rollback
+CREATE NONCLUSTERED INDEX [IX_Bench_Grants_UserId_RoleId_Status_ValidToUtc] ON [jit].[Grants]([UserId] ASC, [RoleId] ASC, [Status] ASC, [ValidToUtc] ASC);
+CREATE NONCLUSTERED INDEX [IX_Bench_Grants_Status_ValidToUtc] ON [jit].[Grants]([Status] ASC, [ValidToUtc] ASC) WHERE [Status] = 'Active';
+CREATE NONCLUSTERED INDEX [IX_Bench_Requests_UserId] ON [jit].[Requests]([UserId] ASC);
+
+UPDATE STATISTICS [jit].[Grants];
+UPDATE STATISTICS [jit].[Requests];
+
+-- ---- Active grants for one user (sp_Grant_ListActiveForUser) ----
+
+PRINT '---- Old: active grants for user via IX_Grants_UserId_RoleId_Status_ValidToUtc ----';
+SET STATISTICS IO ON;
+SET STATISTICS TIME ON;
+
+SELECT g.GrantId, g.RequestId, g.UserId, r.RoleName, g.ValidFromUtc, g.ValidToUtc, g.Status
+FROM [jit].[Grants] g WITH (INDEX([IX_Bench_Grants_UserId_RoleId_Status_ValidToUtc]))
+INNER JOIN [jit].[Roles] r ON g.RoleId = r.RoleId
+WHERE g.UserId = @ProbeUserId
+AND g.Status = 'Active'
+ORDER BY g.ValidToUtc ASC;
+
+SET STATISTICS TIME OFF;
+SET STATISTICS IO OFF;
+
+PRINT '---- New: active grants for user via IX_Grants_Active_UserId_RoleId ----';
+SET STATISTICS IO ON;
+SET STATISTICS TIME ON;
+
+SELECT g.GrantId, g.RequestId, g.UserId, r.RoleName, g.ValidFromUtc, g.ValidToUtc, g.Status
+FROM [jit].[Grants] g WITH (INDEX([IX_Grants_Active_UserId_RoleId]))
+INNER JOIN [jit].[Roles] r ON g.RoleId = r.RoleId
+WHERE g.UserId = @ProbeUserId
+AND g.Status = 'Active'
+ORDER BY g.ValidToUtc ASC;
+
+SET STATISTICS TIME OFF;
+SET STATISTICS IO OFF;
+
+-- ---- Expiry scan (sp_Grant_Expire / expiry worker) ----
+
+PRINT '---- Old: due grants via IX_Grants_Status_ValidToUtc ----';
+SET STATISTICS IO ON;
+SET STATISTICS TIME ON;
+
+SELECT TOP (500) g.GrantId, g.UserId, g.ValidToUtc
+FROM [jit].[Grants] g WITH (INDEX([IX_Bench_Grants_Status_ValidToUtc]))
+WHERE g.Status = 'Active'
+AND g.ValidToUtc < DATEADD(MINUTE, 30, @CurrentUtc)
+ORDER BY g.ValidToUtc ASC;
+
+SET STATISTICS TIME OFF;
+SET STATISTICS IO OFF;
+
+PRINT '---- New: due grants via IX_Grants_Active_ValidToUtc ----';
+SET STATISTICS IO ON;
+SET STATISTICS TIME ON;
+
+SELECT TOP (500) g.GrantId, g.UserId, g.ValidToUtc
+FROM [jit].[Grants] g WITH (INDEX([IX_Grants_Active_ValidToUtc]))
+WHERE g.Status = 'Active'
+AND g.ValidToUtc < DATEADD(MINUTE, 30, @CurrentUtc)
+ORDER BY g.ValidToUtc ASC;
+
+SET STATISTICS TIME OFF;
+SET STATISTICS IO OFF;
+
+-- ---- Request history for one user (sp_Request_ListForUser) ----
+
+PRINT '---- Old: request history via IX_Requests_UserId ----';
+SET STATISTICS IO ON;
+SET STATISTICS TIME ON;
+
+SELECT r.RequestId, r.RequestedDurationMinutes, r.Justification, r.TicketRef, r.Status, r.CreatedUtc, r.UpdatedUtc
+FROM [jit].[Requests] r WITH (INDEX([IX_Bench_Requests_UserId]))
+WHERE r.UserId = @ProbeUserId
+ORDER BY r.CreatedUtc DESC;
+
+SET STATISTICS TIME OFF;
+SET STATISTICS IO OFF;
+
+PRINT '---- New: request history via IX_Requests_UserId_CreatedUtc ----';
+SET STATISTICS IO ON;
+SET STATISTICS TIME ON;
+
+SELECT r.RequestId, r.RequestedDurationMinutes, r.Justification, r.TicketRef, r.Status, r.CreatedUtc, r.UpdatedUtc
+FROM [jit].[Requests] r WITH (INDEX([IX_Requests_UserId_CreatedUtc]))
+WHERE r.UserId = @ProbeUserId
+ORDER BY r.CreatedUtc DESC;
+
+SET STATISTICS TIME OFF;
+SET STATISTICS IO OFF;
+
+PRINT '---- Procedures as deployed (optimizer picks the index) ----';
+SET STATISTICS IO ON;
+SET STATISTICS TIME ON;
+
+EXEC [jit].[sp_Grant_ListActiveForUser] @UserId = @ProbeUserId;
+EXEC [jit].[sp_Request_ListForUser] @UserId = @ProbeUserId;
+
+SET STATISTICS TIME OFF;
+SET STATISTICS IO OFF;
+
+ROLLBACK TRANSACTION;
+GO
@@ -0,0 +1,56 @@
+-- =============================================
+-- SQL Agent Job: jit.Job_ArchiveAuditLog
+-- Keeps jit.AuditLog to a fixed window by moving older events to jit.AuditLog_Archive
+-- Schedule: Nightly, outside business hours
+-- =============================================
+-- Note: This is a template for creating the SQL Agent job
+-- Execute this procedure as part of the job step
+
+USE [DMAP_JIT_Permissions]
+GO
+
+-- Create a wrapper procedure that can be called by SQL Agent
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Job_ArchiveAuditLog]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_Job_ArchiveAuditLog]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE PROCEDURE [jit].[sp_Job_ArchiveAuditLog]
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @ArchivedCount INT;
+    DECLARE @PurgedCount INT;
+    
+    -- 90 days hot, ~7 years in the archive; adjust to the retention policy
+    EXEC [jit].[sp_AuditLog_Archive]
+        @HotRetentionDays = 90,
+        @ArchiveRetentionDays = 2557,
+        @ArchivedCount = @ArchivedCount OUTPUT,
+        @PurgedCount = @PurgedCount OUTPUT;
+    
+    -- Log summary (optional)
+    PRINT 'Archived ' + CAST(ISNULL(@ArchivedCount, 0) AS NVARCHAR(10)) + ' audit event(s), purged ' +
+        CAST(ISNULL(@PurgedCount, 0) AS NVARCHAR(10)) + ' archived event(s)';
+END
+GO
+
+PRINT 'Wrapper procedure [jit].[sp_Job_ArchiveAuditLog] created successfully'
+GO
+
+-- Instructions for creating SQL Agent Job:
+-- 1. Open SQL Server Management Studio
+-- 2. Go to SQL Server Agent > Jobs
+-- 3. Right-click Jobs > New Job
+-- 4. Name: "JIT - Archive Audit Log"
+-- 5. Add Step:
+--    - Type: Transact-SQL script (T-SQL)
+--    - Command: EXEC [jit].[sp_Job_ArchiveAuditLog]
+-- 6. Schedule: Create new schedule
+--    - Frequency: Daily
+--    - Start time: Outside business hours (e.g. 02:00)
@@ -26,7 +26,8 @@ BEGIN
     
     DECLARE @ExpiredCount INT;
     
-    EXEC [jit].[sp_Grant_Expire] @ExpiredCount OUTPUT;
+    -- Grants are processed in batches; each batch commits on its own so locks stay short
+    EXEC [jit].[sp_Grant_Expire] @ExpiredCount = @ExpiredCount OUTPUT, @BatchSize = 500;
     
     -- Log summary (optional)
     PRINT 'Expired ' + CAST(@ExpiredCount AS NVARCHAR(10)) + ' grant(s)';
@@ -0,0 +1,51 @@
+-- =============================================
+-- SQL Agent Job: jit.Job_RefreshEligibility
+-- Keeps jit.User_Effective_Eligibility current as rule/override validity windows open and close
+-- Schedule: Every 5 minutes (keep @LookbackMinutes larger than the interval)
+-- =============================================
+-- Note: This is a template for creating the SQL Agent job
+-- Execute this procedure as part of the job step
+
+USE [DMAP_JIT_Permissions]
+GO
+
+-- Create a wrapper procedure that can be called by SQL Agent
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Job_RefreshEligibility]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_Job_RefreshEligibility]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE PROCEDURE [jit].[sp_Job_RefreshEligibility]
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @ProcessedCount INT;
+    
+    EXEC [jit].[sp_Eligibility_RefreshDue] @LookbackMinutes = 15, @ProcessedCount = @ProcessedCount OUTPUT;
+    
+    -- Log summary (optional)
+    PRINT 'Processed ' + CAST(ISNULL(@ProcessedCount, 0) AS NVARCHAR(10)) + ' eligibility refresh key(s)';
+END
+GO
+
+PRINT 'Wrapper procedure [jit].[sp_Job_RefreshEligibility] created successfully'
+GO
+
+-- Instructions for creating SQL Agent Job:
+-- 1. Open SQL Server Management Studio
+-- 2. Go to SQL Server Agent > Jobs
+-- 3. Right-click Jobs > New Job
+-- 4. Name: "JIT - Refresh Eligibility"
+-- 5. Add Step:
+--    - Type: Transact-SQL script (T-SQL)
+--    - Command: EXEC [jit].[sp_Job_RefreshEligibility]
+-- 6. Add a second, less frequent step or job (e.g. nightly) as a safety net:
+--    - Command: EXEC [jit].[sp_Eligibility_CheckConsistency] @Repair = 1
+-- 7. Schedule: Create new schedule
+--    - Frequency: Occurs every 5 minutes
+--    - Start time: Current time or preferred start time
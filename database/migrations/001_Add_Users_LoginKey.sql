@@ -0,0 +1,32 @@
+-- =============================================
+-- Migration 001: jit.Users.LoginKey
+-- Adds the persisted bare-login column and its index to an existing deployment
+-- (fresh deployments get it from schema\01_Create_Users.sql)
+-- Safe to re-run
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET ANSI_NULLS ON
+GO
+
+SET QUOTED_IDENTIFIER ON
+GO
+
+IF COL_LENGTH(N'[jit].[Users]', N'LoginKey') IS NULL
+BEGIN
+    ALTER TABLE [jit].[Users]
+        ADD [LoginKey] AS (CAST(SUBSTRING([LoginName], CHARINDEX(N'\', [LoginName]) + 1, 255) AS [nvarchar](255))) PERSISTED;
+    PRINT 'Added column: jit.Users.LoginKey'
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(N'[jit].[Users]') AND name = N'IX_Users_LoginKey')
+BEGIN
+    CREATE NONCLUSTERED INDEX [IX_Users_LoginKey] ON [jit].[Users]([LoginKey] ASC)
+        INCLUDE ([IsActive])
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON);
+    PRINT 'Created index: IX_Users_LoginKey'
+END
+GO
@@ -0,0 +1,61 @@
+-- =============================================
+-- Migration 002: jit.User_Effective_Eligibility
+-- Adds the materialized eligibility table and its refresh queue to an existing deployment
+-- (fresh deployments get them from schema\17_* and schema\18_*)
+-- After this script: create views, procedures and triggers, then run
+--   EXEC [jit].[sp_Eligibility_Rebuild]
+-- Safe to re-run
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET ANSI_NULLS ON
+GO
+
+SET QUOTED_IDENTIFIER ON
+GO
+
+IF OBJECT_ID(N'[jit].[User_Effective_Eligibility]', N'U') IS NULL
+BEGIN
+    CREATE TABLE [jit].[User_Effective_Eligibility](
+        [UserId] [nvarchar](255) NOT NULL,
+        [RoleId] [int] NOT NULL,
+        [CanRequest] [bit] NOT NULL,
+        [Priority] [int] NOT NULL,
+        [EligibilityReason] [nvarchar](255) NOT NULL,
+        [RefreshedUtc] [datetime2](7) NOT NULL CONSTRAINT [DF_User_Effective_Eligibility_RefreshedUtc] DEFAULT (GETUTCDATE()),
+        CONSTRAINT [PK_User_Effective_Eligibility] PRIMARY KEY CLUSTERED ([UserId] ASC, [RoleId] ASC)
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
+    );
+    
+    ALTER TABLE [jit].[User_Effective_Eligibility] WITH CHECK ADD CONSTRAINT [FK_User_Effective_Eligibility_Users] 
+        FOREIGN KEY([UserId]) REFERENCES [jit].[Users] ([UserId])
+        ON DELETE CASCADE;
+    
+    ALTER TABLE [jit].[User_Effective_Eligibility] WITH CHECK ADD CONSTRAINT [FK_User_Effective_Eligibility_Roles] 
+        FOREIGN KEY([RoleId]) REFERENCES [jit].[Roles] ([RoleId])
+        ON DELETE CASCADE;
+    
+    CREATE NONCLUSTERED INDEX [IX_User_Effective_Eligibility_RoleId] ON [jit].[User_Effective_Eligibility]([RoleId] ASC)
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON);
+    
+    PRINT 'Created table: jit.User_Effective_Eligibility'
+END
+GO
+
+IF OBJECT_ID(N'[jit].[Eligibility_Refresh_Queue]', N'U') IS NULL
+BEGIN
+    CREATE TABLE [jit].[Eligibility_Refresh_Queue](
+        [QueueId] [bigint] IDENTITY(1,1) NOT NULL,
+        [UserId] [nvarchar](255) NULL,
+        [RoleId] [int] NULL,
+        [Reason] [nvarchar](100) NOT NULL,
+        [QueuedUtc] [datetime2](7) NOT NULL CONSTRAINT [DF_Eligibility_Refresh_Queue_QueuedUtc] DEFAULT (GETUTCDATE()),
+        CONSTRAINT [PK_Eligibility_Refresh_Queue] PRIMARY KEY CLUSTERED ([QueueId] ASC)
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
+    );
+    
+    PRINT 'Created table: jit.Eligibility_Refresh_Queue'
+END
+GO
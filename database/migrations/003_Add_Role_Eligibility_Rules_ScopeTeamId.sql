@@ -0,0 +1,33 @@
+-- =============================================
+-- Migration 003: jit.Role_Eligibility_Rules.ScopeTeamId
+-- Adds the persisted typed Team scope column and its index to an existing deployment
+-- (fresh deployments get it from schema\07_Create_Role_Eligibility_Rules.sql)
+-- Re-run views\99_Create_All_Views.sql afterwards so the resolver joins on it
+-- Safe to re-run
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET ANSI_NULLS ON
+GO
+
+SET QUOTED_IDENTIFIER ON
+GO
+
+IF COL_LENGTH(N'[jit].[Role_Eligibility_Rules]', N'ScopeTeamId') IS NULL
+BEGIN
+    ALTER TABLE [jit].[Role_Eligibility_Rules]
+        ADD [ScopeTeamId] AS (CASE WHEN [ScopeType] = 'Team' AND CAST(TRY_CAST([ScopeValue] AS [int]) AS [nvarchar](255)) = [ScopeValue] THEN TRY_CAST([ScopeValue] AS [int]) END) PERSISTED;
+    PRINT 'Added column: jit.Role_Eligibility_Rules.ScopeTeamId'
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(N'[jit].[Role_Eligibility_Rules]') AND name = N'IX_Role_Eligibility_Rules_ScopeTeamId')
+BEGIN
+    CREATE NONCLUSTERED INDEX [IX_Role_Eligibility_Rules_ScopeTeamId] ON [jit].[Role_Eligibility_Rules]([ScopeTeamId] ASC, [RoleId] ASC)
+        INCLUDE ([CanRequest], [Priority], [ValidFromUtc], [ValidToUtc])
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON);
+    PRINT 'Created index: IX_Role_Eligibility_Rules_ScopeTeamId'
+END
+GO
@@ -0,0 +1,54 @@
+-- =============================================
+-- Migration 004: jit.Request_Approver_Routing
+-- Adds the precomputed approver queue to an existing deployment
+-- (fresh deployments get it from schema\19_*)
+-- After this script: create procedures and triggers, then run
+--   EXEC [jit].[sp_Request_RouteApprovers]
+-- Safe to re-run
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET ANSI_NULLS ON
+GO
+
+SET QUOTED_IDENTIFIER ON
+GO
+
+IF OBJECT_ID(N'[jit].[Request_Approver_Routing]', N'U') IS NULL
+BEGIN
+    CREATE TABLE [jit].[Request_Approver_Routing](
+        [ApproverUserId] [nvarchar](255) NOT NULL,
+        [RequestId] [bigint] NOT NULL,
+        [ApprovalReason] [nvarchar](100) NOT NULL,
+        [RoutedUtc] [datetime2](7) NOT NULL CONSTRAINT [DF_Request_Approver_Routing_RoutedUtc] DEFAULT (GETUTCDATE()),
+        CONSTRAINT [PK_Request_Approver_Routing] PRIMARY KEY CLUSTERED ([ApproverUserId] ASC, [RequestId] ASC)
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
+    );
+    
+    ALTER TABLE [jit].[Request_Approver_Routing] WITH CHECK ADD CONSTRAINT [FK_Request_Approver_Routing_Users] 
+        FOREIGN KEY([ApproverUserId]) REFERENCES [jit].[Users] ([UserId])
+        ON DELETE CASCADE;
+    
+    ALTER TABLE [jit].[Request_Approver_Routing] WITH CHECK ADD CONSTRAINT [FK_Request_Approver_Routing_Requests] 
+        FOREIGN KEY([RequestId]) REFERENCES [jit].[Requests] ([RequestId])
+        ON DELETE CASCADE;
+    
+    CREATE NONCLUSTERED INDEX [IX_Request_Approver_Routing_RequestId] ON [jit].[Request_Approver_Routing]([RequestId] ASC)
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON);
+    
+    PRINT 'Created table: jit.Request_Approver_Routing'
+END
+GO
+
+-- Existing deployments: eligibility refresh fires before approver routing on jit.Users, so both
+-- triggers take jit.Eligibility_Refresh before jit.Request_Routing (trg_Users_RefreshEligibility.sql
+-- sets the same order when the trigger is re-created)
+IF OBJECT_ID(N'[jit].[trg_Users_RefreshEligibility]', N'TR') IS NOT NULL
+BEGIN
+    EXEC sp_settriggerorder @triggername = N'[jit].[trg_Users_RefreshEligibility]', @order = 'First', @stmttype = 'INSERT';
+    EXEC sp_settriggerorder @triggername = N'[jit].[trg_Users_RefreshEligibility]', @order = 'First', @stmttype = 'UPDATE';
+    PRINT 'Set trigger order: jit.trg_Users_RefreshEligibility fires first on jit.Users'
+END
+GO
@@ -0,0 +1,111 @@
+-- =============================================
+-- Migration 005: filtered/covering indexes for the dashboard and expiry hot paths
+-- Replaces the narrow Grants/Requests indexes on an existing deployment
+-- (fresh deployments get them from schema\10_*, schema\11_* and schema\12_*)
+--   Grants:    IX_Grants_UserId_RoleId_Status_ValidToUtc -> IX_Grants_Active_UserId_RoleId
+--              IX_Grants_Status_ValidToUtc               -> IX_Grants_Active_ValidToUtc
+--   Requests:  IX_Requests_UserId                        -> IX_Requests_UserId_CreatedUtc
+--              IX_Requests_Status                        -> IX_Requests_Open_Status_UserId
+--   Approvals: IX_Approvals_RequestId gains INCLUDE (DecisionComment)
+-- New indexes are created before the old ones are dropped so the hot paths always have one
+-- Measured by benchmarks\bench_03_Grant_Request_Indexes.sql
+-- Safe to re-run
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET ANSI_NULLS ON
+GO
+
+SET QUOTED_IDENTIFIER ON
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(N'[jit].[Grants]') AND name = N'IX_Grants_Active_UserId_RoleId')
+BEGIN
+    CREATE NONCLUSTERED INDEX [IX_Grants_Active_UserId_RoleId] ON [jit].[Grants]([UserId] ASC, [RoleId] ASC, [ValidToUtc] ASC)
+        INCLUDE ([ValidFromUtc], [RequestId], [Status])
+        WHERE [Status] = 'Active'
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON);
+    
+    PRINT 'Created index: IX_Grants_Active_UserId_RoleId'
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(N'[jit].[Grants]') AND name = N'IX_Grants_Active_ValidToUtc')
+BEGIN
+    CREATE NONCLUSTERED INDEX [IX_Grants_Active_ValidToUtc] ON [jit].[Grants]([ValidToUtc] ASC)
+        INCLUDE ([UserId])
+        WHERE [Status] = 'Active'
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON);
+    
+    PRINT 'Created index: IX_Grants_Active_ValidToUtc'
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(N'[jit].[Requests]') AND name = N'IX_Requests_UserId_CreatedUtc')
+BEGIN
+    CREATE NONCLUSTERED INDEX [IX_Requests_UserId_CreatedUtc] ON [jit].[Requests]([UserId] ASC, [CreatedUtc] DESC)
+        INCLUDE ([Status], [RequestedDurationMinutes], [TicketRef], [UpdatedUtc], [Justification])
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON);
+    
+    PRINT 'Created index: IX_Requests_UserId_CreatedUtc'
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(N'[jit].[Requests]') AND name = N'IX_Requests_Open_Status_UserId')
+BEGIN
+    CREATE NONCLUSTERED INDEX [IX_Requests_Open_Status_UserId] ON [jit].[Requests]([Status] ASC, [UserId] ASC)
+        WHERE [Status] IN ('Pending', 'AutoApproved')
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON);
+    
+    PRINT 'Created index: IX_Requests_Open_Status_UserId'
+END
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.index_columns ic
+    INNER JOIN sys.indexes i ON i.object_id = ic.object_id AND i.index_id = ic.index_id
+    WHERE i.object_id = OBJECT_ID(N'[jit].[Approvals]') AND i.name = N'IX_Approvals_RequestId'
+    AND ic.is_included_column = 1 AND COL_NAME(ic.object_id, ic.column_id) = N'DecisionComment'
+)
+BEGIN
+    IF EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(N'[jit].[Approvals]') AND name = N'IX_Approvals_RequestId')
+        DROP INDEX [IX_Approvals_RequestId] ON [jit].[Approvals];
+    
+    CREATE NONCLUSTERED INDEX [IX_Approvals_RequestId] ON [jit].[Approvals]([RequestId] ASC)
+        INCLUDE ([DecisionComment])
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON);
+    
+    PRINT 'Recreated index: IX_Approvals_RequestId (INCLUDE DecisionComment)'
+END
+GO
+
+-- Superseded indexes
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(N'[jit].[Grants]') AND name = N'IX_Grants_UserId_RoleId_Status_ValidToUtc')
+BEGIN
+    DROP INDEX [IX_Grants_UserId_RoleId_Status_ValidToUtc] ON [jit].[Grants];
+    PRINT 'Dropped index: IX_Grants_UserId_RoleId_Status_ValidToUtc'
+END
+GO
+
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(N'[jit].[Grants]') AND name = N'IX_Grants_Status_ValidToUtc')
+BEGIN
+    DROP INDEX [IX_Grants_Status_ValidToUtc] ON [jit].[Grants];
+    PRINT 'Dropped index: IX_Grants_Status_ValidToUtc'
+END
+GO
+
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(N'[jit].[Requests]') AND name = N'IX_Requests_UserId')
+BEGIN
+    DROP INDEX [IX_Requests_UserId] ON [jit].[Requests];
+    PRINT 'Dropped index: IX_Requests_UserId'
+END
+GO
+
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(N'[jit].[Requests]') AND name = N'IX_Requests_Status')
+BEGIN
+    DROP INDEX [IX_Requests_Status] ON [jit].[Requests];
+    PRINT 'Dropped index: IX_Requests_Status'
+END
+GO
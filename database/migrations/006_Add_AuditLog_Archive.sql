@@ -0,0 +1,53 @@
+-- =============================================
+-- Migration 006: audit trail hot/cold tiers
+-- Adds jit.AuditLog_Archive and IX_AuditLog_EventType_EventUtc to an existing deployment
+-- (fresh deployments get them from schema\14_* and schema\20_*)
+-- After this script: create views and procedures, deploy jobs\job_ArchiveAuditLog.sql, then
+-- run EXEC [jit].[sp_AuditLog_Archive] once (with @MaxBatches set if the backlog is large)
+-- Safe to re-run
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET ANSI_NULLS ON
+GO
+
+SET QUOTED_IDENTIFIER ON
+GO
+
+IF OBJECT_ID(N'[jit].[AuditLog_Archive]', N'U') IS NULL
+BEGIN
+    CREATE TABLE [jit].[AuditLog_Archive](
+        [AuditId] [bigint] NOT NULL,
+        [EventUtc] [datetime2](7) NOT NULL,
+        [EventType] [nvarchar](100) NOT NULL,
+        [ActorUserId] [nvarchar](255) NULL,
+        [ActorLoginName] [nvarchar](255) NOT NULL,
+        [TargetUserId] [nvarchar](255) NULL,
+        [RequestId] [bigint] NULL,
+        [GrantId] [bigint] NULL,
+        [DetailsJson] [nvarchar](max) NULL,
+        [ArchivedUtc] [datetime2](7) NOT NULL CONSTRAINT [DF_AuditLog_Archive_ArchivedUtc] DEFAULT (GETUTCDATE()),
+        CONSTRAINT [PK_AuditLog_Archive] PRIMARY KEY CLUSTERED ([AuditId] ASC)
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON, DATA_COMPRESSION = PAGE)
+    );
+    
+    CREATE NONCLUSTERED INDEX [IX_AuditLog_Archive_EventUtc] ON [jit].[AuditLog_Archive]([EventUtc] ASC)
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON, DATA_COMPRESSION = PAGE);
+    
+    CREATE NONCLUSTERED INDEX [IX_AuditLog_Archive_EventType_EventUtc] ON [jit].[AuditLog_Archive]([EventType] ASC, [EventUtc] DESC)
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON, DATA_COMPRESSION = PAGE);
+    
+    PRINT 'Created table: jit.AuditLog_Archive'
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(N'[jit].[AuditLog]') AND name = N'IX_AuditLog_EventType_EventUtc')
+BEGIN
+    CREATE NONCLUSTERED INDEX [IX_AuditLog_EventType_EventUtc] ON [jit].[AuditLog]([EventType] ASC, [EventUtc] DESC)
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON);
+    
+    PRINT 'Created index: IX_AuditLog_EventType_EventUtc'
+END
+GO
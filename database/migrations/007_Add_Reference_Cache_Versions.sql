@@ -0,0 +1,26 @@
+-- =============================================
+-- Migration 007: reference-data cache versions
+-- Seeds the 'Reference' and 'Eligibility' rows in jit.Cache_Versions used by the
+-- web tier's reference-data and requestable-role caches
+-- (fresh deployments get them from schema\16_*)
+-- After this script: create triggers (triggers\99_Create_All_Triggers.sql adds the
+-- trg_*_BumpCacheVersion triggers that bump these counters)
+-- Safe to re-run
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET ANSI_NULLS ON
+GO
+
+SET QUOTED_IDENTIFIER ON
+GO
+
+INSERT INTO [jit].[Cache_Versions] (CacheName, Version)
+SELECT v.CacheName, 0
+FROM (VALUES (N'Reference'), (N'Eligibility')) v (CacheName)
+WHERE NOT EXISTS (SELECT 1 FROM [jit].[Cache_Versions] c WHERE c.CacheName = v.CacheName);
+
+PRINT 'Cache versions present: Reference, Eligibility'
+GO
@@ -0,0 +1,23 @@
+-- =============================================
+-- Migration 008: table-valued role input for sp_Request_Create
+-- Adds the jit.RoleIdList table type to an existing deployment
+-- (fresh deployments get it from schema\21_*)
+-- After this script: run procedures\sp_Request_Create.sql and deploy the matching
+-- flask_app (the procedure no longer accepts a comma-separated @RoleIds string)
+-- Safe to re-run
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+-- The current sp_Request_Create still takes the CSV string and does not reference
+-- the type, so the type can be created alongside it
+IF TYPE_ID(N'[jit].[RoleIdList]') IS NULL
+    CREATE TYPE [jit].[RoleIdList] AS TABLE(
+        [RoleId] [int] NOT NULL,
+        PRIMARY KEY CLUSTERED ([RoleId] ASC)
+    );
+GO
+
+PRINT 'Type present: jit.RoleIdList'
+GO
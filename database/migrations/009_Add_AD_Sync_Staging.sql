@@ -0,0 +1,64 @@
+-- =============================================
+-- Migration 009: delta-only AD sync
+-- Adds jit.AD_Staging and the jit.Users.AdRowHash computed column to an existing
+-- deployment (fresh deployments get them from schema\01_* and schema\22_*)
+-- After this script: run procedures\sp_User_SyncFromAD.sql
+-- Safe to re-run
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET ANSI_NULLS ON
+GO
+
+SET QUOTED_IDENTIFIER ON
+GO
+
+-- Not persisted: adding it is a metadata-only change
+IF COL_LENGTH(N'[jit].[Users]', N'AdRowHash') IS NULL
+BEGIN
+    ALTER TABLE [jit].[Users]
+        ADD [AdRowHash] AS (CAST(HASHBYTES('SHA2_256', CONCAT(
+            ISNULL([GivenName], NCHAR(0)), NCHAR(31), ISNULL([Surname], NCHAR(0)), NCHAR(31),
+            ISNULL([DisplayName], NCHAR(0)), NCHAR(31), ISNULL([Email], NCHAR(0)), NCHAR(31),
+            ISNULL([Division], NCHAR(0)), NCHAR(31), ISNULL([Department], NCHAR(0)), NCHAR(31),
+            ISNULL([JobTitle], NCHAR(0)), NCHAR(31), ISNULL(CAST([SeniorityLevel] AS [nvarchar](11)), NCHAR(0))
+        )) AS [binary](32));
+    PRINT 'Added column: jit.Users.AdRowHash'
+END
+GO
+
+-- Any staging table created by hand for the old procedure lacks RowHash; it only ever holds one load
+IF OBJECT_ID(N'[jit].[AD_Staging]', N'U') IS NOT NULL AND COL_LENGTH(N'[jit].[AD_Staging]', N'RowHash') IS NULL
+BEGIN
+    DROP TABLE [jit].[AD_Staging];
+    PRINT 'Dropped old jit.AD_Staging (no RowHash column)'
+END
+GO
+
+IF OBJECT_ID(N'[jit].[AD_Staging]', N'U') IS NULL
+BEGIN
+    CREATE TABLE [jit].[AD_Staging](
+        [LoginName] [nvarchar](255) NOT NULL,
+        [UserId] [nvarchar](255) NOT NULL,
+        [GivenName] [nvarchar](255) NULL,
+        [Surname] [nvarchar](255) NULL,
+        [DisplayName] [nvarchar](255) NULL,
+        [Email] [nvarchar](255) NULL,
+        [Division] [nvarchar](255) NULL,
+        [Department] [nvarchar](255) NULL,
+        [JobTitle] [nvarchar](255) NULL,
+        [SeniorityLevel] [int] NULL,
+        [RowHash] AS (CAST(HASHBYTES('SHA2_256', CONCAT(
+            ISNULL([GivenName], NCHAR(0)), NCHAR(31), ISNULL([Surname], NCHAR(0)), NCHAR(31),
+            ISNULL([DisplayName], NCHAR(0)), NCHAR(31), ISNULL([Email], NCHAR(0)), NCHAR(31),
+            ISNULL([Division], NCHAR(0)), NCHAR(31), ISNULL([Department], NCHAR(0)), NCHAR(31),
+            ISNULL([JobTitle], NCHAR(0)), NCHAR(31), ISNULL(CAST([SeniorityLevel] AS [nvarchar](11)), NCHAR(0))
+        )) AS [binary](32)) PERSISTED,
+        CONSTRAINT [PK_AD_Staging] PRIMARY KEY CLUSTERED ([LoginName] ASC)
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
+    );
+    PRINT 'Created table: jit.AD_Staging'
+END
+GO
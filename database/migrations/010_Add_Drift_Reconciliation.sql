@@ -0,0 +1,93 @@
+-- =============================================
+-- Migration 010: role drift reconciliation
+-- Adds jit.Drift_Observed_Members, jit.Drift_Database_State, jit.Drift_Findings
+-- and the jit.DriftCheckList table type to an existing deployment
+-- (fresh deployments get them from schema\23_* to schema\26_*)
+-- After this script: re-run views\99_Create_All_Views.sql (adds vw_Drift_*) and
+-- run procedures\sp_Drift_Detect.sql
+-- Safe to re-run
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET ANSI_NULLS ON
+GO
+
+SET QUOTED_IDENTIFIER ON
+GO
+
+IF OBJECT_ID(N'[jit].[Drift_Observed_Members]', N'U') IS NULL
+BEGIN
+    CREATE TABLE [jit].[Drift_Observed_Members](
+        [DatabaseName] [nvarchar](255) NOT NULL,
+        [DbRoleName] [nvarchar](255) NOT NULL,
+        [MemberName] [nvarchar](255) NOT NULL,
+        [ObservedUtc] [datetime2](7) NOT NULL CONSTRAINT [DF_Drift_Observed_Members_ObservedUtc] DEFAULT (GETUTCDATE()),
+        CONSTRAINT [PK_Drift_Observed_Members] PRIMARY KEY CLUSTERED ([DatabaseName] ASC, [DbRoleName] ASC, [MemberName] ASC)
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
+    );
+    PRINT 'Created table: jit.Drift_Observed_Members'
+END
+GO
+
+IF OBJECT_ID(N'[jit].[Drift_Database_State]', N'U') IS NULL
+BEGIN
+    CREATE TABLE [jit].[Drift_Database_State](
+        [DatabaseName] [nvarchar](255) NOT NULL,
+        [MembershipHash] [binary](32) NULL,
+        [MemberCount] [int] NULL,
+        [ExpectedHash] [binary](32) NULL,
+        [MissingCount] [int] NOT NULL CONSTRAINT [DF_Drift_Database_State_MissingCount] DEFAULT (0),
+        [OrphanedCount] [int] NOT NULL CONSTRAINT [DF_Drift_Database_State_OrphanedCount] DEFAULT (0),
+        [LastDiffUtc] [datetime2](7) NULL,
+        [LastCheckedUtc] [datetime2](7) NOT NULL CONSTRAINT [DF_Drift_Database_State_LastCheckedUtc] DEFAULT (GETUTCDATE()),
+        [LastError] [nvarchar](max) NULL,
+        CONSTRAINT [PK_Drift_Database_State] PRIMARY KEY CLUSTERED ([DatabaseName] ASC)
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
+    );
+    PRINT 'Created table: jit.Drift_Database_State'
+END
+GO
+
+IF OBJECT_ID(N'[jit].[Drift_Findings]', N'U') IS NULL
+BEGIN
+    CREATE TABLE [jit].[Drift_Findings](
+        [FindingId] [bigint] IDENTITY(1,1) NOT NULL,
+        [DatabaseName] [nvarchar](255) NOT NULL,
+        [DbRoleName] [nvarchar](255) NOT NULL,
+        [MemberName] [nvarchar](255) NOT NULL,
+        [DriftType] [nvarchar](20) NOT NULL,
+        [DbRoleId] [int] NULL,
+        [UserId] [nvarchar](255) NULL,
+        [GrantId] [bigint] NULL,
+        [DetectedUtc] [datetime2](7) NOT NULL CONSTRAINT [DF_Drift_Findings_DetectedUtc] DEFAULT (GETUTCDATE()),
+        [LastSeenUtc] [datetime2](7) NOT NULL CONSTRAINT [DF_Drift_Findings_LastSeenUtc] DEFAULT (GETUTCDATE()),
+        [RepairAttemptUtc] [datetime2](7) NULL,
+        [RepairSucceeded] [bit] NULL,
+        [RepairError] [nvarchar](max) NULL,
+        CONSTRAINT [PK_Drift_Findings] PRIMARY KEY CLUSTERED ([FindingId] ASC)
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON),
+        CONSTRAINT [CK_Drift_Findings_DriftType] CHECK ([DriftType] IN ('Missing', 'Orphaned'))
+    );
+
+    CREATE UNIQUE NONCLUSTERED INDEX [IX_Drift_Findings_Membership] ON [jit].[Drift_Findings]([DatabaseName] ASC, [DbRoleName] ASC, [MemberName] ASC)
+        INCLUDE ([DriftType])
+        WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON);
+    PRINT 'Created table: jit.Drift_Findings'
+END
+GO
+
+IF TYPE_ID(N'[jit].[DriftCheckList]') IS NULL
+    CREATE TYPE [jit].[DriftCheckList] AS TABLE(
+        [DatabaseName] [nvarchar](255) NOT NULL,
+        [Status] [nvarchar](20) NOT NULL,
+        [MembershipHash] [binary](32) NULL,
+        [MemberCount] [int] NULL,
+        [Error] [nvarchar](max) NULL,
+        PRIMARY KEY CLUSTERED ([DatabaseName] ASC)
+    );
+GO
+
+PRINT 'Type present: jit.DriftCheckList'
+GO
@@ -2,7 +2,7 @@
 -- Master Script: Create All JIT Framework Stored Procedures
 -- This script creates all stored procedures in the correct dependency order
 -- =============================================
--- Note: Run this script AFTER creating all tables
+-- Note: Run this script AFTER creating all tables and views
 -- 
 -- Dependency Order:
 -- 1. User procedures (no dependencies)
@@ -23,16 +23,21 @@ PRINT ''
 -- (No dependencies on other procedures)
 -- =============================================
 PRINT 'Step 1: Creating Identity Management Procedures...'
+:r "procedures\sp_CacheVersion_Bump.sql"
 :r "procedures\sp_User_ResolveCurrentUser.sql"
 :r "procedures\sp_User_GetByLogin.sql"
 :r "procedures\sp_User_SyncFromAD.sql"
 :r "procedures\sp_User_Eligibility_Check.sql"
+:r "procedures\sp_Eligibility_ProcessQueue.sql"
+:r "procedures\sp_Eligibility_Rebuild.sql"
+:r "procedures\sp_Eligibility_RefreshDue.sql"
+:r "procedures\sp_Eligibility_CheckConsistency.sql"
 :r "procedures\sp_Approver_CanApproveRequest.sql"
 PRINT ''
 
 -- =============================================
 -- Step 2: Role Management Procedures
--- (Depends on sp_User_Eligibility_Check)
+-- (Depends on jit.vw_User_Role_Eligibility)
 -- =============================================
 PRINT 'Step 2: Creating Role Management Procedures...'
 :r "procedures\sp_Role_ListRequestable.sql"
@@ -44,16 +49,18 @@ PRINT ''
 -- =============================================
 PRINT 'Step 3: Creating Grant Management Procedures...'
 :r "procedures\sp_Grant_Issue.sql"
+:r "procedures\sp_Grant_IssueForRequest.sql"
 :r "procedures\sp_Grant_Expire.sql"
 :r "procedures\sp_Grant_ListActiveForUser.sql"
 PRINT ''
 
 -- =============================================
 -- Step 4: Request Workflow Procedures
--- (sp_Request_Create and sp_Request_Approve depend on sp_Grant_Issue)
--- (sp_Request_Create also depends on sp_User_Eligibility_Check)
+-- (sp_Request_Create and sp_Request_Approve depend on sp_Grant_IssueForRequest)
+-- (sp_Request_Create also needs the jit.RoleIdList table type from schema\21_*)
 -- =============================================
 PRINT 'Step 4: Creating Request Workflow Procedures...'
+:r "procedures\sp_Request_RouteApprovers.sql"
 :r "procedures\sp_Request_Create.sql"
 :r "procedures\sp_Request_GetRoles.sql"
 :r "procedures\sp_Request_ListForUser.sql"
@@ -61,15 +68,39 @@ PRINT 'Step 4: Creating Request Workflow Procedures...'
 :r "procedures\sp_Request_Cancel.sql"
 :r "procedures\sp_Request_Approve.sql"
 :r "procedures\sp_Request_Deny.sql"
+:r "procedures\sp_User_GetDashboard.sql"
+PRINT ''
+
+-- =============================================
+-- Step 5: Maintenance Procedures
+-- (Requires AuditLog_Archive table)
+-- =============================================
+PRINT 'Step 5: Creating Maintenance Procedures...'
+:r "procedures\sp_AuditLog_Archive.sql"
+PRINT ''
+
+-- =============================================
+-- Step 6: Drift Reconciliation Procedures
+-- (Needs the jit.DriftCheckList table type from schema\26_* and the vw_Drift_* views)
+-- =============================================
+PRINT 'Step 6: Creating Drift Reconciliation Procedures...'
+:r "procedures\sp_Drift_Detect.sql"
 PRINT ''
 
 PRINT 'Procedure Dependencies:'
-PRINT '  - sp_Role_ListRequestable depends on sp_User_Eligibility_Check'
+PRINT '  - sp_User_SyncFromAD depends on sp_CacheVersion_Bump (invalidates web identity cache)'
+PRINT '  - sp_User_Eligibility_Check and sp_Approver_CanApproveRequest resolve live through vw_User_Role_Eligibility'
+PRINT '  - sp_Role_ListRequestable and sp_Request_RouteApprovers read the materialized User_Effective_Eligibility'
+PRINT '  - sp_Eligibility_Rebuild, sp_Eligibility_RefreshDue and sp_Eligibility_CheckConsistency depend on sp_Eligibility_ProcessQueue'
 PRINT '  - sp_Approver_CanApproveRequest checks all roles in a request (requires Request_Roles table)'
-PRINT '  - sp_Request_Create depends on sp_User_Eligibility_Check and sp_Grant_Issue (supports multiple roles)'
-PRINT '  - sp_Request_Approve depends on sp_Grant_Issue and sp_Approver_CanApproveRequest (creates grants for all roles)'
-PRINT '  - sp_Request_ListPendingForApprover filters by approval capability for all roles in request'
+PRINT '  - sp_Request_Create takes a jit.RoleIdList parameter, validates all roles in one pass through vw_User_Role_Eligibility and depends on sp_Grant_IssueForRequest'
+PRINT '  - sp_Request_Approve depends on sp_Grant_IssueForRequest and sp_Approver_CanApproveRequest (creates grants for all roles)'
+PRINT '  - sp_Request_Create, sp_Request_Cancel, sp_Request_Approve and sp_Request_Deny depend on sp_Request_RouteApprovers'
+PRINT '  - sp_Request_ListPendingForApprover reads the precomputed Request_Approver_Routing (same rules as sp_Approver_CanApproveRequest)'
 PRINT '  - sp_Request_GetRoles is a helper procedure (no dependencies)'
+PRINT '  - sp_User_GetDashboard returns grants, pending/recent requests and counts as four result sets (no procedure dependencies)'
+PRINT '  - sp_AuditLog_Archive moves AuditLog rows into AuditLog_Archive (no procedure dependencies)'
+PRINT '  - sp_Drift_Detect takes a jit.DriftCheckList parameter and diffs Drift_Observed_Members against vw_Drift_ExpectedMembers (no procedure dependencies)'
 PRINT ''
 GO
 
@@ -104,43 +104,17 @@ BEGIN
         -- Check if approver can approve ALL roles
         -- For each role: approver must be able to request it AND have seniority >= requester
         DECLARE @ApprovableRoleCount INT = 0;
-        DECLARE @RoleId INT;
-        DECLARE @CanRequestRole BIT;
-        DECLARE @EligibilityReason NVARCHAR(255);
         
-        -- Cursor to check each role
-        DECLARE role_cursor CURSOR FOR
-            SELECT rr.RoleId
+        IF @ApproverSeniority IS NULL OR @RequesterSeniority IS NULL OR @ApproverSeniority >= @RequesterSeniority
+        BEGIN
+            SELECT @ApprovableRoleCount = COUNT(*)
             FROM [jit].[Request_Roles] rr
+            INNER JOIN [jit].[vw_User_Role_Eligibility] e ON e.RoleId = rr.RoleId
+                AND e.UserId = @ApproverUserId
+                AND e.CanRequest = 1
             WHERE rr.RequestId = @RequestId;
-        
-        OPEN role_cursor;
-        FETCH NEXT FROM role_cursor INTO @RoleId;
-        
-        WHILE @@FETCH_STATUS = 0
-        BEGIN
-            -- Check if approver can request this role
-            EXEC [jit].[sp_User_Eligibility_Check]
-                @UserId = @ApproverUserId,
-                @RoleId = @RoleId,
-                @CanRequest = @CanRequestRole OUTPUT,
-                @EligibilityReason = @EligibilityReason OUTPUT;
-            
-            -- Approver can approve this role if:
-            -- 1. They can request it themselves
-            -- 2. Their seniority >= requester's seniority
-            IF @CanRequestRole = 1
-               AND (@ApproverSeniority IS NULL OR @RequesterSeniority IS NULL OR @ApproverSeniority >= @RequesterSeniority)
-            BEGIN
-                SET @ApprovableRoleCount = @ApprovableRoleCount + 1;
-            END
-            
-            FETCH NEXT FROM role_cursor INTO @RoleId;
         END
         
-        CLOSE role_cursor;
-        DEALLOCATE role_cursor;
-        
         -- Approver can approve only if they can approve ALL roles
         IF @ApprovableRoleCount = @RoleCount
         BEGIN
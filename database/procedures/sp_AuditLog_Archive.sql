@@ -0,0 +1,131 @@
+-- =============================================
+-- Stored Procedure: jit.sp_AuditLog_Archive
+-- Sliding-window retention for the audit trail
+-- Moves events older than @HotRetentionDays from jit.AuditLog to jit.AuditLog_Archive,
+-- then purges archived events older than @ArchiveRetentionDays (NULL keeps them forever)
+-- Each batch is its own short transaction (DELETE ... OUTPUT INTO), so inserts into
+-- the hot table are never blocked for long and the hot table stays a constant size
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_AuditLog_Archive]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_AuditLog_Archive]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE PROCEDURE [jit].[sp_AuditLog_Archive]
+    @HotRetentionDays INT = 90,
+    @ArchiveRetentionDays INT = NULL,
+    @BatchSize INT = 5000,
+    @MaxBatches INT = NULL,
+    @ArchivedCount INT = NULL OUTPUT,
+    @PurgedCount INT = NULL OUTPUT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @CurrentUtc DATETIME2 = GETUTCDATE();
+    DECLARE @HotCutoffUtc DATETIME2;
+    DECLARE @ArchiveCutoffUtc DATETIME2 = NULL;
+    DECLARE @BatchCount INT = 0;
+    DECLARE @BatchRows INT;
+    DECLARE @LockResult INT;
+    
+    SET @ArchivedCount = 0;
+    SET @PurgedCount = 0;
+    
+    IF @HotRetentionDays IS NULL OR @HotRetentionDays < 1
+    BEGIN
+        RAISERROR('@HotRetentionDays must be at least 1', 16, 1);
+        RETURN;
+    END
+    
+    IF @ArchiveRetentionDays IS NOT NULL AND @ArchiveRetentionDays <= @HotRetentionDays
+    BEGIN
+        RAISERROR('@ArchiveRetentionDays must be greater than @HotRetentionDays', 16, 1);
+        RETURN;
+    END
+    
+    IF @BatchSize IS NULL OR @BatchSize < 1
+        SET @BatchSize = 5000;
+    
+    SET @HotCutoffUtc = DATEADD(DAY, -@HotRetentionDays, @CurrentUtc);
+    IF @ArchiveRetentionDays IS NOT NULL
+        SET @ArchiveCutoffUtc = DATEADD(DAY, -@ArchiveRetentionDays, @CurrentUtc);
+    
+    -- One archiver at a time; a second caller returns immediately
+    EXEC @LockResult = sp_getapplock @Resource = N'jit.AuditLog_Archive', @LockMode = 'Exclusive', @LockOwner = 'Session', @LockTimeout = 0;
+    IF @LockResult < 0
+    BEGIN
+        PRINT 'Audit archive already running - skipped';
+        RETURN;
+    END
+    
+    BEGIN TRY
+        -- Hot -> cold, oldest first
+        WHILE @MaxBatches IS NULL OR @BatchCount < @MaxBatches
+        BEGIN
+            DELETE TOP (@BatchSize) a
+            OUTPUT deleted.AuditId, deleted.EventUtc, deleted.EventType, deleted.ActorUserId, deleted.ActorLoginName,
+                   deleted.TargetUserId, deleted.RequestId, deleted.GrantId, deleted.DetailsJson
+            INTO [jit].[AuditLog_Archive] (AuditId, EventUtc, EventType, ActorUserId, ActorLoginName,
+                   TargetUserId, RequestId, GrantId, DetailsJson)
+            FROM [jit].[AuditLog] a
+            WHERE a.EventUtc < @HotCutoffUtc;
+            
+            SET @BatchRows = @@ROWCOUNT;
+            SET @ArchivedCount = @ArchivedCount + @BatchRows;
+            SET @BatchCount = @BatchCount + 1;
+            
+            IF @BatchRows < @BatchSize
+                BREAK;
+        END
+        
+        -- Drop the tail of the archive window
+        IF @ArchiveCutoffUtc IS NOT NULL
+        BEGIN
+            SET @BatchCount = 0;
+            WHILE @MaxBatches IS NULL OR @BatchCount < @MaxBatches
+            BEGIN
+                DELETE TOP (@BatchSize)
+                FROM [jit].[AuditLog_Archive]
+                WHERE EventUtc < @ArchiveCutoffUtc;
+                
+                SET @BatchRows = @@ROWCOUNT;
+                SET @PurgedCount = @PurgedCount + @BatchRows;
+                SET @BatchCount = @BatchCount + 1;
+                
+                IF @BatchRows < @BatchSize
+                    BREAK;
+            END
+        END
+        
+        IF @ArchivedCount > 0 OR @PurgedCount > 0
+        BEGIN
+            INSERT INTO [jit].[AuditLog] (EventType, ActorLoginName, DetailsJson)
+            VALUES (
+                'AuditArchived',
+                'System',
+                '{"ArchivedCount":' + CAST(@ArchivedCount AS NVARCHAR(20)) +
+                ',"PurgedCount":' + CAST(@PurgedCount AS NVARCHAR(20)) +
+                ',"HotCutoffUtc":"' + CONVERT(NVARCHAR(30), @HotCutoffUtc, 127) + '"' +
+                CASE WHEN @ArchiveCutoffUtc IS NULL THEN ''
+                     ELSE ',"ArchiveCutoffUtc":"' + CONVERT(NVARCHAR(30), @ArchiveCutoffUtc, 127) + '"' END +
+                '}'
+            );
+        END
+        
+        EXEC sp_releaseapplock @Resource = N'jit.AuditLog_Archive', @LockOwner = 'Session';
+    END TRY
+    BEGIN CATCH
+        EXEC sp_releaseapplock @Resource = N'jit.AuditLog_Archive', @LockOwner = 'Session';
+        THROW;
+    END CATCH
+END
+GO
@@ -0,0 +1,36 @@
+-- =============================================
+-- Stored Procedure: jit.sp_CacheVersion_Bump
+-- Increments a cache change counter in jit.Cache_Versions
+-- Called by any procedure that changes data the web tier caches
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_CacheVersion_Bump]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_CacheVersion_Bump]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE PROCEDURE [jit].[sp_CacheVersion_Bump]
+    @CacheName NVARCHAR(100)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    UPDATE [jit].[Cache_Versions]
+    SET Version = Version + 1,
+        UpdatedUtc = GETUTCDATE()
+    WHERE CacheName = @CacheName;
+    
+    IF @@ROWCOUNT = 0
+    BEGIN
+        INSERT INTO [jit].[Cache_Versions] (CacheName, Version)
+        VALUES (@CacheName, 1);
+    END
+END
+GO
@@ -0,0 +1,233 @@
+-- =============================================
+-- Stored Procedure: jit.sp_Drift_Detect
+-- Diffs the role memberships read from the target databases
+-- (jit.Drift_Observed_Members) against the memberships active grants imply
+-- (jit.vw_Drift_ExpectedMembers) in one set-based pass, and records the result
+-- in jit.Drift_Findings and jit.Drift_Database_State
+-- =============================================
+-- Called by flask_app/drift_reconcile.py after it has probed every database with
+-- JIT-managed roles concurrently; @Checks holds one row per probed database:
+--   Checked   - memberships were re-read; findings for the database are replaced
+--               (resolved ones deleted, persisting ones keep DetectedUtc)
+--   Unchanged - neither hash moved since the last check; findings are kept
+--   Failed    - the target could not be read; findings are kept and the next
+--               run rechecks the database
+-- Drift data of databases that no longer have JIT-managed roles is removed.
+-- Returns two result sets:
+--   1. One row per database in @Checks (Status, MissingCount, OrphanedCount, LastError)
+--   2. Findings of those databases not yet repaired
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Drift_Detect]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_Drift_Detect]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE PROCEDURE [jit].[sp_Drift_Detect]
+    @Checks [jit].[DriftCheckList] READONLY
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @Now DATETIME2 = GETUTCDATE();
+    DECLARE @CurrentUser NVARCHAR(255) = SUSER_SNAME();
+    DECLARE @NewCount INT = 0;
+    DECLARE @ResolvedCount INT = 0;
+    
+    CREATE TABLE #Drift (
+        DatabaseName NVARCHAR(255) NOT NULL,
+        DbRoleName NVARCHAR(255) NOT NULL,
+        MemberName NVARCHAR(255) NOT NULL,
+        DriftType NVARCHAR(20) NOT NULL,
+        DbRoleId INT NULL,
+        UserId NVARCHAR(255) NULL,
+        GrantId BIGINT NULL,
+        PRIMARY KEY (DatabaseName, DbRoleName, MemberName)
+    );
+    
+    -- Expected vs observed for every rechecked database at once
+    INSERT INTO #Drift (DatabaseName, DbRoleName, MemberName, DriftType, DbRoleId, UserId, GrantId)
+    SELECT
+        COALESCE(e.DatabaseName, o.DatabaseName),
+        COALESCE(e.DbRoleName, o.DbRoleName),
+        COALESCE(e.MemberName, o.MemberName),
+        CASE WHEN o.MemberName IS NULL THEN 'Missing' ELSE 'Orphaned' END,
+        COALESCE(e.DbRoleId, dbr.DbRoleId),
+        COALESCE(e.UserId, u.UserId),
+        e.GrantId
+    FROM (
+        SELECT em.DatabaseName, em.DbRoleName, em.MemberName, em.DbRoleId, em.UserId, em.GrantId
+        FROM [jit].[vw_Drift_ExpectedMembers] em
+        WHERE EXISTS (SELECT 1 FROM @Checks c WHERE c.DatabaseName = em.DatabaseName AND c.Status = 'Checked')
+    ) e
+    FULL OUTER JOIN (
+        SELECT om.DatabaseName, om.DbRoleName, om.MemberName
+        FROM [jit].[Drift_Observed_Members] om
+        WHERE EXISTS (SELECT 1 FROM @Checks c WHERE c.DatabaseName = om.DatabaseName AND c.Status = 'Checked')
+    ) o ON o.DatabaseName = e.DatabaseName AND o.DbRoleName = e.DbRoleName AND o.MemberName = e.MemberName
+    LEFT JOIN [jit].[DB_Roles] dbr ON e.DatabaseName IS NULL
+        AND dbr.DatabaseName = o.DatabaseName AND dbr.DbRoleName = o.DbRoleName
+    LEFT JOIN [jit].[Users] u ON e.DatabaseName IS NULL
+        AND u.LoginName = o.MemberName
+    WHERE e.MemberName IS NULL
+    OR o.MemberName IS NULL;
+    
+    SELECT
+        c.DatabaseName,
+        c.Status,
+        c.MembershipHash,
+        c.MemberCount,
+        c.Error,
+        es.ExpectedHash,
+        ISNULL(dc.MissingCount, 0) AS MissingCount,
+        ISNULL(dc.OrphanedCount, 0) AS OrphanedCount
+    INTO #State
+    FROM @Checks c
+    LEFT JOIN [jit].[vw_Drift_ExpectedState] es ON es.DatabaseName = c.DatabaseName
+    OUTER APPLY (
+        SELECT
+            SUM(CASE WHEN d.DriftType = 'Missing' THEN 1 ELSE 0 END) AS MissingCount,
+            SUM(CASE WHEN d.DriftType = 'Orphaned' THEN 1 ELSE 0 END) AS OrphanedCount
+        FROM #Drift d
+        WHERE d.DatabaseName = c.DatabaseName
+    ) dc;
+    
+    BEGIN TRY
+        BEGIN TRANSACTION;
+    
+        -- Resolved differences of the rechecked databases
+        DELETE f
+        FROM [jit].[Drift_Findings] f
+        WHERE EXISTS (SELECT 1 FROM @Checks c WHERE c.DatabaseName = f.DatabaseName AND c.Status = 'Checked')
+        AND NOT EXISTS (
+            SELECT 1 FROM #Drift d
+            WHERE d.DatabaseName = f.DatabaseName
+            AND d.DbRoleName = f.DbRoleName
+            AND d.MemberName = f.MemberName
+            AND d.DriftType = f.DriftType
+        );
+    
+        SET @ResolvedCount = @@ROWCOUNT;
+    
+        -- Persisting differences: a repair that reported success did not stick
+        UPDATE f
+        SET
+            LastSeenUtc = @Now,
+            DbRoleId = d.DbRoleId,
+            UserId = d.UserId,
+            GrantId = d.GrantId,
+            RepairSucceeded = CASE WHEN f.RepairSucceeded = 1 THEN NULL ELSE f.RepairSucceeded END
+        FROM [jit].[Drift_Findings] f
+        INNER JOIN #Drift d ON d.DatabaseName = f.DatabaseName
+            AND d.DbRoleName = f.DbRoleName
+            AND d.MemberName = f.MemberName
+            AND d.DriftType = f.DriftType;
+    
+        INSERT INTO [jit].[Drift_Findings] (
+            DatabaseName, DbRoleName, MemberName, DriftType, DbRoleId, UserId, GrantId, DetectedUtc, LastSeenUtc
+        )
+        SELECT d.DatabaseName, d.DbRoleName, d.MemberName, d.DriftType, d.DbRoleId, d.UserId, d.GrantId, @Now, @Now
+        FROM #Drift d
+        WHERE NOT EXISTS (
+            SELECT 1 FROM [jit].[Drift_Findings] f
+            WHERE f.DatabaseName = d.DatabaseName
+            AND f.DbRoleName = d.DbRoleName
+            AND f.MemberName = d.MemberName
+        );
+    
+        SET @NewCount = @@ROWCOUNT;
+    
+        UPDATE s
+        SET
+            MembershipHash = CASE st.Status WHEN 'Checked' THEN st.MembershipHash WHEN 'Failed' THEN NULL ELSE s.MembershipHash END,
+            MemberCount = CASE st.Status WHEN 'Checked' THEN st.MemberCount ELSE s.MemberCount END,
+            ExpectedHash = CASE st.Status WHEN 'Checked' THEN st.ExpectedHash ELSE s.ExpectedHash END,
+            MissingCount = CASE st.Status WHEN 'Checked' THEN st.MissingCount ELSE s.MissingCount END,
+            OrphanedCount = CASE st.Status WHEN 'Checked' THEN st.OrphanedCount ELSE s.OrphanedCount END,
+            LastDiffUtc = CASE st.Status WHEN 'Checked' THEN @Now ELSE s.LastDiffUtc END,
+            LastCheckedUtc = @Now,
+            LastError = CASE st.Status WHEN 'Checked' THEN NULL WHEN 'Failed' THEN st.Error ELSE s.LastError END
+        FROM [jit].[Drift_Database_State] s
+        INNER JOIN #State st ON st.DatabaseName = s.DatabaseName;
+    
+        INSERT INTO [jit].[Drift_Database_State] (
+            DatabaseName, MembershipHash, MemberCount, ExpectedHash, MissingCount, OrphanedCount,
+            LastDiffUtc, LastCheckedUtc, LastError
+        )
+        SELECT
+            st.DatabaseName,
+            CASE WHEN st.Status = 'Checked' THEN st.MembershipHash END,
+            CASE WHEN st.Status = 'Checked' THEN st.MemberCount END,
+            CASE WHEN st.Status = 'Checked' THEN st.ExpectedHash END,
+            st.MissingCount,
+            st.OrphanedCount,
+            CASE WHEN st.Status = 'Checked' THEN @Now END,
+            @Now,
+            CASE WHEN st.Status = 'Failed' THEN st.Error END
+        FROM #State st
+        WHERE NOT EXISTS (SELECT 1 FROM [jit].[Drift_Database_State] s WHERE s.DatabaseName = st.DatabaseName);
+    
+        -- Databases that no longer have JIT-managed roles
+        DELETE f
+        FROM [jit].[Drift_Findings] f
+        WHERE NOT EXISTS (SELECT 1 FROM [jit].[DB_Roles] dbr WHERE dbr.DatabaseName = f.DatabaseName AND dbr.IsJitManaged = 1);
+    
+        DELETE om
+        FROM [jit].[Drift_Observed_Members] om
+        WHERE NOT EXISTS (SELECT 1 FROM [jit].[DB_Roles] dbr WHERE dbr.DatabaseName = om.DatabaseName AND dbr.IsJitManaged = 1);
+    
+        DELETE s
+        FROM [jit].[Drift_Database_State] s
+        WHERE NOT EXISTS (SELECT 1 FROM [jit].[DB_Roles] dbr WHERE dbr.DatabaseName = s.DatabaseName AND dbr.IsJitManaged = 1);
+    
+        INSERT INTO [jit].[AuditLog] (EventType, ActorLoginName, DetailsJson)
+        SELECT 'DriftCheck', @CurrentUser,
+            '{"Checked":' + CAST(SUM(CASE WHEN c.Status = 'Checked' THEN 1 ELSE 0 END) AS NVARCHAR(10)) +
+            ',"Unchanged":' + CAST(SUM(CASE WHEN c.Status = 'Unchanged' THEN 1 ELSE 0 END) AS NVARCHAR(10)) +
+            ',"Failed":' + CAST(SUM(CASE WHEN c.Status = 'Failed' THEN 1 ELSE 0 END) AS NVARCHAR(10)) +
+            ',"Missing":' + CAST(ISNULL(SUM(s.MissingCount), 0) AS NVARCHAR(10)) +
+            ',"Orphaned":' + CAST(ISNULL(SUM(s.OrphanedCount), 0) AS NVARCHAR(10)) +
+            ',"NewFindings":' + CAST(@NewCount AS NVARCHAR(10)) +
+            ',"ResolvedFindings":' + CAST(@ResolvedCount AS NVARCHAR(10)) + '}'
+        FROM @Checks c
+        LEFT JOIN [jit].[Drift_Database_State] s ON s.DatabaseName = c.DatabaseName;
+    
+        COMMIT TRANSACTION;
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        THROW;
+    END CATCH
+    
+    SELECT
+        c.DatabaseName,
+        c.Status,
+        s.MemberCount,
+        s.MissingCount,
+        s.OrphanedCount,
+        s.LastDiffUtc,
+        s.LastError
+    FROM @Checks c
+    LEFT JOIN [jit].[Drift_Database_State] s ON s.DatabaseName = c.DatabaseName
+    ORDER BY c.DatabaseName;
+    
+    SELECT
+        f.FindingId, f.DatabaseName, f.DbRoleName, f.MemberName, f.DriftType,
+        f.DbRoleId, f.UserId, f.GrantId, f.DetectedUtc, f.RepairAttemptUtc, f.RepairError
+    FROM [jit].[Drift_Findings] f
+    WHERE EXISTS (SELECT 1 FROM @Checks c WHERE c.DatabaseName = f.DatabaseName)
+    AND (f.RepairSucceeded IS NULL OR f.RepairSucceeded = 0)
+    ORDER BY f.DatabaseName, f.DbRoleName, f.MemberName;
+    
+    DROP TABLE #Drift;
+    DROP TABLE #State;
+END
+GO
@@ -0,0 +1,94 @@
+-- =============================================
+-- Stored Procedure: jit.sp_Eligibility_CheckConsistency
+-- Compares jit.User_Effective_Eligibility with the live resolver (jit.vw_User_Role_Eligibility)
+-- Returns one row per mismatch:
+--   Missing - live resolver has a decision the table lacks
+--   Extra   - table has a decision the live resolver does not
+--   Stale   - both have a decision but CanRequest/Priority/Reason differ
+-- @Repair = 1 queues and refreshes the mismatched pairs
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Eligibility_CheckConsistency]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_Eligibility_CheckConsistency]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE PROCEDURE [jit].[sp_Eligibility_CheckConsistency]
+    @UserId NVARCHAR(255) = NULL,
+    @Repair BIT = 0,
+    @MismatchCount INT = NULL OUTPUT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    CREATE TABLE #Mismatches (
+        UserId NVARCHAR(255) NOT NULL,
+        RoleId INT NOT NULL,
+        Issue NVARCHAR(20) NOT NULL,
+        MaterializedCanRequest BIT NULL,
+        MaterializedPriority INT NULL,
+        MaterializedReason NVARCHAR(255) NULL,
+        MaterializedRefreshedUtc DATETIME2 NULL,
+        LiveCanRequest BIT NULL,
+        LivePriority INT NULL,
+        LiveReason NVARCHAR(255) NULL
+    );
+    
+    INSERT INTO #Mismatches
+    SELECT 
+        COALESCE(m.UserId, v.UserId),
+        COALESCE(m.RoleId, v.RoleId),
+        CASE 
+            WHEN m.UserId IS NULL THEN 'Missing'
+            WHEN v.UserId IS NULL THEN 'Extra'
+            ELSE 'Stale'
+        END,
+        m.CanRequest,
+        m.Priority,
+        m.EligibilityReason,
+        m.RefreshedUtc,
+        v.CanRequest,
+        v.Priority,
+        v.EligibilityReason
+    FROM (
+        SELECT UserId, RoleId, CanRequest, Priority, EligibilityReason, RefreshedUtc
+        FROM [jit].[User_Effective_Eligibility]
+        WHERE @UserId IS NULL OR UserId = @UserId
+    ) m
+    FULL OUTER JOIN (
+        SELECT UserId, RoleId, CanRequest, Priority, EligibilityReason
+        FROM [jit].[vw_User_Role_Eligibility]
+        WHERE @UserId IS NULL OR UserId = @UserId
+    ) v ON v.UserId = m.UserId AND v.RoleId = m.RoleId
+    WHERE m.UserId IS NULL
+    OR v.UserId IS NULL
+    OR m.CanRequest <> v.CanRequest
+    OR m.Priority <> v.Priority
+    OR m.EligibilityReason <> v.EligibilityReason;
+    
+    SET @MismatchCount = @@ROWCOUNT;
+    
+    SELECT * FROM #Mismatches
+    ORDER BY UserId, RoleId;
+    
+    IF @Repair = 1 AND @MismatchCount > 0
+    BEGIN
+        INSERT INTO [jit].[Eligibility_Refresh_Queue] (UserId, RoleId, Reason)
+        SELECT UserId, RoleId, 'ConsistencyRepair'
+        FROM #Mismatches;
+        
+        EXEC [jit].[sp_Eligibility_ProcessQueue];
+        
+        PRINT 'Repaired ' + CAST(@MismatchCount AS NVARCHAR(20)) + ' effective eligibility row(s)';
+    END
+    
+    DROP TABLE #Mismatches;
+END
+GO
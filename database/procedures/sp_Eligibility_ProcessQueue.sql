@@ -0,0 +1,130 @@
+-- =============================================
+-- Stored Procedure: jit.sp_Eligibility_ProcessQueue
+-- Incrementally refreshes jit.User_Effective_Eligibility for the keys
+-- waiting in jit.Eligibility_Refresh_Queue
+-- Called by the eligibility triggers (same transaction as the change)
+-- and by sp_Eligibility_RefreshDue
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Eligibility_ProcessQueue]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_Eligibility_ProcessQueue]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE PROCEDURE [jit].[sp_Eligibility_ProcessQueue]
+    @ProcessedCount INT = NULL OUTPUT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @MaxQueueId BIGINT;
+    DECLARE @OwnsTransaction BIT = 0;
+    
+    SET @ProcessedCount = 0;
+    
+    IF NOT EXISTS (SELECT 1 FROM [jit].[Eligibility_Refresh_Queue])
+        RETURN;
+    
+    BEGIN TRY
+        -- Triggers call this inside the caller's transaction; only open our own when standalone
+        IF @@TRANCOUNT = 0
+        BEGIN
+            BEGIN TRANSACTION;
+            SET @OwnsTransaction = 1;
+        END
+        
+        -- Serialize refreshes so concurrent writers cannot interleave delete/insert on the same keys
+        EXEC sp_getapplock @Resource = N'jit.Eligibility_Refresh', @LockMode = 'Exclusive', @LockOwner = 'Transaction';
+        
+        SELECT @MaxQueueId = MAX(QueueId) FROM [jit].[Eligibility_Refresh_Queue];
+        
+        IF @MaxQueueId IS NOT NULL
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM [jit].[Eligibility_Refresh_Queue]
+                WHERE QueueId <= @MaxQueueId AND UserId IS NULL AND RoleId IS NULL
+            )
+            BEGIN
+                -- Full rebuild requested
+                DELETE FROM [jit].[User_Effective_Eligibility];
+                
+                INSERT INTO [jit].[User_Effective_Eligibility] (UserId, RoleId, CanRequest, Priority, EligibilityReason)
+                SELECT v.UserId, v.RoleId, v.CanRequest, v.Priority, v.EligibilityReason
+                FROM [jit].[vw_User_Role_Eligibility] v;
+            END
+            ELSE
+            BEGIN
+                CREATE TABLE #RefreshUsers (UserId NVARCHAR(255) NOT NULL PRIMARY KEY);
+                CREATE TABLE #RefreshRoles (RoleId INT NOT NULL PRIMARY KEY);
+                CREATE TABLE #RefreshPairs (UserId NVARCHAR(255) NOT NULL, RoleId INT NOT NULL, PRIMARY KEY (UserId, RoleId));
+                
+                INSERT INTO #RefreshUsers (UserId)
+                SELECT DISTINCT UserId FROM [jit].[Eligibility_Refresh_Queue]
+                WHERE QueueId <= @MaxQueueId AND UserId IS NOT NULL AND RoleId IS NULL;
+                
+                INSERT INTO #RefreshRoles (RoleId)
+                SELECT DISTINCT RoleId FROM [jit].[Eligibility_Refresh_Queue]
+                WHERE QueueId <= @MaxQueueId AND UserId IS NULL AND RoleId IS NOT NULL;
+                
+                -- Pairs already covered by a whole-user or whole-role refresh are skipped
+                INSERT INTO #RefreshPairs (UserId, RoleId)
+                SELECT DISTINCT q.UserId, q.RoleId FROM [jit].[Eligibility_Refresh_Queue] q
+                WHERE q.QueueId <= @MaxQueueId AND q.UserId IS NOT NULL AND q.RoleId IS NOT NULL
+                AND NOT EXISTS (SELECT 1 FROM #RefreshUsers ru WHERE ru.UserId = q.UserId)
+                AND NOT EXISTS (SELECT 1 FROM #RefreshRoles rr WHERE rr.RoleId = q.RoleId);
+                
+                -- Remove current decisions for every affected key
+                DELETE e FROM [jit].[User_Effective_Eligibility] e
+                INNER JOIN #RefreshUsers ru ON ru.UserId = e.UserId;
+                
+                DELETE e FROM [jit].[User_Effective_Eligibility] e
+                INNER JOIN #RefreshRoles rr ON rr.RoleId = e.RoleId;
+                
+                DELETE e FROM [jit].[User_Effective_Eligibility] e
+                INNER JOIN #RefreshPairs rp ON rp.UserId = e.UserId AND rp.RoleId = e.RoleId;
+                
+                -- Re-resolve them from the live resolver
+                INSERT INTO [jit].[User_Effective_Eligibility] (UserId, RoleId, CanRequest, Priority, EligibilityReason)
+                SELECT v.UserId, v.RoleId, v.CanRequest, v.Priority, v.EligibilityReason
+                FROM #RefreshUsers ru
+                INNER JOIN [jit].[vw_User_Role_Eligibility] v ON v.UserId = ru.UserId;
+                
+                INSERT INTO [jit].[User_Effective_Eligibility] (UserId, RoleId, CanRequest, Priority, EligibilityReason)
+                SELECT v.UserId, v.RoleId, v.CanRequest, v.Priority, v.EligibilityReason
+                FROM #RefreshRoles rr
+                INNER JOIN [jit].[vw_User_Role_Eligibility] v ON v.RoleId = rr.RoleId
+                WHERE NOT EXISTS (SELECT 1 FROM #RefreshUsers ru WHERE ru.UserId = v.UserId);
+                
+                INSERT INTO [jit].[User_Effective_Eligibility] (UserId, RoleId, CanRequest, Priority, EligibilityReason)
+                SELECT v.UserId, v.RoleId, v.CanRequest, v.Priority, v.EligibilityReason
+                FROM #RefreshPairs rp
+                INNER JOIN [jit].[vw_User_Role_Eligibility] v ON v.UserId = rp.UserId AND v.RoleId = rp.RoleId;
+                
+                DROP TABLE #RefreshUsers;
+                DROP TABLE #RefreshRoles;
+                DROP TABLE #RefreshPairs;
+            END
+            
+            DELETE FROM [jit].[Eligibility_Refresh_Queue]
+            WHERE QueueId <= @MaxQueueId;
+            
+            SET @ProcessedCount = @@ROWCOUNT;
+        END
+        
+        IF @OwnsTransaction = 1
+            COMMIT TRANSACTION;
+    END TRY
+    BEGIN CATCH
+        IF @OwnsTransaction = 1 AND @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        THROW;
+    END CATCH
+END
+GO
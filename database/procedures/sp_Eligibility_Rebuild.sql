@@ -0,0 +1,36 @@
+-- =============================================
+-- Stored Procedure: jit.sp_Eligibility_Rebuild
+-- Full rebuild of jit.User_Effective_Eligibility from jit.vw_User_Role_Eligibility
+-- Fallback for when incremental refresh is suspect (see sp_Eligibility_CheckConsistency)
+-- and for initial population after deployment/migration
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Eligibility_Rebuild]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_Eligibility_Rebuild]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE PROCEDURE [jit].[sp_Eligibility_Rebuild]
+    @RowCount INT = NULL OUTPUT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    -- A keyless queue entry means "rebuild everything"; queued keys are absorbed by it
+    INSERT INTO [jit].[Eligibility_Refresh_Queue] (UserId, RoleId, Reason)
+    VALUES (NULL, NULL, 'Rebuild');
+    
+    EXEC [jit].[sp_Eligibility_ProcessQueue];
+    
+    SELECT @RowCount = COUNT(*) FROM [jit].[User_Effective_Eligibility];
+    
+    PRINT 'Rebuilt effective eligibility: ' + CAST(@RowCount AS NVARCHAR(20)) + ' row(s)';
+END
+GO
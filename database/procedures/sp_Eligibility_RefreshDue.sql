@@ -0,0 +1,48 @@
+-- =============================================
+-- Stored Procedure: jit.sp_Eligibility_RefreshDue
+-- Queues keys whose rule/override validity window opened or closed recently,
+-- then drains the refresh queue
+-- Triggers only see data changes; time passing is picked up here
+-- Run from SQL Agent (see jobs\job_RefreshEligibility.sql)
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Eligibility_RefreshDue]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_Eligibility_RefreshDue]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE PROCEDURE [jit].[sp_Eligibility_RefreshDue]
+    @LookbackMinutes INT = 15,
+    @ProcessedCount INT = NULL OUTPUT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @CurrentUtc DATETIME2 = GETUTCDATE();
+    -- Lookback should exceed the job interval so a late run never misses a boundary
+    DECLARE @SinceUtc DATETIME2 = DATEADD(MINUTE, -@LookbackMinutes, @CurrentUtc);
+    
+    -- Scope rules crossing a boundary affect every user for that role
+    INSERT INTO [jit].[Eligibility_Refresh_Queue] (UserId, RoleId, Reason)
+    SELECT DISTINCT NULL, rer.RoleId, 'RuleWindow'
+    FROM [jit].[Role_Eligibility_Rules] rer
+    WHERE (rer.ValidFromUtc > @SinceUtc AND rer.ValidFromUtc <= @CurrentUtc)
+    OR (rer.ValidToUtc >= @SinceUtc AND rer.ValidToUtc < @CurrentUtc);
+    
+    -- Overrides crossing a boundary affect a single pair
+    INSERT INTO [jit].[Eligibility_Refresh_Queue] (UserId, RoleId, Reason)
+    SELECT ue.UserId, ue.RoleId, 'OverrideWindow'
+    FROM [jit].[User_To_Role_Eligibility] ue
+    WHERE (ue.ValidFromUtc > @SinceUtc AND ue.ValidFromUtc <= @CurrentUtc)
+    OR (ue.ValidToUtc >= @SinceUtc AND ue.ValidToUtc < @CurrentUtc);
+    
+    EXEC [jit].[sp_Eligibility_ProcessQueue] @ProcessedCount = @ProcessedCount OUTPUT;
+END
+GO
@@ -2,6 +2,9 @@
 -- Stored Procedure: jit.sp_Grant_Expire
 -- Called by expiry job to process expired grants
 -- Removes role memberships and updates grant status
+-- Works in batches of @BatchSize grants: DROP MEMBER statements are sent as one
+-- dynamic batch per target database, then assignment/grant status and audit rows
+-- are written set-based in one short transaction per batch
 -- =============================================
 
 USE [DMAP_JIT_Permissions]
@@ -17,125 +20,174 @@ SET QUOTED_IDENTIFIER ON
 GO
 
 CREATE PROCEDURE [jit].[sp_Grant_Expire]
-    @ExpiredCount INT OUTPUT
+    @ExpiredCount INT OUTPUT,
+    @BatchSize INT = 500,
+    @MaxBatches INT = NULL
 AS
 BEGIN
     SET NOCOUNT ON;
     
     DECLARE @CurrentUser NVARCHAR(255) = 'System';
     DECLARE @CurrentUtc DATETIME2 = GETUTCDATE();
-    
-    DECLARE @GrantId BIGINT;
-    DECLARE @UserId NVARCHAR(255);
-    DECLARE @LoginName NVARCHAR(255);
-    DECLARE @DbRoleName NVARCHAR(255);
+    DECLARE @BatchCount INT = 0;
+    DECLARE @BatchExpired INT;
     DECLARE @DatabaseName NVARCHAR(255);
-    DECLARE @DbRoleId INT;
-    DECLARE @DropError NVARCHAR(MAX);
+    DECLARE @Sql NVARCHAR(MAX);
     
     SET @ExpiredCount = 0;
     
-    -- Find expired active grants
-    DECLARE grant_cursor CURSOR FOR
-    SELECT g.GrantId, g.UserId, u.LoginName
-    FROM [jit].[Grants] g
-    INNER JOIN [jit].[Users] u ON g.UserId = u.UserId
-    WHERE g.Status = 'Active'
-    AND g.ValidToUtc < @CurrentUtc;
+    IF @BatchSize IS NULL OR @BatchSize < 1
+        SET @BatchSize = 500;
+    
+    CREATE TABLE #ExpireBatch (
+        GrantId BIGINT NOT NULL PRIMARY KEY,
+        UserId NVARCHAR(255) NOT NULL,
+        LoginName NVARCHAR(255) NOT NULL
+    );
+    
+    -- One row per role membership to drop; the dynamic batches write their outcome back here
+    CREATE TABLE #RoleDrops (
+        DropKey INT IDENTITY(1,1) NOT NULL PRIMARY KEY,
+        GrantId BIGINT NOT NULL,
+        DbRoleId INT NOT NULL,
+        UserId NVARCHAR(255) NOT NULL,
+        LoginName NVARCHAR(255) NOT NULL,
+        DatabaseName NVARCHAR(255) NOT NULL,
+        DbRoleName NVARCHAR(255) NOT NULL,
+        DropAttemptUtc DATETIME2 NULL,
+        DropSucceeded BIT NULL,
+        DropError NVARCHAR(MAX) NULL
+    );
     
-    OPEN grant_cursor;
-    FETCH NEXT FROM grant_cursor INTO @GrantId, @UserId, @LoginName;
+    CREATE TABLE #ExpiredGrants (
+        GrantId BIGINT NOT NULL PRIMARY KEY,
+        UserId NVARCHAR(255) NOT NULL
+    );
     
-    WHILE @@FETCH_STATUS = 0
+    WHILE @MaxBatches IS NULL OR @BatchCount < @MaxBatches
     BEGIN
+        DELETE FROM #ExpireBatch;
+        DELETE FROM #RoleDrops;
+        DELETE FROM #ExpiredGrants;
+        
+        -- Find the next batch of expired active grants (oldest first)
+        INSERT INTO #ExpireBatch (GrantId, UserId, LoginName)
+        SELECT TOP (@BatchSize) g.GrantId, g.UserId, u.LoginName
+        FROM [jit].[Grants] g
+        INNER JOIN [jit].[Users] u ON g.UserId = u.UserId
+        WHERE g.Status = 'Active'
+        AND g.ValidToUtc < @CurrentUtc
+        ORDER BY g.ValidToUtc;
+        
+        IF @@ROWCOUNT = 0
+            BREAK;
+        
+        SET @BatchCount = @BatchCount + 1;
+        
+        -- Get all DB roles for the batch
+        INSERT INTO #RoleDrops (GrantId, DbRoleId, UserId, LoginName, DatabaseName, DbRoleName)
+        SELECT b.GrantId, dbr.DbRoleId, b.UserId, b.LoginName, dbr.DatabaseName, dbr.DbRoleName
+        FROM #ExpireBatch b
+        INNER JOIN [jit].[Grant_DBRole_Assignments] gdba ON gdba.GrantId = b.GrantId
+        INNER JOIN [jit].[DB_Roles] dbr ON gdba.DbRoleId = dbr.DbRoleId
+        WHERE gdba.AddSucceeded = 1;
+        
+        -- Remove memberships: one round trip per target database, each DROP MEMBER in its
+        -- own TRY/CATCH so a failing role is recorded without affecting the others
+        DECLARE db_cursor CURSOR LOCAL FAST_FORWARD FOR
+            SELECT DISTINCT DatabaseName FROM #RoleDrops;
+        
+        OPEN db_cursor;
+        FETCH NEXT FROM db_cursor INTO @DatabaseName;
+        
+        WHILE @@FETCH_STATUS = 0
+        BEGIN
+            SELECT @Sql = N'USE ' + QUOTENAME(@DatabaseName) + N';' + NCHAR(10) + STRING_AGG(CAST(
+                N'BEGIN TRY ALTER ROLE ' + QUOTENAME(DbRoleName) + N' DROP MEMBER ' + QUOTENAME(LoginName) + N'; '
+                + N'UPDATE #RoleDrops SET DropAttemptUtc = GETUTCDATE(), DropSucceeded = 1 WHERE DropKey = ' + CAST(DropKey AS NVARCHAR(10)) + N'; END TRY '
+                + N'BEGIN CATCH UPDATE #RoleDrops SET DropAttemptUtc = GETUTCDATE(), DropSucceeded = 0, DropError = ERROR_MESSAGE() WHERE DropKey = ' + CAST(DropKey AS NVARCHAR(10)) + N'; END CATCH'
+                AS NVARCHAR(MAX)), NCHAR(10))
+            FROM #RoleDrops
+            WHERE DatabaseName = @DatabaseName;
+            
+            BEGIN TRY
+                EXEC sp_executesql @Sql;
+            END TRY
+            BEGIN CATCH
+                -- Batch-level failure (e.g. database offline): every unattempted drop for it fails
+                UPDATE #RoleDrops
+                SET DropAttemptUtc = GETUTCDATE(),
+                    DropSucceeded = 0,
+                    DropError = ERROR_MESSAGE()
+                WHERE DatabaseName = @DatabaseName
+                AND DropSucceeded IS NULL;
+            END CATCH
+            
+            FETCH NEXT FROM db_cursor INTO @DatabaseName;
+        END
+        
+        CLOSE db_cursor;
+        DEALLOCATE db_cursor;
+        
         BEGIN TRY
             BEGIN TRANSACTION;
             
-            -- Get all DB roles for this grant and remove user from each
-            DECLARE role_cursor CURSOR FOR
-            SELECT dbr.DatabaseName, dbr.DbRoleName, dbr.DbRoleId
+            -- Record per-role outcome
+            UPDATE gdba
+            SET DropAttemptUtc = rd.DropAttemptUtc,
+                DropSucceeded = rd.DropSucceeded,
+                DropError = rd.DropError
             FROM [jit].[Grant_DBRole_Assignments] gdba
-            INNER JOIN [jit].[DB_Roles] dbr ON gdba.DbRoleId = dbr.DbRoleId
-            WHERE gdba.GrantId = @GrantId
-            AND gdba.AddSucceeded = 1;
+            INNER JOIN #RoleDrops rd ON rd.GrantId = gdba.GrantId AND rd.DbRoleId = gdba.DbRoleId;
             
-            OPEN role_cursor;
-            FETCH NEXT FROM role_cursor INTO @DatabaseName, @DbRoleName, @DbRoleId;
-            
-            WHILE @@FETCH_STATUS = 0
-            BEGIN
-                SET @DropError = NULL;
-                
-                BEGIN TRY
-                    -- Remove user from DB role in the target database
-                    DECLARE @Sql NVARCHAR(MAX) = 
-                        'USE ' + QUOTENAME(@DatabaseName) + '; ' +
-                        'ALTER ROLE ' + QUOTENAME(@DbRoleName) + ' DROP MEMBER ' + QUOTENAME(@LoginName);
-                    EXEC sp_executesql @Sql;
-                    
-                    -- Record success
-                    UPDATE [jit].[Grant_DBRole_Assignments]
-                    SET DropAttemptUtc = GETUTCDATE(),
-                        DropSucceeded = 1
-                    WHERE GrantId = @GrantId AND DbRoleId = @DbRoleId;
-                    
-                END TRY
-                BEGIN CATCH
-                    SET @DropError = ERROR_MESSAGE();
-                    
-                    -- Record failure
-                    UPDATE [jit].[Grant_DBRole_Assignments]
-                    SET DropAttemptUtc = GETUTCDATE(),
-                        DropSucceeded = 0,
-                        DropError = @DropError
-                    WHERE GrantId = @GrantId AND DbRoleId = @DbRoleId;
-                    
-                    -- Log error
-                    INSERT INTO [jit].[AuditLog] (EventType, ActorLoginName, TargetUserId, GrantId, DetailsJson)
-                    VALUES ('RoleDropError', @CurrentUser, @UserId, @GrantId,
-                        '{"DatabaseName":"' + @DatabaseName + '","DbRoleName":"' + @DbRoleName + '","Error":"' + REPLACE(@DropError, '"', '""') + '"}');
-                END CATCH
-                
-                FETCH NEXT FROM role_cursor INTO @DatabaseName, @DbRoleName, @DbRoleId;
-            END
-            
-            CLOSE role_cursor;
-            DEALLOCATE role_cursor;
+            -- Log errors
+            INSERT INTO [jit].[AuditLog] (EventType, ActorLoginName, TargetUserId, GrantId, DetailsJson)
+            SELECT 'RoleDropError', @CurrentUser, rd.UserId, rd.GrantId,
+                '{"DatabaseName":"' + STRING_ESCAPE(rd.DatabaseName, 'json') + '","DbRoleName":"' + STRING_ESCAPE(rd.DbRoleName, 'json') + '","Error":"' + STRING_ESCAPE(ISNULL(rd.DropError, ''), 'json') + '"}'
+            FROM #RoleDrops rd
+            WHERE rd.DropSucceeded = 0;
             
-            -- Update grant status
-            UPDATE [jit].[Grants]
+            -- Update grant status (skips grants expired/revoked by someone else in the meantime)
+            UPDATE g
             SET Status = 'Expired'
-            WHERE GrantId = @GrantId;
+            OUTPUT inserted.GrantId, inserted.UserId INTO #ExpiredGrants (GrantId, UserId)
+            FROM [jit].[Grants] g
+            INNER JOIN #ExpireBatch b ON b.GrantId = g.GrantId
+            WHERE g.Status = 'Active';
+            
+            SET @BatchExpired = @@ROWCOUNT;
             
             -- Log audit
             INSERT INTO [jit].[AuditLog] (EventType, ActorLoginName, TargetUserId, GrantId, DetailsJson)
-            VALUES ('GrantExpired', @CurrentUser, @UserId, @GrantId, '{}');
-            
-            SET @ExpiredCount = @ExpiredCount + 1;
+            SELECT 'GrantExpired', @CurrentUser, eg.UserId, eg.GrantId, '{}'
+            FROM #ExpiredGrants eg;
             
             COMMIT TRANSACTION;
             
+            SET @ExpiredCount = @ExpiredCount + @BatchExpired;
         END TRY
         BEGIN CATCH
             IF @@TRANCOUNT > 0
                 ROLLBACK TRANSACTION;
             
-            -- Log error but continue with next grant
+            -- Log error for every grant in the batch
             INSERT INTO [jit].[AuditLog] (EventType, ActorLoginName, TargetUserId, GrantId, DetailsJson)
-            VALUES ('GrantExpireError', @CurrentUser, @UserId, @GrantId,
-                '{"Error":"' + ERROR_MESSAGE() + '"}');
+            SELECT 'GrantExpireError', @CurrentUser, b.UserId, b.GrantId,
+                '{"Error":"' + STRING_ESCAPE(ERROR_MESSAGE(), 'json') + '"}'
+            FROM #ExpireBatch b;
+            
+            -- The same grants would be picked up again, so stop this run
+            BREAK;
         END CATCH
-        
-        FETCH NEXT FROM grant_cursor INTO @GrantId, @UserId, @LoginName;
     END
     
-    CLOSE grant_cursor;
-    DEALLOCATE grant_cursor;
+    DROP TABLE #ExpireBatch;
+    DROP TABLE #RoleDrops;
+    DROP TABLE #ExpiredGrants;
     
     -- Log job run
     INSERT INTO [jit].[AuditLog] (EventType, ActorLoginName, DetailsJson)
     VALUES ('ExpiredJobRun', @CurrentUser,
-        '{"ExpiredCount":' + CAST(@ExpiredCount AS NVARCHAR(10)) + '}');
+        '{"ExpiredCount":' + CAST(@ExpiredCount AS NVARCHAR(10)) + ',"BatchCount":' + CAST(@BatchCount AS NVARCHAR(10)) + '}');
 END
 GO
-
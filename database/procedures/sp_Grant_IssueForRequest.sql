@@ -0,0 +1,175 @@
+-- =============================================
+-- Stored Procedure: jit.sp_Grant_IssueForRequest
+-- Bulk version of sp_Grant_Issue: issues grants for every role in a request
+-- One grant per business role; DB roles shared between business roles are added
+-- once, with one dynamic batch per target database
+-- Grants, Grant_DBRole_Assignments and AuditLog rows are written set-based
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Grant_IssueForRequest]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_Grant_IssueForRequest]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE PROCEDURE [jit].[sp_Grant_IssueForRequest]
+    @RequestId BIGINT,
+    @UserId NVARCHAR(255),
+    @ValidFromUtc DATETIME2,
+    @ValidToUtc DATETIME2,
+    @IssuedByUserId NVARCHAR(255),
+    @GrantIds NVARCHAR(MAX) = NULL OUTPUT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @CurrentUser NVARCHAR(255) = SUSER_SNAME();
+    DECLARE @LoginName NVARCHAR(255);
+    DECLARE @DatabaseName NVARCHAR(255);
+    DECLARE @Sql NVARCHAR(MAX);
+    
+    CREATE TABLE #IssuedGrants (
+        GrantId BIGINT NOT NULL PRIMARY KEY,
+        RoleId INT NOT NULL
+    );
+    
+    -- Distinct DB roles across all business roles; the dynamic batches write their outcome back here
+    CREATE TABLE #RoleAdds (
+        AddKey INT IDENTITY(1,1) NOT NULL PRIMARY KEY,
+        DbRoleId INT NOT NULL UNIQUE,
+        DatabaseName NVARCHAR(255) NOT NULL,
+        DbRoleName NVARCHAR(255) NOT NULL,
+        AddAttemptUtc DATETIME2 NULL,
+        AddSucceeded BIT NULL,
+        AddError NVARCHAR(MAX) NULL
+    );
+    
+    BEGIN TRY
+        BEGIN TRANSACTION;
+        
+        -- Get user login name
+        SELECT @LoginName = LoginName
+        FROM [jit].[Users]
+        WHERE UserId = @UserId;
+        
+        IF @LoginName IS NULL
+        BEGIN
+            THROW 50003, 'User not found', 1;
+        END
+        
+        -- Create one grant record per role in the request
+        INSERT INTO [jit].[Grants] (
+            RequestId, UserId, RoleId, ValidFromUtc, ValidToUtc,
+            IssuedByUserId, Status
+        )
+        OUTPUT inserted.GrantId, inserted.RoleId INTO #IssuedGrants (GrantId, RoleId)
+        SELECT DISTINCT
+            @RequestId, @UserId, rr.RoleId, @ValidFromUtc, @ValidToUtc,
+            @IssuedByUserId, 'Active'
+        FROM [jit].[Request_Roles] rr
+        WHERE rr.RequestId = @RequestId;
+        
+        -- Collect the DB roles behind all business roles, once each
+        INSERT INTO #RoleAdds (DbRoleId, DatabaseName, DbRoleName)
+        SELECT DISTINCT dbr.DbRoleId, dbr.DatabaseName, dbr.DbRoleName
+        FROM #IssuedGrants ig
+        INNER JOIN [jit].[Role_To_DB_Roles] rtdbr ON rtdbr.RoleId = ig.RoleId
+        INNER JOIN [jit].[DB_Roles] dbr ON dbr.DbRoleId = rtdbr.DbRoleId
+        WHERE dbr.IsJitManaged = 1;
+        
+        -- Add user to DB roles: one dynamic batch per target database, each ADD MEMBER in
+        -- its own TRY/CATCH so a failing role is recorded without affecting the others
+        DECLARE db_cursor CURSOR LOCAL FAST_FORWARD FOR
+            SELECT DISTINCT DatabaseName FROM #RoleAdds;
+        
+        OPEN db_cursor;
+        FETCH NEXT FROM db_cursor INTO @DatabaseName;
+        
+        WHILE @@FETCH_STATUS = 0
+        BEGIN
+            SELECT @Sql = N'USE ' + QUOTENAME(@DatabaseName) + N';' + NCHAR(10) + STRING_AGG(CAST(
+                N'BEGIN TRY ALTER ROLE ' + QUOTENAME(DbRoleName) + N' ADD MEMBER ' + QUOTENAME(@LoginName) + N'; '
+                + N'UPDATE #RoleAdds SET AddAttemptUtc = GETUTCDATE(), AddSucceeded = 1 WHERE AddKey = ' + CAST(AddKey AS NVARCHAR(10)) + N'; END TRY '
+                + N'BEGIN CATCH UPDATE #RoleAdds SET AddAttemptUtc = GETUTCDATE(), AddSucceeded = 0, AddError = ERROR_MESSAGE() WHERE AddKey = ' + CAST(AddKey AS NVARCHAR(10)) + N'; END CATCH'
+                AS NVARCHAR(MAX)), NCHAR(10))
+            FROM #RoleAdds
+            WHERE DatabaseName = @DatabaseName;
+            
+            BEGIN TRY
+                EXEC sp_executesql @Sql;
+            END TRY
+            BEGIN CATCH
+                -- Batch-level failure (e.g. database offline): every unattempted add for it fails
+                UPDATE #RoleAdds
+                SET AddAttemptUtc = GETUTCDATE(),
+                    AddSucceeded = 0,
+                    AddError = ERROR_MESSAGE()
+                WHERE DatabaseName = @DatabaseName
+                AND AddSucceeded IS NULL;
+            END CATCH
+            
+            FETCH NEXT FROM db_cursor INTO @DatabaseName;
+        END
+        
+        CLOSE db_cursor;
+        DEALLOCATE db_cursor;
+        
+        -- Record the outcome against every grant that maps to the DB role
+        INSERT INTO [jit].[Grant_DBRole_Assignments] (
+            GrantId, DbRoleId, AddAttemptUtc, AddSucceeded, AddError
+        )
+        SELECT ig.GrantId, ra.DbRoleId, ra.AddAttemptUtc, ra.AddSucceeded, ra.AddError
+        FROM #IssuedGrants ig
+        INNER JOIN [jit].[Role_To_DB_Roles] rtdbr ON rtdbr.RoleId = ig.RoleId
+        INNER JOIN #RoleAdds ra ON ra.DbRoleId = rtdbr.DbRoleId;
+        
+        -- Log errors (per grant, as sp_Grant_Issue does)
+        INSERT INTO [jit].[AuditLog] (EventType, ActorLoginName, TargetUserId, GrantId, DetailsJson)
+        SELECT 'RoleAddError', @CurrentUser, @UserId, ig.GrantId,
+            '{"DatabaseName":"' + STRING_ESCAPE(ra.DatabaseName, 'json') + '","DbRoleName":"' + STRING_ESCAPE(ra.DbRoleName, 'json') + '","Error":"' + STRING_ESCAPE(ISNULL(ra.AddError, ''), 'json') + '"}'
+        FROM #IssuedGrants ig
+        INNER JOIN [jit].[Role_To_DB_Roles] rtdbr ON rtdbr.RoleId = ig.RoleId
+        INNER JOIN #RoleAdds ra ON ra.DbRoleId = rtdbr.DbRoleId
+        WHERE ra.AddSucceeded = 0;
+        
+        -- Log audit
+        INSERT INTO [jit].[AuditLog] (EventType, ActorUserId, ActorLoginName, TargetUserId, RequestId, GrantId, DetailsJson)
+        SELECT 'GrantIssued', @IssuedByUserId, @CurrentUser, @UserId, @RequestId, ig.GrantId,
+            '{"RoleId":' + CAST(ig.RoleId AS NVARCHAR(10)) + 
+            ',"ValidToUtc":"' + CAST(@ValidToUtc AS NVARCHAR(50)) + '"}'
+        FROM #IssuedGrants ig;
+        
+        -- Update request status if not already auto-approved
+        UPDATE [jit].[Requests]
+        SET Status = 'Approved',
+            UpdatedUtc = GETUTCDATE()
+        WHERE RequestId = @RequestId AND Status = 'Pending';
+        
+        SELECT @GrantIds = STRING_AGG(CAST(GrantId AS NVARCHAR(20)), ',') WITHIN GROUP (ORDER BY GrantId)
+        FROM #IssuedGrants;
+        
+        COMMIT TRANSACTION;
+        
+    END TRY
+    BEGIN CATCH
+        IF CURSOR_STATUS('local', 'db_cursor') >= 0
+        BEGIN
+            CLOSE db_cursor;
+            DEALLOCATE db_cursor;
+        END
+        
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        THROW;
+    END CATCH
+    
+    DROP TABLE #IssuedGrants;
+    DROP TABLE #RoleAdds;
+END
+GO
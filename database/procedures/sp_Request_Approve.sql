@@ -27,10 +27,8 @@ BEGIN
     DECLARE @CurrentUser NVARCHAR(255) = SUSER_SNAME();
     DECLARE @UserId NVARCHAR(255);
     DECLARE @RequestedDurationMinutes INT;
-    DECLARE @GrantId BIGINT;
     DECLARE @CanApprove BIT;
     DECLARE @ApprovalReason NVARCHAR(100);
-    DECLARE @CurrentRoleId INT;
     DECLARE @GrantIds NVARCHAR(MAX) = '';
     
     BEGIN TRY
@@ -82,46 +80,24 @@ BEGIN
             UpdatedUtc = GETUTCDATE()
         WHERE RequestId = @RequestId;
         
+        -- No longer pending: remove it from every approver's queue
+        EXEC [jit].[sp_Request_RouteApprovers] @RequestId = @RequestId;
+        
         -- Issue grants for ALL roles in the request
         DECLARE @GrantValidFromUtc DATETIME2 = GETUTCDATE();
         DECLARE @GrantValidToUtc DATETIME2 = DATEADD(MINUTE, @RequestedDurationMinutes, GETUTCDATE());
         
-        -- Use LOCAL cursor scope to avoid conflicts with other procedures
-        DECLARE role_cursor CURSOR LOCAL STATIC FORWARD_ONLY READ_ONLY FOR 
-            SELECT RoleId 
-            FROM [jit].[Request_Roles] 
-            WHERE RequestId = @RequestId;
-        
-        OPEN role_cursor;
-        FETCH NEXT FROM role_cursor INTO @CurrentRoleId;
-        
-        WHILE @@FETCH_STATUS = 0
-        BEGIN
-            EXEC [jit].[sp_Grant_Issue]
-                @RequestId = @RequestId,
-                @UserId = @UserId,
-                @RoleId = @CurrentRoleId,
-                @ValidFromUtc = @GrantValidFromUtc,
-                @ValidToUtc = @GrantValidToUtc,
-                @IssuedByUserId = @ApproverUserId,
-                @GrantId = @GrantId OUTPUT;
-            
-            -- Collect grant IDs for audit log
-            IF LEN(@GrantIds) > 0
-                SET @GrantIds = @GrantIds + ',';
-            SET @GrantIds = @GrantIds + CAST(@GrantId AS NVARCHAR(10));
-            
-            FETCH NEXT FROM role_cursor INTO @CurrentRoleId;
-        END
-        
-        IF CURSOR_STATUS('local', 'role_cursor') >= 0
-        BEGIN
-            CLOSE role_cursor;
-            DEALLOCATE role_cursor;
-        END
+        -- One bulk call: grants for every role, shared DB roles added once per target database
+        EXEC [jit].[sp_Grant_IssueForRequest]
+            @RequestId = @RequestId,
+            @UserId = @UserId,
+            @ValidFromUtc = @GrantValidFromUtc,
+            @ValidToUtc = @GrantValidToUtc,
+            @IssuedByUserId = @ApproverUserId,
+            @GrantIds = @GrantIds OUTPUT;
         
         -- Log audit
-        DECLARE @DetailsJson NVARCHAR(MAX) = '{"GrantIds":[' + @GrantIds + ']}';
+        DECLARE @DetailsJson NVARCHAR(MAX) = '{"GrantIds":[' + ISNULL(@GrantIds, '') + ']}';
         INSERT INTO [jit].[AuditLog] (EventType, ActorUserId, ActorLoginName, TargetUserId, RequestId, DetailsJson)
         VALUES ('Approved', @ApproverUserId, @ApproverLoginName, @UserId, @RequestId, @DetailsJson);
         
@@ -129,14 +105,6 @@ BEGIN
         
     END TRY
     BEGIN CATCH
-        -- Clean up cursor if it exists
-        IF CURSOR_STATUS('local', 'role_cursor') >= 0
-        BEGIN
-            IF CURSOR_STATUS('local', 'role_cursor') > -1
-                CLOSE role_cursor;
-            DEALLOCATE role_cursor;
-        END
-        
         IF @@TRANCOUNT > 0
             ROLLBACK TRANSACTION;
         THROW;
@@ -2,7 +2,8 @@
 -- Stored Procedure: jit.sp_Request_Create
 -- Creates new access request with multiple roles
 -- Implements auto-approval logic (pre-approved roles and seniority-based)
--- @RoleIds: Comma-separated list of role IDs (e.g., "1,2,3")
+-- @RoleIds: jit.RoleIdList table-valued parameter (one row per role ID)
+-- All roles are validated in one set-based pass, so the cost barely grows with the role count
 -- =============================================
 
 USE [DMAP_JIT_Permissions]
@@ -19,7 +20,7 @@ GO
 
 CREATE PROCEDURE [jit].[sp_Request_Create]
     @UserId NVARCHAR(255),
-    @RoleIds NVARCHAR(MAX),  -- Comma-separated role IDs: "1,2,3"
+    @RoleIds [jit].[RoleIdList] READONLY,
     @RequestedDurationMinutes INT,
     @Justification NVARCHAR(MAX),
     @TicketRef NVARCHAR(255) = NULL
@@ -28,18 +29,17 @@ BEGIN
     SET NOCOUNT ON;
     
     DECLARE @CurrentUser NVARCHAR(255) = SUSER_SNAME();
+    DECLARE @CurrentUtc DATETIME2 = GETUTCDATE();
     DECLARE @RequestId BIGINT;
     DECLARE @Status NVARCHAR(50);
     DECLARE @UserSeniorityLevel INT;
     DECLARE @UserDept NVARCHAR(255);
     DECLARE @UserTitle NVARCHAR(255);
-    DECLARE @CanRequest BIT;
-    DECLARE @EligibilityReason NVARCHAR(255);
+    -- Trim ticket reference to handle any leading/trailing whitespace
+    DECLARE @TicketRefTrimmed NVARCHAR(255) = LTRIM(RTRIM(@TicketRef));
     
-    -- Temporary table to store role IDs
-    CREATE TABLE #RoleIds (RoleId INT PRIMARY KEY);
-    
-    -- Temporary table for role details
+    -- One row per requested role with everything the validation needs
+    -- RoleName IS NULL: role not found or disabled
     CREATE TABLE #RoleDetails (
         RoleId INT PRIMARY KEY,
         RoleName NVARCHAR(255),
@@ -48,134 +48,143 @@ BEGIN
         TicketRegex NVARCHAR(255),
         RequiresApproval BIT,
         AutoApproveMinSeniority INT,
-        RequiresJustification BIT
+        RequiresJustification BIT,
+        CanRequest BIT,
+        HasActiveGrant BIT,
+        HasOpenRequest BIT,
+        TicketFormatValid BIT
     );
     
     BEGIN TRY
         BEGIN TRANSACTION;
         
-        -- Parse comma-separated role IDs into temp table
-        IF @RoleIds IS NULL OR LEN(LTRIM(RTRIM(@RoleIds))) = 0
+        IF NOT EXISTS (SELECT 1 FROM @RoleIds)
         BEGIN
             THROW 50000, 'At least one role must be specified', 1;
         END
         
-        INSERT INTO #RoleIds (RoleId)
-        SELECT CAST(value AS INT)
-        FROM STRING_SPLIT(@RoleIds, ',')
-        WHERE LTRIM(RTRIM(value)) != '';
-        
-        -- Validate we got at least one role
-        IF NOT EXISTS (SELECT 1 FROM #RoleIds)
-        BEGIN
-            THROW 50000, 'No valid role IDs provided', 1;
-        END
-        
-        -- Get role details for all specified roles
-        INSERT INTO #RoleDetails (RoleId, RoleName, MaxDurationMinutes, RequiresTicket, TicketRegex, RequiresApproval, AutoApproveMinSeniority, RequiresJustification)
-        SELECT r.RoleId, r.RoleName, r.MaxDurationMinutes, r.RequiresTicket, r.TicketRegex, r.RequiresApproval, r.AutoApproveMinSeniority, r.RequiresJustification
-        FROM [jit].[Roles] r
-        INNER JOIN #RoleIds rid ON r.RoleId = rid.RoleId
-        WHERE r.IsEnabled = 1;
+        -- Single validation pass over all roles: role details, eligibility (same
+        -- resolver as sp_User_Eligibility_Check), conflicting grants/requests and
+        -- the ticket format. Index seeks per role on (UserId, RoleId) keys.
+        INSERT INTO #RoleDetails (
+            RoleId, RoleName, MaxDurationMinutes, RequiresTicket, TicketRegex, RequiresApproval,
+            AutoApproveMinSeniority, RequiresJustification, CanRequest, HasActiveGrant, HasOpenRequest, TicketFormatValid
+        )
+        SELECT
+            rid.RoleId,
+            r.RoleName,
+            r.MaxDurationMinutes,
+            r.RequiresTicket,
+            r.TicketRegex,
+            r.RequiresApproval,
+            r.AutoApproveMinSeniority,
+            r.RequiresJustification,
+            ISNULL(e.CanRequest, 0),
+            CASE WHEN EXISTS (
+                SELECT 1 FROM [jit].[Grants] g
+                WHERE g.UserId = @UserId
+                AND g.RoleId = rid.RoleId
+                AND g.Status = 'Active'
+                AND g.ValidToUtc > @CurrentUtc
+            ) THEN 1 ELSE 0 END,
+            CASE WHEN EXISTS (
+                SELECT 1 FROM [jit].[Requests] req
+                INNER JOIN [jit].[Request_Roles] rr ON req.RequestId = rr.RequestId
+                WHERE req.UserId = @UserId
+                AND rr.RoleId = rid.RoleId
+                AND req.Status IN ('Pending', 'AutoApproved')
+            ) THEN 1 ELSE 0 END,
+            -- Only roles that require a ticket and define a format are checked
+            CASE WHEN r.RequiresTicket = 1
+                AND r.TicketRegex IS NOT NULL AND LTRIM(RTRIM(r.TicketRegex)) != ''
+                AND NOT (@TicketRefTrimmed LIKE tp.LikePattern)
+            THEN 0 ELSE 1 END
+        FROM @RoleIds rid
+        LEFT JOIN [jit].[Roles] r ON r.RoleId = rid.RoleId AND r.IsEnabled = 1
+        OUTER APPLY (
+            SELECT TOP 1 v.CanRequest
+            FROM [jit].[vw_User_Role_Eligibility] v
+            WHERE v.UserId = @UserId
+            AND v.RoleId = rid.RoleId
+        ) e
+        -- Convert common regex patterns to SQL Server LIKE patterns:
+        -- remove the start (^) and end ($) anchors, then turn one-or-more
+        -- quantifiers into LIKE wildcards ([0-9]+, [0-9]{1,}, [a-zA-Z0-9]+, \d+, \w+).
+        -- SQL Server LIKE supports [0-9] character classes, so keep them as-is
+        CROSS APPLY (
+            SELECT CASE WHEN LEFT(r.TicketRegex, 1) = '^'
+                THEN SUBSTRING(r.TicketRegex, 2, LEN(r.TicketRegex) - 1)
+                ELSE r.TicketRegex END AS Unanchored
+        ) ta
+        CROSS APPLY (
+            SELECT CASE WHEN RIGHT(ta.Unanchored, 1) = '$'
+                THEN LEFT(ta.Unanchored, LEN(ta.Unanchored) - 1)
+                ELSE ta.Unanchored END AS Pattern
+        ) tb
+        CROSS APPLY (
+            SELECT REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(tb.Pattern,
+                '[0-9]+', '[0-9]%'),
+                '[0-9]{1,}', '[0-9]%'),
+                '[a-zA-Z0-9]+', '[a-zA-Z0-9]%'),
+                '\d+', '[0-9]%'),
+                '\w+', '[a-zA-Z0-9_]%') AS LikePattern
+        ) tp;
         
         -- Check if all roles exist and are enabled
-        DECLARE @RequestedRoleCount INT = (SELECT COUNT(*) FROM #RoleIds);
-        DECLARE @ValidRoleCount INT = (SELECT COUNT(*) FROM #RoleDetails);
-        
-        IF @RequestedRoleCount != @ValidRoleCount
+        IF EXISTS (SELECT 1 FROM #RoleDetails WHERE RoleName IS NULL)
         BEGIN
             DECLARE @InvalidRoles NVARCHAR(MAX) = (
-                SELECT STRING_AGG(CAST(rid.RoleId AS NVARCHAR(10)), ', ')
-                FROM #RoleIds rid
-                LEFT JOIN #RoleDetails rd ON rid.RoleId = rd.RoleId
-                WHERE rd.RoleId IS NULL
+                SELECT STRING_AGG(CAST(RoleId AS NVARCHAR(10)), ', ') WITHIN GROUP (ORDER BY RoleId)
+                FROM #RoleDetails
+                WHERE RoleName IS NULL
             );
             DECLARE @ErrorMessage50002 NVARCHAR(MAX) = 'One or more roles not found or disabled: ' + @InvalidRoles;
             THROW 50002, @ErrorMessage50002, 1;
         END
         
         -- Validate eligibility for ALL roles
-        DECLARE @IneligibleRoles NVARCHAR(MAX) = '';
-        DECLARE role_cursor CURSOR FOR SELECT RoleId FROM #RoleDetails;
-        DECLARE @CurrentRoleId INT;
-        
-        OPEN role_cursor;
-        FETCH NEXT FROM role_cursor INTO @CurrentRoleId;
-        
-        WHILE @@FETCH_STATUS = 0
-        BEGIN
-            EXEC [jit].[sp_User_Eligibility_Check] 
-                @UserId = @UserId,
-                @RoleId = @CurrentRoleId,
-                @CanRequest = @CanRequest OUTPUT,
-                @EligibilityReason = @EligibilityReason OUTPUT;
-            
-            IF @CanRequest = 0
-            BEGIN
-                DECLARE @RoleName NVARCHAR(255) = (SELECT RoleName FROM #RoleDetails WHERE RoleId = @CurrentRoleId);
-                IF LEN(@IneligibleRoles) > 0
-                    SET @IneligibleRoles = @IneligibleRoles + ', ' + @RoleName;
-                ELSE
-                    SET @IneligibleRoles = @RoleName;
-            END
-            
-            FETCH NEXT FROM role_cursor INTO @CurrentRoleId;
-        END
-        
-        CLOSE role_cursor;
-        DEALLOCATE role_cursor;
-        
-        IF LEN(@IneligibleRoles) > 0
+        IF EXISTS (SELECT 1 FROM #RoleDetails WHERE CanRequest = 0)
         BEGIN
+            DECLARE @IneligibleRoles NVARCHAR(MAX) = (
+                SELECT STRING_AGG(RoleName, ', ') WITHIN GROUP (ORDER BY RoleId)
+                FROM #RoleDetails
+                WHERE CanRequest = 0
+            );
             DECLARE @ErrorMessage50001 NVARCHAR(MAX) = 'User is not eligible for the following roles: ' + @IneligibleRoles;
             THROW 50001, @ErrorMessage50001, 1;
         END
         
         -- Check if user already has active grants for ANY selected role
-        IF EXISTS (
-            SELECT 1 FROM [jit].[Grants] g
-            INNER JOIN #RoleIds rid ON g.RoleId = rid.RoleId
-            WHERE g.UserId = @UserId
-            AND g.Status = 'Active'
-            AND g.ValidToUtc > GETUTCDATE()
-        )
+        IF EXISTS (SELECT 1 FROM #RoleDetails WHERE HasActiveGrant = 1)
         BEGIN
             DECLARE @ConflictingGrants NVARCHAR(MAX) = (
-                SELECT STRING_AGG(rd.RoleName, ', ')
-                FROM [jit].[Grants] g
-                INNER JOIN #RoleDetails rd ON g.RoleId = rd.RoleId
-                WHERE g.UserId = @UserId
-                AND g.Status = 'Active'
-                AND g.ValidToUtc > GETUTCDATE()
+                SELECT STRING_AGG(RoleName, ', ') WITHIN GROUP (ORDER BY RoleId)
+                FROM #RoleDetails
+                WHERE HasActiveGrant = 1
             );
             DECLARE @ErrorMessage50003 NVARCHAR(MAX) = 'User already has an active grant for: ' + @ConflictingGrants;
             THROW 50003, @ErrorMessage50003, 1;
         END
         
         -- Check if user already has pending requests for ANY selected role
-        IF EXISTS (
-            SELECT 1 FROM [jit].[Requests] req
-            INNER JOIN [jit].[Request_Roles] rr ON req.RequestId = rr.RequestId
-            INNER JOIN #RoleIds rid ON rr.RoleId = rid.RoleId
-            WHERE req.UserId = @UserId
-            AND req.Status IN ('Pending', 'AutoApproved')
-        )
+        IF EXISTS (SELECT 1 FROM #RoleDetails WHERE HasOpenRequest = 1)
         BEGIN
             DECLARE @ConflictingRequests NVARCHAR(MAX) = (
-                SELECT STRING_AGG(rd.RoleName, ', ')
-                FROM [jit].[Requests] req
-                INNER JOIN [jit].[Request_Roles] rr ON req.RequestId = rr.RequestId
-                INNER JOIN #RoleDetails rd ON rr.RoleId = rd.RoleId
-                WHERE req.UserId = @UserId
-                AND req.Status IN ('Pending', 'AutoApproved')
-                AND rd.RoleId IN (SELECT RoleId FROM #RoleIds)
+                SELECT STRING_AGG(RoleName, ', ') WITHIN GROUP (ORDER BY RoleId)
+                FROM #RoleDetails
+                WHERE HasOpenRequest = 1
             );
             DECLARE @ErrorMessage50004 NVARCHAR(MAX) = 'User already has a pending or auto-approved request for: ' + @ConflictingRequests;
             THROW 50004, @ErrorMessage50004, 1;
         END
         
-        -- Calculate minimum MaxDurationMinutes across all roles
-        DECLARE @MinMaxDuration INT = (SELECT MIN(MaxDurationMinutes) FROM #RoleDetails);
+        -- Calculate minimum MaxDurationMinutes and whether ANY role requires a ticket
+        DECLARE @MinMaxDuration INT;
+        DECLARE @AnyRequiresTicket BIT;
+        SELECT
+            @MinMaxDuration = MIN(MaxDurationMinutes),
+            @AnyRequiresTicket = MAX(CAST(RequiresTicket AS INT))
+        FROM #RoleDetails;
         
         -- Validate requested duration doesn't exceed minimum
         IF @RequestedDurationMinutes > @MinMaxDuration
@@ -184,89 +193,21 @@ BEGIN
             THROW 50005, @ErrorMessage50005, 1;
         END
         
-        -- Check if ANY role requires ticket
-        DECLARE @AnyRequiresTicket BIT = (SELECT MAX(CAST(RequiresTicket AS INT)) FROM #RoleDetails);
-        
         IF @AnyRequiresTicket = 1 AND (@TicketRef IS NULL OR LTRIM(RTRIM(@TicketRef)) = '')
         BEGIN
             THROW 50006, 'Ticket reference is required for one or more selected roles', 1;
         END
         
-        -- Validate ticket regex if provided and required
-        -- Convert common regex patterns to SQL Server LIKE patterns
-        IF @AnyRequiresTicket = 1 AND @TicketRef IS NOT NULL
+        -- Ticket formats were matched in the validation pass
+        IF EXISTS (SELECT 1 FROM #RoleDetails WHERE TicketFormatValid = 0)
         BEGIN
-            -- Trim ticket reference to handle any leading/trailing whitespace
-            DECLARE @TicketRefTrimmed NVARCHAR(255) = LTRIM(RTRIM(@TicketRef));
-            
-            DECLARE @MatchingRoles NVARCHAR(MAX) = NULL;
-            DECLARE @TicketRegex NVARCHAR(255);
-            DECLARE @RoleNameForRegex NVARCHAR(255);
-            DECLARE @LikePattern NVARCHAR(255);
-            DECLARE @PatternMatches BIT;
-            DECLARE regex_cursor CURSOR FOR 
-                SELECT RoleId, TicketRegex, RoleName 
-                FROM #RoleDetails 
-                WHERE RequiresTicket = 1 AND TicketRegex IS NOT NULL AND LTRIM(RTRIM(TicketRegex)) != '';
-            
-            OPEN regex_cursor;
-            FETCH NEXT FROM regex_cursor INTO @CurrentRoleId, @TicketRegex, @RoleNameForRegex;
-            
-            WHILE @@FETCH_STATUS = 0
-            BEGIN
-                SET @PatternMatches = 0;
-                SET @LikePattern = @TicketRegex;
-                
-                -- Convert regex pattern to SQL Server LIKE pattern
-                -- Remove start anchor (^)
-                IF LEFT(@LikePattern, 1) = '^'
-                    SET @LikePattern = SUBSTRING(@LikePattern, 2, LEN(@LikePattern) - 1);
-                
-                -- Remove end anchor ($)
-                IF RIGHT(@LikePattern, 1) = '$'
-                    SET @LikePattern = LEFT(@LikePattern, LEN(@LikePattern) - 1);
-                
-                -- Convert [0-9]+ to [0-9]% (one or more digits)
-                SET @LikePattern = REPLACE(@LikePattern, '[0-9]+', '[0-9]%');
-                SET @LikePattern = REPLACE(@LikePattern, '[0-9]{1,}', '[0-9]%');
-                
-                -- Convert [a-zA-Z0-9]+ to [a-zA-Z0-9]% (one or more alphanumeric)
-                SET @LikePattern = REPLACE(@LikePattern, '[a-zA-Z0-9]+', '[a-zA-Z0-9]%');
-                
-                -- Convert \d+ to [0-9]% (digits)
-                SET @LikePattern = REPLACE(@LikePattern, '\d+', '[0-9]%');
-                
-                -- Convert \w+ to [a-zA-Z0-9_]% (word characters)
-                SET @LikePattern = REPLACE(@LikePattern, '\w+', '[a-zA-Z0-9_]%');
-                
-                -- Escape special LIKE characters that should be literal in regex
-                -- But don't escape if they're part of a character class [ ]
-                -- SQL Server LIKE supports [0-9] character classes, so keep them as-is
-                
-                -- Test the pattern using trimmed ticket reference
-                IF @TicketRefTrimmed LIKE @LikePattern
-                    SET @PatternMatches = 1;
-                
-                -- If pattern doesn't match, add to error message
-                IF @PatternMatches = 0
-                BEGIN
-                    IF @MatchingRoles IS NULL
-                        SET @MatchingRoles = @RoleNameForRegex + ' (format: ' + @TicketRegex + ')';
-                    ELSE
-                        SET @MatchingRoles = @MatchingRoles + ', ' + @RoleNameForRegex + ' (format: ' + @TicketRegex + ')';
-                END
-                
-                FETCH NEXT FROM regex_cursor INTO @CurrentRoleId, @TicketRegex, @RoleNameForRegex;
-            END
-            
-            CLOSE regex_cursor;
-            DEALLOCATE regex_cursor;
-            
-            IF @MatchingRoles IS NOT NULL
-            BEGIN
-                DECLARE @ErrorMessage50007 NVARCHAR(MAX) = 'Ticket reference format invalid for: ' + @MatchingRoles;
-                THROW 50007, @ErrorMessage50007, 1;
-            END
+            DECLARE @MatchingRoles NVARCHAR(MAX) = (
+                SELECT STRING_AGG(RoleName + ' (format: ' + TicketRegex + ')', ', ') WITHIN GROUP (ORDER BY RoleId)
+                FROM #RoleDetails
+                WHERE TicketFormatValid = 0
+            );
+            DECLARE @ErrorMessage50007 NVARCHAR(MAX) = 'Ticket reference format invalid for: ' + @MatchingRoles;
+            THROW 50007, @ErrorMessage50007, 1;
         END
         
         -- Get user details for snapshot
@@ -319,12 +260,16 @@ BEGIN
         
         -- Insert role associations
         INSERT INTO [jit].[Request_Roles] (RequestId, RoleId)
-        SELECT @RequestId, RoleId FROM #RoleIds;
+        SELECT @RequestId, RoleId FROM #RoleDetails;
+        
+        -- Route pending requests to the users who can approve them
+        IF @Status = 'Pending'
+            EXEC [jit].[sp_Request_RouteApprovers] @RequestId = @RequestId;
         
         -- Log audit with all role IDs
         DECLARE @DetailsJson NVARCHAR(MAX) = 
             '{"RoleIds":[' + 
-            (SELECT STRING_AGG(CAST(RoleId AS NVARCHAR(10)), ',') FROM #RoleIds) + 
+            (SELECT STRING_AGG(CAST(RoleId AS NVARCHAR(10)), ',') WITHIN GROUP (ORDER BY RoleId) FROM #RoleDetails) + 
             '],"Status":"' + @Status + '"';
         IF @AutoApproveReason IS NOT NULL
             SET @DetailsJson = @DetailsJson + ',"AutoApproveReason":"' + @AutoApproveReason + '"';
@@ -333,33 +278,18 @@ BEGIN
         INSERT INTO [jit].[AuditLog] (EventType, ActorUserId, ActorLoginName, TargetUserId, RequestId, DetailsJson)
         VALUES ('RequestCreated', @UserId, @CurrentUser, @UserId, @RequestId, @DetailsJson);
         
-        -- If auto-approved, create grants immediately (one per role)
+        -- If auto-approved, create grants immediately (one per role, in one bulk call)
         IF @AutoApprove = 1
         BEGIN
-            DECLARE @GrantId BIGINT;
             DECLARE @GrantValidFromUtc DATETIME2 = GETUTCDATE();
             DECLARE @GrantValidToUtc DATETIME2 = DATEADD(MINUTE, @RequestedDurationMinutes, GETUTCDATE());
             
-            DECLARE grant_cursor CURSOR FOR SELECT RoleId FROM #RoleIds;
-            OPEN grant_cursor;
-            FETCH NEXT FROM grant_cursor INTO @CurrentRoleId;
-            
-            WHILE @@FETCH_STATUS = 0
-            BEGIN
-                EXEC [jit].[sp_Grant_Issue]
-                    @RequestId = @RequestId,
-                    @UserId = @UserId,
-                    @RoleId = @CurrentRoleId,
-                    @ValidFromUtc = @GrantValidFromUtc,
-                    @ValidToUtc = @GrantValidToUtc,
-                    @IssuedByUserId = @UserId,
-                    @GrantId = @GrantId OUTPUT;
-                
-                FETCH NEXT FROM grant_cursor INTO @CurrentRoleId;
-            END
-            
-            CLOSE grant_cursor;
-            DEALLOCATE grant_cursor;
+            EXEC [jit].[sp_Grant_IssueForRequest]
+                @RequestId = @RequestId,
+                @UserId = @UserId,
+                @ValidFromUtc = @GrantValidFromUtc,
+                @ValidToUtc = @GrantValidToUtc,
+                @IssuedByUserId = @UserId;
         END
         
         COMMIT TRANSACTION;
@@ -372,7 +302,6 @@ BEGIN
     END CATCH
     
     -- Cleanup
-    DROP TABLE #RoleIds;
     DROP TABLE #RoleDetails;
 END
 GO
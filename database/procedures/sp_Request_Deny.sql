@@ -77,6 +77,9 @@ BEGIN
             UpdatedUtc = GETUTCDATE()
         WHERE RequestId = @RequestId;
         
+        -- No longer pending: remove it from every approver's queue
+        EXEC [jit].[sp_Request_RouteApprovers] @RequestId = @RequestId;
+        
         -- Log audit
         INSERT INTO [jit].[AuditLog] (EventType, ActorUserId, ActorLoginName, TargetUserId, RequestId, DetailsJson)
         VALUES ('Denied', @ApproverUserId, @ApproverLoginName, @UserId, @RequestId, '{}');
@@ -3,6 +3,7 @@
 -- Returns pending requests for a specific approver
 -- Used by approver portal
 -- Now supports multiple roles per request - only shows requests where approver can approve ALL roles
+-- Reads the precomputed jit.Request_Approver_Routing
 -- =============================================
 
 USE [DMAP_JIT_Permissions]
@@ -23,28 +24,11 @@ AS
 BEGIN
     SET NOCOUNT ON;
     
-    DECLARE @ApproverDivision NVARCHAR(255);
-    DECLARE @ApproverDepartment NVARCHAR(255);
-    DECLARE @ApproverSeniority INT;
-    DECLARE @ApproverIsAdmin BIT;
-    DECLARE @ApproverIsDataSteward BIT;
-    DECLARE @ApproverIsApprover BIT;
-    DECLARE @CanApprove BIT;
-    DECLARE @ApprovalReason NVARCHAR(100);
-    
-    -- Get approver details once
+    -- Routes are precomputed by sp_Request_RouteApprovers when requests are created,
+    -- cancelled or decided and when approver/requester attributes or eligibility change,
+    -- so the queue is a clustered-index seek on ApproverUserId
+    -- (sp_Approver_CanApproveRequest still re-checks live on approval)
     SELECT 
-        @ApproverDivision = Division,
-        @ApproverDepartment = Department,
-        @ApproverSeniority = SeniorityLevel,
-        @ApproverIsAdmin = IsAdmin,
-        @ApproverIsDataSteward = IsDataSteward,
-        @ApproverIsApprover = IsApprover
-    FROM [jit].[Users]
-    WHERE UserId = @ApproverUserId;
-    
-    -- Get requests where approver can approve ALL roles
-    SELECT DISTINCT
         r.RequestId,
         r.UserId,
         u.DisplayName AS RequesterName,
@@ -52,8 +36,8 @@ BEGIN
         u.Department AS RequesterDepartment,
         u.Division AS RequesterDivision,
         u.SeniorityLevel AS RequesterSeniority,
-        STRING_AGG(rol.RoleName, ', ') AS RoleNames,
-        COUNT(rr.RoleId) AS RoleCount,
+        rl.RoleNames,
+        rl.RoleCount,
         r.RequestedDurationMinutes,
         r.Justification,
         r.TicketRef,
@@ -61,215 +45,20 @@ BEGIN
         r.UserTitleSnapshot,
         r.CreatedUtc,
         r.Status,
-        -- Approval reason (check if approver can approve all roles)
-        CASE
-            WHEN @ApproverIsAdmin = 1 THEN 'Admin'
-            WHEN @ApproverIsDataSteward = 1 
-                 AND @ApproverDivision IS NOT NULL 
-                 AND u.Division IS NOT NULL 
-                 AND @ApproverDivision = u.Division THEN 'DataSteward'
-            WHEN @ApproverIsApprover = 1 
-                 AND @ApproverDivision IS NOT NULL 
-                 AND u.Division IS NOT NULL 
-                 AND @ApproverDivision = u.Division
-                 AND (@ApproverSeniority IS NULL OR u.SeniorityLevel IS NULL OR @ApproverSeniority >= u.SeniorityLevel)
-                 AND NOT EXISTS (
-                     -- Check if there's any role the approver cannot request (using eligibility logic)
-                     SELECT 1 
-                     FROM [jit].[Request_Roles] rr2
-                     WHERE rr2.RequestId = r.RequestId
-                     -- Check if approver CANNOT request this role
-                     AND NOT (
-                         -- Priority 1: Explicit user override allows
-                         EXISTS (
-                             SELECT 1 FROM [jit].[User_To_Role_Eligibility] ue
-                             WHERE ue.UserId = @ApproverUserId AND ue.RoleId = rr2.RoleId
-                             AND (ue.ValidFromUtc IS NULL OR ue.ValidFromUtc <= GETUTCDATE())
-                             AND (ue.ValidToUtc IS NULL OR ue.ValidToUtc >= GETUTCDATE())
-                             AND ue.CanRequest = 1
-                         )
-                         -- Priority 2: OR scope rules allow (only if no user override denies)
-                         OR (
-                             -- User-specific rules
-                             EXISTS (
-                                 SELECT 1 FROM [jit].[Role_Eligibility_Rules] rer
-                                 WHERE rer.RoleId = rr2.RoleId
-                                 AND rer.ScopeType = 'User'
-                                 AND rer.ScopeValue = @ApproverUserId
-                                 AND rer.CanRequest = 1
-                                 AND (rer.ValidFromUtc IS NULL OR rer.ValidFromUtc <= GETUTCDATE())
-                                 AND (rer.ValidToUtc IS NULL OR rer.ValidToUtc >= GETUTCDATE())
-                             )
-                             -- Team rules (user must be active member)
-                             OR EXISTS (
-                                 SELECT 1 FROM [jit].[Role_Eligibility_Rules] rer
-                                 INNER JOIN [jit].[User_Teams] ut ON CAST(ut.TeamId AS NVARCHAR(255)) = rer.ScopeValue
-                                 WHERE rer.RoleId = rr2.RoleId
-                                 AND rer.ScopeType = 'Team'
-                                 AND ut.UserId = @ApproverUserId
-                                 AND ut.IsActive = 1
-                                 AND rer.CanRequest = 1
-                                 AND (rer.ValidFromUtc IS NULL OR rer.ValidFromUtc <= GETUTCDATE())
-                                 AND (rer.ValidToUtc IS NULL OR rer.ValidToUtc >= GETUTCDATE())
-                             )
-                             -- Department rules
-                             OR EXISTS (
-                                 SELECT 1 FROM [jit].[Role_Eligibility_Rules] rer
-                                 WHERE rer.RoleId = rr2.RoleId
-                                 AND rer.ScopeType = 'Department'
-                                 AND rer.ScopeValue = @ApproverDepartment
-                                 AND @ApproverDepartment IS NOT NULL
-                                 AND rer.CanRequest = 1
-                                 AND (rer.ValidFromUtc IS NULL OR rer.ValidFromUtc <= GETUTCDATE())
-                                 AND (rer.ValidToUtc IS NULL OR rer.ValidToUtc >= GETUTCDATE())
-                             )
-                             -- Division rules
-                             OR EXISTS (
-                                 SELECT 1 FROM [jit].[Role_Eligibility_Rules] rer
-                                 WHERE rer.RoleId = rr2.RoleId
-                                 AND rer.ScopeType = 'Division'
-                                 AND rer.ScopeValue = @ApproverDivision
-                                 AND @ApproverDivision IS NOT NULL
-                                 AND rer.CanRequest = 1
-                                 AND (rer.ValidFromUtc IS NULL OR rer.ValidFromUtc <= GETUTCDATE())
-                                 AND (rer.ValidToUtc IS NULL OR rer.ValidToUtc >= GETUTCDATE())
-                             )
-                             -- All rules (lowest priority)
-                             OR EXISTS (
-                                 SELECT 1 FROM [jit].[Role_Eligibility_Rules] rer
-                                 WHERE rer.RoleId = rr2.RoleId
-                                 AND rer.ScopeType = 'All'
-                                 AND rer.ScopeValue IS NULL
-                                 AND rer.CanRequest = 1
-                                 AND (rer.ValidFromUtc IS NULL OR rer.ValidFromUtc <= GETUTCDATE())
-                                 AND (rer.ValidToUtc IS NULL OR rer.ValidToUtc >= GETUTCDATE())
-                             )
-                         )
-                         -- Exclude if user has explicit denial override
-                         AND NOT EXISTS (
-                             SELECT 1 FROM [jit].[User_To_Role_Eligibility] ue2
-                             WHERE ue2.UserId = @ApproverUserId AND ue2.RoleId = rr2.RoleId
-                             AND (ue2.ValidFromUtc IS NULL OR ue2.ValidFromUtc <= GETUTCDATE())
-                             AND (ue2.ValidToUtc IS NULL OR ue2.ValidToUtc >= GETUTCDATE())
-                             AND ue2.CanRequest = 0
-                         )
-                     )
-                 ) THEN 'Approver Eligibility Match'
-            ELSE 'Unknown'
-        END AS ApprovalReason
-    FROM [jit].[Requests] r
-    INNER JOIN [jit].[Request_Roles] rr ON r.RequestId = rr.RequestId
-    INNER JOIN [jit].[Roles] rol ON rr.RoleId = rol.RoleId
+        ra.ApprovalReason
+    FROM [jit].[Request_Approver_Routing] ra
+    INNER JOIN [jit].[Requests] r ON r.RequestId = ra.RequestId
     INNER JOIN [jit].[Users] u ON r.UserId = u.UserId
-    WHERE r.Status = 'Pending'
-    GROUP BY r.RequestId, r.UserId, u.DisplayName, u.LoginName, u.Department, u.Division, 
-             u.SeniorityLevel, r.RequestedDurationMinutes, r.Justification, r.TicketRef, 
-             r.UserDeptSnapshot, r.UserTitleSnapshot, r.CreatedUtc, r.Status
-    HAVING 
-        -- Admin can approve all requests
-        @ApproverIsAdmin = 1
-        OR
-        -- Data Steward can approve requests from same division
-        (
-            @ApproverIsDataSteward = 1
-            AND @ApproverDivision IS NOT NULL 
-            AND u.Division IS NOT NULL 
-            AND @ApproverDivision = u.Division
-        )
-        OR
-        -- IsApprover can approve requests where they can request ALL roles AND have higher/equal seniority
-        (
-            @ApproverIsApprover = 1
-            -- Same division
-            AND @ApproverDivision IS NOT NULL 
-            AND u.Division IS NOT NULL 
-            AND @ApproverDivision = u.Division
-            -- Approver seniority >= requester seniority
-            AND (@ApproverSeniority IS NULL OR u.SeniorityLevel IS NULL OR @ApproverSeniority >= u.SeniorityLevel)
-            -- Check that approver can request ALL roles (no role fails the eligibility check)
-            AND NOT EXISTS (
-                SELECT 1 
-                FROM [jit].[Request_Roles] rr2
-                WHERE rr2.RequestId = r.RequestId
-                -- Check if approver CANNOT request this role (using eligibility logic)
-                AND NOT (
-                    -- Priority 1: Explicit user override allows
-                    EXISTS (
-                        SELECT 1 FROM [jit].[User_To_Role_Eligibility] ue
-                        WHERE ue.UserId = @ApproverUserId AND ue.RoleId = rr2.RoleId
-                        AND (ue.ValidFromUtc IS NULL OR ue.ValidFromUtc <= GETUTCDATE())
-                        AND (ue.ValidToUtc IS NULL OR ue.ValidToUtc >= GETUTCDATE())
-                        AND ue.CanRequest = 1
-                    )
-                    -- Priority 2: OR scope rules allow (only if no user override denies)
-                    OR (
-                        -- User-specific rules
-                        EXISTS (
-                            SELECT 1 FROM [jit].[Role_Eligibility_Rules] rer
-                            WHERE rer.RoleId = rr2.RoleId
-                            AND rer.ScopeType = 'User'
-                            AND rer.ScopeValue = @ApproverUserId
-                            AND rer.CanRequest = 1
-                            AND (rer.ValidFromUtc IS NULL OR rer.ValidFromUtc <= GETUTCDATE())
-                            AND (rer.ValidToUtc IS NULL OR rer.ValidToUtc >= GETUTCDATE())
-                        )
-                        -- Team rules (user must be active member)
-                        OR EXISTS (
-                            SELECT 1 FROM [jit].[Role_Eligibility_Rules] rer
-                            INNER JOIN [jit].[User_Teams] ut ON CAST(ut.TeamId AS NVARCHAR(255)) = rer.ScopeValue
-                            WHERE rer.RoleId = rr2.RoleId
-                            AND rer.ScopeType = 'Team'
-                            AND ut.UserId = @ApproverUserId
-                            AND ut.IsActive = 1
-                            AND rer.CanRequest = 1
-                            AND (rer.ValidFromUtc IS NULL OR rer.ValidFromUtc <= GETUTCDATE())
-                            AND (rer.ValidToUtc IS NULL OR rer.ValidToUtc >= GETUTCDATE())
-                        )
-                         -- Department rules
-                         OR EXISTS (
-                             SELECT 1 FROM [jit].[Role_Eligibility_Rules] rer
-                             WHERE rer.RoleId = rr2.RoleId
-                             AND rer.ScopeType = 'Department'
-                             AND rer.ScopeValue = @ApproverDepartment
-                             AND @ApproverDepartment IS NOT NULL
-                             AND rer.CanRequest = 1
-                             AND (rer.ValidFromUtc IS NULL OR rer.ValidFromUtc <= GETUTCDATE())
-                             AND (rer.ValidToUtc IS NULL OR rer.ValidToUtc >= GETUTCDATE())
-                         )
-                        -- Division rules
-                        OR EXISTS (
-                            SELECT 1 FROM [jit].[Role_Eligibility_Rules] rer
-                            WHERE rer.RoleId = rr2.RoleId
-                            AND rer.ScopeType = 'Division'
-                            AND rer.ScopeValue = @ApproverDivision
-                            AND @ApproverDivision IS NOT NULL
-                            AND rer.CanRequest = 1
-                            AND (rer.ValidFromUtc IS NULL OR rer.ValidFromUtc <= GETUTCDATE())
-                            AND (rer.ValidToUtc IS NULL OR rer.ValidToUtc >= GETUTCDATE())
-                        )
-                        -- All rules (lowest priority)
-                        OR EXISTS (
-                            SELECT 1 FROM [jit].[Role_Eligibility_Rules] rer
-                            WHERE rer.RoleId = rr2.RoleId
-                            AND rer.ScopeType = 'All'
-                            AND rer.ScopeValue IS NULL
-                            AND rer.CanRequest = 1
-                            AND (rer.ValidFromUtc IS NULL OR rer.ValidFromUtc <= GETUTCDATE())
-                            AND (rer.ValidToUtc IS NULL OR rer.ValidToUtc >= GETUTCDATE())
-                        )
-                    )
-                    -- Exclude if user has explicit denial override
-                    AND NOT EXISTS (
-                        SELECT 1 FROM [jit].[User_To_Role_Eligibility] ue2
-                        WHERE ue2.UserId = @ApproverUserId AND ue2.RoleId = rr2.RoleId
-                        AND (ue2.ValidFromUtc IS NULL OR ue2.ValidFromUtc <= GETUTCDATE())
-                        AND (ue2.ValidToUtc IS NULL OR ue2.ValidToUtc >= GETUTCDATE())
-                        AND ue2.CanRequest = 0
-                    )
-                )
-            )
-        )
+    CROSS APPLY (
+        SELECT 
+            STRING_AGG(rol.RoleName, ', ') AS RoleNames,
+            COUNT(rr.RoleId) AS RoleCount
+        FROM [jit].[Request_Roles] rr
+        INNER JOIN [jit].[Roles] rol ON rr.RoleId = rol.RoleId
+        WHERE rr.RequestId = r.RequestId
+    ) rl
+    WHERE ra.ApproverUserId = @ApproverUserId
+    AND r.Status = 'Pending'
     ORDER BY r.CreatedUtc ASC;
 END
 GO
-
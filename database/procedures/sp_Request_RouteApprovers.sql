@@ -0,0 +1,120 @@
+-- =============================================
+-- Stored Procedure: jit.sp_Request_RouteApprovers
+-- Recomputes jit.Request_Approver_Routing: which users may decide which pending requests
+-- Same rules as sp_Approver_CanApproveRequest (admin, data steward of the requester's
+-- division, or approver with seniority >= requester who can request every role),
+-- with approver eligibility read from jit.User_Effective_Eligibility
+-- Scope:
+--   @RequestId       - one request (create/cancel/approve/deny)
+--   @UserId          - every route where the user is the approver or the requester
+--   neither          - full rebuild
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Request_RouteApprovers]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_Request_RouteApprovers]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE PROCEDURE [jit].[sp_Request_RouteApprovers]
+    @RequestId BIGINT = NULL,
+    @UserId NVARCHAR(255) = NULL,
+    @RoutedCount INT = NULL OUTPUT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @OwnsTransaction BIT = 0;
+    
+    SET @RoutedCount = 0;
+    
+    BEGIN TRY
+        -- Request procedures and triggers call this inside their transaction; only open our own when standalone
+        IF @@TRANCOUNT = 0
+        BEGIN
+            BEGIN TRANSACTION;
+            SET @OwnsTransaction = 1;
+        END
+        
+        EXEC sp_getapplock @Resource = N'jit.Request_Routing', @LockMode = 'Exclusive', @LockOwner = 'Transaction';
+        
+        -- Pending requests in scope, with the requester attributes the rules need
+        CREATE TABLE #RoutePending (
+            RequestId BIGINT NOT NULL PRIMARY KEY,
+            RequesterUserId NVARCHAR(255) NOT NULL,
+            RequesterDivision NVARCHAR(255) NULL,
+            RequesterSeniority INT NULL,
+            RoleCount INT NOT NULL
+        );
+        
+        INSERT INTO #RoutePending (RequestId, RequesterUserId, RequesterDivision, RequesterSeniority, RoleCount)
+        SELECT r.RequestId, r.UserId, u.Division, u.SeniorityLevel,
+            (SELECT COUNT(*) FROM [jit].[Request_Roles] rr WHERE rr.RequestId = r.RequestId)
+        FROM [jit].[Requests] r
+        INNER JOIN [jit].[Users] u ON u.UserId = r.UserId
+        WHERE r.Status = 'Pending'
+        AND (@RequestId IS NULL OR r.RequestId = @RequestId)
+        OPTION (RECOMPILE);
+        
+        -- Drop the existing routes in scope (including those of requests that are no longer pending)
+        DELETE ra
+        FROM [jit].[Request_Approver_Routing] ra
+        WHERE (@RequestId IS NULL OR ra.RequestId = @RequestId)
+        AND (@UserId IS NULL
+             OR ra.ApproverUserId = @UserId
+             OR EXISTS (SELECT 1 FROM [jit].[Requests] r WHERE r.RequestId = ra.RequestId AND r.UserId = @UserId))
+        OPTION (RECOMPILE);
+        
+        -- Recompute them
+        INSERT INTO [jit].[Request_Approver_Routing] (ApproverUserId, RequestId, ApprovalReason)
+        SELECT q.ApproverUserId, q.RequestId, q.ApprovalReason
+        FROM (
+            SELECT 
+                a.UserId AS ApproverUserId,
+                p.RequestId,
+                CASE
+                    WHEN a.IsAdmin = 1 THEN 'Admin'
+                    WHEN p.RoleCount = 0 THEN NULL
+                    WHEN a.IsDataSteward = 1
+                         AND a.Division IS NOT NULL
+                         AND p.RequesterDivision IS NOT NULL
+                         AND a.Division = p.RequesterDivision THEN 'DataSteward'
+                    WHEN a.IsApprover = 1
+                         AND (a.SeniorityLevel IS NULL OR p.RequesterSeniority IS NULL OR a.SeniorityLevel >= p.RequesterSeniority)
+                         AND p.RoleCount = (
+                             SELECT COUNT(*)
+                             FROM [jit].[Request_Roles] rr
+                             INNER JOIN [jit].[User_Effective_Eligibility] e ON e.RoleId = rr.RoleId
+                                 AND e.UserId = a.UserId
+                                 AND e.CanRequest = 1
+                             WHERE rr.RequestId = p.RequestId
+                         ) THEN 'Approver Eligibility Match'
+                END AS ApprovalReason
+            FROM #RoutePending p
+            CROSS JOIN [jit].[Users] a
+            WHERE (a.IsAdmin = 1 OR a.IsDataSteward = 1 OR a.IsApprover = 1)
+            AND (@UserId IS NULL OR a.UserId = @UserId OR p.RequesterUserId = @UserId)
+        ) q
+        WHERE q.ApprovalReason IS NOT NULL
+        OPTION (RECOMPILE);
+        
+        SET @RoutedCount = @@ROWCOUNT;
+        
+        DROP TABLE #RoutePending;
+        
+        IF @OwnsTransaction = 1
+            COMMIT TRANSACTION;
+    END TRY
+    BEGIN CATCH
+        IF @OwnsTransaction = 1 AND @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        THROW;
+    END CATCH
+END
+GO
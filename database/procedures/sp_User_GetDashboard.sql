@@ -0,0 +1,108 @@
+-- =============================================
+-- Stored Procedure: jit.sp_User_GetDashboard
+-- Everything the user dashboard shows, in one call
+-- Result sets (in order):
+--   1. ActiveGrants     - same columns as sp_Grant_ListActiveForUser
+--   2. PendingRequests  - the user's pending requests, newest first
+--   3. RecentRequests   - the user's @RecentRequestCount newest requests (any status)
+--   4. Counts           - one row: ActiveGrantCount, ExpiringSoonCount, PendingRequestCount
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_User_GetDashboard]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_User_GetDashboard]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE PROCEDURE [jit].[sp_User_GetDashboard]
+    @UserId NVARCHAR(255),
+    @RecentRequestCount INT = 10,
+    @ExpiringSoonHours INT = 24
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @CurrentUtc DATETIME2 = GETUTCDATE();
+    
+    -- 1. Active grants (IX_Grants_Active_UserId_RoleId)
+    SELECT 
+        g.GrantId,
+        g.RequestId,
+        g.UserId,
+        r.RoleName,
+        g.ValidFromUtc,
+        g.ValidToUtc,
+        g.Status
+    FROM [jit].[Grants] g
+    INNER JOIN [jit].[Roles] r ON g.RoleId = r.RoleId
+    WHERE g.UserId = @UserId
+    AND g.Status = 'Active'
+    ORDER BY g.ValidToUtc ASC;
+    
+    -- 2. Pending requests (IX_Requests_Open_Status_UserId)
+    SELECT 
+        r.RequestId,
+        r.UserId,
+        rn.RoleNames,
+        rn.RoleCount,
+        r.RequestedDurationMinutes,
+        r.Justification,
+        r.TicketRef,
+        r.Status,
+        r.CreatedUtc,
+        r.UpdatedUtc
+    FROM [jit].[Requests] r
+    CROSS APPLY (
+        SELECT STRING_AGG(rol.RoleName, ', ') AS RoleNames, COUNT(*) AS RoleCount
+        FROM [jit].[Request_Roles] rr
+        INNER JOIN [jit].[Roles] rol ON rr.RoleId = rol.RoleId
+        WHERE rr.RequestId = r.RequestId
+    ) rn
+    WHERE r.UserId = @UserId
+    AND r.Status = 'Pending'
+    ORDER BY r.CreatedUtc DESC;
+    
+    -- 3. Recent requests (IX_Requests_UserId_CreatedUtc)
+    SELECT TOP (@RecentRequestCount)
+        r.RequestId,
+        r.UserId,
+        rn.RoleNames,
+        rn.RoleCount,
+        r.RequestedDurationMinutes,
+        r.Status,
+        r.CreatedUtc,
+        r.UpdatedUtc,
+        a.DecisionComment AS ApproverComment
+    FROM [jit].[Requests] r
+    CROSS APPLY (
+        SELECT STRING_AGG(rol.RoleName, ', ') AS RoleNames, COUNT(*) AS RoleCount
+        FROM [jit].[Request_Roles] rr
+        INNER JOIN [jit].[Roles] rol ON rr.RoleId = rol.RoleId
+        WHERE rr.RequestId = r.RequestId
+    ) rn
+    OUTER APPLY (
+        SELECT TOP (1) ap.DecisionComment
+        FROM [jit].[Approvals] ap
+        WHERE ap.RequestId = r.RequestId
+        ORDER BY ap.ApprovalId DESC
+    ) a
+    WHERE r.UserId = @UserId
+    ORDER BY r.CreatedUtc DESC;
+    
+    -- 4. Counts
+    SELECT
+        (SELECT COUNT(*) FROM [jit].[Grants] g
+         WHERE g.UserId = @UserId AND g.Status = 'Active') AS ActiveGrantCount,
+        (SELECT COUNT(*) FROM [jit].[Grants] g
+         WHERE g.UserId = @UserId AND g.Status = 'Active'
+         AND g.ValidToUtc < DATEADD(HOUR, @ExpiringSoonHours, @CurrentUtc)) AS ExpiringSoonCount,
+        (SELECT COUNT(*) FROM [jit].[Requests] r
+         WHERE r.UserId = @UserId AND r.Status = 'Pending') AS PendingRequestCount;
+END
+GO
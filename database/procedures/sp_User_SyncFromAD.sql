@@ -1,12 +1,17 @@
 -- =============================================
 -- Stored Procedure: jit.sp_User_SyncFromAD
--- PowerShell/AD sync integration point
--- Upsert users from AD data
--- Marks users as inactive if missing from AD
--- Optionally sync SeniorityLevel from AD attribute
+-- AD sync integration point (flask_app/ad_sync.py, PowerShell or any bulk loader)
+-- Applies jit.AD_Staging to jit.Users: only users whose AD columns changed
+-- (RowHash <> AdRowHash) or who come back from inactive are updated, new users are
+-- inserted and users missing from AD are inactivated
+-- Each phase commits in chunks of @BatchSize so logins (IX_Users_LoginName /
+-- IX_Users_LoginKey seeks) never wait behind one sync-sized transaction
 -- =============================================
--- Note: This expects a staging table jit.AD_Staging with columns:
--- UserId (samaccountname), LoginName, GivenName, Surname, DisplayName, Email, Division, Department, JobTitle, SeniorityLevel
+-- Note: This expects jit.AD_Staging (schema\22_Create_AD_Staging.sql) to hold the
+-- complete export: every user missing from it is inactivated.
+-- A failed run leaves the chunks committed so far; re-running with the same staging
+-- data picks up where it stopped, since only remaining differences are applied.
+-- LastAdSyncUtc records the last sync that changed the user.
 
 USE [DMAP_JIT_Permissions]
 GO
@@ -21,96 +26,215 @@ SET QUOTED_IDENTIFIER ON
 GO
 
 CREATE PROCEDURE [jit].[sp_User_SyncFromAD]
-    @SyncDate DATETIME2 = NULL
+    @SyncDate DATETIME2 = NULL,
+    @BatchSize INT = 2000
 AS
 BEGIN
     SET NOCOUNT ON;
     
     IF @SyncDate IS NULL
         SET @SyncDate = GETUTCDATE();
+    IF @BatchSize IS NULL OR @BatchSize < 1
+        SET @BatchSize = 2000;
     
     DECLARE @SyncUser NVARCHAR(255) = SUSER_SNAME();
+    DECLARE @StagedCount INT = 0;
     DECLARE @UpdatedCount INT = 0;
     DECLARE @InsertedCount INT = 0;
     DECLARE @InactivatedCount INT = 0;
+    DECLARE @UnchangedCount INT = 0;
+    DECLARE @Batches INT = 0;
+    DECLARE @PhaseStart DATETIME2;
+    DECLARE @DiffMs INT = 0;
+    DECLARE @UpdateMs INT = 0;
+    DECLARE @InsertMs INT = 0;
+    DECLARE @InactivateMs INT = 0;
+    DECLARE @From INT;
+    DECLARE @Last INT;
+    
+    -- Work lists, numbered so each chunk is a seek on Seq
+    CREATE TABLE #Changed (Seq INT IDENTITY(1,1) PRIMARY KEY, LoginName NVARCHAR(255) NOT NULL);
+    CREATE TABLE #New (Seq INT IDENTITY(1,1) PRIMARY KEY, LoginName NVARCHAR(255) NOT NULL);
+    CREATE TABLE #Missing (Seq INT IDENTITY(1,1) PRIMARY KEY, UserId NVARCHAR(255) NOT NULL);
     
     BEGIN TRY
-        BEGIN TRANSACTION;
-        
-        -- Update existing users from staging table
-        UPDATE u
-        SET 
-            GivenName = s.GivenName,
-            Surname = s.Surname,
-            DisplayName = s.DisplayName,
-            Email = s.Email,
-            Division = s.Division,
-            Department = s.Department,
-            JobTitle = s.JobTitle,
-            SeniorityLevel = s.SeniorityLevel,
-            LastAdSyncUtc = @SyncDate,
-            UpdatedUtc = GETUTCDATE(),
-            UpdatedBy = @SyncUser,
-            IsActive = 1  -- Reactivate if was inactive
-        FROM [jit].[Users] u
-        INNER JOIN [jit].[AD_Staging] s ON u.LoginName = s.LoginName;
-        
-        SET @UpdatedCount = @@ROWCOUNT;
-        
-        -- Insert new users from staging table
-        INSERT INTO [jit].[Users] (
-            UserId, LoginName, GivenName, Surname, DisplayName, Email,
-            Division, Department, JobTitle, SeniorityLevel,
-            IsAdmin, IsApprover, IsDataSteward, LastAdSyncUtc, CreatedBy, UpdatedBy
-        )
-        SELECT 
-            s.UserId, s.LoginName, s.GivenName, s.Surname, s.DisplayName, s.Email,
-            s.Division, s.Department, s.JobTitle, s.SeniorityLevel,
-            0, 0, 0, @SyncDate, @SyncUser, @SyncUser
+        SET @StagedCount = (SELECT COUNT(*) FROM [jit].[AD_Staging]);
+    
+        -- An empty export would inactivate every user
+        IF @StagedCount = 0
+        BEGIN
+            THROW 50010, 'jit.AD_Staging is empty; refusing to inactivate every user', 1;
+        END
+    
+        -- Phase 1: diff staging against Users (reads only, no locks held afterwards)
+        SET @PhaseStart = SYSUTCDATETIME();
+    
+        INSERT INTO #Changed (LoginName)
+        SELECT s.LoginName
         FROM [jit].[AD_Staging] s
-        WHERE NOT EXISTS (SELECT 1 FROM [jit].[Users] u WHERE u.LoginName = s.LoginName);
-        
-        SET @InsertedCount = @@ROWCOUNT;
-        
-        -- Mark users as inactive if they're not in the staging table
-        UPDATE u
-        SET 
-            IsActive = 0,
-            UpdatedUtc = GETUTCDATE(),
-            UpdatedBy = @SyncUser
+        INNER JOIN [jit].[Users] u ON u.LoginName = s.LoginName
+        WHERE u.IsActive = 0
+        OR u.AdRowHash <> s.RowHash
+        ORDER BY s.LoginName;
+    
+        INSERT INTO #New (LoginName)
+        SELECT s.LoginName
+        FROM [jit].[AD_Staging] s
+        WHERE NOT EXISTS (SELECT 1 FROM [jit].[Users] u WHERE u.LoginName = s.LoginName)
+        ORDER BY s.LoginName;
+    
+        INSERT INTO #Missing (UserId)
+        SELECT u.UserId
         FROM [jit].[Users] u
         WHERE u.IsActive = 1
-        AND NOT EXISTS (SELECT 1 FROM [jit].[AD_Staging] s WHERE s.LoginName = u.LoginName);
-        
-        SET @InactivatedCount = @@ROWCOUNT;
-        
+        AND NOT EXISTS (SELECT 1 FROM [jit].[AD_Staging] s WHERE s.LoginName = u.LoginName)
+        ORDER BY u.UserId;
+    
+        SET @UnchangedCount = @StagedCount - (SELECT COUNT(*) FROM #Changed) - (SELECT COUNT(*) FROM #New);
+        SET @DiffMs = DATEDIFF(MILLISECOND, @PhaseStart, SYSUTCDATETIME());
+    
+        -- Phase 2: update changed (and reactivated) users
+        SET @PhaseStart = SYSUTCDATETIME();
+        SELECT @From = 1, @Last = ISNULL(MAX(Seq), 0) FROM #Changed;
+        WHILE @From <= @Last
+        BEGIN
+            BEGIN TRANSACTION;
+    
+            UPDATE u
+            SET
+                GivenName = s.GivenName,
+                Surname = s.Surname,
+                DisplayName = s.DisplayName,
+                Email = s.Email,
+                Division = s.Division,
+                Department = s.Department,
+                JobTitle = s.JobTitle,
+                SeniorityLevel = s.SeniorityLevel,
+                LastAdSyncUtc = @SyncDate,
+                UpdatedUtc = GETUTCDATE(),
+                UpdatedBy = @SyncUser,
+                IsActive = 1  -- Reactivate if was inactive
+            FROM #Changed c
+            INNER JOIN [jit].[AD_Staging] s ON s.LoginName = c.LoginName
+            INNER JOIN [jit].[Users] u ON u.LoginName = c.LoginName
+            WHERE c.Seq BETWEEN @From AND @From + @BatchSize - 1;
+    
+            SET @UpdatedCount = @UpdatedCount + @@ROWCOUNT;
+            COMMIT TRANSACTION;
+    
+            SET @Batches = @Batches + 1;
+            SET @From = @From + @BatchSize;
+        END
+        SET @UpdateMs = DATEDIFF(MILLISECOND, @PhaseStart, SYSUTCDATETIME());
+    
+        -- Phase 3: insert new users
+        SET @PhaseStart = SYSUTCDATETIME();
+        SELECT @From = 1, @Last = ISNULL(MAX(Seq), 0) FROM #New;
+        WHILE @From <= @Last
+        BEGIN
+            BEGIN TRANSACTION;
+    
+            INSERT INTO [jit].[Users] (
+                UserId, LoginName, GivenName, Surname, DisplayName, Email,
+                Division, Department, JobTitle, SeniorityLevel,
+                IsAdmin, IsApprover, IsDataSteward, LastAdSyncUtc, CreatedBy, UpdatedBy
+            )
+            SELECT
+                s.UserId, s.LoginName, s.GivenName, s.Surname, s.DisplayName, s.Email,
+                s.Division, s.Department, s.JobTitle, s.SeniorityLevel,
+                0, 0, 0, @SyncDate, @SyncUser, @SyncUser
+            FROM #New n
+            INNER JOIN [jit].[AD_Staging] s ON s.LoginName = n.LoginName
+            WHERE n.Seq BETWEEN @From AND @From + @BatchSize - 1
+            -- Created by someone else since the diff
+            AND NOT EXISTS (SELECT 1 FROM [jit].[Users] u WHERE u.LoginName = s.LoginName);
+    
+            SET @InsertedCount = @InsertedCount + @@ROWCOUNT;
+            COMMIT TRANSACTION;
+    
+            SET @Batches = @Batches + 1;
+            SET @From = @From + @BatchSize;
+        END
+        SET @InsertMs = DATEDIFF(MILLISECOND, @PhaseStart, SYSUTCDATETIME());
+    
+        -- Phase 4: mark users as inactive if they're not in the staging table
+        SET @PhaseStart = SYSUTCDATETIME();
+        SELECT @From = 1, @Last = ISNULL(MAX(Seq), 0) FROM #Missing;
+        WHILE @From <= @Last
+        BEGIN
+            BEGIN TRANSACTION;
+    
+            UPDATE u
+            SET
+                IsActive = 0,
+                UpdatedUtc = GETUTCDATE(),
+                UpdatedBy = @SyncUser
+            FROM #Missing m
+            INNER JOIN [jit].[Users] u ON u.UserId = m.UserId
+            WHERE m.Seq BETWEEN @From AND @From + @BatchSize - 1
+            AND u.IsActive = 1;
+    
+            SET @InactivatedCount = @InactivatedCount + @@ROWCOUNT;
+            COMMIT TRANSACTION;
+    
+            SET @Batches = @Batches + 1;
+            SET @From = @From + @BatchSize;
+        END
+        SET @InactivateMs = DATEDIFF(MILLISECOND, @PhaseStart, SYSUTCDATETIME());
+    
+        -- Invalidate cached identities in the web tier if anything changed
+        IF @UpdatedCount + @InsertedCount + @InactivatedCount > 0
+        BEGIN
+            EXEC [jit].[sp_CacheVersion_Bump] @CacheName = 'Users';
+        END
+    
         -- Log sync activity
         INSERT INTO [jit].[AuditLog] (EventType, ActorLoginName, DetailsJson)
-        VALUES ('AdSync', @SyncUser, 
-            '{"UpdatedCount":' + CAST(@UpdatedCount AS NVARCHAR(10)) + 
-            ',"InsertedCount":' + CAST(@InsertedCount AS NVARCHAR(10)) + 
-            ',"InactivatedCount":' + CAST(@InactivatedCount AS NVARCHAR(10)) + '}');
-        
-        COMMIT TRANSACTION;
-        
-        SELECT 
+        VALUES ('AdSync', @SyncUser,
+            '{"StagedCount":' + CAST(@StagedCount AS NVARCHAR(10)) +
+            ',"UpdatedCount":' + CAST(@UpdatedCount AS NVARCHAR(10)) +
+            ',"InsertedCount":' + CAST(@InsertedCount AS NVARCHAR(10)) +
+            ',"InactivatedCount":' + CAST(@InactivatedCount AS NVARCHAR(10)) +
+            ',"UnchangedCount":' + CAST(@UnchangedCount AS NVARCHAR(10)) +
+            ',"Batches":' + CAST(@Batches AS NVARCHAR(10)) +
+            ',"DiffMs":' + CAST(@DiffMs AS NVARCHAR(10)) +
+            ',"UpdateMs":' + CAST(@UpdateMs AS NVARCHAR(10)) +
+            ',"InsertMs":' + CAST(@InsertMs AS NVARCHAR(10)) +
+            ',"InactivateMs":' + CAST(@InactivateMs AS NVARCHAR(10)) + '}');
+    
+        SELECT
+            @StagedCount AS StagedCount,
             @UpdatedCount AS UpdatedCount,
             @InsertedCount AS InsertedCount,
-            @InactivatedCount AS InactivatedCount;
-            
+            @InactivatedCount AS InactivatedCount,
+            @UnchangedCount AS UnchangedCount,
+            @Batches AS Batches,
+            @DiffMs AS DiffMs,
+            @UpdateMs AS UpdateMs,
+            @InsertMs AS InsertMs,
+            @InactivateMs AS InactivateMs;
+    
     END TRY
     BEGIN CATCH
         IF @@TRANCOUNT > 0
             ROLLBACK TRANSACTION;
-            
+    
+        -- Chunks committed before the failure are already visible to logins
+        IF @UpdatedCount + @InsertedCount + @InactivatedCount > 0
+            EXEC [jit].[sp_CacheVersion_Bump] @CacheName = 'Users';
+    
         INSERT INTO [jit].[AuditLog] (EventType, ActorLoginName, DetailsJson)
-        VALUES ('AdSyncError', @SyncUser, 
-            '{"Error":"' + ERROR_MESSAGE() + '","LineNumber":' + CAST(ERROR_LINE() AS NVARCHAR(10)) + '}');
-            
+        VALUES ('AdSyncError', @SyncUser,
+            '{"Error":"' + STRING_ESCAPE(ERROR_MESSAGE(), 'json') + '","LineNumber":' + CAST(ERROR_LINE() AS NVARCHAR(10)) +
+            ',"UpdatedCount":' + CAST(@UpdatedCount AS NVARCHAR(10)) +
+            ',"InsertedCount":' + CAST(@InsertedCount AS NVARCHAR(10)) +
+            ',"InactivatedCount":' + CAST(@InactivatedCount AS NVARCHAR(10)) + '}');
+    
         THROW;
     END CATCH
+    
+    DROP TABLE #Changed;
+    DROP TABLE #New;
+    DROP TABLE #Missing;
 END
 GO
-
--- Note: You'll need to create the AD_Staging table separately, or modify this procedure to work with your AD sync method
-
@@ -19,6 +19,8 @@ GO
 CREATE TABLE [jit].[Users](
     [UserId] [nvarchar](255) NOT NULL,
     [LoginName] [nvarchar](255) NOT NULL,
+    -- Bare sAMAccountName (LoginName without the DOMAIN\ prefix) so lookups by short name can seek
+    [LoginKey] AS (CAST(SUBSTRING([LoginName], CHARINDEX(N'\', [LoginName]) + 1, 255) AS [nvarchar](255))) PERSISTED,
     [GivenName] [nvarchar](255) NULL,
     [Surname] [nvarchar](255) NULL,
     [DisplayName] [nvarchar](255) NULL,
@@ -27,6 +29,13 @@ CREATE TABLE [jit].[Users](
     [Department] [nvarchar](255) NULL,
     [JobTitle] [nvarchar](255) NULL,
     [SeniorityLevel] [int] NULL,
+    -- Hash of the AD-sourced columns; must stay identical to jit.AD_Staging.RowHash
+    [AdRowHash] AS (CAST(HASHBYTES('SHA2_256', CONCAT(
+        ISNULL([GivenName], NCHAR(0)), NCHAR(31), ISNULL([Surname], NCHAR(0)), NCHAR(31),
+        ISNULL([DisplayName], NCHAR(0)), NCHAR(31), ISNULL([Email], NCHAR(0)), NCHAR(31),
+        ISNULL([Division], NCHAR(0)), NCHAR(31), ISNULL([Department], NCHAR(0)), NCHAR(31),
+        ISNULL([JobTitle], NCHAR(0)), NCHAR(31), ISNULL(CAST([SeniorityLevel] AS [nvarchar](11)), NCHAR(0))
+    )) AS [binary](32)),
     [IsAdmin] [bit] NOT NULL CONSTRAINT [DF_Users_IsAdmin] DEFAULT (0),
     [IsApprover] [bit] NOT NULL CONSTRAINT [DF_Users_IsApprover] DEFAULT (0),
     [IsDataSteward] [bit] NOT NULL CONSTRAINT [DF_Users_IsDataSteward] DEFAULT (0),
@@ -43,6 +52,10 @@ CREATE TABLE [jit].[Users](
 CREATE UNIQUE NONCLUSTERED INDEX [IX_Users_LoginName] ON [jit].[Users]([LoginName] ASC)
     WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
 
+CREATE NONCLUSTERED INDEX [IX_Users_LoginKey] ON [jit].[Users]([LoginKey] ASC)
+    INCLUDE ([IsActive])
+    WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
+
 CREATE NONCLUSTERED INDEX [IX_Users_IsActive] ON [jit].[Users]([IsActive] ASC)
     WHERE [IsActive] = 1
     WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
@@ -29,6 +29,9 @@ CREATE TABLE [jit].[Role_Eligibility_Rules](
     [UpdatedUtc] [datetime2](7) NOT NULL CONSTRAINT [DF_Role_Eligibility_Rules_UpdatedUtc] DEFAULT (GETUTCDATE()),
     [CreatedBy] [nvarchar](255) NOT NULL DEFAULT (SUSER_SNAME()),
     [UpdatedBy] [nvarchar](255) NOT NULL DEFAULT (SUSER_SNAME()),
+    -- Typed copy of ScopeValue for Team rules so team joins can seek (NULL for other scopes and
+    -- for values that are not the canonical text of an int, matching CAST(TeamId AS NVARCHAR) = ScopeValue)
+    [ScopeTeamId] AS (CASE WHEN [ScopeType] = 'Team' AND CAST(TRY_CAST([ScopeValue] AS [int]) AS [nvarchar](255)) = [ScopeValue] THEN TRY_CAST([ScopeValue] AS [int]) END) PERSISTED,
     CONSTRAINT [PK_Role_Eligibility_Rules] PRIMARY KEY CLUSTERED ([EligibilityRuleId] ASC)
     WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
 )
@@ -42,6 +45,10 @@ ALTER TABLE [jit].[Role_Eligibility_Rules] CHECK CONSTRAINT [FK_Role_Eligibility
 CREATE NONCLUSTERED INDEX [IX_Role_Eligibility_Rules_RoleId] ON [jit].[Role_Eligibility_Rules]([RoleId] ASC, [ScopeType] ASC, [ScopeValue] ASC)
     WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
 
+CREATE NONCLUSTERED INDEX [IX_Role_Eligibility_Rules_ScopeTeamId] ON [jit].[Role_Eligibility_Rules]([ScopeTeamId] ASC, [RoleId] ASC)
+    INCLUDE ([CanRequest], [Priority], [ValidFromUtc], [ValidToUtc])
+    WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
+
 CREATE NONCLUSTERED INDEX [IX_Role_Eligibility_Rules_Priority] ON [jit].[Role_Eligibility_Rules]([RoleId] ASC, [Priority] DESC)
     WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
 
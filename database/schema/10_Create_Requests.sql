@@ -37,10 +37,14 @@ ALTER TABLE [jit].[Requests] WITH CHECK ADD CONSTRAINT [FK_Requests_Users]
 
 ALTER TABLE [jit].[Requests] CHECK CONSTRAINT [FK_Requests_Users]
 
-CREATE NONCLUSTERED INDEX [IX_Requests_UserId] ON [jit].[Requests]([UserId] ASC)
+-- sp_Request_ListForUser: a user's history newest first, covered
+CREATE NONCLUSTERED INDEX [IX_Requests_UserId_CreatedUtc] ON [jit].[Requests]([UserId] ASC, [CreatedUtc] DESC)
+    INCLUDE ([Status], [RequestedDurationMinutes], [TicketRef], [UpdatedUtc], [Justification])
     WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
 
-CREATE NONCLUSTERED INDEX [IX_Requests_Status] ON [jit].[Requests]([Status] ASC)
+-- Open requests only: per-user duplicate checks (Status IN (...) AND UserId = ?) and
+-- the pending set read by sp_Request_RouteApprovers
+CREATE NONCLUSTERED INDEX [IX_Requests_Open_Status_UserId] ON [jit].[Requests]([Status] ASC, [UserId] ASC)
     WHERE [Status] IN ('Pending', 'AutoApproved')
     WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
 
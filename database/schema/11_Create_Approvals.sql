@@ -40,6 +40,7 @@ ALTER TABLE [jit].[Approvals] WITH CHECK ADD CONSTRAINT [FK_Approvals_Users]
 ALTER TABLE [jit].[Approvals] CHECK CONSTRAINT [FK_Approvals_Users]
 
 CREATE NONCLUSTERED INDEX [IX_Approvals_RequestId] ON [jit].[Approvals]([RequestId] ASC)
+    INCLUDE ([DecisionComment])
     WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
 
 CREATE NONCLUSTERED INDEX [IX_Approvals_ApproverUserId] ON [jit].[Approvals]([ApproverUserId] ASC)
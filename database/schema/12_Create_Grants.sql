@@ -51,10 +51,17 @@ ALTER TABLE [jit].[Grants] WITH CHECK ADD CONSTRAINT [FK_Grants_IssuedByUsers]
 
 ALTER TABLE [jit].[Grants] CHECK CONSTRAINT [FK_Grants_IssuedByUsers]
 
-CREATE NONCLUSTERED INDEX [IX_Grants_UserId_RoleId_Status_ValidToUtc] ON [jit].[Grants]([UserId] ASC, [RoleId] ASC, [Status] ASC, [ValidToUtc] ASC)
+-- Active grants are a small, hot slice of a table that only grows; both indexes are
+-- filtered to it so they stay small and cover their queries without key lookups
+-- Per-user: sp_Grant_ListActiveForUser, sp_Role_ListRequestable and sp_Request_Create probes
+CREATE NONCLUSTERED INDEX [IX_Grants_Active_UserId_RoleId] ON [jit].[Grants]([UserId] ASC, [RoleId] ASC, [ValidToUtc] ASC)
+    INCLUDE ([ValidFromUtc], [RequestId], [Status])
+    WHERE [Status] = 'Active'
     WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
 
-CREATE NONCLUSTERED INDEX [IX_Grants_Status_ValidToUtc] ON [jit].[Grants]([Status] ASC, [ValidToUtc] ASC)
+-- Expiry: sp_Grant_Expire and the expiry worker range-scan by ValidToUtc
+CREATE NONCLUSTERED INDEX [IX_Grants_Active_ValidToUtc] ON [jit].[Grants]([ValidToUtc] ASC)
+    INCLUDE ([UserId])
     WHERE [Status] = 'Active'
     WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
 
@@ -1,6 +1,6 @@
 -- =============================================
 -- Create jit.AuditLog Table
--- Comprehensive audit trail
+-- Comprehensive audit trail (hot tier: recent events only, see 20_Create_AuditLog_Archive.sql)
 -- =============================================
 
 USE [DMAP_JIT_Permissions]
@@ -53,6 +53,10 @@ ALTER TABLE [jit].[AuditLog] CHECK CONSTRAINT [FK_AuditLog_Grants]
 CREATE NONCLUSTERED INDEX [IX_AuditLog_EventUtc_EventType_ActorLoginName] ON [jit].[AuditLog]([EventUtc] DESC, [EventType] ASC, [ActorLoginName] ASC)
     WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
 
+-- Event-type/date-range queries from the admin audit API
+CREATE NONCLUSTERED INDEX [IX_AuditLog_EventType_EventUtc] ON [jit].[AuditLog]([EventType] ASC, [EventUtc] DESC)
+    WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
+
 CREATE NONCLUSTERED INDEX [IX_AuditLog_TargetUserId] ON [jit].[AuditLog]([TargetUserId] ASC)
     WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
 
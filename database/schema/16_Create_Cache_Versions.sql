@@ -0,0 +1,34 @@
+-- =============================================
+-- Create jit.Cache_Versions Table
+-- Change counters polled by the web tier to invalidate its in-process caches
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET ANSI_NULLS ON
+GO
+
+SET QUOTED_IDENTIFIER ON
+GO
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[Cache_Versions]') AND type in (N'U'))
+    DROP TABLE [jit].[Cache_Versions]
+GO
+
+CREATE TABLE [jit].[Cache_Versions](
+    [CacheName] [nvarchar](100) NOT NULL,
+    [Version] [bigint] NOT NULL CONSTRAINT [DF_Cache_Versions_Version] DEFAULT (0),
+    [UpdatedUtc] [datetime2](7) NOT NULL CONSTRAINT [DF_Cache_Versions_UpdatedUtc] DEFAULT (GETUTCDATE()),
+    CONSTRAINT [PK_Cache_Versions] PRIMARY KEY CLUSTERED ([CacheName] ASC)
+    WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
+)
+
+-- Seed known caches
+-- Users: identity cache (bumped by sp_User_SyncFromAD)
+-- Reference: role catalog, DB role mappings and teams (bumped by triggers on those tables)
+-- Eligibility: memoized requestable-role lists (bumped by a trigger on jit.User_Effective_Eligibility)
+INSERT INTO [jit].[Cache_Versions] (CacheName, Version)
+VALUES ('Users', 0), ('Reference', 0), ('Eligibility', 0);
+
+GO
@@ -0,0 +1,47 @@
+-- =============================================
+-- Create jit.User_Effective_Eligibility Table
+-- Materialized output of jit.vw_User_Role_Eligibility (one row per user/role decision)
+-- Maintained by sp_Eligibility_ProcessQueue; rebuilt by sp_Eligibility_Rebuild
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET ANSI_NULLS ON
+GO
+
+SET QUOTED_IDENTIFIER ON
+GO
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[User_Effective_Eligibility]') AND type in (N'U'))
+    DROP TABLE [jit].[User_Effective_Eligibility]
+GO
+
+CREATE TABLE [jit].[User_Effective_Eligibility](
+    [UserId] [nvarchar](255) NOT NULL,
+    [RoleId] [int] NOT NULL,
+    [CanRequest] [bit] NOT NULL,
+    [Priority] [int] NOT NULL,
+    [EligibilityReason] [nvarchar](255) NOT NULL,
+    [RefreshedUtc] [datetime2](7) NOT NULL CONSTRAINT [DF_User_Effective_Eligibility_RefreshedUtc] DEFAULT (GETUTCDATE()),
+    CONSTRAINT [PK_User_Effective_Eligibility] PRIMARY KEY CLUSTERED ([UserId] ASC, [RoleId] ASC)
+    WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
+)
+
+ALTER TABLE [jit].[User_Effective_Eligibility] WITH CHECK ADD CONSTRAINT [FK_User_Effective_Eligibility_Users] 
+    FOREIGN KEY([UserId]) REFERENCES [jit].[Users] ([UserId])
+    ON DELETE CASCADE
+
+ALTER TABLE [jit].[User_Effective_Eligibility] CHECK CONSTRAINT [FK_User_Effective_Eligibility_Users]
+
+ALTER TABLE [jit].[User_Effective_Eligibility] WITH CHECK ADD CONSTRAINT [FK_User_Effective_Eligibility_Roles] 
+    FOREIGN KEY([RoleId]) REFERENCES [jit].[Roles] ([RoleId])
+    ON DELETE CASCADE
+
+ALTER TABLE [jit].[User_Effective_Eligibility] CHECK CONSTRAINT [FK_User_Effective_Eligibility_Roles]
+
+-- Role-driven refreshes (rule changes) delete by RoleId
+CREATE NONCLUSTERED INDEX [IX_User_Effective_Eligibility_RoleId] ON [jit].[User_Effective_Eligibility]([RoleId] ASC)
+    WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
+
+GO
@@ -0,0 +1,34 @@
+-- =============================================
+-- Create jit.Eligibility_Refresh_Queue Table
+-- Keys whose effective eligibility must be recomputed
+--   UserId only  -> every role for that user
+--   RoleId only  -> every user for that role
+--   both         -> that single pair
+--   neither      -> full rebuild
+-- Filled by the eligibility triggers, drained by sp_Eligibility_ProcessQueue
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET ANSI_NULLS ON
+GO
+
+SET QUOTED_IDENTIFIER ON
+GO
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[Eligibility_Refresh_Queue]') AND type in (N'U'))
+    DROP TABLE [jit].[Eligibility_Refresh_Queue]
+GO
+
+CREATE TABLE [jit].[Eligibility_Refresh_Queue](
+    [QueueId] [bigint] IDENTITY(1,1) NOT NULL,
+    [UserId] [nvarchar](255) NULL,
+    [RoleId] [int] NULL,
+    [Reason] [nvarchar](100) NOT NULL,
+    [QueuedUtc] [datetime2](7) NOT NULL CONSTRAINT [DF_Eligibility_Refresh_Queue_QueuedUtc] DEFAULT (GETUTCDATE()),
+    CONSTRAINT [PK_Eligibility_Refresh_Queue] PRIMARY KEY CLUSTERED ([QueueId] ASC)
+    WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
+)
+
+GO
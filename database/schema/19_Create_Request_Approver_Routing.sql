@@ -0,0 +1,45 @@
+-- =============================================
+-- Create jit.Request_Approver_Routing Table
+-- One row per (approver, pending request) the approver is allowed to decide
+-- Maintained by sp_Request_RouteApprovers; read by sp_Request_ListPendingForApprover
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET ANSI_NULLS ON
+GO
+
+SET QUOTED_IDENTIFIER ON
+GO
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[Request_Approver_Routing]') AND type in (N'U'))
+    DROP TABLE [jit].[Request_Approver_Routing]
+GO
+
+CREATE TABLE [jit].[Request_Approver_Routing](
+    [ApproverUserId] [nvarchar](255) NOT NULL,
+    [RequestId] [bigint] NOT NULL,
+    [ApprovalReason] [nvarchar](100) NOT NULL,
+    [RoutedUtc] [datetime2](7) NOT NULL CONSTRAINT [DF_Request_Approver_Routing_RoutedUtc] DEFAULT (GETUTCDATE()),
+    CONSTRAINT [PK_Request_Approver_Routing] PRIMARY KEY CLUSTERED ([ApproverUserId] ASC, [RequestId] ASC)
+    WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
+)
+
+ALTER TABLE [jit].[Request_Approver_Routing] WITH CHECK ADD CONSTRAINT [FK_Request_Approver_Routing_Users] 
+    FOREIGN KEY([ApproverUserId]) REFERENCES [jit].[Users] ([UserId])
+    ON DELETE CASCADE
+
+ALTER TABLE [jit].[Request_Approver_Routing] CHECK CONSTRAINT [FK_Request_Approver_Routing_Users]
+
+ALTER TABLE [jit].[Request_Approver_Routing] WITH CHECK ADD CONSTRAINT [FK_Request_Approver_Routing_Requests] 
+    FOREIGN KEY([RequestId]) REFERENCES [jit].[Requests] ([RequestId])
+    ON DELETE CASCADE
+
+ALTER TABLE [jit].[Request_Approver_Routing] CHECK CONSTRAINT [FK_Request_Approver_Routing_Requests]
+
+-- Request-driven re-routing (create/cancel/decide) deletes by RequestId
+CREATE NONCLUSTERED INDEX [IX_Request_Approver_Routing_RequestId] ON [jit].[Request_Approver_Routing]([RequestId] ASC)
+    WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
+
+GO
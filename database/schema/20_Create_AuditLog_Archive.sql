@@ -0,0 +1,47 @@
+-- =============================================
+-- Create jit.AuditLog_Archive Table
+-- Cold tier of the audit trail
+-- =============================================
+-- jit.AuditLog keeps only recent events so inserts and listings stay cheap;
+-- jit.sp_AuditLog_Archive moves older rows here in batches, keeping their AuditId.
+-- No foreign keys: archived events must outlive the users, requests and grants
+-- they reference. Page-compressed because rows are written once and rarely read.
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET ANSI_NULLS ON
+GO
+
+SET QUOTED_IDENTIFIER ON
+GO
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[AuditLog_Archive]') AND type in (N'U'))
+    DROP TABLE [jit].[AuditLog_Archive]
+GO
+
+CREATE TABLE [jit].[AuditLog_Archive](
+    [AuditId] [bigint] NOT NULL,
+    [EventUtc] [datetime2](7) NOT NULL,
+    [EventType] [nvarchar](100) NOT NULL,
+    [ActorUserId] [nvarchar](255) NULL,
+    [ActorLoginName] [nvarchar](255) NOT NULL,
+    [TargetUserId] [nvarchar](255) NULL,
+    [RequestId] [bigint] NULL,
+    [GrantId] [bigint] NULL,
+    [DetailsJson] [nvarchar](max) NULL,
+    [ArchivedUtc] [datetime2](7) NOT NULL CONSTRAINT [DF_AuditLog_Archive_ArchivedUtc] DEFAULT (GETUTCDATE()),
+    CONSTRAINT [PK_AuditLog_Archive] PRIMARY KEY CLUSTERED ([AuditId] ASC)
+    WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON, DATA_COMPRESSION = PAGE)
+)
+
+-- Retention purge and date-range queries
+CREATE NONCLUSTERED INDEX [IX_AuditLog_Archive_EventUtc] ON [jit].[AuditLog_Archive]([EventUtc] ASC)
+    WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON, DATA_COMPRESSION = PAGE)
+
+-- Event-type queries (jit.vw_AuditLog_All / /admin/api/audit?archive=1)
+CREATE NONCLUSTERED INDEX [IX_AuditLog_Archive_EventType_EventUtc] ON [jit].[AuditLog_Archive]([EventType] ASC, [EventUtc] DESC)
+    WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON, DATA_COMPRESSION = PAGE)
+
+GO
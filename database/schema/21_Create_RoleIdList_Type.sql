@@ -0,0 +1,23 @@
+-- =============================================
+-- Create jit.RoleIdList Table Type
+-- Table-valued parameter for passing a set of role IDs (sp_Request_Create @RoleIds)
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+-- A type cannot be dropped while a procedure references it; sp_Request_Create
+-- is recreated by procedures\99_Create_All_Procedures.sql
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Request_Create]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_Request_Create]
+GO
+
+IF TYPE_ID(N'[jit].[RoleIdList]') IS NOT NULL
+    DROP TYPE [jit].[RoleIdList]
+GO
+
+CREATE TYPE [jit].[RoleIdList] AS TABLE(
+    [RoleId] [int] NOT NULL,
+    PRIMARY KEY CLUSTERED ([RoleId] ASC)
+)
+GO
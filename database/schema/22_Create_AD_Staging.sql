@@ -0,0 +1,42 @@
+-- =============================================
+-- Create jit.AD_Staging Table
+-- Directory export loaded by flask_app/ad_sync.py (or any bulk loader) before
+-- EXEC jit.sp_User_SyncFromAD; truncated at the start of every load
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET ANSI_NULLS ON
+GO
+
+SET QUOTED_IDENTIFIER ON
+GO
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[AD_Staging]') AND type in (N'U'))
+    DROP TABLE [jit].[AD_Staging]
+GO
+
+CREATE TABLE [jit].[AD_Staging](
+    [LoginName] [nvarchar](255) NOT NULL,
+    [UserId] [nvarchar](255) NOT NULL,
+    [GivenName] [nvarchar](255) NULL,
+    [Surname] [nvarchar](255) NULL,
+    [DisplayName] [nvarchar](255) NULL,
+    [Email] [nvarchar](255) NULL,
+    [Division] [nvarchar](255) NULL,
+    [Department] [nvarchar](255) NULL,
+    [JobTitle] [nvarchar](255) NULL,
+    [SeniorityLevel] [int] NULL,
+    -- Must stay identical to jit.Users.AdRowHash: sp_User_SyncFromAD only touches users whose hashes differ
+    [RowHash] AS (CAST(HASHBYTES('SHA2_256', CONCAT(
+        ISNULL([GivenName], NCHAR(0)), NCHAR(31), ISNULL([Surname], NCHAR(0)), NCHAR(31),
+        ISNULL([DisplayName], NCHAR(0)), NCHAR(31), ISNULL([Email], NCHAR(0)), NCHAR(31),
+        ISNULL([Division], NCHAR(0)), NCHAR(31), ISNULL([Department], NCHAR(0)), NCHAR(31),
+        ISNULL([JobTitle], NCHAR(0)), NCHAR(31), ISNULL(CAST([SeniorityLevel] AS [nvarchar](11)), NCHAR(0))
+    )) AS [binary](32)) PERSISTED,
+    CONSTRAINT [PK_AD_Staging] PRIMARY KEY CLUSTERED ([LoginName] ASC)
+    WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
+)
+
+GO
@@ -0,0 +1,33 @@
+-- =============================================
+-- Create jit.Drift_Observed_Members Table
+-- Role memberships read from the target databases by the drift reconciler
+-- =============================================
+-- flask_app/drift_reconcile.py replaces the rows of each database it rechecks
+-- (one writer per database) before jit.sp_Drift_Detect diffs them against
+-- jit.vw_Drift_ExpectedMembers. Databases skipped as unchanged keep their rows.
+-- No foreign keys: rows describe the target databases as found.
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET ANSI_NULLS ON
+GO
+
+SET QUOTED_IDENTIFIER ON
+GO
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[Drift_Observed_Members]') AND type in (N'U'))
+    DROP TABLE [jit].[Drift_Observed_Members]
+GO
+
+CREATE TABLE [jit].[Drift_Observed_Members](
+    [DatabaseName] [nvarchar](255) NOT NULL,
+    [DbRoleName] [nvarchar](255) NOT NULL,
+    [MemberName] [nvarchar](255) NOT NULL,
+    [ObservedUtc] [datetime2](7) NOT NULL CONSTRAINT [DF_Drift_Observed_Members_ObservedUtc] DEFAULT (GETUTCDATE()),
+    CONSTRAINT [PK_Drift_Observed_Members] PRIMARY KEY CLUSTERED ([DatabaseName] ASC, [DbRoleName] ASC, [MemberName] ASC)
+    WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
+)
+
+GO
@@ -0,0 +1,39 @@
+-- =============================================
+-- Create jit.Drift_Database_State Table
+-- Per-database result of the last drift check
+-- =============================================
+-- MembershipHash is SHA-256 over the sorted role memberships of the database's
+-- JIT-managed roles (computed on the target), ExpectedHash the same over
+-- jit.vw_Drift_ExpectedMembers (jit.vw_Drift_ExpectedState). An incremental run
+-- only re-reads and re-diffs a database when either hash moved or the last
+-- check failed; a NULL MembershipHash forces the next run to recheck it.
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET ANSI_NULLS ON
+GO
+
+SET QUOTED_IDENTIFIER ON
+GO
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[Drift_Database_State]') AND type in (N'U'))
+    DROP TABLE [jit].[Drift_Database_State]
+GO
+
+CREATE TABLE [jit].[Drift_Database_State](
+    [DatabaseName] [nvarchar](255) NOT NULL,
+    [MembershipHash] [binary](32) NULL,
+    [MemberCount] [int] NULL,
+    [ExpectedHash] [binary](32) NULL,
+    [MissingCount] [int] NOT NULL CONSTRAINT [DF_Drift_Database_State_MissingCount] DEFAULT (0),
+    [OrphanedCount] [int] NOT NULL CONSTRAINT [DF_Drift_Database_State_OrphanedCount] DEFAULT (0),
+    [LastDiffUtc] [datetime2](7) NULL,
+    [LastCheckedUtc] [datetime2](7) NOT NULL CONSTRAINT [DF_Drift_Database_State_LastCheckedUtc] DEFAULT (GETUTCDATE()),
+    [LastError] [nvarchar](max) NULL,
+    CONSTRAINT [PK_Drift_Database_State] PRIMARY KEY CLUSTERED ([DatabaseName] ASC)
+    WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
+)
+
+GO
@@ -0,0 +1,51 @@
+-- =============================================
+-- Create jit.Drift_Findings Table
+-- Current differences between target role memberships and active grants
+-- =============================================
+-- DriftType:
+--   Missing  - an active grant's assignment (jit.Grant_DBRole_Assignments) has no
+--              membership in the target database
+--   Orphaned - a JIT-managed role has a member no active grant accounts for
+-- jit.sp_Drift_Detect keeps one row per difference for each database it rechecks:
+-- resolved differences are deleted, persisting ones keep DetectedUtc.
+-- No foreign keys: findings may name roles, users and grants that are gone.
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET ANSI_NULLS ON
+GO
+
+SET QUOTED_IDENTIFIER ON
+GO
+
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[Drift_Findings]') AND type in (N'U'))
+    DROP TABLE [jit].[Drift_Findings]
+GO
+
+CREATE TABLE [jit].[Drift_Findings](
+    [FindingId] [bigint] IDENTITY(1,1) NOT NULL,
+    [DatabaseName] [nvarchar](255) NOT NULL,
+    [DbRoleName] [nvarchar](255) NOT NULL,
+    [MemberName] [nvarchar](255) NOT NULL,
+    [DriftType] [nvarchar](20) NOT NULL,
+    [DbRoleId] [int] NULL,
+    [UserId] [nvarchar](255) NULL,
+    [GrantId] [bigint] NULL,
+    [DetectedUtc] [datetime2](7) NOT NULL CONSTRAINT [DF_Drift_Findings_DetectedUtc] DEFAULT (GETUTCDATE()),
+    [LastSeenUtc] [datetime2](7) NOT NULL CONSTRAINT [DF_Drift_Findings_LastSeenUtc] DEFAULT (GETUTCDATE()),
+    [RepairAttemptUtc] [datetime2](7) NULL,
+    [RepairSucceeded] [bit] NULL,
+    [RepairError] [nvarchar](max) NULL,
+    CONSTRAINT [PK_Drift_Findings] PRIMARY KEY CLUSTERED ([FindingId] ASC)
+    WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON),
+    CONSTRAINT [CK_Drift_Findings_DriftType] CHECK ([DriftType] IN ('Missing', 'Orphaned'))
+)
+
+-- One finding per membership; sp_Drift_Detect matches on it
+CREATE UNIQUE NONCLUSTERED INDEX [IX_Drift_Findings_Membership] ON [jit].[Drift_Findings]([DatabaseName] ASC, [DbRoleName] ASC, [MemberName] ASC)
+    INCLUDE ([DriftType])
+    WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON)
+
+GO
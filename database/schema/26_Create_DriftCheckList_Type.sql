@@ -0,0 +1,31 @@
+-- =============================================
+-- Create jit.DriftCheckList Table Type
+-- Table-valued parameter for jit.sp_Drift_Detect: one row per target database
+-- probed by the drift reconciler
+--   Status: Checked   - memberships re-read into jit.Drift_Observed_Members
+--           Unchanged - MembershipHash and ExpectedHash match the last check
+--           Failed    - the target could not be read (Error holds the message)
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+-- A type cannot be dropped while a procedure references it; sp_Drift_Detect
+-- is recreated by procedures\99_Create_All_Procedures.sql
+IF EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[jit].[sp_Drift_Detect]') AND type in (N'P', N'PC'))
+    DROP PROCEDURE [jit].[sp_Drift_Detect]
+GO
+
+IF TYPE_ID(N'[jit].[DriftCheckList]') IS NOT NULL
+    DROP TYPE [jit].[DriftCheckList]
+GO
+
+CREATE TYPE [jit].[DriftCheckList] AS TABLE(
+    [DatabaseName] [nvarchar](255) NOT NULL,
+    [Status] [nvarchar](20) NOT NULL,
+    [MembershipHash] [binary](32) NULL,
+    [MemberCount] [int] NULL,
+    [Error] [nvarchar](max) NULL,
+    PRIMARY KEY CLUSTERED ([DatabaseName] ASC)
+)
+GO
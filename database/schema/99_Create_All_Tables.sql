@@ -36,6 +36,31 @@ PRINT ''
 -- Audit table
 :r "schema\14_Create_AuditLog.sql"
 
+-- Cache invalidation counters
+:r "schema\16_Create_Cache_Versions.sql"
+
+-- Materialized eligibility (depends on Users and Roles)
+:r "schema\17_Create_User_Effective_Eligibility.sql"
+:r "schema\18_Create_Eligibility_Refresh_Queue.sql"
+
+-- Approver routing for pending requests (depends on Users and Requests)
+:r "schema\19_Create_Request_Approver_Routing.sql"
+
+-- Cold tier of the audit trail (no foreign keys)
+:r "schema\20_Create_AuditLog_Archive.sql"
+
+-- Table types for set-valued procedure parameters
+:r "schema\21_Create_RoleIdList_Type.sql"
+
+-- AD export staging for sp_User_SyncFromAD (no foreign keys)
+:r "schema\22_Create_AD_Staging.sql"
+
+-- Role drift reconciliation (no foreign keys) and its table-valued parameter
+:r "schema\23_Create_Drift_Observed_Members.sql"
+:r "schema\24_Create_Drift_Database_State.sql"
+:r "schema\25_Create_Drift_Findings.sql"
+:r "schema\26_Create_DriftCheckList_Type.sql"
+
 GO
 
 -- Note: The :r commands above are SQLCMD syntax. If running in SSMS,
@@ -141,3 +141,8 @@ PRINT CAST(@@ROWCOUNT AS VARCHAR(10)) + ' request-role associations inserted'
 
 GO
 
+-- Requests above bypass sp_Request_Create, so route the pending ones to their approvers
+EXEC [jit].[sp_Request_RouteApprovers];
+PRINT 'Pending requests routed to approvers'
+
+GO
@@ -0,0 +1,254 @@
+-- =============================================
+-- Test Data: Seed Load-Test Data Set
+-- =============================================
+-- Persistent, production-sized data set for flask_app\loadtest.py:
+--   100,000 users (LOADTEST\load.user.N), 1 in 100 an approver, load.user.1-5 admins
+--   400 teams, 2,000 roles, about 2,400 eligibility rules (Team, Department and All scopes)
+--   2,000,000 requests (1 in 20 users has one Pending), about 2,300,000 grants
+--   (approved requests among each user's three newest are still Active), approvals for
+--   every decided request and 3,000,000 audit rows over the last 90 days
+-- Everything is tagged LOADTEST / 'Load ...' so 21_Remove_Load_Test.sql can take it out again.
+--
+-- The eligibility and routing triggers are disabled while seeding; the effective
+-- eligibility table and approver routing are rebuilt once at the end instead.
+-- Expect 10-30 minutes and several GB of log on a developer SQL Server container.
+-- =============================================
+-- WARNING: Test/dev databases only!
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET ANSI_NULLS ON
+GO
+
+SET QUOTED_IDENTIFIER ON
+GO
+
+SET NOCOUNT ON;
+
+DECLARE @UserCount INT = 100000;
+DECLARE @TeamCount INT = 400;           -- Must be a multiple of 40 so team and user departments line up
+DECLARE @RoleCount INT = 2000;
+DECLARE @RequestsPerUser INT = 20;
+DECLARE @AuditRowsPerUser INT = 30;
+DECLARE @CurrentUtc DATETIME2 = GETUTCDATE();
+
+IF EXISTS (SELECT 1 FROM [jit].[Users] WHERE UserId LIKE N'load.user.%')
+BEGIN
+    PRINT 'Load-test data already present. Run 21_Remove_Load_Test.sql first to reseed.'
+    RETURN;
+END
+
+PRINT 'Seeding load-test data...'
+
+DISABLE TRIGGER [jit].[trg_Users_RefreshEligibility] ON [jit].[Users];
+DISABLE TRIGGER [jit].[trg_Users_RouteApprovers] ON [jit].[Users];
+DISABLE TRIGGER [jit].[trg_User_Teams_RefreshEligibility] ON [jit].[User_Teams];
+DISABLE TRIGGER [jit].[trg_Role_Eligibility_Rules_RefreshEligibility] ON [jit].[Role_Eligibility_Rules];
+DISABLE TRIGGER [jit].[trg_User_Effective_Eligibility_RouteApprovers] ON [jit].[User_Effective_Eligibility];
+
+-- Numbers 1..@UserCount, reused for every fan-out below
+CREATE TABLE #n (i INT NOT NULL PRIMARY KEY);
+;WITH n AS (
+    SELECT TOP (@UserCount) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS i
+    FROM sys.all_objects a CROSS JOIN sys.all_objects b
+)
+INSERT INTO #n (i) SELECT i FROM n;
+
+-- ---- Users ----
+-- Division = i % 8, Department = i % 40, Team = i % @TeamCount
+INSERT INTO [jit].[Users] (
+    UserId, LoginName, GivenName, Surname, DisplayName, Email,
+    Division, Department, JobTitle, SeniorityLevel,
+    IsAdmin, IsApprover, IsDataSteward, CreatedBy, UpdatedBy
+)
+SELECT N'load.user.' + CAST(i AS NVARCHAR(10)),
+       N'LOADTEST\load.user.' + CAST(i AS NVARCHAR(10)),
+       N'Load', N'User ' + CAST(i AS NVARCHAR(10)),
+       N'Load User ' + CAST(i AS NVARCHAR(10)),
+       N'load.user.' + CAST(i AS NVARCHAR(10)) + N'@loadtest.local',
+       N'Load Division ' + CAST(i % 8 AS NVARCHAR(10)),
+       N'Load Department ' + CAST(i % 40 AS NVARCHAR(10)),
+       CASE WHEN i % 100 = 0 THEN N'Data Manager' ELSE N'Analyst' END,
+       CASE WHEN i % 100 = 0 THEN 5 ELSE 1 + i % 4 END,
+       CASE WHEN i <= 5 THEN 1 ELSE 0 END,
+       CASE WHEN i % 100 = 0 THEN 1 ELSE 0 END,
+       CASE WHEN i % 1000 = 0 THEN 1 ELSE 0 END,
+       N'LOADTEST', N'LOADTEST'
+FROM #n;
+PRINT '  Users: ' + CAST(@@ROWCOUNT AS NVARCHAR(20));
+
+-- ---- Teams and memberships ----
+INSERT INTO [jit].[Teams] (TeamName, Description, Division, Department, CreatedBy, UpdatedBy)
+SELECT N'Load Team ' + CAST(i - 1 AS NVARCHAR(10)), N'Load test',
+       N'Load Division ' + CAST((i - 1) % 8 AS NVARCHAR(10)),
+       N'Load Department ' + CAST((i - 1) % 40 AS NVARCHAR(10)),
+       N'LOADTEST', N'LOADTEST'
+FROM #n
+WHERE i <= @TeamCount;
+
+CREATE TABLE #Teams (k INT NOT NULL PRIMARY KEY, TeamId INT NOT NULL);
+INSERT INTO #Teams (k, TeamId)
+SELECT CAST(SUBSTRING(TeamName, 11, 10) AS INT), TeamId
+FROM [jit].[Teams]
+WHERE TeamName LIKE N'Load Team %';
+
+INSERT INTO [jit].[User_Teams] (UserId, TeamId)
+SELECT N'load.user.' + CAST(n.i AS NVARCHAR(10)), t.TeamId
+FROM #n n
+INNER JOIN #Teams t ON t.k = n.i % @TeamCount;
+PRINT '  User_Teams: ' + CAST(@@ROWCOUNT AS NVARCHAR(20));
+
+-- ---- Roles and eligibility rules ----
+-- Role k (0-based) is requestable by team k % @TeamCount; every 10th role also by a
+-- department, and roles 0-9 by everyone
+INSERT INTO [jit].[Roles] (RoleName, Description, MaxDurationMinutes, RequiresTicket, RequiresApproval, AutoApproveMinSeniority, CreatedBy, UpdatedBy)
+SELECT N'Load Role ' + CAST(i - 1 AS NVARCHAR(10)), N'Load test role',
+       CASE (i - 1) % 4 WHEN 0 THEN 240 WHEN 1 THEN 1440 WHEN 2 THEN 4320 ELSE 10080 END,
+       CASE WHEN (i - 1) % 5 = 0 THEN 1 ELSE 0 END,
+       CASE WHEN (i - 1) % 4 = 0 THEN 0 ELSE 1 END,
+       CASE WHEN (i - 1) % 4 = 1 THEN 3 END,
+       N'LOADTEST', N'LOADTEST'
+FROM #n
+WHERE i <= @RoleCount;
+
+CREATE TABLE #Roles (k INT NOT NULL PRIMARY KEY, RoleId INT NOT NULL);
+INSERT INTO #Roles (k, RoleId)
+SELECT CAST(SUBSTRING(RoleName, 11, 10) AS INT), RoleId
+FROM [jit].[Roles]
+WHERE RoleName LIKE N'Load Role %';
+PRINT '  Roles: ' + CAST(@@ROWCOUNT AS NVARCHAR(20));
+
+INSERT INTO [jit].[Role_Eligibility_Rules] (RoleId, ScopeType, ScopeValue, CanRequest, Priority, CreatedBy, UpdatedBy)
+SELECT r.RoleId, 'Team', CAST(t.TeamId AS NVARCHAR(255)), 1, 0, N'LOADTEST', N'LOADTEST'
+FROM #Roles r
+INNER JOIN #Teams t ON t.k = r.k % @TeamCount
+UNION ALL
+SELECT r.RoleId, 'Department', N'Load Department ' + CAST(r.k % 40 AS NVARCHAR(10)), 1, 0, N'LOADTEST', N'LOADTEST'
+FROM #Roles r
+WHERE r.k % 10 = 0
+UNION ALL
+SELECT r.RoleId, 'All', NULL, 1, 0, N'LOADTEST', N'LOADTEST'
+FROM #Roles r
+WHERE r.k < 10;
+PRINT '  Role_Eligibility_Rules: ' + CAST(@@ROWCOUNT AS NVARCHAR(20));
+
+-- ---- Requests ----
+-- Request n of user i asks for role (i % @TeamCount) + @TeamCount * (n % 5), which the
+-- user's team rule makes requestable; every third request adds the next such role
+INSERT INTO [jit].[Requests] (UserId, RequestedDurationMinutes, Justification, TicketRef, Status,
+                              UserDeptSnapshot, UserTitleSnapshot, CreatedUtc, UpdatedUtc, CreatedBy)
+SELECT N'load.user.' + CAST(u.i AS NVARCHAR(10)), 240, N'Load test',
+       N'LOAD-' + CAST(n.i AS NVARCHAR(10)),
+       CASE WHEN n.i = 1 AND u.i % 20 = 0 THEN 'Pending'
+            WHEN n.i % 7 = 0 THEN 'Denied'
+            WHEN n.i % 11 = 0 THEN 'Cancelled'
+            ELSE 'Approved' END,
+       N'Load Department ' + CAST(u.i % 40 AS NVARCHAR(10)),
+       CASE WHEN u.i % 100 = 0 THEN N'Data Manager' ELSE N'Analyst' END,
+       DATEADD(HOUR, -(n.i - 1) * 432 - u.i % 24, @CurrentUtc),
+       DATEADD(HOUR, -(n.i - 1) * 432 - u.i % 24, @CurrentUtc),
+       N'LOADTEST'
+FROM #n u
+CROSS JOIN #n n
+WHERE n.i <= @RequestsPerUser;
+PRINT '  Requests: ' + CAST(@@ROWCOUNT AS NVARCHAR(20));
+
+-- Map each request back to (user index, request ordinal) once; the parsing is not cheap at 2M rows
+CREATE TABLE #Requests (RequestId BIGINT NOT NULL PRIMARY KEY, u INT NOT NULL, n INT NOT NULL,
+                        Status NVARCHAR(50) NOT NULL, CreatedUtc DATETIME2 NOT NULL);
+INSERT INTO #Requests (RequestId, u, n, Status, CreatedUtc)
+SELECT RequestId, CAST(SUBSTRING(UserId, 11, 10) AS INT), CAST(SUBSTRING(TicketRef, 6, 10) AS INT), Status, CreatedUtc
+FROM [jit].[Requests]
+WHERE CreatedBy = N'LOADTEST';
+
+INSERT INTO [jit].[Request_Roles] (RequestId, RoleId, CreatedUtc)
+SELECT q.RequestId, r.RoleId, q.CreatedUtc
+FROM #Requests q
+INNER JOIN #Roles r ON r.k = q.u % @TeamCount + @TeamCount * (q.n % 5)
+UNION ALL
+SELECT q.RequestId, r.RoleId, q.CreatedUtc
+FROM #Requests q
+INNER JOIN #Roles r ON r.k = q.u % @TeamCount + @TeamCount * ((q.n + 1) % 5)
+WHERE q.n % 3 = 0;
+PRINT '  Request_Roles: ' + CAST(@@ROWCOUNT AS NVARCHAR(20));
+
+-- ---- Approvals (one decision per approved/denied request, by one of 50 approvers) ----
+INSERT INTO [jit].[Approvals] (RequestId, ApproverUserId, ApproverLoginName, Decision, DecisionComment, DecisionUtc)
+SELECT q.RequestId,
+       N'load.user.' + CAST(100 * (1 + q.u % 50) AS NVARCHAR(10)),
+       N'LOADTEST\load.user.' + CAST(100 * (1 + q.u % 50) AS NVARCHAR(10)),
+       q.Status, N'Load test decision', DATEADD(MINUTE, 30, q.CreatedUtc)
+FROM #Requests q
+WHERE q.Status IN ('Approved', 'Denied');
+PRINT '  Approvals: ' + CAST(@@ROWCOUNT AS NVARCHAR(20));
+
+-- ---- Grants (one per role of each approved request) ----
+-- Approved requests among each user's three newest are still Active, the rest expired
+INSERT INTO [jit].[Grants] (RequestId, UserId, RoleId, ValidFromUtc, ValidToUtc, RevokedUtc, IssuedByUserId, Status)
+SELECT q.RequestId, N'load.user.' + CAST(q.u AS NVARCHAR(10)), rr.RoleId,
+       CASE WHEN q.n <= 3 THEN DATEADD(MINUTE, -30, @CurrentUtc) ELSE DATEADD(MINUTE, 30, q.CreatedUtc) END,
+       CASE WHEN q.n <= 3 THEN DATEADD(MINUTE, 60 + q.u % 2880, @CurrentUtc) ELSE DATEADD(MINUTE, 270, q.CreatedUtc) END,
+       CASE WHEN q.n <= 3 THEN NULL ELSE DATEADD(MINUTE, 270, q.CreatedUtc) END,
+       N'load.user.' + CAST(100 * (1 + q.u % 50) AS NVARCHAR(10)),
+       CASE WHEN q.n <= 3 THEN 'Active' ELSE 'Expired' END
+FROM #Requests q
+INNER JOIN [jit].[Request_Roles] rr ON rr.RequestId = q.RequestId
+WHERE q.Status = 'Approved';
+PRINT '  Grants: ' + CAST(@@ROWCOUNT AS NVARCHAR(20));
+
+-- ---- Audit log (hot tier, last 90 days) ----
+INSERT INTO [jit].[AuditLog] (EventUtc, EventType, ActorUserId, ActorLoginName, TargetUserId, DetailsJson)
+SELECT DATEADD(MINUTE, -((u.i * 37 + n.i * 4391) % 129600), @CurrentUtc),
+       CASE n.i % 6 WHEN 0 THEN 'RequestCreated' WHEN 1 THEN 'GrantIssued' WHEN 2 THEN 'GrantExpired'
+                    WHEN 3 THEN 'PageAccess' WHEN 4 THEN 'RequestApproved' ELSE 'UserSynced' END,
+       N'load.user.' + CAST(u.i AS NVARCHAR(10)),
+       N'LOADTEST\load.user.' + CAST(u.i AS NVARCHAR(10)),
+       N'load.user.' + CAST(u.i AS NVARCHAR(10)),
+       N'{"Source":"LoadTest","Ordinal":' + CAST(n.i AS NVARCHAR(10)) + N'}'
+FROM #n u
+CROSS JOIN #n n
+WHERE n.i <= @AuditRowsPerUser;
+PRINT '  AuditLog: ' + CAST(@@ROWCOUNT AS NVARCHAR(20));
+
+DROP TABLE #Requests;
+DROP TABLE #Roles;
+DROP TABLE #Teams;
+DROP TABLE #n;
+
+ENABLE TRIGGER [jit].[trg_Users_RefreshEligibility] ON [jit].[Users];
+ENABLE TRIGGER [jit].[trg_Users_RouteApprovers] ON [jit].[Users];
+ENABLE TRIGGER [jit].[trg_User_Teams_RefreshEligibility] ON [jit].[User_Teams];
+ENABLE TRIGGER [jit].[trg_Role_Eligibility_Rules_RefreshEligibility] ON [jit].[Role_Eligibility_Rules];
+GO
+
+-- ---- Derived tables, rebuilt once instead of per-row by the triggers ----
+PRINT 'Rebuilding effective eligibility...'
+DECLARE @EligibleRows INT;
+EXEC [jit].[sp_Eligibility_Rebuild] @RowCount = @EligibleRows OUTPUT;
+PRINT '  User_Effective_Eligibility: ' + CAST(@EligibleRows AS NVARCHAR(20));
+
+ENABLE TRIGGER [jit].[trg_User_Effective_Eligibility_RouteApprovers] ON [jit].[User_Effective_Eligibility];
+GO
+
+PRINT 'Routing pending requests to approvers...'
+DECLARE @RoutedCount INT;
+EXEC [jit].[sp_Request_RouteApprovers] @RoutedCount = @RoutedCount OUTPUT;
+PRINT '  Request_Approver_Routing: ' + CAST(@RoutedCount AS NVARCHAR(20));
+
+EXEC [jit].[sp_CacheVersion_Bump] @CacheName = N'Users';
+
+UPDATE STATISTICS [jit].[Users];
+UPDATE STATISTICS [jit].[Requests];
+UPDATE STATISTICS [jit].[Request_Roles];
+UPDATE STATISTICS [jit].[Grants];
+UPDATE STATISTICS [jit].[AuditLog];
+GO
+
+PRINT ''
+PRINT 'Load-test data seeded.'
+PRINT '  User logins:     LOADTEST\load.user.1 .. LOADTEST\load.user.100000'
+PRINT '  Approver logins: every hundredth user (LOADTEST\load.user.100, .200, ...)'
+PRINT '  Admin logins:    LOADTEST\load.user.1 .. LOADTEST\load.user.5'
+GO
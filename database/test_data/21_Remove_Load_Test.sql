@@ -0,0 +1,111 @@
+-- =============================================
+-- Test Data: Remove Load-Test Data Set
+-- =============================================
+-- Deletes everything 20_Seed_Load_Test.sql created, in foreign key order.
+-- Large tables are deleted in batches so the log can truncate between them.
+-- =============================================
+-- WARNING: Test/dev databases only!
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+SET NOCOUNT ON;
+
+DECLARE @BatchSize INT = 50000;
+DECLARE @Deleted INT;
+
+PRINT 'Removing load-test data...'
+
+DISABLE TRIGGER [jit].[trg_Users_RefreshEligibility] ON [jit].[Users];
+DISABLE TRIGGER [jit].[trg_Users_RouteApprovers] ON [jit].[Users];
+DISABLE TRIGGER [jit].[trg_User_Teams_RefreshEligibility] ON [jit].[User_Teams];
+DISABLE TRIGGER [jit].[trg_Role_Eligibility_Rules_RefreshEligibility] ON [jit].[Role_Eligibility_Rules];
+DISABLE TRIGGER [jit].[trg_User_Effective_Eligibility_RouteApprovers] ON [jit].[User_Effective_Eligibility];
+
+SET @Deleted = 1;
+WHILE @Deleted > 0
+BEGIN
+    DELETE TOP (@BatchSize) FROM [jit].[AuditLog] WHERE ActorUserId LIKE N'load.user.%' OR TargetUserId LIKE N'load.user.%';
+    SET @Deleted = @@ROWCOUNT;
+END
+
+DELETE FROM [jit].[AuditLog_Archive] WHERE ActorUserId LIKE N'load.user.%' OR TargetUserId LIKE N'load.user.%';
+
+SET @Deleted = 1;
+WHILE @Deleted > 0
+BEGIN
+    DELETE TOP (@BatchSize) a
+    FROM [jit].[Grant_DBRole_Assignments] a
+    INNER JOIN [jit].[Grants] g ON a.GrantId = g.GrantId
+    WHERE g.UserId LIKE N'load.user.%';
+    SET @Deleted = @@ROWCOUNT;
+END
+
+SET @Deleted = 1;
+WHILE @Deleted > 0
+BEGIN
+    DELETE TOP (@BatchSize) FROM [jit].[Grants] WHERE UserId LIKE N'load.user.%';
+    SET @Deleted = @@ROWCOUNT;
+END
+
+DELETE FROM [jit].[Request_Approver_Routing] WHERE ApproverUserId LIKE N'load.user.%'
+    OR RequestId IN (SELECT RequestId FROM [jit].[Requests] WHERE UserId LIKE N'load.user.%');
+
+SET @Deleted = 1;
+WHILE @Deleted > 0
+BEGIN
+    DELETE TOP (@BatchSize) a
+    FROM [jit].[Approvals] a
+    INNER JOIN [jit].[Requests] r ON a.RequestId = r.RequestId
+    WHERE r.UserId LIKE N'load.user.%';
+    SET @Deleted = @@ROWCOUNT;
+END
+
+SET @Deleted = 1;
+WHILE @Deleted > 0
+BEGIN
+    DELETE TOP (@BatchSize) rr
+    FROM [jit].[Request_Roles] rr
+    INNER JOIN [jit].[Requests] r ON rr.RequestId = r.RequestId
+    WHERE r.UserId LIKE N'load.user.%';
+    SET @Deleted = @@ROWCOUNT;
+END
+
+SET @Deleted = 1;
+WHILE @Deleted > 0
+BEGIN
+    DELETE TOP (@BatchSize) FROM [jit].[Requests] WHERE UserId LIKE N'load.user.%';
+    SET @Deleted = @@ROWCOUNT;
+END
+
+DELETE FROM [jit].[Eligibility_Refresh_Queue] WHERE UserId LIKE N'load.user.%'
+    OR RoleId IN (SELECT RoleId FROM [jit].[Roles] WHERE RoleName LIKE N'Load Role %');
+
+SET @Deleted = 1;
+WHILE @Deleted > 0
+BEGIN
+    DELETE TOP (@BatchSize) FROM [jit].[User_Effective_Eligibility] WHERE UserId LIKE N'load.user.%';
+    SET @Deleted = @@ROWCOUNT;
+END
+
+DELETE FROM [jit].[User_Effective_Eligibility]
+WHERE RoleId IN (SELECT RoleId FROM [jit].[Roles] WHERE RoleName LIKE N'Load Role %');
+DELETE FROM [jit].[User_To_Role_Eligibility] WHERE UserId LIKE N'load.user.%';
+DELETE FROM [jit].[Role_Eligibility_Rules]
+WHERE RoleId IN (SELECT RoleId FROM [jit].[Roles] WHERE RoleName LIKE N'Load Role %');
+DELETE FROM [jit].[User_Teams] WHERE UserId LIKE N'load.user.%';
+DELETE FROM [jit].[Teams] WHERE TeamName LIKE N'Load Team %';
+DELETE FROM [jit].[Roles] WHERE RoleName LIKE N'Load Role %';
+DELETE FROM [jit].[Users] WHERE UserId LIKE N'load.user.%';
+
+ENABLE TRIGGER [jit].[trg_Users_RefreshEligibility] ON [jit].[Users];
+ENABLE TRIGGER [jit].[trg_Users_RouteApprovers] ON [jit].[Users];
+ENABLE TRIGGER [jit].[trg_User_Teams_RefreshEligibility] ON [jit].[User_Teams];
+ENABLE TRIGGER [jit].[trg_Role_Eligibility_Rules_RefreshEligibility] ON [jit].[Role_Eligibility_Rules];
+ENABLE TRIGGER [jit].[trg_User_Effective_Eligibility_RouteApprovers] ON [jit].[User_Effective_Eligibility];
+
+EXEC [jit].[sp_CacheVersion_Bump] @CacheName = N'Users';
+
+PRINT 'Load-test data removed.'
+GO
@@ -32,11 +32,15 @@ END
 /*
 PRINT 'Clearing existing test data...'
 DELETE FROM [jit].[AuditLog];
+DELETE FROM [jit].[AuditLog_Archive];
 DELETE FROM [jit].[Grant_DBRole_Assignments];
 DELETE FROM [jit].[Grants];
 DELETE FROM [jit].[Approvals];
+DELETE FROM [jit].[Request_Approver_Routing];
 DELETE FROM [jit].[Request_Roles];
 DELETE FROM [jit].[Requests];
+DELETE FROM [jit].[Eligibility_Refresh_Queue];
+DELETE FROM [jit].[User_Effective_Eligibility];
 DELETE FROM [jit].[User_To_Role_Eligibility]; 
 DELETE FROM [jit].[Role_Eligibility_Rules];
 DELETE FROM [jit].[User_Teams];
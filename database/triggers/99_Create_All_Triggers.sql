@@ -0,0 +1,35 @@
+-- =============================================
+-- Master Script: Create All JIT Framework Triggers
+-- Run this script AFTER creating all procedures (triggers call sp_Eligibility_ProcessQueue, sp_Request_RouteApprovers and sp_CacheVersion_Bump)
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+PRINT '========================================'
+PRINT 'Creating JIT Framework Triggers'
+PRINT '========================================'
+PRINT ''
+
+-- Effective eligibility maintenance (jit.User_Effective_Eligibility)
+:r "triggers\trg_Users_RefreshEligibility.sql"
+:r "triggers\trg_User_Teams_RefreshEligibility.sql"
+:r "triggers\trg_Role_Eligibility_Rules_RefreshEligibility.sql"
+:r "triggers\trg_User_To_Role_Eligibility_RefreshEligibility.sql"
+
+-- Approver routing maintenance (jit.Request_Approver_Routing)
+:r "triggers\trg_Users_RouteApprovers.sql"
+:r "triggers\trg_User_Effective_Eligibility_RouteApprovers.sql"
+
+-- Web-tier cache invalidation (jit.Cache_Versions)
+:r "triggers\trg_Users_BumpCacheVersion.sql"
+:r "triggers\trg_Roles_BumpCacheVersion.sql"
+:r "triggers\trg_DB_Roles_BumpCacheVersion.sql"
+:r "triggers\trg_Role_To_DB_Roles_BumpCacheVersion.sql"
+:r "triggers\trg_Teams_BumpCacheVersion.sql"
+:r "triggers\trg_User_Effective_Eligibility_BumpCacheVersion.sql"
+
+GO
+
+-- Note: The :r commands above are SQLCMD syntax. If running in SSMS,
+-- you may need to enable SQLCMD mode or run each script individually in order.
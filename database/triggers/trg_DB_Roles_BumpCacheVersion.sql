@@ -0,0 +1,31 @@
+-- =============================================
+-- Trigger: jit.trg_DB_Roles_BumpCacheVersion
+-- Database role metadata changed: bump the 'Reference' cache version so the web
+-- tier reloads its cached role-to-database-role mappings
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.triggers WHERE object_id = OBJECT_ID(N'[jit].[trg_DB_Roles_BumpCacheVersion]'))
+    DROP TRIGGER [jit].[trg_DB_Roles_BumpCacheVersion]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE TRIGGER [jit].[trg_DB_Roles_BumpCacheVersion]
+ON [jit].[DB_Roles]
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    IF NOT EXISTS (SELECT 1 FROM inserted) AND NOT EXISTS (SELECT 1 FROM deleted)
+        RETURN;
+    
+    EXEC [jit].[sp_CacheVersion_Bump] @CacheName = N'Reference';
+END
+GO
@@ -0,0 +1,37 @@
+-- =============================================
+-- Trigger: jit.trg_Role_Eligibility_Rules_RefreshEligibility
+-- Rule added/changed/removed: refresh every user for the affected role(s)
+-- Queues affected keys and refreshes jit.User_Effective_Eligibility in the same transaction
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.triggers WHERE object_id = OBJECT_ID(N'[jit].[trg_Role_Eligibility_Rules_RefreshEligibility]'))
+    DROP TRIGGER [jit].[trg_Role_Eligibility_Rules_RefreshEligibility]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE TRIGGER [jit].[trg_Role_Eligibility_Rules_RefreshEligibility]
+ON [jit].[Role_Eligibility_Rules]
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    INSERT INTO [jit].[Eligibility_Refresh_Queue] (UserId, RoleId, Reason)
+    SELECT NULL, RoleId, 'RuleChanged'
+    FROM (
+        SELECT RoleId FROM inserted
+        UNION
+        SELECT RoleId FROM deleted
+    ) changed;
+    
+    IF @@ROWCOUNT > 0
+        EXEC [jit].[sp_Eligibility_ProcessQueue];
+END
+GO
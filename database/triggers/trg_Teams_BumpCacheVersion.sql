@@ -0,0 +1,31 @@
+-- =============================================
+-- Trigger: jit.trg_Teams_BumpCacheVersion
+-- Teams changed: bump the 'Reference' cache version so the web tier reloads its
+-- cached team list
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.triggers WHERE object_id = OBJECT_ID(N'[jit].[trg_Teams_BumpCacheVersion]'))
+    DROP TRIGGER [jit].[trg_Teams_BumpCacheVersion]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE TRIGGER [jit].[trg_Teams_BumpCacheVersion]
+ON [jit].[Teams]
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    IF NOT EXISTS (SELECT 1 FROM inserted) AND NOT EXISTS (SELECT 1 FROM deleted)
+        RETURN;
+    
+    EXEC [jit].[sp_CacheVersion_Bump] @CacheName = N'Reference';
+END
+GO
@@ -0,0 +1,31 @@
+-- =============================================
+-- Trigger: jit.trg_User_Effective_Eligibility_BumpCacheVersion
+-- Effective eligibility changed: bump the 'Eligibility' cache version so the web
+-- tier drops memoized requestable-role lists
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.triggers WHERE object_id = OBJECT_ID(N'[jit].[trg_User_Effective_Eligibility_BumpCacheVersion]'))
+    DROP TRIGGER [jit].[trg_User_Effective_Eligibility_BumpCacheVersion]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE TRIGGER [jit].[trg_User_Effective_Eligibility_BumpCacheVersion]
+ON [jit].[User_Effective_Eligibility]
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    IF NOT EXISTS (SELECT 1 FROM inserted) AND NOT EXISTS (SELECT 1 FROM deleted)
+        RETURN;
+    
+    EXEC [jit].[sp_CacheVersion_Bump] @CacheName = N'Eligibility';
+END
+GO
@@ -0,0 +1,51 @@
+-- =============================================
+-- Trigger: jit.trg_User_Effective_Eligibility_RouteApprovers
+-- An approver's effective eligibility changed: re-route the pending requests they
+-- may approve through the eligibility match (jit.Request_Approver_Routing)
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.triggers WHERE object_id = OBJECT_ID(N'[jit].[trg_User_Effective_Eligibility_RouteApprovers]'))
+    DROP TRIGGER [jit].[trg_User_Effective_Eligibility_RouteApprovers]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE TRIGGER [jit].[trg_User_Effective_Eligibility_RouteApprovers]
+ON [jit].[User_Effective_Eligibility]
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @ChangedCount INT;
+    DECLARE @ChangedUserId NVARCHAR(255);
+    
+    -- Eligibility only matters for the IsApprover rule (admins route regardless)
+    SELECT @ChangedCount = COUNT(*), @ChangedUserId = MIN(c.UserId)
+    FROM (
+        SELECT UserId FROM inserted
+        UNION
+        SELECT UserId FROM deleted
+    ) c
+    INNER JOIN [jit].[Users] u ON u.UserId = c.UserId
+    WHERE u.IsApprover = 1 AND u.IsAdmin = 0;
+    
+    IF @ChangedCount = 0
+        RETURN;
+    
+    -- Nothing to route while no request is pending
+    IF NOT EXISTS (SELECT 1 FROM [jit].[Requests] WHERE Status = 'Pending')
+        RETURN;
+    
+    IF @ChangedCount = 1
+        EXEC [jit].[sp_Request_RouteApprovers] @UserId = @ChangedUserId;
+    ELSE
+        EXEC [jit].[sp_Request_RouteApprovers];
+END
+GO
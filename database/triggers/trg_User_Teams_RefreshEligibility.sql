@@ -0,0 +1,37 @@
+-- =============================================
+-- Trigger: jit.trg_User_Teams_RefreshEligibility
+-- Team membership added/changed/removed: refresh every role for the affected user(s)
+-- Queues affected keys and refreshes jit.User_Effective_Eligibility in the same transaction
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.triggers WHERE object_id = OBJECT_ID(N'[jit].[trg_User_Teams_RefreshEligibility]'))
+    DROP TRIGGER [jit].[trg_User_Teams_RefreshEligibility]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE TRIGGER [jit].[trg_User_Teams_RefreshEligibility]
+ON [jit].[User_Teams]
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    INSERT INTO [jit].[Eligibility_Refresh_Queue] (UserId, RoleId, Reason)
+    SELECT UserId, NULL, 'TeamMembershipChanged'
+    FROM (
+        SELECT UserId FROM inserted
+        UNION
+        SELECT UserId FROM deleted
+    ) changed;
+    
+    IF @@ROWCOUNT > 0
+        EXEC [jit].[sp_Eligibility_ProcessQueue];
+END
+GO
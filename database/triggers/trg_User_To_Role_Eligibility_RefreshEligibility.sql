@@ -0,0 +1,37 @@
+-- =============================================
+-- Trigger: jit.trg_User_To_Role_Eligibility_RefreshEligibility
+-- User override added/changed/removed: refresh the affected user/role pair(s)
+-- Queues affected keys and refreshes jit.User_Effective_Eligibility in the same transaction
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.triggers WHERE object_id = OBJECT_ID(N'[jit].[trg_User_To_Role_Eligibility_RefreshEligibility]'))
+    DROP TRIGGER [jit].[trg_User_To_Role_Eligibility_RefreshEligibility]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE TRIGGER [jit].[trg_User_To_Role_Eligibility_RefreshEligibility]
+ON [jit].[User_To_Role_Eligibility]
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    INSERT INTO [jit].[Eligibility_Refresh_Queue] (UserId, RoleId, Reason)
+    SELECT UserId, RoleId, 'OverrideChanged'
+    FROM (
+        SELECT UserId, RoleId FROM inserted
+        UNION
+        SELECT UserId, RoleId FROM deleted
+    ) changed;
+    
+    IF @@ROWCOUNT > 0
+        EXEC [jit].[sp_Eligibility_ProcessQueue];
+END
+GO
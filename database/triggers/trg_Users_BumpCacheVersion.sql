@@ -0,0 +1,47 @@
+-- =============================================
+-- Trigger: jit.trg_Users_BumpCacheVersion
+-- A user was deleted, (de)activated, renamed or had a role flag changed: bump the
+-- 'Users' cache version so every web process drops its cached identities within
+-- IDENTITY_CACHE_VERSION_POLL_SECONDS (new users need no bump: unknown logins are not cached)
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.triggers WHERE object_id = OBJECT_ID(N'[jit].[trg_Users_BumpCacheVersion]'))
+    DROP TRIGGER [jit].[trg_Users_BumpCacheVersion]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE TRIGGER [jit].[trg_Users_BumpCacheVersion]
+ON [jit].[Users]
+AFTER UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    -- AD sync touches UpdatedUtc on every user; skip updates that leave cached identity columns alone
+    IF EXISTS (SELECT 1 FROM inserted)
+    AND NOT (UPDATE(IsAdmin) OR UPDATE(IsApprover) OR UPDATE(IsDataSteward) OR UPDATE(IsActive) OR UPDATE(LoginName))
+        RETURN;
+    
+    IF NOT EXISTS (
+        SELECT 1
+        FROM deleted d
+        LEFT JOIN inserted i ON i.UserId = d.UserId
+        WHERE i.UserId IS NULL
+        OR i.IsAdmin <> d.IsAdmin
+        OR i.IsApprover <> d.IsApprover
+        OR i.IsDataSteward <> d.IsDataSteward
+        OR i.IsActive <> d.IsActive
+        OR i.LoginName <> d.LoginName
+    )
+        RETURN;
+    
+    EXEC [jit].[sp_CacheVersion_Bump] @CacheName = N'Users';
+END
+GO
@@ -0,0 +1,47 @@
+-- =============================================
+-- Trigger: jit.trg_Users_RefreshEligibility
+-- New user or Division/Department change: refresh every role for the affected user(s)
+-- Queues affected keys and refreshes jit.User_Effective_Eligibility in the same transaction
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.triggers WHERE object_id = OBJECT_ID(N'[jit].[trg_Users_RefreshEligibility]'))
+    DROP TRIGGER [jit].[trg_Users_RefreshEligibility]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE TRIGGER [jit].[trg_Users_RefreshEligibility]
+ON [jit].[Users]
+AFTER INSERT, UPDATE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    -- AD sync touches UpdatedUtc on every user; skip updates that leave scope columns alone
+    IF NOT (UPDATE(Division) OR UPDATE(Department))
+        RETURN;
+    
+    INSERT INTO [jit].[Eligibility_Refresh_Queue] (UserId, RoleId, Reason)
+    SELECT i.UserId, NULL, 'UserScopeChanged'
+    FROM inserted i
+    LEFT JOIN deleted d ON d.UserId = i.UserId
+    WHERE d.UserId IS NULL
+    OR ISNULL(i.Division, N'') <> ISNULL(d.Division, N'')
+    OR ISNULL(i.Department, N'') <> ISNULL(d.Department, N'');
+    
+    IF @@ROWCOUNT > 0
+        EXEC [jit].[sp_Eligibility_ProcessQueue];
+END
+GO
+
+-- Fire before trg_Users_RouteApprovers so eligibility is refreshed (and jit.Eligibility_Refresh
+-- taken) before routing takes jit.Request_Routing; re-creating the trigger resets its order
+EXEC sp_settriggerorder @triggername = N'[jit].[trg_Users_RefreshEligibility]', @order = 'First', @stmttype = 'INSERT';
+EXEC sp_settriggerorder @triggername = N'[jit].[trg_Users_RefreshEligibility]', @order = 'First', @stmttype = 'UPDATE';
+GO
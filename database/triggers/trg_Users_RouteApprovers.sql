@@ -0,0 +1,57 @@
+-- =============================================
+-- Trigger: jit.trg_Users_RouteApprovers
+-- New user or change to approval flags, Division or SeniorityLevel: re-route the
+-- pending requests the user can approve or has raised (jit.Request_Approver_Routing)
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.triggers WHERE object_id = OBJECT_ID(N'[jit].[trg_Users_RouteApprovers]'))
+    DROP TRIGGER [jit].[trg_Users_RouteApprovers]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE TRIGGER [jit].[trg_Users_RouteApprovers]
+ON [jit].[Users]
+AFTER INSERT, UPDATE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    -- AD sync touches UpdatedUtc on every user; skip updates that leave routing columns alone
+    IF NOT (UPDATE(IsAdmin) OR UPDATE(IsDataSteward) OR UPDATE(IsApprover) OR UPDATE(Division) OR UPDATE(SeniorityLevel))
+        RETURN;
+    
+    DECLARE @ChangedCount INT;
+    DECLARE @ChangedUserId NVARCHAR(255);
+    
+    SELECT @ChangedCount = COUNT(*), @ChangedUserId = MIN(i.UserId)
+    FROM inserted i
+    LEFT JOIN deleted d ON d.UserId = i.UserId
+    WHERE d.UserId IS NULL
+    OR i.IsAdmin <> d.IsAdmin
+    OR i.IsDataSteward <> d.IsDataSteward
+    OR i.IsApprover <> d.IsApprover
+    OR ISNULL(i.Division, N'') <> ISNULL(d.Division, N'')
+    OR ISNULL(i.SeniorityLevel, -1) <> ISNULL(d.SeniorityLevel, -1);
+    
+    IF @ChangedCount = 0
+        RETURN;
+    
+    -- Lock order is jit.Eligibility_Refresh, then jit.Request_Routing on every path
+    -- (sp_Eligibility_ProcessQueue routes via trg_User_Effective_Eligibility_RouteApprovers
+    -- while holding the first); taking it here avoids a deadlock with rule/override edits
+    EXEC sp_getapplock @Resource = N'jit.Eligibility_Refresh', @LockMode = 'Exclusive', @LockOwner = 'Transaction';
+    
+    -- One user (the usual AD sync / admin edit): targeted; several: rebuild the pending queue once
+    IF @ChangedCount = 1
+        EXEC [jit].[sp_Request_RouteApprovers] @UserId = @ChangedUserId;
+    ELSE
+        EXEC [jit].[sp_Request_RouteApprovers];
+END
+GO
@@ -0,0 +1,29 @@
+-- =============================================
+-- Master Script: Create All JIT Framework Views
+-- Run this script AFTER creating all tables and BEFORE creating procedures
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+PRINT '========================================'
+PRINT 'Creating JIT Framework Views'
+PRINT '========================================'
+PRINT ''
+
+-- Eligibility resolver (used live by sp_User_Eligibility_Check and sp_Approver_CanApproveRequest,
+-- materialized into jit.User_Effective_Eligibility by sp_Eligibility_ProcessQueue)
+:r "views\vw_User_Role_Eligibility.sql"
+
+-- Audit trail across the hot and archive tiers (admin audit API)
+:r "views\vw_AuditLog_All.sql"
+
+-- Memberships active grants imply in the target databases, and their per-database
+-- fingerprint (jit.sp_Drift_Detect / flask_app/drift_reconcile.py)
+:r "views\vw_Drift_ExpectedMembers.sql"
+:r "views\vw_Drift_ExpectedState.sql"
+
+GO
+
+-- Note: The :r commands above are SQLCMD syntax. If running in SSMS,
+-- you may need to enable SQLCMD mode or run each script individually in order.
@@ -0,0 +1,35 @@
+-- =============================================
+-- View: jit.vw_AuditLog_All
+-- Hot and archived audit events as one row set (Tier = 'Hot' | 'Archive')
+-- =============================================
+-- AuditId is preserved by jit.sp_AuditLog_Archive, so it stays unique across
+-- both tiers and keyset paging by AuditId works over the union. Filter on
+-- EventUtc/EventType/AuditId so both branches seek their own indexes.
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.views WHERE object_id = OBJECT_ID(N'[jit].[vw_AuditLog_All]'))
+    DROP VIEW [jit].[vw_AuditLog_All]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE VIEW [jit].[vw_AuditLog_All]
+AS
+SELECT
+    a.AuditId, a.EventUtc, a.EventType, a.ActorUserId, a.ActorLoginName,
+    a.TargetUserId, a.RequestId, a.GrantId, a.DetailsJson,
+    CAST('Hot' AS VARCHAR(10)) AS Tier
+FROM [jit].[AuditLog] a
+UNION ALL
+SELECT
+    aa.AuditId, aa.EventUtc, aa.EventType, aa.ActorUserId, aa.ActorLoginName,
+    aa.TargetUserId, aa.RequestId, aa.GrantId, aa.DetailsJson,
+    CAST('Archive' AS VARCHAR(10)) AS Tier
+FROM [jit].[AuditLog_Archive] aa;
+GO
@@ -0,0 +1,39 @@
+-- =============================================
+-- View: jit.vw_Drift_ExpectedMembers
+-- Role memberships the target databases should have: one row per JIT-managed
+-- DB role and member (LoginName) with at least one active grant assigning it
+-- =============================================
+-- Built from jit.Grant_DBRole_Assignments, i.e. what sp_Grant_Issue actually
+-- assigned (failed adds included, they are exactly the memberships to repair).
+-- GrantId is the oldest active grant behind the membership.
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.views WHERE object_id = OBJECT_ID(N'[jit].[vw_Drift_ExpectedMembers]'))
+    DROP VIEW [jit].[vw_Drift_ExpectedMembers]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE VIEW [jit].[vw_Drift_ExpectedMembers]
+AS
+SELECT
+    dbr.DatabaseName,
+    dbr.DbRoleName,
+    u.LoginName AS MemberName,
+    dbr.DbRoleId,
+    g.UserId,
+    MIN(g.GrantId) AS GrantId
+FROM [jit].[Grants] g
+INNER JOIN [jit].[Grant_DBRole_Assignments] gdba ON gdba.GrantId = g.GrantId
+INNER JOIN [jit].[DB_Roles] dbr ON dbr.DbRoleId = gdba.DbRoleId
+INNER JOIN [jit].[Users] u ON u.UserId = g.UserId
+WHERE g.Status = 'Active'
+AND dbr.IsJitManaged = 1
+GROUP BY dbr.DatabaseName, dbr.DbRoleName, u.LoginName, dbr.DbRoleId, g.UserId;
+GO
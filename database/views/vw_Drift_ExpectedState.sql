@@ -0,0 +1,34 @@
+-- =============================================
+-- View: jit.vw_Drift_ExpectedState
+-- Per-database fingerprint of jit.vw_Drift_ExpectedMembers
+-- =============================================
+-- ExpectedHash changes whenever a grant adds or removes an expected membership
+-- in the database; compared with jit.Drift_Database_State.ExpectedHash to decide
+-- whether an incremental drift run must recheck the database. Databases with no
+-- expected members have no row (treat as NULL).
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.views WHERE object_id = OBJECT_ID(N'[jit].[vw_Drift_ExpectedState]'))
+    DROP VIEW [jit].[vw_Drift_ExpectedState]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE VIEW [jit].[vw_Drift_ExpectedState]
+AS
+SELECT
+    e.DatabaseName,
+    COUNT(*) AS ExpectedCount,
+    CAST(HASHBYTES('SHA2_256',
+        STRING_AGG(CAST(e.DbRoleName AS NVARCHAR(MAX)) + NCHAR(31) + e.MemberName, NCHAR(30))
+            WITHIN GROUP (ORDER BY e.DbRoleName, e.MemberName)
+    ) AS BINARY(32)) AS ExpectedHash
+FROM [jit].[vw_Drift_ExpectedMembers] e
+GROUP BY e.DatabaseName;
+GO
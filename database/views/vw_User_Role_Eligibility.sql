@@ -0,0 +1,111 @@
+-- =============================================
+-- View: jit.vw_User_Role_Eligibility
+-- Set-based eligibility resolver (one row per user/role pair that has a decision)
+-- Priority: User_To_Role_Eligibility > Role_Eligibility_Rules (by priority)
+-- =============================================
+-- Same resolution as the original per-role sp_User_Eligibility_Check:
+--   1. A currently valid explicit user override always wins
+--   2. Otherwise the matching scope rule with the highest Priority wins;
+--      ties go to the more specific scope (User > Team > Department > Division > All)
+--   3. Rules with a negative Priority never match
+-- Pairs with no override and no matching rule have no row here; callers treat
+-- a missing row as CanRequest = 0 / 'NoEligibilityRule'.
+--
+-- Always filter by UserId (and/or RoleId) - the predicates are pushed into
+-- every branch so a single user resolves with index seeks, while omitting the
+-- filter resolves all users x roles in one pass.
+-- =============================================
+
+USE [DMAP_JIT_Permissions]
+GO
+
+IF EXISTS (SELECT * FROM sys.views WHERE object_id = OBJECT_ID(N'[jit].[vw_User_Role_Eligibility]'))
+    DROP VIEW [jit].[vw_User_Role_Eligibility]
+GO
+
+SET ANSI_NULLS ON
+GO
+SET QUOTED_IDENTIFIER ON
+GO
+
+CREATE VIEW [jit].[vw_User_Role_Eligibility]
+AS
+WITH ActiveRules AS (
+    SELECT rer.EligibilityRuleId, rer.RoleId, rer.ScopeType, rer.ScopeValue, rer.ScopeTeamId, rer.CanRequest, rer.Priority
+    FROM [jit].[Role_Eligibility_Rules] rer
+    WHERE rer.Priority >= 0
+    AND (rer.ValidFromUtc IS NULL OR rer.ValidFromUtc <= GETUTCDATE())
+    AND (rer.ValidToUtc IS NULL OR rer.ValidToUtc >= GETUTCDATE())
+),
+MatchedRules AS (
+    -- User-specific rules
+    SELECT u.UserId, ar.RoleId, ar.CanRequest, ar.Priority, 1 AS ScopeRank, CAST('UserScopeRule' AS NVARCHAR(255)) AS EligibilityReason
+    FROM [jit].[Users] u
+    INNER JOIN ActiveRules ar ON ar.ScopeType = 'User' AND ar.ScopeValue = u.UserId
+    
+    UNION ALL
+    
+    -- Team rules (user must be active member); ScopeTeamId is only set for Team rules
+    SELECT ut.UserId, ar.RoleId, ar.CanRequest, ar.Priority, 2, 'TeamScopeRule'
+    FROM [jit].[User_Teams] ut
+    INNER JOIN ActiveRules ar ON ar.ScopeTeamId = ut.TeamId
+    WHERE ut.IsActive = 1
+    
+    UNION ALL
+    
+    -- Department rules
+    SELECT u.UserId, ar.RoleId, ar.CanRequest, ar.Priority, 3, 'DepartmentScopeRule'
+    FROM [jit].[Users] u
+    INNER JOIN ActiveRules ar ON ar.ScopeType = 'Department' AND ar.ScopeValue = u.Department
+    
+    UNION ALL
+    
+    -- Division rules
+    SELECT u.UserId, ar.RoleId, ar.CanRequest, ar.Priority, 4, 'DivisionScopeRule'
+    FROM [jit].[Users] u
+    INNER JOIN ActiveRules ar ON ar.ScopeType = 'Division' AND ar.ScopeValue = u.Division
+    
+    UNION ALL
+    
+    -- 'All' rules
+    SELECT u.UserId, ar.RoleId, ar.CanRequest, ar.Priority, 5, 'AllScopeRule'
+    FROM [jit].[Users] u
+    INNER JOIN ActiveRules ar ON ar.ScopeType = 'All' AND ar.ScopeValue IS NULL
+),
+RankedRules AS (
+    SELECT 
+        UserId, RoleId, CanRequest, Priority, EligibilityReason,
+        ROW_NUMBER() OVER (PARTITION BY UserId, RoleId ORDER BY Priority DESC, ScopeRank ASC) AS RuleRank
+    FROM MatchedRules
+),
+ActiveOverrides AS (
+    SELECT ue.UserId, ue.RoleId, ue.CanRequest, ue.Priority
+    FROM [jit].[User_To_Role_Eligibility] ue
+    WHERE (ue.ValidFromUtc IS NULL OR ue.ValidFromUtc <= GETUTCDATE())
+    AND (ue.ValidToUtc IS NULL OR ue.ValidToUtc >= GETUTCDATE())
+)
+-- Priority 1: explicit user overrides
+SELECT 
+    ao.UserId,
+    ao.RoleId,
+    ao.CanRequest,
+    ao.Priority,
+    CAST(CASE WHEN ao.CanRequest = 1 THEN 'ExplicitUserOverride_Allow' ELSE 'ExplicitUserOverride_Deny' END AS NVARCHAR(255)) AS EligibilityReason
+FROM ActiveOverrides ao
+
+UNION ALL
+
+-- Priority 2: winning scope rule where no override applies
+SELECT 
+    rr.UserId,
+    rr.RoleId,
+    rr.CanRequest,
+    rr.Priority,
+    rr.EligibilityReason
+FROM RankedRules rr
+WHERE rr.RuleRank = 1
+AND NOT EXISTS (
+    SELECT 1 FROM ActiveOverrides ao
+    WHERE ao.UserId = rr.UserId AND ao.RoleId = rr.RoleId
+);
+GO
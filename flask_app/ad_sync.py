@@ -0,0 +1,102 @@
+"""
+AD sync command for JIT Access Framework
+
+Streams a directory export (CSV or LDIF) into jit.AD_Staging with fast_executemany
+batches, then runs jit.sp_User_SyncFromAD, which applies only real changes in
+chunked transactions. Prints counts and timing per phase; exits 1 on failure.
+
+CSV headers and LDIF attributes may use the staging column names or the AD names
+(sAMAccountName, givenName, sn, displayName, mail, division, department, title).
+
+Examples:
+    python ad_sync.py users.ldif --domain CONTOSO
+    python ad_sync.py export.csv --seniority-attribute extensionAttribute1 --batch-size 10000
+    python ad_sync.py users.ldif --domain CONTOSO --stage-only   # inspect jit.AD_Staging first
+"""
+import argparse
+import logging
+import sys
+import time
+
+import pyodbc
+
+from config import Config
+from utils.adsync import StagingLoader, apply_sync, read_csv, read_ldif
+
+logger = logging.getLogger('ad_sync')
+
+PROCEDURE_PHASES = (('diff', 'DiffMs'), ('update', 'UpdateMs'), ('insert', 'InsertMs'), ('inactivate', 'InactivateMs'))
+
+
+def _phase(name, ms, detail=''):
+    timing = f"{ms:8.0f} ms" if ms is not None else ' ' * 11
+    logger.info(f"{name:<10} {timing}  {detail}".rstrip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('path', help='Directory export file (.csv, or .ldif/.ldf)')
+    parser.add_argument('--format', choices=('csv', 'ldif'), help='Default: from the file extension')
+    parser.add_argument('--domain', help='LoginName prefix (DOMAIN\\sAMAccountName) when the export has no LoginName')
+    parser.add_argument('--seniority-attribute', default='SeniorityLevel',
+                        help="Attribute holding the numeric SeniorityLevel ('' to leave it empty)")
+    parser.add_argument('--include-disabled', action='store_true',
+                        help='Stage accounts with ACCOUNTDISABLE set (default: leave them out so they are inactivated)')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Staging rows per fast_executemany batch')
+    parser.add_argument('--sync-batch-size', type=int, default=2000, help='Users per sp_User_SyncFromAD transaction')
+    parser.add_argument('--stage-only', action='store_true', help='Load jit.AD_Staging and stop')
+    parser.add_argument('--connection-string', help='Override the connection string from settings.env')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    fmt = args.format or ('ldif' if args.path.lower().endswith(('.ldif', '.ldf')) else 'csv')
+    records = read_ldif(args.path) if fmt == 'ldif' else read_csv(args.path)
+
+    conn = pyodbc.connect(args.connection_string or Config().DB_CONNECTION_STRING, autocommit=False)
+    started = time.monotonic()
+    try:
+        loader = StagingLoader(
+            conn,
+            domain=args.domain,
+            seniority_attribute=args.seniority_attribute or None,
+            batch_size=args.batch_size,
+            include_disabled=args.include_disabled,
+        )
+        clear_started = time.monotonic()
+        loader.clear()
+        clear_seconds = time.monotonic() - clear_started
+        stage_seconds = loader.load(records)
+        stats = loader.stats
+        rate = stats['staged'] / stage_seconds if stage_seconds else 0
+        _phase('clear', clear_seconds * 1000)
+        _phase('stage', stage_seconds * 1000, f"{stats['staged']} rows in {stats['batches']} batches "
+                                              f"({rate:.0f} rows/s) from {stats['read']} {fmt.upper()} records")
+        skipped = {k: v for k, v in stats.items()
+                   if k in ('skipped_disabled', 'skipped_invalid', 'duplicates', 'truncated_values', 'bad_seniority') and v}
+        if skipped:
+            _phase('skipped', None, skipped)
+
+        if args.stage_only:
+            logger.info("--stage-only: jit.AD_Staging loaded, jit.Users not changed")
+            return 0
+        if not stats['staged']:
+            logger.error("Nothing staged; not running sp_User_SyncFromAD (it would inactivate every user)")
+            return 1
+
+        result = apply_sync(conn, batch_size=args.sync_batch_size)
+        for phase, column in PROCEDURE_PHASES:
+            _phase(phase, result.get(column, 0))
+        _phase('result', None, f"updated={result.get('UpdatedCount')} inserted={result.get('InsertedCount')} "
+                               f"inactivated={result.get('InactivatedCount')} unchanged={result.get('UnchangedCount')} "
+                               f"transactions={result.get('Batches')}")
+        _phase('total', (time.monotonic() - started) * 1000)
+        return 0
+    except (pyodbc.Error, OSError, ValueError) as e:
+        logger.error(f"AD sync failed: {e}")
+        return 1
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,17 @@
 JIT Access Framework - Flask Application
 Main application file
 """
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, Response, stream_with_context
 from config import Config
-from utils.db import get_db_connection, close_db, execute_procedure, execute_query
-from utils.auth import get_current_user, login_required, admin_required, approver_required, is_approver, is_admin
+from utils.db import READ, get_db_connection, init_db, execute_procedure, execute_query, read_connection_source
+from utils.audit import audit_event, init_audit
+from utils.metrics import init_metrics
+from utils.sessions import init_sessions
+from utils.refdata import get_role_db_roles, get_teams, invalidate_requestable, requestable_roles
+from utils.auth import get_current_user, remember_user, login_required, admin_required, approver_required
+from utils.paging import Listing, jsonable, parse_flag, parse_utc
+from utils.export import Export, FORMATS as EXPORT_FORMATS
+from datetime import datetime, timezone
 import os
 import mimetypes
 
@@ -23,8 +30,17 @@ def minutes_to_days_filter(minutes):
         return 0
     return round(minutes / 1440, 1)
 
-# Register close_db to be called when request ends
-app.teardown_appcontext(close_db)
+# Create the connection pools (primary, plus the read replica if configured) and return connections when each request ends
+init_db(app)
+
+# Application audit events are queued and written to jit.AuditLog in the background
+init_audit(app)
+
+# Session data stays server-side; the cookie only carries the session ID
+init_sessions(app)
+
+# Per-route and per-statement latency histograms, served in Prometheus format at /metrics
+init_metrics(app)
 
 # Add response headers for Edge compatibility
 @app.after_request
@@ -54,10 +70,8 @@ def index():
     """Redirect to dashboard"""
     user = get_current_user()
     if user:
-        # Add role flags to user dict for template use
-        user['IsApprover'] = is_approver(user.get('UserId'))
-        user['IsAdmin'] = is_admin(user.get('UserId'))
-        session['user'] = user
+        # Role flags are resolved together with the user row
+        remember_user(user)
         return redirect(url_for('user_dashboard'))
     return redirect(url_for('login'))
 
@@ -66,10 +80,8 @@ def login():
     """Login page (Windows Auth - auto-redirect if authenticated)"""
     user = get_current_user()
     if user:
-        # Add role flags to user dict for template use
-        user['IsApprover'] = is_approver(user.get('UserId'))
-        user['IsAdmin'] = is_admin(user.get('UserId'))
-        session['user'] = user
+        # Role flags are resolved together with the user row
+        remember_user(user)
         return redirect(url_for('user_dashboard'))
     return render_template('login.html')
 
@@ -83,27 +95,23 @@ def user_dashboard():
     if not user:
         return redirect(url_for('login'))
     
-    # Ensure role flags are set
-    if 'IsApprover' not in user:
-        user['IsApprover'] = is_approver(user.get('UserId'))
-    if 'IsAdmin' not in user:
-        user['IsAdmin'] = is_admin(user.get('UserId'))
-    session['user'] = user
-    
     try:
-        # Get active grants for user
-        grants = execute_procedure('jit.sp_Grant_ListActiveForUser', {'UserId': user['UserId']})
-        
-        # Get pending requests
-        requests = execute_procedure('jit.sp_Request_ListForUser', {'UserId': user['UserId']})
+        # Grants, pending/recent requests and counts in one round trip
+        dashboard = execute_procedure(
+            'jit.sp_User_GetDashboard',
+            {'UserId': user['UserId']},
+            result_sets=['grants', 'pending', 'recent', 'counts'],
+        )
         
         return render_template('user/dashboard.html', 
                              user=user, 
-                             grants=grants or [], 
-                             requests=requests or [])
+                             grants=dashboard['grants'], 
+                             requests=dashboard['pending'],
+                             recent=dashboard['recent'],
+                             counts=dashboard['counts'][0] if dashboard['counts'] else {})
     except Exception as e:
         flash(f'Error loading dashboard: {str(e)}', 'error')
-        return render_template('user/dashboard.html', user=user, grants=[], requests=[])
+        return render_template('user/dashboard.html', user=user, grants=[], requests=[], recent=[], counts={})
 
 @app.route('/user/request', methods=['GET', 'POST'])
 @login_required
@@ -119,16 +127,14 @@ def user_request():
             role_ids_raw = request.form.getlist('role_id')
             if not role_ids_raw:
                 flash('Please select at least one role', 'error')
-                roles = execute_procedure('jit.sp_Role_ListRequestable', {'UserId': user['UserId']})
-                return render_template('user/request.html', user=user, roles=roles or [])
+                return _render_request_form(user)
             
-            # Convert to comma-separated string for stored procedure
-            role_ids = ','.join(str(int(rid)) for rid in role_ids_raw if rid.strip())
+            # Distinct role IDs for the jit.RoleIdList table-valued parameter
+            role_ids = sorted({int(rid) for rid in role_ids_raw if rid.strip()})
             
             if not role_ids:
                 flash('Please select at least one valid role', 'error')
-                roles = execute_procedure('jit.sp_Role_ListRequestable', {'UserId': user['UserId']})
-                return render_template('user/request.html', user=user, roles=roles or [])
+                return _render_request_form(user)
             
             duration_days = int(request.form.get('duration_days'))
             # Convert days to minutes (1 day = 1440 minutes)
@@ -139,26 +145,33 @@ def user_request():
             # Execute procedure that doesn't return results (fetch=False)
             execute_procedure('jit.sp_Request_Create', {
                 'UserId': user['UserId'],
-                'RoleIds': role_ids,  # Comma-separated string of role IDs
+                # pyodbc sends a list of row tuples as a TVP; type name and schema come first
+                'RoleIds': ['RoleIdList', 'jit'] + [(rid,) for rid in role_ids],
                 'RequestedDurationMinutes': duration_minutes,
                 'Justification': justification,
                 'TicketRef': ticket_ref if ticket_ref else None
             }, fetch=False)
+            invalidate_requestable(user['UserId'])
             
-            role_count = len(role_ids_raw)
+            role_count = len(role_ids)
             flash(f'Request submitted successfully for {role_count} role(s)!', 'success')
             return redirect(url_for('user_dashboard'))
         except Exception as e:
             flash(f'Error submitting request: {str(e)}', 'error')
+            audit_event('ActionFailed', details={'Action': 'Create', 'RoleIds': request.form.getlist('role_id'), 'Error': str(e)})
     
-    # Get requestable roles
+    return _render_request_form(user)
+
+def _render_request_form(user):
+    """Request form with the user's requestable roles (memoized, see utils/refdata.py)"""
     try:
-        roles = execute_procedure('jit.sp_Role_ListRequestable', {'UserId': user['UserId']})
+        roles = requestable_roles(user['UserId'])
+        db_roles = get_role_db_roles()
     except Exception as e:
-        roles = []
+        roles, db_roles = [], {}
         flash(f'Error loading roles: {str(e)}', 'error')
     
-    return render_template('user/request.html', user=user, roles=roles or [])
+    return render_template('user/request.html', user=user, roles=roles, db_roles=db_roles)
 
 @app.route('/user/history')
 @login_required
@@ -186,9 +199,11 @@ def user_cancel(request_id):
     
     try:
         execute_procedure('jit.sp_Request_Cancel', {'RequestId': request_id, 'UserId': user['UserId']}, fetch=False)
+        invalidate_requestable(user['UserId'])
         flash('Request cancelled successfully', 'success')
     except Exception as e:
         flash(f'Error cancelling request: {str(e)}', 'error')
+        audit_event('ActionFailed', request_id=request_id, details={'Action': 'Cancel', 'Error': str(e)})
     
     return redirect(url_for('user_dashboard'))
 
@@ -202,11 +217,6 @@ def approver_dashboard():
     if not user:
         return redirect(url_for('login'))
     
-    # Ensure role flags are refreshed
-    user['IsApprover'] = is_approver(user.get('UserId'))
-    user['IsAdmin'] = is_admin(user.get('UserId'))
-    session['user'] = user
-    
     try:
         requests = execute_procedure('jit.sp_Request_ListPendingForApprover', {'ApproverUserId': user['UserId']})
     except Exception as e:
@@ -245,7 +255,8 @@ def approver_request_detail(request_id):
             FROM jit.Requests r
             INNER JOIN jit.Users u ON r.UserId = u.UserId
             WHERE r.RequestId = ?""",
-            [request_id]
+            [request_id],
+            intent=READ
         )
         
         request_data = request_data[0] if request_data else None
@@ -284,6 +295,7 @@ def approver_approve(request_id):
         flash('Request approved successfully', 'success')
     except Exception as e:
         flash(f'Error approving request: {str(e)}', 'error')
+        audit_event('ActionFailed', request_id=request_id, details={'Action': 'Approve', 'Error': str(e)})
     
     return redirect(url_for('approver_dashboard'))
 
@@ -308,6 +320,7 @@ def approver_deny(request_id):
         flash('Request denied', 'info')
     except Exception as e:
         flash(f'Error denying request: {str(e)}', 'error')
+        audit_event('ActionFailed', request_id=request_id, details={'Action': 'Deny', 'Error': str(e)})
     
     return redirect(url_for('approver_dashboard'))
 
@@ -323,21 +336,153 @@ def admin_dashboard():
     
     return render_template('admin/dashboard.html', user=user)
 
+# Admin listings: explicit columns, server-side filter/sort, keyset pages loaded by static/js/admin-list.js
+USERS_LISTING = Listing(
+    source='jit.Users u',
+    columns=['u.UserId', 'u.LoginName', 'u.DisplayName', 'u.Email', 'u.Division', 'u.Department',
+             'u.JobTitle', 'u.SeniorityLevel', 'u.IsAdmin', 'u.IsApprover', 'u.IsActive', 'u.LastAdSyncUtc'],
+    key=('u.UserId', 'ASC'),
+    sorts={
+        'login': [('u.LoginName', 'ASC')],
+        'name': [("ISNULL(u.DisplayName, N'')", 'ASC')],
+        'division': [("ISNULL(u.Division, N'')", 'ASC'), ("ISNULL(u.Department, N'')", 'ASC')],
+    },
+    default_sort='login',
+    filters={
+        'division': ('u.Division = ?', str),
+        'department': ('u.Department = ?', str),
+        'active': ('u.IsActive = ?', parse_flag),
+        'admin': ('u.IsAdmin = ?', parse_flag),
+        'approver': ('u.IsApprover = ?', parse_flag),
+    },
+    search=['u.LoginName', 'u.DisplayName', 'u.Email'],
+)
+
+ROLES_LISTING = Listing(
+    source='jit.Roles r',
+    columns=['r.RoleId', 'r.RoleName', 'r.Description', 'r.MaxDurationMinutes', 'r.RequiresTicket',
+             'r.RequiresApproval', 'r.AutoApproveMinSeniority', 'r.IsEnabled'],
+    key=('r.RoleId', 'ASC'),
+    sorts={
+        'name': [('r.RoleName', 'ASC')],
+        'duration': [('r.MaxDurationMinutes', 'DESC')],
+    },
+    default_sort='name',
+    filters={
+        'enabled': ('r.IsEnabled = ?', parse_flag),
+        'requires_approval': ('r.RequiresApproval = ?', parse_flag),
+    },
+    search=['r.RoleName'],
+)
+
+ELIGIBILITY_LISTING = Listing(
+    source='jit.Role_Eligibility_Rules rer INNER JOIN jit.Roles r ON rer.RoleId = r.RoleId',
+    columns=['rer.EligibilityRuleId', 'rer.RoleId', 'r.RoleName', 'rer.ScopeType', 'rer.ScopeValue',
+             'rer.CanRequest', 'rer.Priority', 'rer.ValidFromUtc', 'rer.ValidToUtc'],
+    key=('rer.EligibilityRuleId', 'ASC'),
+    sorts={
+        'role': [('r.RoleName', 'ASC'), ('rer.Priority', 'DESC')],
+        'priority': [('rer.Priority', 'DESC')],
+        'scope': [('rer.ScopeType', 'ASC'), ("ISNULL(rer.ScopeValue, N'')", 'ASC')],
+    },
+    default_sort='role',
+    filters={
+        'role_id': ('rer.RoleId = ?', int),
+        'scope_type': ('rer.ScopeType = ?', str),
+        'can_request': ('rer.CanRequest = ?', parse_flag),
+    },
+    search=['r.RoleName', 'rer.ScopeValue'],
+)
+
+# AuditId is an identity, so it orders events by insertion without relying on
+# datetime2 values surviving a round trip through the cursor. Listings leave out
+# DetailsJson; admin_api_audit_event returns it when a row is expanded.
+AUDIT_COLUMNS = ['a.AuditId', 'a.EventUtc', 'a.EventType', 'a.ActorUserId', 'a.ActorLoginName',
+                 'a.TargetUserId', 'a.RequestId', 'a.GrantId']
+AUDIT_FILTERS = {
+    'event_type': ('a.EventType = ?', str),
+    'actor': ('a.ActorLoginName = ?', str),
+    'target': ('a.TargetUserId = ?', str),
+    'request_id': ('a.RequestId = ?', int),
+    'grant_id': ('a.GrantId = ?', int),
+    'from': ('a.EventUtc >= ?', parse_utc),
+    'to': ('a.EventUtc < ?', parse_utc),
+}
+AUDIT_SORTS = {
+    'newest': [],
+    'type': [('a.EventType', 'ASC')],
+}
+
+# Hot tier only (jit.AuditLog keeps the retention window set by jit.sp_AuditLog_Archive)
+AUDIT_LISTING = Listing(
+    source='jit.AuditLog a',
+    columns=AUDIT_COLUMNS,
+    key=('a.AuditId', 'DESC'),
+    sorts=AUDIT_SORTS,
+    default_sort='newest',
+    filters=AUDIT_FILTERS,
+    search=['a.EventType', 'a.ActorLoginName'],
+)
+
+# Hot and archived events (archive=1)
+AUDIT_ALL_LISTING = Listing(
+    source='jit.vw_AuditLog_All a',
+    columns=AUDIT_COLUMNS + ['a.Tier'],
+    key=('a.AuditId', 'DESC'),
+    sorts=AUDIT_SORTS,
+    default_sort='newest',
+    filters=AUDIT_FILTERS,
+    search=['a.EventType', 'a.ActorLoginName'],
+)
+
+# Current drift findings (written by drift_reconcile.py / jit.sp_Drift_Detect)
+DRIFT_LISTING = Listing(
+    source='jit.Drift_Findings f',
+    columns=['f.FindingId', 'f.DatabaseName', 'f.DbRoleName', 'f.MemberName', 'f.DriftType', 'f.UserId',
+             'f.GrantId', 'f.DetectedUtc', 'f.LastSeenUtc', 'f.RepairAttemptUtc', 'f.RepairSucceeded',
+             'f.RepairError'],
+    key=('f.FindingId', 'ASC'),
+    sorts={
+        'database': [('f.DatabaseName', 'ASC'), ('f.DbRoleName', 'ASC'), ('f.MemberName', 'ASC')],
+        'type': [('f.DriftType', 'ASC'), ('f.DatabaseName', 'ASC')],
+    },
+    default_sort='database',
+    filters={
+        'database': ('f.DatabaseName = ?', str),
+        'drift_type': ('f.DriftType = ?', str),
+        'user': ('f.UserId = ?', str),
+    },
+    search=['f.MemberName', 'f.DbRoleName', 'f.DatabaseName'],
+)
+
+def listing_response(listing, what):
+    """Serve one keyset page of an admin listing as JSON"""
+    try:
+        return jsonify(listing.page(
+            request.args,
+            page_size=app.config.get('ADMIN_PAGE_SIZE', 50),
+            max_page_size=app.config.get('ADMIN_PAGE_SIZE_MAX', 200),
+        ))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Error loading {what}: {str(e)}'}), 500
+
 @app.route('/admin/roles')
 @admin_required
 def admin_roles():
-    """Manage role catalog"""
+    """Manage role catalog (rows are loaded page by page from admin_api_roles)"""
     user = session.get('user')
     if not user:
         return redirect(url_for('login'))
     
-    try:
-        roles = execute_query("SELECT * FROM jit.Roles ORDER BY RoleName")
-    except Exception as e:
-        roles = []
-        flash(f'Error loading roles: {str(e)}', 'error')
-    
-    return render_template('admin/roles.html', user=user, roles=roles or [])
+    return render_template('admin/roles.html', user=user)
+
+@app.route('/admin/api/roles')
+@admin_required
+def admin_api_roles():
+    """Keyset-paginated role catalog"""
+    return listing_response(ROLES_LISTING, 'roles')
 
 @app.route('/admin/teams')
 @admin_required
@@ -348,7 +493,7 @@ def admin_teams():
         return redirect(url_for('login'))
     
     try:
-        teams = execute_query("SELECT * FROM jit.Teams WHERE IsActive = 1 ORDER BY TeamName")
+        teams = get_teams()
     except Exception as e:
         teams = []
         flash(f'Error loading teams: {str(e)}', 'error')
@@ -358,68 +503,209 @@ def admin_teams():
 @app.route('/admin/eligibility')
 @admin_required
 def admin_eligibility():
-    """Manage eligibility rules"""
+    """Manage eligibility rules (rows are loaded page by page from admin_api_eligibility)"""
     user = session.get('user')
     if not user:
         return redirect(url_for('login'))
     
-    try:
-        rules = execute_query("""
-            SELECT rer.*, r.RoleName 
-            FROM jit.Role_Eligibility_Rules rer
-            INNER JOIN jit.Roles r ON rer.RoleId = r.RoleId
-            ORDER BY r.RoleName, rer.Priority DESC
-        """)
-    except Exception as e:
-        rules = []
-        flash(f'Error loading eligibility rules: {str(e)}', 'error')
-    
-    return render_template('admin/eligibility.html', user=user, rules=rules or [])
+    return render_template('admin/eligibility.html', user=user)
+
+@app.route('/admin/api/eligibility')
+@admin_required
+def admin_api_eligibility():
+    """Keyset-paginated eligibility rules"""
+    return listing_response(ELIGIBILITY_LISTING, 'eligibility rules')
 
 @app.route('/admin/users')
 @admin_required
 def admin_users():
-    """User list (AD sync status)"""
+    """User list (AD sync status; rows are loaded page by page from admin_api_users)"""
     user = session.get('user')
     if not user:
         return redirect(url_for('login'))
     
-    try:
-        users = execute_query("SELECT * FROM jit.Users ORDER BY LoginName")
-    except Exception as e:
-        users = []
-        flash(f'Error loading users: {str(e)}', 'error')
-    
-    return render_template('admin/users.html', user=user, users=users or [])
+    return render_template('admin/users.html', user=user)
+
+@app.route('/admin/api/users')
+@admin_required
+def admin_api_users():
+    """Keyset-paginated user directory"""
+    return listing_response(USERS_LISTING, 'users')
 
 @app.route('/admin/reports')
 @admin_required
 def admin_reports():
-    """Audit reports and drift detection"""
+    """Audit reports and drift detection (audit rows are loaded page by page from admin_api_audit)"""
     user = session.get('user')
     if not user:
         return redirect(url_for('login'))
     
     try:
-        # Get recent audit logs
-        audit_logs = execute_query("""
-            SELECT TOP 100 * FROM jit.AuditLog 
-            ORDER BY EventUtc DESC
-        """)
-        
         # Get active grants summary
         active_grants = execute_query("""
             SELECT COUNT(*) as Count FROM jit.Grants WHERE Status = 'Active'
-        """)
+        """, intent=READ)
     except Exception as e:
-        audit_logs = []
         active_grants = [{'Count': 0}]
         flash(f'Error loading reports: {str(e)}', 'error')
     
+    try:
+        # Last drift check per database (findings are loaded page by page from admin_api_drift)
+        drift_databases = execute_query("""
+            SELECT DatabaseName, MemberCount, MissingCount, OrphanedCount, LastDiffUtc, LastCheckedUtc, LastError
+            FROM jit.Drift_Database_State
+            ORDER BY DatabaseName
+        """, intent=READ)
+    except Exception as e:
+        drift_databases = []
+        flash(f'Error loading drift status: {str(e)}', 'error')
+    
     return render_template('admin/reports.html', 
                          user=user, 
-                         audit_logs=audit_logs or [],
-                         active_grants=active_grants[0] if active_grants else {'Count': 0})
+                         active_grants=active_grants[0] if active_grants else {'Count': 0},
+                         drift_databases=drift_databases or [])
+
+@app.route('/admin/api/drift')
+@admin_required
+def admin_api_drift():
+    """Keyset-paginated drift findings (database/drift_type/user filters)"""
+    return listing_response(DRIFT_LISTING, 'drift findings')
+
+@app.route('/admin/api/audit')
+@admin_required
+def admin_api_audit():
+    """Keyset-paginated audit log (event_type/from/to filters; archive=1 includes archived events)"""
+    try:
+        include_archive = parse_flag(request.args.get('archive') or '0')
+    except ValueError:
+        return jsonify({'error': f"Invalid value for archive: {request.args.get('archive')}"}), 400
+    return listing_response(AUDIT_ALL_LISTING if include_archive else AUDIT_LISTING, 'audit events')
+
+@app.route('/admin/api/audit/<int:audit_id>')
+@admin_required
+def admin_api_audit_event(audit_id):
+    """One audit event including DetailsJson (hot tier first, then the archive)"""
+    try:
+        rows = execute_query("""
+            SELECT AuditId, EventUtc, EventType, ActorUserId, ActorLoginName, TargetUserId,
+                   RequestId, GrantId, DetailsJson, 'Hot' AS Tier
+            FROM jit.AuditLog
+            WHERE AuditId = ?
+            UNION ALL
+            SELECT AuditId, EventUtc, EventType, ActorUserId, ActorLoginName, TargetUserId,
+                   RequestId, GrantId, DetailsJson, 'Archive' AS Tier
+            FROM jit.AuditLog_Archive
+            WHERE AuditId = ?
+        """, [audit_id, audit_id], intent=READ)
+    except Exception as e:
+        return jsonify({'error': f'Error loading audit event: {str(e)}'}), 500
+    
+    if not rows:
+        return jsonify({'error': 'Audit event not found'}), 404
+    return jsonify({k: jsonable(v) for k, v in rows[0].items()})
+
+# Compliance extracts: full tables streamed in key order (after/before resume an interrupted export)
+EXPORTS = {
+    'audit': Export(
+        name='audit',
+        source='jit.vw_AuditLog_All a',
+        columns={
+            'AuditId': 'a.AuditId', 'EventUtc': 'a.EventUtc', 'EventType': 'a.EventType',
+            'ActorUserId': 'a.ActorUserId', 'ActorLoginName': 'a.ActorLoginName',
+            'TargetUserId': 'a.TargetUserId', 'RequestId': 'a.RequestId', 'GrantId': 'a.GrantId',
+            'DetailsJson': 'a.DetailsJson', 'Tier': 'a.Tier',
+        },
+        key='a.AuditId',
+        filters={
+            'from': ('a.EventUtc >= ?', parse_utc),
+            'to': ('a.EventUtc < ?', parse_utc),
+            'event_type': ('a.EventType = ?', str),
+            'actor': ('a.ActorLoginName = ?', str),
+            'target': ('a.TargetUserId = ?', str),
+        },
+    ),
+    'grants': Export(
+        name='grants',
+        source='jit.Grants g INNER JOIN jit.Roles r ON g.RoleId = r.RoleId',
+        columns={
+            'GrantId': 'g.GrantId', 'RequestId': 'g.RequestId', 'UserId': 'g.UserId',
+            'RoleId': 'g.RoleId', 'RoleName': 'r.RoleName', 'ValidFromUtc': 'g.ValidFromUtc',
+            'ValidToUtc': 'g.ValidToUtc', 'RevokedUtc': 'g.RevokedUtc', 'RevokeReason': 'g.RevokeReason',
+            'IssuedByUserId': 'g.IssuedByUserId', 'Status': 'g.Status',
+        },
+        key='g.GrantId',
+        filters={
+            'from': ('g.ValidFromUtc >= ?', parse_utc),
+            'to': ('g.ValidFromUtc < ?', parse_utc),
+            'status': ('g.Status = ?', str),
+            'user': ('g.UserId = ?', str),
+        },
+    ),
+    'requests': Export(
+        name='requests',
+        source=(
+            'jit.Requests r CROSS APPLY ('
+            "SELECT STRING_AGG(rol.RoleName, ', ') AS RoleNames FROM jit.Request_Roles rr "
+            'INNER JOIN jit.Roles rol ON rr.RoleId = rol.RoleId WHERE rr.RequestId = r.RequestId) rn'
+        ),
+        columns={
+            'RequestId': 'r.RequestId', 'UserId': 'r.UserId', 'RoleNames': 'rn.RoleNames',
+            'RequestedDurationMinutes': 'r.RequestedDurationMinutes', 'Justification': 'r.Justification',
+            'TicketRef': 'r.TicketRef', 'Status': 'r.Status', 'UserDeptSnapshot': 'r.UserDeptSnapshot',
+            'UserTitleSnapshot': 'r.UserTitleSnapshot', 'CreatedUtc': 'r.CreatedUtc',
+            'UpdatedUtc': 'r.UpdatedUtc', 'CreatedBy': 'r.CreatedBy',
+        },
+        key='r.RequestId',
+        filters={
+            'from': ('r.CreatedUtc >= ?', parse_utc),
+            'to': ('r.CreatedUtc < ?', parse_utc),
+            'status': ('r.Status = ?', str),
+            'user': ('r.UserId = ?', str),
+        },
+    ),
+}
+
+@app.route('/admin/export/<dataset>')
+@admin_required
+def admin_export(dataset):
+    """Stream a full extract as CSV or NDJSON (format=csv|ndjson; from/to, after/before and dataset filters)"""
+    export = EXPORTS.get(dataset)
+    if export is None:
+        return jsonify({'error': f'Unknown export: {dataset}'}), 404
+    fmt = (request.args.get('format') or 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f'Unknown format: {fmt}'}), 400
+    try:
+        sql, params = export.query(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    filters = {k: v for k, v in request.args.items() if k != 'format'}
+    progress = {'rows': 0}
+    # Replica or primary is chosen now, with the same fallback as other READ statements
+    acquire, release = read_connection_source()
+    
+    def generate():
+        try:
+            yield from export.stream(acquire, release, sql, params, fmt,
+                                     chunk_size=app.config.get('EXPORT_CHUNK_ROWS', 1000), progress=progress)
+        finally:
+            audit_event('DataExported', details={
+                'Dataset': dataset, 'Format': fmt, 'Filters': filters,
+                'Rows': progress['rows'], 'Completed': progress.get('completed', False),
+            })
+    
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    return Response(
+        stream_with_context(generate()),
+        mimetype=EXPORT_FORMATS[fmt].split(';')[0],
+        headers={
+            'Content-Type': EXPORT_FORMATS[fmt],
+            'Content-Disposition': f'attachment; filename="jit_{dataset}_{stamp}.{fmt}"',
+            'Cache-Control': 'no-store',
+            'X-Accel-Buffering': 'no',
+        },
+    )
 
 if __name__ == '__main__':
     app.run(debug=True, host='127.0.0.1', port=5001)
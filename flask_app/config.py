@@ -42,6 +42,68 @@ class Config:
             f"PWD={self.DB_PASSWORD};"
         )
     
+    # Connection pool (one pool per app process, shared by Waitress worker threads)
+    DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE') or 2)
+    DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE') or 10)
+    DB_POOL_MAX_AGE_SECONDS = int(os.environ.get('DB_POOL_MAX_AGE_SECONDS') or 1800)
+    DB_POOL_ACQUIRE_TIMEOUT_SECONDS = float(os.environ.get('DB_POOL_ACQUIRE_TIMEOUT_SECONDS') or 5)
+    DB_POOL_VALIDATE_IDLE_SECONDS = float(os.environ.get('DB_POOL_VALIDATE_IDLE_SECONDS') or 30)
+    
+    # Read replica for dashboards, history, approver queues, reports and exports (ApplicationIntent=ReadOnly;
+    # empty sends every read to the primary). Reads fall back to the primary while the replica is unreachable
+    # and stay on it for DB_READ_STICKY_SECONDS after the user's last write, so users see their own changes.
+    DB_READ_SERVER = os.environ.get('DB_READ_SERVER') or ''
+    DB_READ_POOL_MAX_SIZE = int(os.environ.get('DB_READ_POOL_MAX_SIZE') or 10)
+    DB_READ_RETRY_SECONDS = int(os.environ.get('DB_READ_RETRY_SECONDS') or 30)
+    DB_READ_STICKY_SECONDS = int(os.environ.get('DB_READ_STICKY_SECONDS') or 30)
+    
+    # Identity cache (per-process, keyed by X-Remote-User; 0 disables cross-request caching)
+    IDENTITY_CACHE_TTL_SECONDS = int(os.environ.get('IDENTITY_CACHE_TTL_SECONDS') or 30)
+    IDENTITY_CACHE_VERSION_POLL_SECONDS = int(os.environ.get('IDENTITY_CACHE_VERSION_POLL_SECONDS') or 5)
+    IDENTITY_CACHE_MAX_ENTRIES = int(os.environ.get('IDENTITY_CACHE_MAX_ENTRIES') or 10000)
+    
+    # Grant expiry worker (expiry_worker.py)
+    EXPIRY_WORKER_THREADS = int(os.environ.get('EXPIRY_WORKER_THREADS') or 4)
+    EXPIRY_WORKER_REFRESH_SECONDS = int(os.environ.get('EXPIRY_WORKER_REFRESH_SECONDS') or 60)
+    EXPIRY_WORKER_BATCH_SIZE = int(os.environ.get('EXPIRY_WORKER_BATCH_SIZE') or 500)
+    EXPIRY_WORKER_STATS_SECONDS = int(os.environ.get('EXPIRY_WORKER_STATS_SECONDS') or 300)
+    
+    # Drift reconciliation (drift_reconcile.py): target databases read / repaired concurrently
+    DRIFT_RECONCILE_THREADS = int(os.environ.get('DRIFT_RECONCILE_THREADS') or 8)
+    
+    # Admin listings (keyset-paginated JSON endpoints under /admin/api)
+    ADMIN_PAGE_SIZE = int(os.environ.get('ADMIN_PAGE_SIZE') or 50)
+    ADMIN_PAGE_SIZE_MAX = int(os.environ.get('ADMIN_PAGE_SIZE_MAX') or 200)
+    
+    # Asynchronous audit writer (application events: page access, access denials, failed actions, slow queries)
+    AUDIT_QUEUE_MAX_EVENTS = int(os.environ.get('AUDIT_QUEUE_MAX_EVENTS') or 10000)
+    AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE') or 500)
+    AUDIT_FLUSH_SECONDS = float(os.environ.get('AUDIT_FLUSH_SECONDS') or 2)
+    AUDIT_RETRY_SECONDS = float(os.environ.get('AUDIT_RETRY_SECONDS') or 30)
+    AUDIT_SPILL_PATH = os.environ.get('AUDIT_SPILL_PATH') or str(Path(__file__).parent / 'instance' / 'audit_spill.jsonl')
+    AUDIT_PAGE_ACCESS = os.environ.get('AUDIT_PAGE_ACCESS', 'True').lower() == 'true'
+    SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS') or 1000)
+    
+    # Metrics (/metrics, Prometheus text format) and the opt-in slow-query log (logger 'jit.slow_query')
+    # Set METRICS_TOKEN for scrapers (Authorization: Bearer <token>); unset, only signed-in admins can read /metrics
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+    SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG', 'False').lower() == 'true'
+    
+    # Streaming exports (/admin/export/<dataset>)
+    EXPORT_CHUNK_ROWS = int(os.environ.get('EXPORT_CHUNK_ROWS') or 1000)
+    
+    # Reference data cache (roles, DB role mappings, teams; 0 disables) and per-user requestable roles
+    REFERENCE_CACHE_TTL_SECONDS = int(os.environ.get('REFERENCE_CACHE_TTL_SECONDS') or 300)
+    REFERENCE_CACHE_VERSION_POLL_SECONDS = int(os.environ.get('REFERENCE_CACHE_VERSION_POLL_SECONDS') or 5)
+    REQUESTABLE_CACHE_TTL_SECONDS = int(os.environ.get('REQUESTABLE_CACHE_TTL_SECONDS') or 30)
+    REQUESTABLE_CACHE_MAX_ENTRIES = int(os.environ.get('REQUESTABLE_CACHE_MAX_ENTRIES') or 5000)
+    
+    # Server-side sessions (cookie holds only the session ID; False falls back to Flask's signed cookie)
+    SERVER_SESSIONS = os.environ.get('SERVER_SESSIONS', 'True').lower() == 'true'
+    SESSION_IDLE_TIMEOUT_SECONDS = int(os.environ.get('SESSION_IDLE_TIMEOUT_SECONDS') or 28800)
+    SESSION_MAX_ENTRIES = int(os.environ.get('SESSION_MAX_ENTRIES') or 50000)
+    
     # Application settings
     FLASK_ENV = os.environ.get('FLASK_ENV') or 'development'
     DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
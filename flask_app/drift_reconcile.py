@@ -0,0 +1,88 @@
+"""
+Drift detection and reconciliation for JIT-managed DB roles
+
+Reads the role memberships of every database with JIT-managed roles concurrently,
+diffs them against active grants (jit.sp_Drift_Detect) and reports Missing and
+Orphaned memberships; --repair fixes them. Incremental by default: a database is
+only re-read when its memberships or its active grants changed since the last run.
+Exits 1 when drift remains or a database could not be checked, so it can be
+scheduled as a monitoring job.
+
+Examples:
+    python drift_reconcile.py                    # incremental check, report only
+    python drift_reconcile.py --full             # re-read every database
+    python drift_reconcile.py --repair missing   # re-add memberships active grants should have
+    python drift_reconcile.py --repair all       # also drop members no active grant accounts for
+"""
+import argparse
+import logging
+import sys
+
+import pyodbc
+
+from config import Config
+from utils.db import ConnectionPool
+from utils.drift import REPAIR_MODES, DriftReconciler
+
+logger = logging.getLogger('drift_reconcile')
+
+
+def main():
+    config = Config()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--full', action='store_true', help='Re-read every database, not only changed ones')
+    parser.add_argument('--repair', choices=REPAIR_MODES, help='Fix findings of this kind (default: report only)')
+    parser.add_argument('--threads', type=int, default=config.DRIFT_RECONCILE_THREADS,
+                        help='Target databases read / repaired concurrently')
+    parser.add_argument('--connection-string', help='Override the connection string from settings.env')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    # One connection per worker thread plus one for the diff and bookkeeping
+    pool = ConnectionPool(
+        args.connection_string or config.DB_CONNECTION_STRING,
+        min_size=1,
+        max_size=args.threads + 1,
+        max_age_seconds=config.DB_POOL_MAX_AGE_SECONDS,
+        acquire_timeout=config.DB_POOL_ACQUIRE_TIMEOUT_SECONDS,
+        validate_idle_seconds=config.DB_POOL_VALIDATE_IDLE_SECONDS,
+    )
+    try:
+        result = DriftReconciler(pool, max_workers=args.threads).run(full=args.full, repair=args.repair)
+    except pyodbc.Error as e:
+        logger.error(f"Drift reconciliation failed: {e}")
+        return 1
+    finally:
+        pool.close()
+
+    databases = result['databases']
+    for row in databases:
+        line = (f"{row['DatabaseName']:<30} {row['Status']:<9} members={row['MemberCount']} "
+                f"missing={row['MissingCount']} orphaned={row['OrphanedCount']}")
+        if row['Status'] == 'Failed':
+            logger.warning(f"{line} error={row['LastError']}")
+        else:
+            logger.info(line)
+    for finding in result['findings']:
+        logger.info(f"{finding['DriftType']:<8} {finding['DatabaseName']}.{finding['DbRoleName']}: "
+                    f"{finding['MemberName']}" + (f" (grant {finding['GrantId']})" if finding['GrantId'] else ''))
+
+    repaired = result['repaired']
+    failed_repairs = [f for f in repaired if not f['RepairSucceeded']]
+    for finding in failed_repairs:
+        logger.warning(f"Repair failed: {finding['DatabaseName']}.{finding['DbRoleName']} "
+                       f"{finding['MemberName']}: {finding['RepairError']}")
+
+    statuses = [row['Status'] for row in databases]
+    timings = ' '.join(f"{name}={ms:.0f}" for name, ms in result['timings'].items())
+    logger.info(f"{len(databases)} database(s): {statuses.count('Checked')} checked, "
+                f"{statuses.count('Unchanged')} unchanged, {statuses.count('Failed')} failed; "
+                f"{len(result['findings'])} finding(s), {len(repaired) - len(failed_repairs)} repaired; {timings}")
+
+    unresolved = len(result['findings']) - (len(repaired) - len(failed_repairs))
+    return 1 if unresolved or statuses.count('Failed') else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Entry point for the grant expiry worker
+Run as its own long-lived process next to Waitress: python expiry_worker.py
+"""
+import logging
+import signal
+import threading
+
+from config import Config
+from utils.db import ConnectionPool
+from utils.expiry import ExpiryWorker
+
+logger = logging.getLogger('expiry_worker')
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    config = Config()
+
+    # One connection per drop thread plus one for queue refresh/bookkeeping
+    pool = ConnectionPool(
+        config.DB_CONNECTION_STRING,
+        min_size=1,
+        max_size=config.EXPIRY_WORKER_THREADS + 1,
+        max_age_seconds=config.DB_POOL_MAX_AGE_SECONDS,
+        acquire_timeout=config.DB_POOL_ACQUIRE_TIMEOUT_SECONDS,
+        validate_idle_seconds=config.DB_POOL_VALIDATE_IDLE_SECONDS,
+    )
+    worker = ExpiryWorker(
+        pool,
+        max_workers=config.EXPIRY_WORKER_THREADS,
+        refresh_seconds=config.EXPIRY_WORKER_REFRESH_SECONDS,
+        batch_size=config.EXPIRY_WORKER_BATCH_SIZE,
+    )
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stopping.set())
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+
+    worker.start()
+    logger.info("Expiry worker started")
+    try:
+        while not stopping.wait(config.EXPIRY_WORKER_STATS_SECONDS):
+            logger.info(f"Expiry worker stats: {worker.stats()}")
+    finally:
+        worker.stop(timeout=60)
+        pool.close()
+        logger.info(f"Expiry worker stopped: {worker.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Load-test harness for JIT Access Framework
+
+Serves the app through Waitress in this process and drives the main routes from
+concurrent client threads, reporting p50/p95/p99 latency and database round
+trips per request for each scenario.
+
+Database modes:
+    live    - the database in settings.env (seed it with database/test_data/20_Seed_Load_Test.sql)
+    record  - as live, and save every statement's response to --recording
+    replay  - no database; answer from --recording (recorded latency x --latency-scale)
+
+Examples:
+    python loadtest.py --mode record --recording loadtest.json --duration 60
+    python loadtest.py --mode replay --recording loadtest.json --concurrency 32 --save-report run.json
+    python loadtest.py --mode replay --recording loadtest.json --baseline run.json --tolerance 0.2
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+# name: (path, persona)
+SCENARIOS = {
+    'user_dashboard': ('/user/dashboard', 'user'),
+    'user_request': ('/user/request', 'user'),
+    'user_history': ('/user/history', 'user'),
+    'approver_dashboard': ('/approver/dashboard', 'approver'),
+    'admin_reports': ('/admin/reports', 'admin'),
+    'admin_audit_api': ('/admin/api/audit', 'admin'),
+}
+DEFAULT_MIX = 'user_dashboard=6,user_request=3,approver_dashboard=2,admin_reports=1'
+
+
+def parse_mix(mix):
+    """'name=weight,...' -> [(name, weight)]"""
+    weighted = []
+    for part in mix.split(','):
+        name, _, weight = part.strip().partition('=')
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name}' (known: {', '.join(SCENARIOS)})")
+        weighted.append((name, int(weight or 1)))
+    return weighted
+
+
+def login_for(persona, args, rng):
+    """X-Remote-User for a persona, matching the users seeded by 20_Seed_Load_Test.sql"""
+    if persona == 'admin':
+        n = rng.randint(1, 5)
+    elif persona == 'approver':
+        n = 100 * rng.randint(1, max(1, args.users // 100))
+    else:
+        n = rng.randint(1, args.users)
+    return f'{args.domain}\\load.user.{n}'
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Client(threading.Thread):
+    """One simulated user session: a keep-alive connection issuing requests back to back"""
+
+    def __init__(self, index, host, port, args, mix, results, results_lock, measure_from, stop_at):
+        super().__init__(name=f'loadtest-client-{index}', daemon=True)
+        self.host = host
+        self.port = port
+        self.args = args
+        self.rng = random.Random(args.seed + index)
+        self.names = [name for name, _ in mix]
+        self.weights = [weight for _, weight in mix]
+        self.results = results
+        self.results_lock = results_lock
+        self.measure_from = measure_from
+        self.stop_at = stop_at
+
+    def run(self):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.args.timeout)
+        local = []
+        sent = 0
+        while time.monotonic() < self.stop_at:
+            if self.args.requests and sent >= self.args.requests:
+                break
+            name = self.rng.choices(self.names, self.weights)[0]
+            path, persona = SCENARIOS[name]
+            headers = {'X-Remote-User': login_for(persona, self.args, self.rng), 'Accept': 'text/html,application/json'}
+            started = time.monotonic()
+            try:
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException) as e:
+                status = f'error: {e.__class__.__name__}'
+                conn.close()
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=self.args.timeout)
+            elapsed = time.monotonic() - started
+            if started >= self.measure_from:
+                local.append((name, status, elapsed))
+                sent += 1
+        conn.close()
+        with self.results_lock:
+            self.results.extend(local)
+
+
+def summarize(results, wall_seconds, round_trips):
+    report = {}
+    for name in sorted({r[0] for r in results}):
+        rows = [r for r in results if r[0] == name]
+        ok = sorted(r[2] for r in rows if r[1] == 200)
+        statuses = {}
+        for _, status, _ in rows:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        report[name] = {
+            'requests': len(rows),
+            'errors': len(rows) - len(ok),
+            'statuses': statuses,
+            'rps': round(len(rows) / wall_seconds, 1) if wall_seconds else None,
+            'p50_ms': round(percentile(ok, 50) * 1000, 1) if ok else None,
+            'p95_ms': round(percentile(ok, 95) * 1000, 1) if ok else None,
+            'p99_ms': round(percentile(ok, 99) * 1000, 1) if ok else None,
+            'max_ms': round(ok[-1] * 1000, 1) if ok else None,
+            'db_round_trips': round_trips.get(SCENARIOS[name][0]),
+        }
+    return report
+
+
+def print_report(report, wall_seconds, concurrency):
+    print()
+    print(f"{'scenario':<20} {'reqs':>7} {'err':>5} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'db rt':>6}")
+    print('-' * 86)
+    for name, row in report.items():
+        cells = [row[k] if row[k] is not None else '-' for k in ('p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'db_round_trips')]
+        print(f"{name:<20} {row['requests']:>7} {row['errors']:>5} {row['rps'] or '-':>7} "
+              f"{cells[0]:>8} {cells[1]:>8} {cells[2]:>8} {cells[3]:>8} {cells[4]:>6}")
+    print(f"\n{sum(r['requests'] for r in report.values())} requests in {wall_seconds:.1f}s at concurrency {concurrency}")
+    for name, row in report.items():
+        if row['errors']:
+            print(f"  {name}: {row['statuses']}")
+
+
+def compare(report, baseline, tolerance):
+    """Scenarios whose p95 grew by more than tolerance, or that now need more DB round trips, versus the baseline"""
+    regressions = []
+    for name, row in report.items():
+        before = baseline.get(name, {}).get('p95_ms')
+        if before and row['p95_ms'] and row['p95_ms'] > before * (1 + tolerance):
+            regressions.append(f"{name}: p95 {row['p95_ms']}ms vs baseline {before}ms")
+        rt_before = baseline.get(name, {}).get('db_round_trips')
+        if rt_before is not None and row['db_round_trips'] is not None and row['db_round_trips'] > rt_before + 0.05:
+            regressions.append(f"{name}: {row['db_round_trips']} DB round trips per request vs baseline {rt_before}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--mode', choices=('live', 'record', 'replay'), default='live')
+    parser.add_argument('--recording', default='loadtest_recording.json', help='Recording file for record/replay')
+    parser.add_argument('--latency-scale', type=float, default=1.0, help='Replay: multiplier for recorded statement time')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"Scenario weights (scenarios: {', '.join(SCENARIOS)})")
+    parser.add_argument('--concurrency', type=int, default=16, help='Client threads')
+    parser.add_argument('--threads', type=int, default=8, help='Waitress worker threads (production uses 8)')
+    parser.add_argument('--duration', type=float, default=60, help='Measured seconds')
+    parser.add_argument('--warmup', type=float, default=5, help='Unmeasured seconds before measuring')
+    parser.add_argument('--requests', type=int, default=0, help='Stop each client after this many measured requests')
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+    parser.add_argument('--users', type=int, default=100000, help='Seeded load.user.N count')
+    parser.add_argument('--domain', default='LOADTEST', help='Login domain of the seeded users')
+    parser.add_argument('--port', type=int, default=0, help='Listen port (0 = any free port)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--save-report', help='Write the per-scenario results as JSON')
+    parser.add_argument('--baseline', help='Report JSON to compare against; exit 1 on regression')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed p95 increase over the baseline (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    mix = parse_mix(args.mix)
+
+    from waitress.server import create_server
+    from app import app
+    from utils.metrics import HTTP_DB_ROUND_TRIPS
+    from utils.recording import RecordingConnector, ReplayConnector
+
+    # Requests must authenticate as the seeded users, not the developer's fake user
+    os.environ.pop('JIT_FAKE_USER', None)
+    if not app.config.get('METRICS_ENABLED', True):
+        print('METRICS_ENABLED is off; DB round trips will not be reported')
+
+    # READ statements go through the read replica's pool when DB_READ_SERVER is set; both pools
+    # share one connector so the recording covers every statement whichever pool ran it
+    pools = [app.extensions['jit_db_pool']]
+    if 'jit_db_read' in app.extensions:
+        pools.append(app.extensions['jit_db_read'].pool)
+    for pool in pools:
+        pool.close()
+    recorder = None
+    connector = None
+    if args.mode == 'record':
+        connector = recorder = RecordingConnector(pools[0].connect)
+    elif args.mode == 'replay':
+        connector = ReplayConnector(args.recording, latency_scale=args.latency_scale)
+        print(f"Replaying {len(connector)} recorded statements from {args.recording}")
+    if connector is not None:
+        for pool in pools:
+            pool.connect = connector
+
+    server = create_server(app, host='127.0.0.1', port=args.port, threads=args.threads)
+    host, port = '127.0.0.1', server.effective_port
+    server_thread = threading.Thread(target=server.run, name='loadtest-waitress', daemon=True)
+    server_thread.start()
+
+    print(f"Waitress on {host}:{port} ({args.threads} threads), {args.concurrency} clients, "
+          f"mode={args.mode}, mix={args.mix}")
+    results = []
+    results_lock = threading.Lock()
+    start = time.monotonic()
+    measure_from = start + args.warmup
+    stop_at = measure_from + args.duration
+    clients = [Client(i, host, port, args, mix, results, results_lock, measure_from, stop_at)
+               for i in range(args.concurrency)]
+    for client in clients:
+        client.start()
+
+    # Round trips are read from the app's own metrics over the measured window only
+    time.sleep(max(0.0, measure_from - time.monotonic()))
+    before = HTTP_DB_ROUND_TRIPS.snapshot()
+    measured_start = time.monotonic()
+    for client in clients:
+        client.join()
+    wall_seconds = time.monotonic() - measured_start
+    after = HTTP_DB_ROUND_TRIPS.snapshot()
+    # Let in-flight tasks finish before closing the sockets they report back on
+    server.task_dispatcher.shutdown()
+    server.close()
+
+    round_trips = {}
+    for (route,), (count, total) in after.items():
+        count_before, total_before = before.get((route,), (0, 0.0))
+        if count > count_before:
+            round_trips[route] = round((total - total_before) / (count - count_before), 2)
+
+    report = summarize(results, wall_seconds, round_trips)
+    print_report(report, wall_seconds, args.concurrency)
+
+    if recorder is not None:
+        recorder.save(args.recording)
+        print(f"Recorded {len(recorder)} statements to {args.recording}")
+    if args.save_report:
+        with open(args.save_report, 'w', encoding='utf-8') as f:
+            json.dump({'mode': args.mode, 'concurrency': args.concurrency, 'scenarios': report}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['scenarios']
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print('\nRegressions against baseline:')
+            for line in regressions:
+                print(f'  {line}')
+            return 1
+        print('\nNo regressions against baseline')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
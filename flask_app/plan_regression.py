@@ -0,0 +1,302 @@
+"""
+Query-plan regression suite for the heavy stored procedures
+
+Runs each case against the load-test data set (database/test_data/20_Seed_Load_Test.sql)
+inside a transaction that is rolled back, with SET STATISTICS XML ON to capture the
+actual execution plans. From the plans it takes logical reads, CPU/elapsed time and
+scan operators, compares them with the baselines committed under
+database/benchmarks/plan_baselines/ and exits 1 on a regression or when a case has
+no baseline yet.
+
+Examples:
+    python plan_regression.py                    # compare against the committed baselines
+    python plan_regression.py --update-baseline  # re-measure and rewrite baselines + .sqlplan files
+    python plan_regression.py --case grant_expire --runs 5
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pyodbc
+
+from config import Config
+
+SHOWPLAN_NS = {'p': 'http://schemas.microsoft.com/sqlserver/2004/07/showplan'}
+SHOWPLAN_COLUMN = 'Microsoft SQL Server 2005 XML Showplan'
+SCAN_OPERATORS = ('Table Scan', 'Clustered Index Scan', 'Index Scan')
+BASELINE_DIR = Path(__file__).resolve().parent.parent / 'database' / 'benchmarks' / 'plan_baselines'
+
+# Up to {count} roles load.user.4242 can request right now, as one row (RoleIds comma-separated)
+REQUESTABLE_ROLES_LOOKUP = """
+    SELECT UserId, STRING_AGG(CAST(RoleId AS NVARCHAR(10)), ',') AS RoleIds
+    FROM (
+        SELECT TOP ({count}) e.UserId, e.RoleId
+        FROM [jit].[User_Effective_Eligibility] e
+        INNER JOIN [jit].[Roles] r ON e.RoleId = r.RoleId
+        WHERE e.UserId = N'load.user.4242' AND e.CanRequest = 1 AND r.IsEnabled = 1 AND r.RequiresApproval = 1
+        AND NOT EXISTS (SELECT 1 FROM [jit].[Grants] g
+                        WHERE g.UserId = e.UserId AND g.RoleId = e.RoleId AND g.Status = 'Active')
+        AND NOT EXISTS (SELECT 1 FROM [jit].[Requests] req
+                        INNER JOIN [jit].[Request_Roles] rr ON req.RequestId = rr.RequestId
+                        WHERE req.UserId = e.UserId AND rr.RoleId = e.RoleId AND req.Status IN ('Pending', 'AutoApproved'))
+        ORDER BY e.RoleId
+    ) roles
+    GROUP BY UserId
+"""
+
+# name: {'lookup': query returning one row of parameters (optional),
+#        'setup': statements run inside the transaction before measuring (optional),
+#        'sql': the measured batch, 'params': lookup columns bound to its ? markers in order,
+#        'tvp': {param: (type name, schema)} for comma-separated lookup columns bound as table-valued parameters}
+CASES = {
+    'request_list_pending_for_approver': {
+        'sql': "EXEC [jit].[sp_Request_ListPendingForApprover] @ApproverUserId = ?",
+        'params': ['ApproverUserId'],
+        'lookup': """
+            SELECT TOP 1 ApproverUserId
+            FROM [jit].[Request_Approver_Routing]
+            WHERE ApproverUserId LIKE N'load.user.%'
+            GROUP BY ApproverUserId
+            ORDER BY COUNT(*) DESC, ApproverUserId
+        """,
+    },
+    'role_list_requestable': {
+        'sql': "EXEC [jit].[sp_Role_ListRequestable] @UserId = ?",
+        'params': ['UserId'],
+        'lookup': "SELECT N'load.user.4242' AS UserId",
+    },
+    'request_create': {
+        'sql': """
+            EXEC [jit].[sp_Request_Create] @UserId = ?, @RoleIds = ?,
+                @RequestedDurationMinutes = 60, @Justification = N'Plan regression suite', @TicketRef = N'PLAN-1'
+        """,
+        'params': ['UserId', 'RoleIds'],
+        'tvp': {'RoleIds': ('RoleIdList', 'jit')},
+        'lookup': REQUESTABLE_ROLES_LOOKUP.format(count=1),
+    },
+    # Same procedure with 20 roles; validation is set-based, so reads should stay close to request_create
+    'request_create_20_roles': {
+        'sql': """
+            EXEC [jit].[sp_Request_Create] @UserId = ?, @RoleIds = ?,
+                @RequestedDurationMinutes = 60, @Justification = N'Plan regression suite', @TicketRef = N'PLAN-1'
+        """,
+        'params': ['UserId', 'RoleIds'],
+        'tvp': {'RoleIds': ('RoleIdList', 'jit')},
+        'lookup': REQUESTABLE_ROLES_LOOKUP.format(count=20),
+    },
+    'grant_expire': {
+        'setup': """
+            UPDATE TOP (500) [jit].[Grants]
+            SET ValidToUtc = DATEADD(MINUTE, -5, GETUTCDATE())
+            WHERE Status = 'Active' AND UserId LIKE N'load.user.%'
+        """,
+        'sql': """
+            DECLARE @ExpiredCount INT;
+            EXEC [jit].[sp_Grant_Expire] @ExpiredCount = @ExpiredCount OUTPUT, @BatchSize = 500, @MaxBatches = 1;
+        """,
+        'params': [],
+    },
+}
+
+
+def _attr_sum(elements, name):
+    return sum(int(float(e.get(name))) for e in elements if e.get(name) is not None)
+
+
+def summarize_plans(plans):
+    """
+    Metrics from the actual plans of one execution
+
+    Returns:
+        Dictionary with logical_reads, cpu_ms, elapsed_ms (server side, from QueryTimeStats),
+        statements and scans ({'PhysicalOp [schema].[table].[index]': rows read})
+    """
+    logical_reads = cpu_ms = elapsed_ms = statements = 0
+    scans = {}
+    for xml in plans:
+        root = ET.fromstring(xml)
+        for stmt in root.iter(f"{{{SHOWPLAN_NS['p']}}}StmtSimple"):
+            statements += 1
+            times = stmt.find('p:QueryPlan/p:QueryTimeStats', SHOWPLAN_NS)
+            if times is not None:
+                cpu_ms += int(times.get('CpuTime', 0))
+                elapsed_ms += int(times.get('ElapsedTime', 0))
+        for relop in root.iter(f"{{{SHOWPLAN_NS['p']}}}RelOp"):
+            counters = relop.findall('p:RunTimeInformation/p:RunTimeCountersPerThread', SHOWPLAN_NS)
+            logical_reads += _attr_sum(counters, 'ActualLogicalReads')
+            op = relop.get('PhysicalOp')
+            if op not in SCAN_OPERATORS:
+                continue
+            obj = relop.find('.//p:Object', SHOWPLAN_NS)
+            if obj is None or (obj.get('Table') or '').startswith('[#'):
+                continue
+            target = '.'.join(v for v in (obj.get('Schema'), obj.get('Table'), obj.get('Index')) if v)
+            rows = _attr_sum(counters, 'ActualRowsRead') or _attr_sum(counters, 'ActualRows')
+            key = f'{op} {target}'
+            scans[key] = scans.get(key, 0) + rows
+    return {
+        'logical_reads': logical_reads,
+        'cpu_ms': cpu_ms,
+        'elapsed_ms': elapsed_ms,
+        'statements': statements,
+        'scans': scans,
+    }
+
+
+def run_once(conn, case, params):
+    """Execute one case inside a rolled-back transaction; returns (plan XML list, client seconds)"""
+    cursor = conn.cursor()
+    plans = []
+    try:
+        cursor.execute("SET NOCOUNT ON")
+        if case.get('setup'):
+            cursor.execute(case['setup'])
+        cursor.execute("SET STATISTICS XML ON")
+        started = time.monotonic()
+        cursor.execute(case['sql'], [params[name] for name in case['params']])
+        while True:
+            if cursor.description is not None:
+                rows = cursor.fetchall()
+                if cursor.description[0][0] == SHOWPLAN_COLUMN:
+                    plans.extend(row[0] for row in rows)
+            if not cursor.nextset():
+                break
+        seconds = time.monotonic() - started
+    finally:
+        try:
+            cursor.execute("SET STATISTICS XML OFF")
+        except pyodbc.Error:
+            pass
+        conn.rollback()
+        cursor.close()
+    return plans, seconds
+
+
+def measure(conn, name, case, runs):
+    params = {}
+    if case.get('lookup'):
+        cursor = conn.cursor()
+        try:
+            cursor.execute(case['lookup'])
+            row = cursor.fetchone()
+            if row is None:
+                raise RuntimeError(f"{name}: lookup returned no row - is 20_Seed_Load_Test.sql loaded?")
+            params = dict(zip([c[0] for c in cursor.description], row))
+        finally:
+            cursor.close()
+            conn.rollback()
+
+    bind = dict(params)
+    for param, (type_name, schema) in case.get('tvp', {}).items():
+        bind[param] = [type_name, schema] + [(int(v),) for v in str(params[param]).split(',')]
+
+    run_once(conn, case, bind)  # warm-up: compile and load pages into the buffer pool
+    results = [run_once(conn, case, bind) for _ in range(runs)]
+    summaries = [summarize_plans(plans) for plans, _ in results]
+    last = summaries[-1]
+    return {
+        'params': {k: str(v) for k, v in params.items()},
+        'logical_reads': last['logical_reads'],
+        'statements': last['statements'],
+        'scans': last['scans'],
+        'cpu_ms': statistics.median(s['cpu_ms'] for s in summaries),
+        'elapsed_ms': statistics.median(s['elapsed_ms'] for s in summaries),
+        'client_ms': round(statistics.median(seconds for _, seconds in results) * 1000, 1),
+    }, results[-1][0]
+
+
+def compare(current, baseline, args):
+    """Human-readable regressions of current against baseline"""
+    problems = []
+    reads_limit = baseline['logical_reads'] * (1 + args.reads_tolerance) + args.reads_slack
+    if current['logical_reads'] > reads_limit:
+        problems.append(f"logical reads {current['logical_reads']} > {int(reads_limit)} (baseline {baseline['logical_reads']})")
+    for key in ('elapsed_ms', 'cpu_ms'):
+        limit = baseline[key] * (1 + args.time_tolerance) + args.time_slack_ms
+        if current[key] > limit:
+            problems.append(f"{key} {current[key]} > {limit:.0f} (baseline {baseline[key]})")
+    for scan, rows in current['scans'].items():
+        if rows < args.scan_min_rows:
+            continue
+        before = baseline['scans'].get(scan)
+        if before is None:
+            problems.append(f"new scan: {scan} ({rows} rows)")
+        elif rows > before * (1 + args.reads_tolerance) + args.scan_min_rows:
+            problems.append(f"scan grew: {scan} {rows} rows (baseline {before})")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--case', action='append', choices=sorted(CASES), help='Run only these cases (repeatable)')
+    parser.add_argument('--runs', type=int, default=3, help='Measured runs per case (after one warm-up run)')
+    parser.add_argument('--update-baseline', action='store_true', help='Rewrite baselines and .sqlplan files')
+    parser.add_argument('--baseline-dir', default=str(BASELINE_DIR))
+    parser.add_argument('--connection-string', help='Override the connection string from settings.env')
+    parser.add_argument('--reads-tolerance', type=float, default=0.10, help='Allowed relative logical-read increase')
+    parser.add_argument('--reads-slack', type=int, default=50, help='Allowed absolute logical-read increase')
+    parser.add_argument('--time-tolerance', type=float, default=0.50, help='Allowed relative CPU/elapsed increase')
+    parser.add_argument('--time-slack-ms', type=int, default=20, help='Allowed absolute CPU/elapsed increase')
+    parser.add_argument('--scan-min-rows', type=int, default=10000, help='Ignore scans reading fewer rows')
+    args = parser.parse_args()
+
+    baseline_dir = Path(args.baseline_dir)
+    baseline_file = baseline_dir / 'baselines.json'
+    baselines = {}
+    if baseline_file.exists():
+        baselines = json.loads(baseline_file.read_text(encoding='utf-8'))['cases']
+
+    conn = pyodbc.connect(args.connection_string or Config().DB_CONNECTION_STRING, autocommit=False)
+    failures = 0
+    measured = {}
+    try:
+        for name in args.case or sorted(CASES):
+            try:
+                current, plans = measure(conn, name, CASES[name], args.runs)
+            except (pyodbc.Error, RuntimeError) as e:
+                print(f"ERROR {name}: {e}")
+                failures += 1
+                continue
+            measured[name] = (current, plans)
+            line = (f"{name:<36} reads={current['logical_reads']:<8} cpu={current['cpu_ms']}ms "
+                    f"elapsed={current['elapsed_ms']}ms client={current['client_ms']}ms")
+            if args.update_baseline:
+                print(f"BASELINE {line}")
+                continue
+            if name not in baselines:
+                # A case without a committed baseline can't pass: the gate would check nothing
+                failures += 1
+                print(f"MISSING  {line} (no baseline in {baseline_file}; take one with --update-baseline and commit it)")
+                continue
+            problems = compare(current, baselines[name], args)
+            if problems:
+                failures += 1
+                print(f"FAIL     {line}")
+                for problem in problems:
+                    print(f"           {problem}")
+            else:
+                print(f"ok       {line}")
+    finally:
+        conn.close()
+
+    if args.update_baseline and measured:
+        baseline_dir.mkdir(parents=True, exist_ok=True)
+        for name, (current, plans) in measured.items():
+            baselines[name] = current
+            # One .sqlplan per statement; open in SSMS to diff against a failing run
+            for old in baseline_dir.glob(f'{name}.*.sqlplan'):
+                old.unlink()
+            for i, plan in enumerate(plans, 1):
+                (baseline_dir / f'{name}.{i}.sqlplan').write_text(plan, encoding='utf-8')
+        baseline_file.write_text(json.dumps({'cases': baselines}, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+        print(f"Wrote {baseline_file}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
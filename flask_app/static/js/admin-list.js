@@ -0,0 +1,215 @@
+// Admin listings: loads keyset-paginated JSON pages into a table.
+// Markup: <section data-admin-list data-url="..."> containing
+//   <form data-list-filters>        inputs are sent as query arguments
+//   <th data-field="X" data-render="text|strong|flag|days|datetime|truncate" data-sort="name">
+//   <tbody data-list-body>, <button data-list-more>, [data-list-status], [data-list-empty]
+// Optional row details: data-detail-url="/base/" data-detail-key="Id" on the section;
+// clicking a row loads base + row[Id] and shows its data-detail-field (pretty-printed JSON)
+
+(function () {
+  const EMPTY = "—";
+
+  function text(value) {
+    return value === null || value === undefined || value === "" ? EMPTY : String(value);
+  }
+
+  const RENDERERS = {
+    text: function (td, value) {
+      td.textContent = text(value);
+    },
+    strong: function (td, value) {
+      const el = document.createElement("strong");
+      el.textContent = text(value);
+      td.appendChild(el);
+    },
+    // data-on / data-off labels, data-on-class / data-off-class badge modifiers
+    flag: function (td, value, th) {
+      const on = value === true || value === 1;
+      const el = document.createElement("span");
+      el.className = "Badge " + ((on ? th.dataset.onClass : th.dataset.offClass) || "");
+      el.textContent = on ? th.dataset.on || "Yes" : th.dataset.off || "No";
+      td.appendChild(el);
+    },
+    days: function (td, value) {
+      if (value === null || value === undefined) {
+        td.textContent = EMPTY;
+        return;
+      }
+      const days = Math.floor(value / 1440);
+      td.textContent = days + " day" + (days === 1 ? "" : "s");
+    },
+    datetime: function (td, value) {
+      td.textContent = value ? String(value).replace("T", " ").slice(0, 16) : EMPTY;
+    },
+    truncate: function (td, value) {
+      const s = text(value);
+      td.textContent = s.length > 120 ? s.slice(0, 120) + "…" : s;
+      if (s.length > 120) td.title = s;
+    },
+  };
+
+  function init(root) {
+    const url = root.dataset.url;
+    const form = root.querySelector("[data-list-filters]");
+    const body = root.querySelector("[data-list-body]");
+    const more = root.querySelector("[data-list-more]");
+    const status = root.querySelector("[data-list-status]");
+    const empty = root.querySelector("[data-list-empty]");
+    const headers = Array.prototype.slice.call(root.querySelectorAll("th[data-field]"));
+    const detailUrl = root.dataset.detailUrl;
+    const detailKey = root.dataset.detailKey;
+    const detailField = root.dataset.detailField;
+
+    let sort = root.dataset.sort || "";
+    let dir = "";
+    let cursor = null;
+    let loading = false;
+    let generation = 0;
+
+    function query() {
+      const params = new URLSearchParams(form ? new FormData(form) : undefined);
+      if (sort) params.set("sort", sort);
+      if (dir) params.set("dir", dir);
+      if (cursor) params.set("cursor", cursor);
+      return url + "?" + params.toString();
+    }
+
+    function setStatus(message) {
+      if (status) status.textContent = message || "";
+    }
+
+    function appendRows(items) {
+      const fragment = document.createDocumentFragment();
+      items.forEach(function (item) {
+        const tr = document.createElement("tr");
+        headers.forEach(function (th) {
+          const td = document.createElement("td");
+          const render = RENDERERS[th.dataset.render] || RENDERERS.text;
+          render(td, item[th.dataset.field], th);
+          tr.appendChild(td);
+        });
+        if (detailUrl && detailKey) {
+          tr.style.cursor = "pointer";
+          tr.addEventListener("click", function () {
+            toggleDetail(tr, item[detailKey]);
+          });
+        }
+        fragment.appendChild(tr);
+      });
+      body.appendChild(fragment);
+    }
+
+    function formatDetail(value) {
+      if (value === null || value === undefined || value === "") return EMPTY;
+      try {
+        return JSON.stringify(JSON.parse(value), null, 2);
+      } catch (e) {
+        return String(value);
+      }
+    }
+
+    function toggleDetail(tr, id) {
+      const next = tr.nextElementSibling;
+      if (next && next.hasAttribute("data-list-detail")) {
+        next.remove();
+        return;
+      }
+      const row = document.createElement("tr");
+      row.setAttribute("data-list-detail", "");
+      const td = document.createElement("td");
+      td.colSpan = headers.length;
+      const pre = document.createElement("pre");
+      pre.style.whiteSpace = "pre-wrap";
+      pre.style.margin = "0";
+      pre.textContent = "Loading…";
+      td.appendChild(pre);
+      row.appendChild(td);
+      tr.after(row);
+
+      fetch(detailUrl + encodeURIComponent(id), { headers: { Accept: "application/json" }, credentials: "same-origin" })
+        .then(function (response) {
+          return response.json().then(function (data) {
+            if (!response.ok) throw new Error(data.error || response.statusText);
+            return data;
+          });
+        })
+        .then(function (data) {
+          pre.textContent = formatDetail(detailField ? data[detailField] : JSON.stringify(data));
+        })
+        .catch(function (err) {
+          pre.textContent = err.message;
+        });
+    }
+
+    function load() {
+      if (loading) return;
+      loading = true;
+      const mine = generation;
+      if (more) more.disabled = true;
+      setStatus("Loading…");
+
+      fetch(query(), { headers: { Accept: "application/json" }, credentials: "same-origin" })
+        .then(function (response) {
+          return response.json().then(function (data) {
+            if (!response.ok) throw new Error(data.error || response.statusText);
+            return data;
+          });
+        })
+        .then(function (data) {
+          if (mine !== generation) return;
+          appendRows(data.items);
+          cursor = data.next_cursor;
+          dir = data.dir;
+          if (more) more.hidden = !cursor;
+          if (empty) empty.hidden = body.children.length > 0;
+          setStatus(body.children.length + " shown" + (cursor ? "" : " (all)"));
+        })
+        .catch(function (err) {
+          if (mine === generation) setStatus(err.message);
+        })
+        .then(function () {
+          if (mine !== generation) return;
+          loading = false;
+          if (more) more.disabled = false;
+        });
+    }
+
+    function reload() {
+      generation += 1;
+      loading = false;
+      cursor = null;
+      body.innerHTML = "";
+      load();
+    }
+
+    if (form) {
+      form.addEventListener("submit", function (e) {
+        e.preventDefault();
+        reload();
+      });
+      form.addEventListener("change", reload);
+    }
+
+    if (more) more.addEventListener("click", load);
+
+    headers.forEach(function (th) {
+      if (!th.dataset.sort) return;
+      th.style.cursor = "pointer";
+      th.addEventListener("click", function () {
+        if (sort === th.dataset.sort) {
+          dir = dir === "asc" ? "desc" : "asc";
+        } else {
+          sort = th.dataset.sort;
+          dir = "";
+        }
+        reload();
+      });
+    });
+
+    load();
+  }
+
+  document.addEventListener("DOMContentLoaded", function () {
+    document.querySelectorAll("[data-admin-list]").forEach(init);
+  });
+})();
@@ -0,0 +1,236 @@
+"""
+Directory export reader and AD_Staging loader for the AD sync command (ad_sync.py)
+
+Reads a CSV or LDIF export one record at a time, maps AD attributes to the
+jit.AD_Staging columns and bulk-inserts them with fast_executemany in batches.
+Applying the staging table to jit.Users is left to jit.sp_User_SyncFromAD.
+"""
+import base64
+import csv
+import time
+
+import pyodbc
+
+# Staging column -> export attribute names tried in order (matched case-insensitively)
+ATTRIBUTES = {
+    'UserId': ('UserId', 'sAMAccountName'),
+    'LoginName': ('LoginName',),
+    'GivenName': ('GivenName',),
+    'Surname': ('Surname', 'sn'),
+    'DisplayName': ('DisplayName',),
+    'Email': ('Email', 'mail'),
+    'Division': ('Division',),
+    'Department': ('Department',),
+    'JobTitle': ('JobTitle', 'title'),
+}
+STAGING_COLUMNS = ('LoginName', 'UserId', 'GivenName', 'Surname', 'DisplayName', 'Email',
+                   'Division', 'Department', 'JobTitle', 'SeniorityLevel')
+MAX_LENGTH = 255
+ACCOUNTDISABLE = 0x2
+
+_INSERT_SQL = (
+    f"INSERT INTO jit.AD_Staging ({', '.join(STAGING_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(STAGING_COLUMNS))})"
+)
+# Fixed sizes so fast_executemany binds one buffer per column instead of re-binding per row
+_INPUT_SIZES = [(pyodbc.SQL_WVARCHAR, MAX_LENGTH, 0)] * 9 + [(pyodbc.SQL_INTEGER, 0, 0)]
+
+
+def read_csv(path):
+    """Yield one {attribute: value} dict per CSV row (header row names the attributes)"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            yield row
+
+
+def read_ldif(path):
+    """
+    Yield one {attribute: value} dict per LDIF entry
+
+    Handles folded lines, base64 values (attr:: ...) and comments; for
+    multi-valued attributes the first value is kept.
+    """
+    def parse(lines):
+        entry = {}
+        for line in lines:
+            name, sep, value = line.partition(':')
+            if not sep or name.lower() == 'version':
+                continue
+            if value.startswith(':'):
+                value = base64.b64decode(value[1:].strip()).decode('utf-8', errors='replace')
+            elif value.startswith('<'):
+                continue  # URL references are not followed
+            else:
+                value = value.strip()
+            entry.setdefault(name, value)
+        return entry
+
+    lines = []
+    with open(path, encoding='utf-8-sig') as f:
+        for raw in f:
+            raw = raw.rstrip('\r\n')
+            if raw.startswith(' ') and lines:
+                lines[-1] += raw[1:]
+            elif not raw.strip():
+                if lines:
+                    entry = parse(lines)
+                    if entry:
+                        yield entry
+                    lines = []
+            elif not raw.startswith('#'):
+                lines.append(raw)
+    if lines:
+        entry = parse(lines)
+        if entry:
+            yield entry
+
+
+class StagingLoader:
+    """
+    Maps export records to AD_Staging rows and inserts them in batches
+
+    Args:
+        conn: pyodbc connection (autocommit off); each batch is committed on its own
+        domain: Prefix for LoginName (DOMAIN\\sAMAccountName) when the export has no LoginName
+        seniority_attribute: Attribute holding the numeric SeniorityLevel (None to leave it empty)
+        batch_size: Rows per executemany
+        include_disabled: Stage accounts whose userAccountControl has ACCOUNTDISABLE
+            (by default they are left out, so sp_User_SyncFromAD inactivates them)
+    """
+
+    def __init__(self, conn, domain=None, seniority_attribute='SeniorityLevel', batch_size=5000,
+                 include_disabled=False):
+        self.conn = conn
+        self.domain = domain
+        self.seniority_attribute = seniority_attribute
+        self.batch_size = batch_size
+        self.include_disabled = include_disabled
+        self.stats = {
+            'read': 0,
+            'staged': 0,
+            'skipped_disabled': 0,
+            'skipped_invalid': 0,
+            'duplicates': 0,
+            'truncated_values': 0,
+            'bad_seniority': 0,
+            'batches': 0,
+        }
+
+    def clear(self):
+        """Empty AD_Staging (TRUNCATE, or DELETE when the account may not truncate)"""
+        cursor = self.conn.cursor()
+        try:
+            try:
+                cursor.execute("TRUNCATE TABLE jit.AD_Staging")
+            except pyodbc.ProgrammingError:
+                self.conn.rollback()
+                cursor.execute("DELETE FROM jit.AD_Staging")
+            self.conn.commit()
+        finally:
+            cursor.close()
+
+    def _value(self, record, names):
+        for name in names:
+            value = record.get(name)
+            if value is not None:
+                value = value.strip()
+                if len(value) > MAX_LENGTH:
+                    self.stats['truncated_values'] += 1
+                    value = value[:MAX_LENGTH]
+                return value or None
+        return None
+
+    def to_row(self, record):
+        """Staging row tuple for one export record, or None when it is skipped"""
+        record = {k.lower(): v for k, v in record.items() if k}
+        if not self.include_disabled:
+            try:
+                if int(record.get('useraccountcontrol') or 0) & ACCOUNTDISABLE:
+                    self.stats['skipped_disabled'] += 1
+                    return None
+            except ValueError:
+                pass
+        values = {column: self._value(record, [n.lower() for n in names]) for column, names in ATTRIBUTES.items()}
+        if values['LoginName'] is None and values['UserId'] and self.domain:
+            values['LoginName'] = f"{self.domain}\\{values['UserId']}"
+        if values['UserId'] is None and values['LoginName']:
+            values['UserId'] = values['LoginName'].rpartition('\\')[2]
+        if not values['UserId'] or not values['LoginName']:
+            self.stats['skipped_invalid'] += 1
+            return None
+
+        seniority = None
+        if self.seniority_attribute:
+            raw = record.get(self.seniority_attribute.lower())
+            if raw not in (None, ''):
+                try:
+                    seniority = int(raw)
+                except ValueError:
+                    self.stats['bad_seniority'] += 1
+        values['SeniorityLevel'] = seniority
+        return tuple(values[column] for column in STAGING_COLUMNS)
+
+    def _insert(self, cursor, rows):
+        cursor.executemany(_INSERT_SQL, rows)
+        self.conn.commit()
+        self.stats['staged'] += len(rows)
+        self.stats['batches'] += 1
+
+    def load(self, records):
+        """
+        Stream records into AD_Staging
+
+        Returns:
+            Seconds spent reading and inserting
+        """
+        started = time.monotonic()
+        seen = set()
+        batch = []
+        cursor = self.conn.cursor()
+        try:
+            cursor.fast_executemany = True
+            cursor.setinputsizes(_INPUT_SIZES)
+            for record in records:
+                self.stats['read'] += 1
+                row = self.to_row(record)
+                if row is None:
+                    continue
+                # LoginName is the staging key; the first occurrence wins
+                key = row[0].lower()
+                if key in seen:
+                    self.stats['duplicates'] += 1
+                    continue
+                seen.add(key)
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self._insert(cursor, batch)
+                    batch = []
+            if batch:
+                self._insert(cursor, batch)
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        return time.monotonic() - started
+
+
+def apply_sync(conn, batch_size=2000):
+    """
+    Run jit.sp_User_SyncFromAD against the loaded staging table
+
+    Returns:
+        Dictionary of the procedure's counts and per-phase milliseconds
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("EXEC jit.sp_User_SyncFromAD @BatchSize = ?", batch_size)
+        row = cursor.fetchone()
+        result = dict(zip([column[0] for column in cursor.description], row)) if row else {}
+        conn.commit()
+        return result
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
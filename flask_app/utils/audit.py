@@ -0,0 +1,403 @@
+"""
+Asynchronous audit writer for JIT Access Framework
+
+Application-level events (page access, access denials, failed actions, slow
+queries) go into a bounded in-process queue and are written to jit.AuditLog in
+batches by a background thread, so audit volume never adds to request latency.
+Batches that cannot be written because the database is unavailable are appended
+to a local JSON-lines spill file and replayed once it is reachable again.
+
+Workflow events (RequestCreated, Approved, GrantIssued, ...) are still written by
+the stored procedures inside their own transactions.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+import pyodbc
+from flask import current_app, g, has_request_context, request, session
+
+logger = logging.getLogger(__name__)
+
+_INSERT_SQL = """
+    INSERT INTO jit.AuditLog (EventUtc, EventType, ActorUserId, ActorLoginName, TargetUserId, RequestId, GrantId, DetailsJson)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# DetailsJson is NVARCHAR(MAX); without an explicit size fast_executemany would
+# allocate a MAX-sized buffer per row
+_INPUT_SIZES = [None] * 7 + [(pyodbc.SQL_WVARCHAR, 0, 0)]
+
+# Row-level failures (e.g. a foreign key to a deleted request) are never retried;
+# anything else means the database is unavailable and the batch is spilled
+_DATA_ERRORS = (pyodbc.IntegrityError, pyodbc.DataError)
+
+# Row layout: (EventUtc, EventType, ActorUserId, ActorLoginName, TargetUserId, RequestId, GrantId, DetailsJson)
+_REFERENCE_COLUMNS = (2, 4, 5, 6)
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class AuditWriter:
+    """
+    Bounded queue of audit rows flushed to jit.AuditLog by a daemon thread
+
+    Args:
+        pool: utils.db.ConnectionPool the writer borrows one connection from per flush
+        max_queue: Events held in memory; further events go straight to the spill file
+        batch_size: Maximum rows per executemany
+        flush_seconds: Longest time an event waits in the queue
+        retry_seconds: Pause after a failed flush before the database is tried again
+        spill_path: JSON-lines file for rows that could not be written (None drops them)
+    """
+
+    def __init__(self, pool, max_queue=10000, batch_size=500, flush_seconds=2.0,
+                 retry_seconds=30.0, spill_path=None):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.retry_seconds = retry_seconds
+        self.spill_path = spill_path
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._retry_at = 0.0
+        self._stats = {
+            'queued': 0,
+            'written': 0,
+            'batches': 0,
+            'overflowed': 0,
+            'spilled': 0,
+            'replayed': 0,
+            'rejected': 0,
+            'dropped': 0,
+            'flush_failures': 0,
+            'flush_seconds_total': 0.0,
+        }
+
+    # ---- producers --------------------------------------------------------
+
+    def emit(self, event_type, actor_login, actor_user_id=None, target_user_id=None,
+             request_id=None, grant_id=None, details=None):
+        """
+        Queue one audit event without blocking
+
+        Returns:
+            True if the event was queued, False if it overflowed to the spill file
+        """
+        row = (
+            _utcnow(), event_type, actor_user_id, actor_login or 'Anonymous', target_user_id,
+            request_id, grant_id,
+            json.dumps(details, default=str, separators=(',', ':')) if details is not None else None,
+        )
+        self.start()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self._stats['overflowed'] += 1
+            self._spill([row])
+            return False
+        with self._lock:
+            self._stats['queued'] += 1
+        return True
+
+    # ---- database ---------------------------------------------------------
+
+    def _write(self, rows):
+        """Insert rows in one batch; rows the database rejects are retried alone, then dropped"""
+        conn = self.pool.acquire()
+        discard = False
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.fast_executemany = True
+                cursor.setinputsizes(_INPUT_SIZES)
+                try:
+                    cursor.executemany(_INSERT_SQL, rows)
+                    conn.commit()
+                except _DATA_ERRORS:
+                    conn.rollback()
+                    self._write_each(conn, rows)
+            finally:
+                cursor.close()
+        except Exception:
+            discard = True
+            raise
+        finally:
+            self.pool.release(conn, discard=discard)
+
+    def _write_each(self, conn, rows):
+        cursor = conn.cursor()
+        try:
+            for row in rows:
+                try:
+                    cursor.execute(_INSERT_SQL, row)
+                    conn.commit()
+                    continue
+                except _DATA_ERRORS as e:
+                    conn.rollback()
+                    error = e
+                # Keep the event, moving dangling references into the details
+                stripped = list(row)
+                details = json.loads(row[7]) if row[7] else {}
+                if not isinstance(details, dict):
+                    details = {'Details': details}
+                details['Unlinked'] = {'ActorUserId': row[2], 'TargetUserId': row[4], 'RequestId': row[5], 'GrantId': row[6]}
+                for i in _REFERENCE_COLUMNS:
+                    stripped[i] = None
+                stripped[7] = json.dumps(details, default=str, separators=(',', ':'))
+                try:
+                    cursor.execute(_INSERT_SQL, stripped)
+                    conn.commit()
+                except _DATA_ERRORS:
+                    conn.rollback()
+                    with self._lock:
+                        self._stats['rejected'] += 1
+                    logger.error(f"Audit event {row[1]} rejected by the database: {error}")
+        finally:
+            cursor.close()
+
+    def _flush(self, rows):
+        """Write rows, spilling them if the database is unavailable; returns True when written"""
+        started = time.monotonic()
+        try:
+            self._write(rows)
+        except Exception as e:
+            self._retry_at = time.monotonic() + self.retry_seconds
+            with self._lock:
+                self._stats['flush_failures'] += 1
+            logger.warning(f"Audit flush of {len(rows)} event(s) failed, spilling: {e}")
+            self._spill(rows)
+            return False
+        with self._lock:
+            self._stats['written'] += len(rows)
+            self._stats['batches'] += 1
+            self._stats['flush_seconds_total'] += time.monotonic() - started
+        return True
+
+    # ---- spill file -------------------------------------------------------
+
+    def _spill(self, rows, count=True):
+        if not self.spill_path:
+            with self._lock:
+                self._stats['dropped'] += len(rows)
+            logger.error(f"Dropped {len(rows)} audit event(s): no spill file configured")
+            return
+        lines = ''.join(
+            json.dumps([row[0].isoformat()] + list(row[1:]), separators=(',', ':')) + '\n' for row in rows
+        )
+        try:
+            with self._spill_lock:
+                directory = os.path.dirname(self.spill_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.spill_path, 'a', encoding='utf-8') as f:
+                    f.write(lines)
+                    f.flush()
+                    os.fsync(f.fileno())
+        except OSError as e:
+            with self._lock:
+                self._stats['dropped'] += len(rows)
+            logger.error(f"Dropped {len(rows)} audit event(s): spill file not writable: {e}")
+            return
+        if count:
+            with self._lock:
+                self._stats['spilled'] += len(rows)
+
+    def _read_spilled(self, f):
+        """Yield batches of rows from an open spill file"""
+        batch = []
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                values = json.loads(line)
+                batch.append(tuple([datetime.fromisoformat(values[0])] + values[1:]))
+            except (ValueError, IndexError, TypeError):
+                logger.error(f"Skipping unreadable spilled audit line: {line[:200]}")
+                continue
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _replay(self):
+        """Write spilled rows back to the database; on failure the rest is spilled again"""
+        if not self.spill_path:
+            return
+        replay_path = self.spill_path + '.replay'
+        with self._spill_lock:
+            # A .replay file left behind by a crash is finished first
+            if not os.path.exists(replay_path):
+                if not os.path.exists(self.spill_path):
+                    return
+                os.replace(self.spill_path, replay_path)
+
+        replayed = 0
+        with open(replay_path, encoding='utf-8') as f:
+            batches = self._read_spilled(f)
+            for batch in batches:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    self._retry_at = time.monotonic() + self.retry_seconds
+                    logger.warning(f"Audit spill replay stopped after {replayed} event(s): {e}")
+                    self._spill(batch, count=False)
+                    for rest in batches:
+                        self._spill(rest, count=False)
+                    break
+                replayed += len(batch)
+                with self._lock:
+                    self._stats['replayed'] += len(batch)
+        os.remove(replay_path)
+        if replayed:
+            logger.info(f"Replayed {replayed} spilled audit event(s)")
+
+    # ---- loop -------------------------------------------------------------
+
+    def _take(self):
+        """Wait up to flush_seconds for the first event, then take whatever else is queued"""
+        try:
+            rows = [self._queue.get(timeout=self.flush_seconds)]
+        except queue.Empty:
+            return []
+        while len(rows) < self.batch_size:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            try:
+                rows = self._take()
+                if time.monotonic() < self._retry_at:
+                    if rows:
+                        self._spill(rows)
+                    continue
+                if rows:
+                    if not self._flush(rows):
+                        continue
+                self._replay()
+            except Exception as e:
+                logger.error(f"Audit writer iteration failed: {e}")
+
+        # Drain whatever is left; spill it if the database is still unavailable
+        while True:
+            rows = []
+            while len(rows) < self.batch_size:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not rows:
+                break
+            if time.monotonic() < self._retry_at:
+                self._spill(rows)
+            else:
+                self._flush(rows)
+
+    def start(self):
+        """Run the flush loop on a background daemon thread (idempotent)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self.run_forever, name='jit-audit-writer', daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=None):
+        """Flush queued events and stop the background thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self):
+        """Snapshot of writer counters"""
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['queue_depth'] = self._queue.qsize()
+        snapshot['spill_pending'] = bool(self.spill_path and (
+            os.path.exists(self.spill_path) or os.path.exists(self.spill_path + '.replay')))
+        return snapshot
+
+
+def init_audit(app):
+    """Create the application's audit writer and, if enabled, register page-access auditing"""
+    pool = app.extensions['jit_db_pool']
+    writer = AuditWriter(
+        pool,
+        max_queue=app.config.get('AUDIT_QUEUE_MAX_EVENTS', 10000),
+        batch_size=app.config.get('AUDIT_BATCH_SIZE', 500),
+        flush_seconds=app.config.get('AUDIT_FLUSH_SECONDS', 2.0),
+        retry_seconds=app.config.get('AUDIT_RETRY_SECONDS', 30.0),
+        spill_path=app.config.get('AUDIT_SPILL_PATH'),
+    )
+    app.extensions['jit_audit'] = writer
+    atexit.register(writer.stop, 10)
+
+    if app.config.get('AUDIT_PAGE_ACCESS', True):
+        app.before_request(_start_request_timer)
+        app.after_request(_audit_page_access)
+
+
+def _actor():
+    """(ActorUserId, ActorLoginName) for the current request"""
+    identity = g.get('_jit_identity') or session.get('user')
+    if identity and identity.get('UserId'):
+        return identity['UserId'], identity.get('LoginName') or identity['UserId']
+    return None, request.headers.get('X-Remote-User') or 'Anonymous'
+
+
+def audit_event(event_type, target_user_id=None, request_id=None, grant_id=None, details=None):
+    """
+    Queue an application audit event for the current app (never raises)
+
+    Args:
+        event_type: jit.AuditLog.EventType, e.g. 'AccessDenied'
+        target_user_id, request_id, grant_id: Optional references (rows the database rejects
+            are kept with the references moved into DetailsJson)
+        details: JSON-serializable value stored as DetailsJson
+    """
+    try:
+        writer = current_app.extensions.get('jit_audit')
+        if writer is None:
+            return
+        actor_user_id, actor_login = _actor() if has_request_context() else (None, 'System')
+        writer.emit(event_type, actor_login, actor_user_id=actor_user_id, target_user_id=target_user_id,
+                    request_id=request_id, grant_id=grant_id, details=details)
+    except Exception as e:
+        logger.error(f"Could not queue audit event {event_type}: {e}")
+
+
+def _start_request_timer():
+    g._audit_started = time.monotonic()
+
+
+def _audit_page_access(response):
+    if request.endpoint in (None, 'static', 'metrics'):
+        return response
+    started = g.get('_audit_started')
+    audit_event('PageAccess', details={
+        'Method': request.method,
+        'Path': request.path,
+        'Endpoint': request.endpoint,
+        'Status': response.status_code,
+        'DurationMs': round((time.monotonic() - started) * 1000, 1) if started is not None else None,
+    })
+    return response
@@ -2,11 +2,18 @@
 Authentication utilities for JIT Access Framework
 Uses Windows Authentication for user identification, SQL Auth for database connection
 """
+import logging
 import os
+import threading
+import time
 import pyodbc
-from flask import session, request, redirect, url_for
+from flask import session, request, redirect, url_for, g, current_app
 from functools import wraps
 from .db import get_db_connection, execute_query
+from .audit import audit_event
+from .metrics import record_statement
+
+logger = logging.getLogger(__name__)
 
 def get_windows_username():
     """
@@ -18,9 +25,6 @@ def get_windows_username():
     Returns:
         str: Windows username in format DOMAIN\\username or username, or None if not found
     """
-    import logging
-    logger = logging.getLogger(__name__)
-    
     # In development, allow a local env var to fake the user for testing.
     # This is only enabled when FLASK_ENV=development.
     if os.getenv('FLASK_ENV') == 'development':
@@ -57,53 +61,178 @@ def get_windows_username():
     return windows_user
     
 
-def get_current_user():
+class IdentityCache:
     """
-    Get current user information from database
-    User must exist in jit.Users table (no auto-creation)
-    Returns user dictionary or None if not found
+    Short-TTL, in-process cache of resolved identities keyed by Windows login
+
+    Entries are tagged with the jit.Cache_Versions 'Users' counter at the time
+    they were loaded; when sp_User_SyncFromAD or trg_Users_BumpCacheVersion
+    (role flag, IsActive or LoginName changes) bumps the counter every entry
+    becomes stale. The counter itself is polled at most once per poll interval
+    so a warm cache costs no database round trip.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._version = None
+        self._version_checked_at = 0.0
+
+    def get(self, login, ttl):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(login.lower())
+            if entry is None:
+                return None
+            identity, loaded_at, version = entry
+            if now - loaded_at >= ttl or version != self._version:
+                del self._entries[login.lower()]
+                return None
+            return dict(identity)
+
+    def set(self, login, identity, max_entries):
+        with self._lock:
+            if len(self._entries) >= max_entries:
+                # Drop the oldest entry (dicts preserve insertion order)
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[login.lower()] = (dict(identity), time.monotonic(), self._version)
+
+    def invalidate(self, login=None):
+        """Drop one login (or every login when login is None)"""
+        with self._lock:
+            if login is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(login.lower(), None)
+
+    def refresh_version(self, poll_seconds):
+        """Re-read the Users change counter if the poll interval has elapsed"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._version_checked_at < poll_seconds:
+                return
+            self._version_checked_at = now
+        try:
+            rows = execute_query(
+                "SELECT Version FROM jit.Cache_Versions WHERE CacheName = ?", ['Users']
+            )
+            version = rows[0]['Version'] if rows else None
+        except Exception as e:
+            logger.warning(f"Identity cache version check failed: {e}")
+            self.invalidate()
+            return
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+
+
+identity_cache = IdentityCache()
+
+
+def _load_identity(windows_username):
     """
+    Single round trip: the user's row plus effective role flags
+
+    IsApprover/IsAdmin in the returned dict are the effective capabilities used
+    by templates and decorators (an admin is always an approver).
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
     try:
-        windows_username = get_windows_username()
-        
-        # Validate that we have a string username
-        if not windows_username or not isinstance(windows_username, str) or not windows_username.strip():
-            return None
-        
-        # Ensure it's a string and strip whitespace
-        windows_username = str(windows_username).strip()
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Try to find user by login name (exact match or domain\username format)
         # Users need to be created manually or via AD sync
-        # Try multiple patterns: exact match, domain\username, just username
-        search_pattern = f'%\\{windows_username}'
+        # DOMAIN\username: exact match on LoginName (IX_Users_LoginName seek)
+        # username only: match any domain via the persisted LoginKey column (IX_Users_LoginKey seek)
+        if '\\' in windows_username:
+            match_column = 'LoginName'
+        else:
+            match_column = 'LoginKey'
         
-        cursor.execute("""
+        started = time.monotonic()
+        cursor.execute(f"""
             SELECT UserId, LoginName, GivenName, Surname, DisplayName, 
                    Email, Division, Department, JobTitle, SeniorityLevel, 
                    IsAdmin, IsApprover, IsDataSteward, IsActive
             FROM jit.Users 
-            WHERE (LoginName = ? OR LoginName LIKE ? OR LoginName = ?)
+            WHERE {match_column} = ?
             AND IsActive = 1
-        """, windows_username, search_pattern, windows_username)
+        """, windows_username)
         
         row = cursor.fetchone()
-        if row:
-            columns = [column[0] for column in cursor.description]
-            user_dict = dict(zip(columns, row))
-            cursor.close()
-            return user_dict
-        
+        record_statement('identity:' + match_column, started, 1 if row else 0)
+        if not row:
+            return None
+        columns = [column[0] for column in cursor.description]
+        user_dict = dict(zip(columns, row))
+    finally:
         cursor.close()
+    
+    user_dict['IsAdmin'] = bool(user_dict.get('IsAdmin'))
+    user_dict['IsApprover'] = user_dict['IsAdmin'] or bool(user_dict.get('IsApprover'))
+    user_dict['IsDataSteward'] = bool(user_dict.get('IsDataSteward'))
+    return user_dict
+
+
+def resolve_identity():
+    """
+    Resolve the current request's user and role flags once per request
+
+    The result is memoized on flask.g, and optionally in a short-TTL
+    cross-request cache keyed by the X-Remote-User login
+    (IDENTITY_CACHE_TTL_SECONDS, 0 disables it).
+
+    Returns:
+        dict: user row with effective IsAdmin/IsApprover/IsDataSteward flags, or None
+    """
+    if '_jit_identity' in g:
+        return g._jit_identity
+    
+    windows_username = get_windows_username()
+    
+    # Validate that we have a string username
+    if not windows_username or not isinstance(windows_username, str) or not windows_username.strip():
+        g._jit_identity = None
         return None
+    
+    # Ensure it's a string and strip whitespace
+    windows_username = str(windows_username).strip()
+    
+    ttl = current_app.config.get('IDENTITY_CACHE_TTL_SECONDS', 0)
+    identity = None
+    if ttl > 0:
+        identity_cache.refresh_version(current_app.config.get('IDENTITY_CACHE_VERSION_POLL_SECONDS', 5))
+        identity = identity_cache.get(windows_username, ttl)
+    
+    if identity is None:
+        identity = _load_identity(windows_username)
+        if identity is not None and ttl > 0:
+            identity_cache.set(windows_username, identity,
+                               current_app.config.get('IDENTITY_CACHE_MAX_ENTRIES', 10000))
+    
+    g._jit_identity = identity
+    return identity
+
+
+def _request_identity(user_id):
+    """Return this request's resolved identity if it belongs to user_id"""
+    identity = g.get('_jit_identity')
+    if identity and identity.get('UserId') == user_id:
+        return identity
+    return None
+
+
+def get_current_user():
+    """
+    Get current user information from database
+    User must exist in jit.Users table (no auto-creation)
+    Returns user dictionary (including IsApprover/IsAdmin flags) or None if not found
+    """
+    try:
+        identity = resolve_identity()
+        return dict(identity) if identity else None
         
     except Exception as e:
-        print(f"Error getting current user: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"Error getting current user: {e}")
         return None
 
 def is_approver(user_id):
@@ -113,6 +242,11 @@ def is_approver(user_id):
     """
     if not user_id:
         return False
+    
+    # Already resolved for this request - no extra round trip
+    identity = _request_identity(user_id)
+    if identity is not None:
+        return identity['IsApprover']
         
     try:
         conn = get_db_connection()
@@ -135,7 +269,7 @@ def is_approver(user_id):
         return False
         
     except Exception as e:
-        print(f"Error checking approver status: {e}")
+        logger.error(f"Error checking approver status: {e}")
         return False
 
 def is_admin(user_id):
@@ -145,6 +279,11 @@ def is_admin(user_id):
     """
     if not user_id:
         return False
+    
+    # Already resolved for this request - no extra round trip
+    identity = _request_identity(user_id)
+    if identity is not None:
+        return identity['IsAdmin']
         
     try:
         conn = get_db_connection()
@@ -164,9 +303,20 @@ def is_admin(user_id):
         return False
         
     except Exception as e:
-        print(f"Error checking admin status: {e}")
+        logger.error(f"Error checking admin status: {e}")
         return False
 
+def remember_user(user):
+    """
+    Keep the resolved user in the session for the views
+
+    Only written when it changed, so an unchanged user costs no session store
+    write (or, with cookie sessions, no re-signed cookie).
+    """
+    if session.get('user') != user:
+        session['user'] = user
+
+
 def login_required(f):
     """Decorator to require user to be logged in"""
     @wraps(f)
@@ -175,8 +325,9 @@ def login_required(f):
         if user is None:
             from flask import flash
             flash('User not found. Please contact your administrator to create your account.', 'error')
+            audit_event('AccessDenied', details={'Reason': 'UnknownUser', 'Path': request.path})
             return redirect(url_for('login'))
-        session['user'] = user
+        remember_user(user)
         return f(*args, **kwargs)
     return decorated_function
 
@@ -193,6 +344,7 @@ def approver_required(f):
         if not is_approver(user.get('UserId')):
             from flask import flash
             flash('You do not have permission to access this page. Approver access required.', 'error')
+            audit_event('AccessDenied', details={'Reason': 'ApproverRequired', 'Path': request.path})
             return redirect(url_for('user_dashboard'))
         
         return f(*args, **kwargs)
@@ -211,6 +363,7 @@ def admin_required(f):
         if not is_admin(user.get('UserId')):
             from flask import flash
             flash('You do not have permission to access this page. Administrator access required.', 'error')
+            audit_event('AccessDenied', details={'Reason': 'AdminRequired', 'Path': request.path})
             return redirect(url_for('user_dashboard'))
         
         return f(*args, **kwargs)
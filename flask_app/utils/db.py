@@ -1,31 +1,500 @@
 """
 Database utility functions for JIT Access Framework
 """
+import logging
+import threading
+import time
+from collections import deque
+
 import pyodbc
-from flask import current_app, g
+from flask import current_app, g, has_request_context, request, session
 from functools import wraps
 
-def get_db_connection():
-    """Get database connection using SQL Server Authentication (service account)"""
-    if 'db' not in g:
-        # Build connection string from config (can't use property in Flask config)
-        conn_str = (
-            f"DRIVER={current_app.config['DB_DRIVER']};"
-            f"SERVER={current_app.config['DB_SERVER']};"
-            f"DATABASE={current_app.config['DB_NAME']};"
-            f"UID={current_app.config['DB_USERNAME']};"
-            f"PWD={current_app.config['DB_PASSWORD']};"
+from .audit import audit_event
+from .metrics import DB_ACQUIRE_SECONDS, DB_READS, params_fingerprint, record_statement, statement_label
+
+logger = logging.getLogger(__name__)
+
+# Statement intents. READ may be served by the read replica (DB_READ_SERVER) and tolerates
+# replication lag; PRIMARY reads must see the primary; WRITE runs on the primary and pins the
+# user's reads to it for DB_READ_STICKY_SECONDS so they see their own change.
+READ = 'read'
+PRIMARY = 'primary'
+WRITE = 'write'
+
+# Intent of each procedure called through execute_procedure; unlisted procedures are writes
+PROCEDURE_INTENTS = {
+    'jit.sp_User_GetDashboard': READ,
+    'jit.sp_Request_ListForUser': READ,
+    'jit.sp_Request_ListPendingForApprover': READ,
+    'jit.sp_Request_GetRoles': READ,
+    # Feeds the requestable-roles memo, which must not cache a lagging copy under a newer version
+    'jit.sp_Role_ListRequestable': PRIMARY,
+}
+
+
+class PoolExhaustedError(RuntimeError):
+    """Raised when no pooled connection becomes available within the acquire timeout"""
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of pyodbc connections
+
+    Connections are opened lazily up to max_size, kept warm down to min_size,
+    validated on checkout when they have been idle for a while, and recycled
+    once they exceed max_age_seconds. Waitress serves requests from a fixed
+    thread pool, so max_size should be at least the number of worker threads.
+
+    connect opens one connection from the connection string (pyodbc.connect by
+    default); the load-test harness swaps it for recording/replay connectors.
+    """
+
+    def __init__(self, conn_str, min_size=1, max_size=10, max_age_seconds=1800,
+                 acquire_timeout=5.0, validate_idle_seconds=30.0, connect=None):
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1')
+        self._conn_str = conn_str
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.max_age_seconds = max_age_seconds
+        self.acquire_timeout = acquire_timeout
+        self.validate_idle_seconds = validate_idle_seconds
+        self.connect = connect or pyodbc.connect
+
+        self._lock = threading.Condition(threading.Lock())
+        # Idle entries are (connection, created_at, last_used_at); most recently used on the right
+        self._idle = deque()
+        # Checked-out connections keyed by id() -> created_at
+        self._in_use = {}
+        self._opening = 0
+        self._warmed = False
+        self._stats = {
+            'connections_opened': 0,
+            'connections_closed': 0,
+            'checkouts': 0,
+            'checkout_reuses': 0,
+            'validation_failures': 0,
+            'recycled_by_age': 0,
+            'waits': 0,
+            'exhausted': 0,
+            'acquire_seconds_total': 0.0,
+            'peak_in_use': 0,
+        }
+
+    # ---- internal helpers -------------------------------------------------
+
+    def _open(self):
+        conn = self.connect(self._conn_str)
+        with self._lock:
+            self._stats['connections_opened'] += 1
+        return conn
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._stats['connections_closed'] += 1
+
+    def _is_expired(self, created_at, now):
+        return self.max_age_seconds and (now - created_at) >= self.max_age_seconds
+
+    @staticmethod
+    def _ping(conn):
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        finally:
+            cursor.close()
+
+    def _warm(self):
+        """Open min_size connections the first time the pool is used"""
+        with self._lock:
+            if self._warmed:
+                return
+            self._warmed = True
+            missing = self.min_size - len(self._idle) - len(self._in_use) - self._opening
+            if missing <= 0:
+                return
+            self._opening += missing
+        opened = []
+        try:
+            for _ in range(missing):
+                opened.append(self._open())
+        except Exception as e:
+            logger.warning(f"Connection pool warm-up stopped early: {e}")
+        finally:
+            now = time.monotonic()
+            with self._lock:
+                self._opening -= missing
+                for conn in opened:
+                    self._idle.append((conn, now, now))
+                self._lock.notify_all()
+
+    # ---- public API -------------------------------------------------------
+
+    def acquire(self):
+        """
+        Check out a connection, waiting up to acquire_timeout when the pool is at max_size
+
+        Returns:
+            An open pyodbc connection owned by the caller until release()
+        """
+        if not self._warmed:
+            self._warm()
+
+        started = time.monotonic()
+        deadline = started + self.acquire_timeout
+        waited = False
+
+        while True:
+            candidate = None
+            open_new = False
+            with self._lock:
+                while True:
+                    if self._idle:
+                        candidate = self._idle.pop()
+                        break
+                    if len(self._in_use) + self._opening < self.max_size:
+                        self._opening += 1
+                        open_new = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['exhausted'] += 1
+                        in_use = len(self._in_use)
+                        break
+                    if not waited:
+                        waited = True
+                        self._stats['waits'] += 1
+                    self._lock.wait(remaining)
+
+            if candidate is None and not open_new:
+                logger.warning(f"Connection pool exhausted ({in_use}/{self.max_size} in use)")
+                raise PoolExhaustedError(
+                    f'No database connection available within {self.acquire_timeout}s '
+                    f'(pool max_size={self.max_size})'
+                )
+
+            now = time.monotonic()
+            if open_new:
+                try:
+                    conn = self._open()
+                finally:
+                    with self._lock:
+                        self._opening -= 1
+                        self._lock.notify()
+                created_at = now
+                reused = False
+            else:
+                conn, created_at, last_used = candidate
+                reused = True
+                if self._is_expired(created_at, now):
+                    with self._lock:
+                        self._stats['recycled_by_age'] += 1
+                    self._discard(conn)
+                    continue
+                if self.validate_idle_seconds is not None and (now - last_used) >= self.validate_idle_seconds:
+                    try:
+                        self._ping(conn)
+                    except Exception:
+                        with self._lock:
+                            self._stats['validation_failures'] += 1
+                        self._discard(conn)
+                        continue
+
+            with self._lock:
+                self._in_use[id(conn)] = created_at
+                self._stats['checkouts'] += 1
+                if reused:
+                    self._stats['checkout_reuses'] += 1
+                self._stats['acquire_seconds_total'] += time.monotonic() - started
+                if len(self._in_use) > self._stats['peak_in_use']:
+                    self._stats['peak_in_use'] = len(self._in_use)
+            return conn
+
+    def release(self, conn, discard=False):
+        """
+        Return a connection to the pool
+
+        Any open transaction is rolled back so the next borrower starts clean.
+        Broken or over-age connections are closed instead of being pooled.
+        """
+        with self._lock:
+            created_at = self._in_use.pop(id(conn), None)
+        if created_at is None:
+            # Not ours (or already released) - just close it
+            self._discard(conn)
+            return
+
+        now = time.monotonic()
+        if not discard:
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+        if discard or self._is_expired(created_at, now):
+            if not discard:
+                with self._lock:
+                    self._stats['recycled_by_age'] += 1
+            self._discard(conn)
+            with self._lock:
+                self._lock.notify()
+            return
+
+        with self._lock:
+            self._idle.append((conn, created_at, now))
+            self._lock.notify()
+
+    def close(self):
+        """Close every idle connection (checked-out connections are closed on release)"""
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._warmed = False
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        """Snapshot of pool counters and gauges"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['in_use'] = len(self._in_use)
+            snapshot['idle'] = len(self._idle)
+            snapshot['min_size'] = self.min_size
+            snapshot['max_size'] = self.max_size
+        return snapshot
+
+
+class ReadReplica:
+    """
+    Read-intent connection pool that steps aside while the replica is unreachable
+
+    acquire() returns None instead of raising, so the caller reads from the primary.
+    After a connection failure the replica is skipped for retry_seconds; an exhausted
+    pool only sends that one read to the primary.
+    """
+
+    def __init__(self, pool, retry_seconds=30):
+        self.pool = pool
+        self.retry_seconds = retry_seconds
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+        self._fallbacks = 0
+
+    def available(self):
+        return time.monotonic() >= self._down_until
+
+    def acquire(self):
+        """Check out a replica connection, or None when reads should go to the primary"""
+        if self.available():
+            try:
+                return self.pool.acquire()
+            except PoolExhaustedError as e:
+                logger.warning(f"Read replica pool exhausted, reading from the primary: {e}")
+            except pyodbc.Error as e:
+                logger.warning(f"Read replica unavailable, reading from the primary for {self.retry_seconds}s: {e}")
+                with self._lock:
+                    self._down_until = time.monotonic() + self.retry_seconds
+        with self._lock:
+            self._fallbacks += 1
+        return None
+
+    def release(self, conn, discard=False):
+        self.pool.release(conn, discard=discard)
+
+    def close(self):
+        self.pool.close()
+
+    def stats(self):
+        """Replica pool counters plus fallbacks to the primary"""
+        snapshot = self.pool.stats()
+        with self._lock:
+            snapshot['fallbacks'] = self._fallbacks
+        snapshot['backing_off'] = 0 if self.available() else 1
+        return snapshot
+
+
+def build_connection_string(config, read_only=False):
+    """Build the SQL Server Authentication connection string from app config (read_only: the read replica)"""
+    # Built from config keys (can't use the Config property in Flask config)
+    conn_str = (
+        f"DRIVER={config['DB_DRIVER']};"
+        f"SERVER={config['DB_READ_SERVER'] if read_only else config['DB_SERVER']};"
+        f"DATABASE={config['DB_NAME']};"
+        f"UID={config['DB_USERNAME']};"
+        f"PWD={config['DB_PASSWORD']};"
+    )
+    if read_only:
+        # An availability group listener routes read-intent connections to a readable secondary
+        conn_str += "ApplicationIntent=ReadOnly;"
+    return conn_str
+
+
+def init_db(app):
+    """Create the application's connection pools and register request teardown"""
+    app.extensions['jit_db_pool'] = ConnectionPool(
+        build_connection_string(app.config),
+        min_size=app.config.get('DB_POOL_MIN_SIZE', 1),
+        max_size=app.config.get('DB_POOL_MAX_SIZE', 10),
+        max_age_seconds=app.config.get('DB_POOL_MAX_AGE_SECONDS', 1800),
+        acquire_timeout=app.config.get('DB_POOL_ACQUIRE_TIMEOUT_SECONDS', 5.0),
+        validate_idle_seconds=app.config.get('DB_POOL_VALIDATE_IDLE_SECONDS', 30.0),
+    )
+    if app.config.get('DB_READ_SERVER'):
+        app.extensions['jit_db_read'] = ReadReplica(
+            ConnectionPool(
+                build_connection_string(app.config, read_only=True),
+                min_size=app.config.get('DB_POOL_MIN_SIZE', 1),
+                max_size=app.config.get('DB_READ_POOL_MAX_SIZE', 10),
+                max_age_seconds=app.config.get('DB_POOL_MAX_AGE_SECONDS', 1800),
+                # Fall back to the primary quickly rather than queue behind a busy replica
+                acquire_timeout=min(app.config.get('DB_POOL_ACQUIRE_TIMEOUT_SECONDS', 5.0), 1.0),
+                validate_idle_seconds=app.config.get('DB_POOL_VALIDATE_IDLE_SECONDS', 30.0),
+            ),
+            retry_seconds=app.config.get('DB_READ_RETRY_SECONDS', 30),
         )
-        g.db = pyodbc.connect(conn_str)
+    app.teardown_appcontext(close_db)
+
+
+def _reads_pinned():
+    """
+    Whether READ statements must go to the primary (read your writes)
+
+    True for the rest of a request that wrote or is not a GET, and for
+    DB_READ_STICKY_SECONDS after the user's last write, so the page a POST
+    redirects to does not show replica data from before the change.
+    """
+    if not has_request_context():
+        return False
+    if request.method not in ('GET', 'HEAD') or g.get('_db_wrote'):
+        return True
+    return session.get('read_primary_until', 0) > time.time()
+
+
+def _note_write():
+    """Pin this user's reads to the primary after a write (see _reads_pinned)"""
+    if not has_request_context():
+        return
+    g._db_wrote = True
+    sticky = current_app.config.get('DB_READ_STICKY_SECONDS', 0)
+    if sticky and 'jit_db_read' in current_app.extensions:
+        session['read_primary_until'] = time.time() + sticky
+
+
+def get_pool():
+    """Return the connection pool owned by the current app"""
+    pool = current_app.extensions.get('jit_db_pool')
+    if pool is None:
+        init_db(current_app)
+        pool = current_app.extensions['jit_db_pool']
+    return pool
+
+
+def _read_connection():
+    """The request's replica connection, or None when this read goes to the primary"""
+    if 'db_read' in g:
+        return g.db_read
+    replica = current_app.extensions.get('jit_db_read')
+    if replica is None or _reads_pinned():
+        return None
+    started = time.monotonic()
+    conn = replica.acquire()
+    if conn is None:
+        return None
+    DB_ACQUIRE_SECONDS.observe(time.monotonic() - started)
+    g.db_read = conn
+    return conn
+
+
+def read_connection_source():
+    """
+    (acquire, release) for a READ connection held outside the request's own (exports)
+
+    acquire() falls back to the primary like get_db_connection(READ) does when the
+    replica is unreachable, exhausted or the request is pinned to the primary;
+    release(conn, discard) returns a connection to whichever pool supplied it.
+    Call it while handling the request, before the response starts streaming.
+    """
+    replica = current_app.extensions.get('jit_db_read')
+    use_replica = replica is not None and not _reads_pinned()
+    primary = get_pool()
+    owners = {}
+
+    def acquire():
+        conn = replica.acquire() if use_replica else None
+        if conn is not None:
+            DB_READS.inc(1, 'replica')
+            owners[id(conn)] = replica
+            return conn
+        if replica is not None:
+            DB_READS.inc(1, 'primary')
+        conn = primary.acquire()
+        owners[id(conn)] = primary
+        return conn
+
+    def release(conn, discard=False):
+        owners.pop(id(conn), primary).release(conn, discard=discard)
+
+    return acquire, release
+
+
+def get_db_connection(intent=PRIMARY):
+    """
+    Get database connection using SQL Server Authentication (service account)
+
+    One primary and at most one replica connection per request; intent=READ uses
+    the replica when available (see PROCEDURE_INTENTS), anything else the primary.
+    """
+    if intent == READ:
+        if not _reads_pinned():
+            conn = _read_connection()
+            if conn is not None:
+                DB_READS.inc(1, 'replica')
+                return conn
+        if 'jit_db_read' in current_app.extensions:
+            DB_READS.inc(1, 'primary')
+    if 'db' not in g:
+        started = time.monotonic()
+        g.db = get_pool().acquire()
+        DB_ACQUIRE_SECONDS.observe(time.monotonic() - started)
     return g.db
 
 def close_db(e=None):
-    """Close database connection"""
+    """Return the request's database connections to their pools"""
+    discard = isinstance(e, pyodbc.Error)
     db = g.pop('db', None)
     if db is not None:
-        db.close()
+        get_pool().release(db, discard=discard)
+    db_read = g.pop('db_read', None)
+    if db_read is not None:
+        current_app.extensions['jit_db_read'].release(db_read, discard=discard)
 
-def execute_procedure(procedure_name, params=None, fetch=True):
+def _check_slow(statement, started, rows=0, params=None):
+    """
+    Record statement metrics and queue a SlowQuery audit event when it ran longer than SLOW_QUERY_MS
+
+    The event carries the statement's fingerprint and the parameter shapes, never the values.
+    """
+    elapsed_ms = record_statement(statement, started, rows, params) * 1000
+    threshold = current_app.config.get('SLOW_QUERY_MS', 0)
+    if threshold and elapsed_ms >= threshold:
+        audit_event('SlowQuery', details={
+            'Statement': ' '.join(statement.split())[:500],
+            'Fingerprint': statement_label(statement),
+            'Params': params_fingerprint(params),
+            'Rows': rows,
+            'DurationMs': round(elapsed_ms, 1),
+        })
+
+def _fetch_rows(cursor):
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def execute_procedure(procedure_name, params=None, fetch=True, result_sets=None, intent=None):
     """
     Execute a stored procedure and return results
     
@@ -33,11 +502,19 @@ def execute_procedure(procedure_name, params=None, fetch=True):
         procedure_name: Name of the stored procedure (e.g., 'jit.sp_User_ResolveCurrentUser')
         params: Dictionary of parameters {param_name: value}
         fetch: Whether to fetch results (for SELECT procedures)
+        result_sets: Names for the procedure's result sets, in order; when given the
+            result sets are returned separately instead of merged into one list
+        intent: READ, PRIMARY or WRITE; defaults to the procedure's PROCEDURE_INTENTS entry
     
     Returns:
-        List of result rows (as dictionaries) if fetch=True, else None
+        fetch=False: None
+        result_sets given: Dictionary {name: list of row dictionaries} (missing sets are empty lists)
+        otherwise: List of result rows (as dictionaries) from all result sets
     """
-    conn = get_db_connection()
+    intent = intent or PROCEDURE_INTENTS.get(procedure_name, WRITE)
+    if intent == WRITE:
+        _note_write()
+    conn = get_db_connection(intent)
     cursor = conn.cursor()
     
     try:
@@ -50,37 +527,34 @@ def execute_procedure(procedure_name, params=None, fetch=True):
             sql = f"EXEC {procedure_name}"
             values = []
         
+        started = time.monotonic()
         cursor.execute(sql, values)
         
-        if fetch:
-            # Check if procedure returns results
-            if cursor.description is None:
-                # Procedure doesn't return results - this is normal for INSERT/UPDATE/DELETE procedures
-                # Commit and return empty list
-                conn.commit()
-                return []
-            
-            # Get column names
-            columns = [column[0] for column in cursor.description]
-            
-            # Fetch all rows
-            rows = cursor.fetchall()
-            
-            # Convert to list of dictionaries
-            results = [dict(zip(columns, row)) for row in rows] if columns else []
-            
-            # Handle output parameters if any
-            while cursor.nextset():
-                if cursor.description:
-                    columns = [column[0] for column in cursor.description]
-                    rows = cursor.fetchall()
-                    results.extend([dict(zip(columns, row)) for row in rows])
-            
-            conn.commit()
-            return results
-        else:
+        if not fetch:
             conn.commit()
+            _check_slow(procedure_name, started, params=params)
             return None
+        
+        # Walk every result set; sets without columns (e.g. row counts) are skipped
+        sets = []
+        while True:
+            if cursor.description is not None:
+                sets.append(_fetch_rows(cursor))
+            if not cursor.nextset():
+                break
+        
+        conn.commit()
+        _check_slow(procedure_name, started, sum(len(rows) for rows in sets), params)
+        
+        if result_sets is not None:
+            if len(sets) > len(result_sets):
+                raise ValueError(
+                    f'{procedure_name} returned {len(sets)} result sets, expected at most {len(result_sets)}'
+                )
+            return {name: sets[i] if i < len(sets) else [] for i, name in enumerate(result_sets)}
+        
+        # Procedures that don't return results (INSERT/UPDATE/DELETE) give an empty list
+        return [row for rows in sets for row in rows]
             
     except Exception as e:
         conn.rollback()
@@ -88,21 +562,25 @@ def execute_procedure(procedure_name, params=None, fetch=True):
     finally:
         cursor.close()
 
-def execute_query(query, params=None):
+def execute_query(query, params=None, intent=PRIMARY):
     """
     Execute a SQL query and return results
     
     Args:
         query: SQL query string
         params: List of parameters for parameterized query
+        intent: READ for reads that tolerate replica lag, WRITE for statements that change data
     
     Returns:
         List of result rows (as dictionaries)
     """
-    conn = get_db_connection()
+    if intent == WRITE:
+        _note_write()
+    conn = get_db_connection(intent)
     cursor = conn.cursor()
     
     try:
+        started = time.monotonic()
         if params:
             cursor.execute(query, params)
         else:
@@ -113,6 +591,7 @@ def execute_query(query, params=None):
         results = [dict(zip(columns, row)) for row in rows] if columns else []
         
         conn.commit()
+        _check_slow(query, started, len(results), params)
         return results
     except Exception as e:
         conn.rollback()
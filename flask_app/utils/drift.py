@@ -0,0 +1,349 @@
+"""
+Drift detection and reconciliation for JIT-managed DB roles
+
+Compares the actual role memberships in every database with JIT-managed roles
+(jit.DB_Roles.IsJitManaged = 1) against the memberships active grants imply
+(jit.vw_Drift_ExpectedMembers):
+
+1. Probe: each target database is read concurrently on its own pooled connection.
+   The target first returns a SHA-256 of its managed-role memberships; the rows
+   themselves are only read (into jit.Drift_Observed_Members) when that hash or
+   the expected state changed since the last run, or when a full run is asked for.
+2. Diff: jit.sp_Drift_Detect diffs all re-read databases in one set-based pass and
+   records Missing/Orphaned findings in jit.Drift_Findings.
+3. Repair (optional): findings are fixed with ALTER ROLE ADD/DROP MEMBER, again one
+   task per database, and recorded in Drift_Findings, Grant_DBRole_Assignments and
+   AuditLog. Repaired databases are rechecked on the next run.
+"""
+import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+ACTOR = 'System'
+
+REPAIR_MODES = ('missing', 'orphaned', 'all')
+
+_LOAD_DATABASES_SQL = """
+    SELECT dbr.DatabaseName, dbr.DbRoleName, s.MembershipHash,
+           CASE WHEN s.DatabaseName IS NOT NULL AND s.LastError IS NULL
+                AND (s.ExpectedHash = es.ExpectedHash OR (s.ExpectedHash IS NULL AND es.ExpectedHash IS NULL))
+                THEN 1 ELSE 0 END AS ExpectedUnchanged
+    FROM jit.DB_Roles dbr
+    LEFT JOIN jit.Drift_Database_State s ON s.DatabaseName = dbr.DatabaseName
+    LEFT JOIN jit.vw_Drift_ExpectedState es ON es.DatabaseName = dbr.DatabaseName
+    WHERE dbr.IsJitManaged = 1
+    ORDER BY dbr.DatabaseName, dbr.DbRoleName
+"""
+
+# Runs in the JIT database against three-part names, so the pooled connection's
+# database context never changes. Membership rows are only returned when the
+# hash differs from @Known (NULL forces them).
+_PROBE_SQL = """
+    SET NOCOUNT ON;
+    DECLARE @Known BINARY(32) = CONVERT(BINARY(32), ?, 2);
+    DECLARE @Hash BINARY(32);
+    DECLARE @Count INT;
+    SELECT
+        @Count = COUNT(*),
+        @Hash = CAST(HASHBYTES('SHA2_256',
+            STRING_AGG(CAST(r.name AS NVARCHAR(MAX)) + NCHAR(31) + m.name, NCHAR(30))
+                WITHIN GROUP (ORDER BY r.name, m.name)
+        ) AS BINARY(32))
+    FROM {db}.sys.database_role_members drm
+    INNER JOIN {db}.sys.database_principals r ON r.principal_id = drm.role_principal_id
+    INNER JOIN {db}.sys.database_principals m ON m.principal_id = drm.member_principal_id
+    WHERE r.name IN ({roles});
+    SELECT @Hash AS MembershipHash, @Count AS MemberCount;
+    IF @Known IS NULL OR @Hash IS NULL OR @Hash <> @Known
+        SELECT r.name AS DbRoleName, m.name AS MemberName
+        FROM {db}.sys.database_role_members drm
+        INNER JOIN {db}.sys.database_principals r ON r.principal_id = drm.role_principal_id
+        INNER JOIN {db}.sys.database_principals m ON m.principal_id = drm.member_principal_id
+        WHERE r.name IN ({roles});
+"""
+
+_INSERT_OBSERVED_SQL = """
+    INSERT INTO jit.Drift_Observed_Members (DatabaseName, DbRoleName, MemberName)
+    VALUES (?, ?, ?)
+"""
+
+_REPAIR_SQL = {
+    'Missing': """
+        DECLARE @Sql NVARCHAR(MAX) =
+            N'USE ' + QUOTENAME(?) + N'; ' +
+            N'ALTER ROLE ' + QUOTENAME(?) + N' ADD MEMBER ' + QUOTENAME(?);
+        EXEC sp_executesql @Sql;
+    """,
+    'Orphaned': """
+        DECLARE @Sql NVARCHAR(MAX) =
+            N'USE ' + QUOTENAME(?) + N'; ' +
+            N'ALTER ROLE ' + QUOTENAME(?) + N' DROP MEMBER ' + QUOTENAME(?);
+        EXEC sp_executesql @Sql;
+    """,
+}
+
+
+def _utcnow():
+    """Naive UTC timestamp, comparable with DATETIME2 values read from SQL Server"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _json_str(value):
+    """Escape a value for embedding in the hand-built DetailsJson strings"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def quote_name(name):
+    """T-SQL QUOTENAME for identifiers built into statement text"""
+    return '[' + name.replace(']', ']]') + ']'
+
+
+def _rows(cursor):
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+class DriftReconciler:
+    """
+    One drift detection (and optional repair) pass over all JIT-managed databases
+
+    Args:
+        pool: utils.db.ConnectionPool (one connection per worker thread plus one)
+        max_workers: Target databases probed / repaired concurrently
+        batch_size: Observed membership rows per fast_executemany insert
+    """
+
+    def __init__(self, pool, max_workers=8, batch_size=1000):
+        self.pool = pool
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+
+    # ---- probe ------------------------------------------------------------
+
+    def _load_databases(self):
+        """{DatabaseName: {'roles': [...], 'known_hash': bytes or None, 'expected_unchanged': bool}}"""
+        databases = {}
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(_LOAD_DATABASES_SQL)
+                for database_name, role_name, membership_hash, expected_unchanged in cursor.fetchall():
+                    database = databases.setdefault(database_name, {
+                        'roles': [],
+                        'known_hash': membership_hash,
+                        'expected_unchanged': bool(expected_unchanged),
+                    })
+                    database['roles'].append(role_name)
+            finally:
+                cursor.close()
+        finally:
+            self.pool.release(conn)
+        return databases
+
+    def _probe(self, database_name, database, full):
+        """Read one target database; returns a jit.DriftCheckList row as a dict"""
+        known = database['known_hash']
+        if full or not database['expected_unchanged'] or known is None:
+            known = None
+        roles = database['roles']
+        sql = _PROBE_SQL.format(db=quote_name(database_name), roles=', '.join('?' * len(roles)))
+        params = [known.hex() if known is not None else None] + roles + roles
+
+        check = {'DatabaseName': database_name, 'Status': 'Unchanged', 'MembershipHash': None,
+                 'MemberCount': None, 'Error': None}
+        conn = self.pool.acquire()
+        discard = False
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql, params)
+                membership_hash, member_count = cursor.fetchone()
+                check['MembershipHash'] = membership_hash
+                check['MemberCount'] = member_count
+                if cursor.nextset():
+                    members = cursor.fetchall()
+                    cursor.execute("DELETE FROM jit.Drift_Observed_Members WHERE DatabaseName = ?", [database_name])
+                    if members:
+                        cursor.fast_executemany = True
+                        for start in range(0, len(members), self.batch_size):
+                            cursor.executemany(_INSERT_OBSERVED_SQL, [
+                                (database_name, role_name, member_name)
+                                for role_name, member_name in members[start:start + self.batch_size]
+                            ])
+                    conn.commit()
+                    check['Status'] = 'Checked'
+            except Exception as e:
+                try:
+                    conn.rollback()
+                except Exception:
+                    discard = True
+                logger.warning(f"Drift probe of {database_name} failed: {e}")
+                check.update(Status='Failed', MembershipHash=None, MemberCount=None, Error=str(e))
+            finally:
+                cursor.close()
+        finally:
+            self.pool.release(conn, discard=discard)
+        return check
+
+    # ---- diff -------------------------------------------------------------
+
+    def _detect(self, checks):
+        """Run jit.sp_Drift_Detect; returns (per-database rows, open findings)"""
+        rows = [(c['DatabaseName'], c['Status'], c['MembershipHash'], c['MemberCount'], c['Error'])
+                for c in checks]
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            try:
+                # pyodbc sends a list of row tuples as a TVP; type name and schema come first
+                cursor.execute("EXEC jit.sp_Drift_Detect @Checks = ?", [['DriftCheckList', 'jit'] + rows])
+                databases = _rows(cursor)
+                findings = _rows(cursor) if cursor.nextset() else []
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        finally:
+            self.pool.release(conn)
+        return databases, findings
+
+    # ---- repair -----------------------------------------------------------
+
+    def _repair_database(self, database_name, findings):
+        """Apply ALTER ROLE for one target database; records the outcome on each finding"""
+        conn = self.pool.acquire()
+        discard = False
+        try:
+            cursor = conn.cursor()
+            try:
+                for finding in findings:
+                    finding['RepairAttemptUtc'] = _utcnow()
+                    try:
+                        cursor.execute(_REPAIR_SQL[finding['DriftType']],
+                                       [database_name, finding['DbRoleName'], finding['MemberName']])
+                        conn.commit()
+                        finding['RepairSucceeded'] = True
+                        finding['RepairError'] = None
+                    except Exception as e:
+                        try:
+                            conn.rollback()
+                        except Exception:
+                            discard = True
+                        finding['RepairSucceeded'] = False
+                        finding['RepairError'] = str(e)
+            finally:
+                cursor.close()
+        finally:
+            self.pool.release(conn, discard=discard)
+        return findings
+
+    def _record_repairs(self, findings):
+        """Write repair outcomes, fixed assignments and audit rows in one transaction"""
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.executemany(
+                    """
+                    UPDATE jit.Drift_Findings
+                    SET RepairAttemptUtc = ?, RepairSucceeded = ?, RepairError = ?
+                    WHERE FindingId = ?
+                    """,
+                    [(f['RepairAttemptUtc'], f['RepairSucceeded'], f['RepairError'], f['FindingId']) for f in findings]
+                )
+                restored = [f for f in findings
+                            if f['RepairSucceeded'] and f['DriftType'] == 'Missing' and f.get('GrantId') is not None]
+                if restored:
+                    cursor.executemany(
+                        """
+                        UPDATE jit.Grant_DBRole_Assignments
+                        SET AddAttemptUtc = ?, AddSucceeded = 1, AddError = NULL
+                        WHERE GrantId = ? AND DbRoleId = ?
+                        """,
+                        [(f['RepairAttemptUtc'], f['GrantId'], f['DbRoleId']) for f in restored]
+                    )
+                cursor.executemany(
+                    """
+                    INSERT INTO jit.AuditLog (EventType, ActorLoginName, TargetUserId, GrantId, DetailsJson)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    [('DriftRepaired' if f['RepairSucceeded'] else 'DriftRepairError', ACTOR, f.get('UserId'),
+                      f.get('GrantId'),
+                      '{"DatabaseName":"%s","DbRoleName":"%s","MemberName":"%s","DriftType":"%s"%s}' % (
+                          _json_str(f['DatabaseName']), _json_str(f['DbRoleName']), _json_str(f['MemberName']),
+                          f['DriftType'],
+                          '' if f['RepairSucceeded'] else ',"Error":"%s"' % _json_str(f['RepairError'])))
+                     for f in findings]
+                )
+                # The next run re-reads these databases to confirm the repairs
+                cursor.executemany(
+                    "UPDATE jit.Drift_Database_State SET MembershipHash = NULL WHERE DatabaseName = ?",
+                    [(name,) for name in sorted({f['DatabaseName'] for f in findings})]
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        finally:
+            self.pool.release(conn)
+
+    # ---- run --------------------------------------------------------------
+
+    def run(self, full=False, repair=None):
+        """
+        Probe every JIT-managed database, diff, and optionally repair
+
+        Args:
+            full: Re-read every database even when its hashes are unchanged
+            repair: None, 'missing', 'orphaned' or 'all'
+
+        Returns:
+            Dictionary with per-database rows, open findings, repaired findings
+            and milliseconds per phase
+        """
+        if repair is not None and repair not in REPAIR_MODES:
+            raise ValueError(f'Unknown repair mode: {repair}')
+        timings = {}
+        started = time.monotonic()
+        databases = self._load_databases()
+        timings['load_ms'] = (time.monotonic() - started) * 1000
+        if not databases:
+            return {'databases': [], 'findings': [], 'repaired': [], 'timings': timings}
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='jit-drift') as executor:
+            futures = [executor.submit(self._probe, name, database, full) for name, database in databases.items()]
+            checks = [future.result() for future in futures]
+        timings['probe_ms'] = (time.monotonic() - started) * 1000
+
+        started = time.monotonic()
+        database_rows, findings = self._detect(checks)
+        timings['diff_ms'] = (time.monotonic() - started) * 1000
+
+        repaired = []
+        if repair:
+            types = {'missing': ('Missing',), 'orphaned': ('Orphaned',), 'all': ('Missing', 'Orphaned')}[repair]
+            by_database = defaultdict(list)
+            for finding in findings:
+                if finding['DriftType'] in types:
+                    by_database[finding['DatabaseName']].append(dict(finding))
+            started = time.monotonic()
+            if by_database:
+                with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='jit-drift') as executor:
+                    futures = [executor.submit(self._repair_database, name, items)
+                               for name, items in by_database.items()]
+                    for future in futures:
+                        repaired.extend(future.result())
+                self._record_repairs(repaired)
+            timings['repair_ms'] = (time.monotonic() - started) * 1000
+
+        return {'databases': database_rows, 'findings': findings, 'repaired': repaired, 'timings': timings}
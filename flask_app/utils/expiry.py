@@ -0,0 +1,377 @@
+"""
+Grant expiry worker for JIT Access Framework
+
+Keeps a due-time priority queue of active grants and revokes each one as soon as
+its ValidToUtc passes, instead of waiting for the next sp_Job_ExpireGrants run.
+Role drops run on a thread pool partitioned by DB_Roles.DatabaseName and are
+recorded in Grant_DBRole_Assignments/AuditLog exactly like jit.sp_Grant_Expire.
+The SQL Agent job can keep running as a safety net: grant status is only changed
+while still 'Active', so whichever side gets there first wins.
+"""
+import heapq
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+ACTOR = 'System'
+
+# Delay before re-checking grants the database did not yet consider expired
+RETRY_SECONDS = 2
+
+# SQL Server allows 2100 parameters per statement
+_ID_CHUNK = 500
+
+_LOAD_DUE_SQL = """
+    SELECT GrantId, ValidToUtc
+    FROM jit.Grants
+    WHERE Status = 'Active'
+    AND ValidToUtc < DATEADD(SECOND, ?, GETUTCDATE())
+"""
+
+# Only grants the database itself considers expired are processed, so a fast
+# local clock can never revoke early
+# Every requested grant that is still active; role assignments only for those already due
+_LOAD_DROPS_SQL = """
+    SELECT g.GrantId, g.UserId, g.ValidToUtc, u.LoginName, due.IsDue,
+           dbr.DbRoleId, dbr.DatabaseName, dbr.DbRoleName
+    FROM jit.Grants g
+    INNER JOIN jit.Users u ON g.UserId = u.UserId
+    CROSS APPLY (SELECT CASE WHEN g.ValidToUtc < GETUTCDATE() THEN 1 ELSE 0 END AS IsDue) due
+    LEFT JOIN jit.Grant_DBRole_Assignments gdba
+        ON due.IsDue = 1 AND gdba.GrantId = g.GrantId AND gdba.AddSucceeded = 1
+    LEFT JOIN jit.DB_Roles dbr ON gdba.DbRoleId = dbr.DbRoleId
+    WHERE g.GrantId IN ({placeholders})
+    AND g.Status = 'Active'
+"""
+
+_DROP_MEMBER_SQL = """
+    DECLARE @Sql NVARCHAR(MAX) =
+        N'USE ' + QUOTENAME(?) + N'; ' +
+        N'ALTER ROLE ' + QUOTENAME(?) + N' DROP MEMBER ' + QUOTENAME(?);
+    EXEC sp_executesql @Sql;
+"""
+
+
+def _utcnow():
+    """Naive UTC timestamp, comparable with DATETIME2 values read from SQL Server"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _json_str(value):
+    """Escape a value for embedding in the hand-built DetailsJson strings"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r')
+
+
+class ExpiryWorker:
+    """
+    Long-running grant expiry loop
+
+    Args:
+        pool: utils.db.ConnectionPool owned by the worker process
+        max_workers: Threads used for role drops (one task per target database)
+        refresh_seconds: How often the due queue is reloaded from jit.Grants
+                         (picks up new, extended and revoked grants)
+        batch_size: Maximum grants revoked per wake-up
+    """
+
+    def __init__(self, pool, max_workers=4, refresh_seconds=60, batch_size=500):
+        self.pool = pool
+        self.refresh_seconds = refresh_seconds
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='jit-expiry')
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        # Heap of (ValidToUtc, GrantId); _due holds the current ValidToUtc per grant so
+        # entries superseded by a reload are skipped lazily
+        self._heap = []
+        self._due = {}
+        self._next_refresh = 0.0
+        self._stats = {
+            'refreshes': 0,
+            'batches': 0,
+            'grants_expired': 0,
+            'role_drops': 0,
+            'role_drop_failures': 0,
+            'errors': 0,
+            'lag_seconds_total': 0.0,
+            'lag_seconds_max': 0.0,
+            'lag_seconds_last': None,
+        }
+
+    # ---- queue ------------------------------------------------------------
+
+    def refresh(self):
+        """Reload active grants due before the next refresh into the queue"""
+        horizon = int(self.refresh_seconds * 2)
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(_LOAD_DUE_SQL, [horizon])
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        finally:
+            self.pool.release(conn)
+
+        due = {row[0]: row[1] for row in rows}
+        with self._lock:
+            self._due = due
+            self._heap = [(valid_to, grant_id) for grant_id, valid_to in due.items()]
+            heapq.heapify(self._heap)
+            self._stats['refreshes'] += 1
+        self._next_refresh = time.monotonic() + self.refresh_seconds
+
+    def _pop_due(self, now):
+        """Pop up to batch_size grant ids whose ValidToUtc has passed"""
+        grant_ids = []
+        with self._lock:
+            while self._heap and len(grant_ids) < self.batch_size:
+                valid_to, grant_id = self._heap[0]
+                if self._due.get(grant_id) != valid_to:
+                    heapq.heappop(self._heap)
+                    continue
+                if valid_to > now:
+                    break
+                heapq.heappop(self._heap)
+                del self._due[grant_id]
+                grant_ids.append(grant_id)
+        return grant_ids
+
+    def _requeue(self, grant_ids, due_at):
+        """Push grants back onto the queue (e.g. not yet expired by the database clock)"""
+        with self._lock:
+            for grant_id in grant_ids:
+                self._due[grant_id] = due_at
+                heapq.heappush(self._heap, (due_at, grant_id))
+
+    def _seconds_until_next(self, now):
+        with self._lock:
+            while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            next_due = self._heap[0][0] if self._heap else None
+        until_refresh = max(0.0, self._next_refresh - time.monotonic())
+        if next_due is None:
+            return until_refresh
+        return max(0.0, min(until_refresh, (next_due - now).total_seconds()))
+
+    # ---- revocation -------------------------------------------------------
+
+    def _load_drops(self, grant_ids):
+        """
+        Return {GrantId: grant row} and [drop rows] for grants still active and expired,
+        plus the ids of grants still active but not yet due by the database clock
+        """
+        grants = {}
+        drops = []
+        not_due = []
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            try:
+                for start in range(0, len(grant_ids), _ID_CHUNK):
+                    chunk = grant_ids[start:start + _ID_CHUNK]
+                    cursor.execute(_LOAD_DROPS_SQL.format(placeholders=', '.join('?' * len(chunk))), chunk)
+                    for (grant_id, user_id, valid_to, login_name, is_due,
+                         db_role_id, database_name, db_role_name) in cursor.fetchall():
+                        if not is_due:
+                            not_due.append(grant_id)
+                            continue
+                        grants[grant_id] = {'GrantId': grant_id, 'UserId': user_id, 'ValidToUtc': valid_to}
+                        if db_role_id is not None:
+                            drops.append({
+                                'GrantId': grant_id,
+                                'UserId': user_id,
+                                'LoginName': login_name,
+                                'DbRoleId': db_role_id,
+                                'DatabaseName': database_name,
+                                'DbRoleName': db_role_name,
+                            })
+            finally:
+                cursor.close()
+        finally:
+            self.pool.release(conn)
+        return grants, drops, not_due
+
+    def _drop_database_members(self, database_name, drops):
+        """Remove memberships in one target database; records the outcome on each drop"""
+        conn = self.pool.acquire()
+        discard = False
+        try:
+            cursor = conn.cursor()
+            try:
+                for drop in drops:
+                    drop['DropAttemptUtc'] = _utcnow()
+                    try:
+                        cursor.execute(_DROP_MEMBER_SQL, [database_name, drop['DbRoleName'], drop['LoginName']])
+                        conn.commit()
+                        drop['DropSucceeded'] = True
+                        drop['DropError'] = None
+                    except Exception as e:
+                        try:
+                            conn.rollback()
+                        except Exception:
+                            discard = True
+                        drop['DropSucceeded'] = False
+                        drop['DropError'] = str(e)
+            finally:
+                cursor.close()
+        finally:
+            self.pool.release(conn, discard=discard)
+        return drops
+
+    def _record(self, grants, drops):
+        """Write drop outcomes, grant status and audit rows in one transaction; returns expired grant ids"""
+        expired = []
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            try:
+                if drops:
+                    cursor.executemany(
+                        """
+                        UPDATE jit.Grant_DBRole_Assignments
+                        SET DropAttemptUtc = ?, DropSucceeded = ?, DropError = ?
+                        WHERE GrantId = ? AND DbRoleId = ?
+                        """,
+                        [(d['DropAttemptUtc'], d['DropSucceeded'], d['DropError'], d['GrantId'], d['DbRoleId'])
+                         for d in drops]
+                    )
+                failures = [d for d in drops if not d['DropSucceeded']]
+                if failures:
+                    cursor.executemany(
+                        """
+                        INSERT INTO jit.AuditLog (EventType, ActorLoginName, TargetUserId, GrantId, DetailsJson)
+                        VALUES ('RoleDropError', ?, ?, ?, ?)
+                        """,
+                        [(ACTOR, d['UserId'], d['GrantId'],
+                          '{"DatabaseName":"%s","DbRoleName":"%s","Error":"%s"}' % (
+                              _json_str(d['DatabaseName']), _json_str(d['DbRoleName']), _json_str(d['DropError'])))
+                         for d in failures]
+                    )
+                for grant_id, grant in grants.items():
+                    cursor.execute(
+                        "UPDATE jit.Grants SET Status = 'Expired' WHERE GrantId = ? AND Status = 'Active'",
+                        [grant_id]
+                    )
+                    if cursor.rowcount == 1:
+                        expired.append(grant_id)
+                if expired:
+                    cursor.executemany(
+                        """
+                        INSERT INTO jit.AuditLog (EventType, ActorLoginName, TargetUserId, GrantId, DetailsJson)
+                        VALUES ('GrantExpired', ?, ?, ?, '{}')
+                        """,
+                        [(ACTOR, grants[grant_id]['UserId'], grant_id) for grant_id in expired]
+                    )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        finally:
+            self.pool.release(conn)
+        return expired
+
+    def expire(self, grant_ids):
+        """
+        Revoke the given grants
+
+        Returns:
+            Number of grants moved from Active to Expired
+        """
+        grants, drops, not_due = self._load_drops(grant_ids)
+        # Active but not yet due by the database clock: retry shortly. Grants that are no
+        # longer active were revoked/expired elsewhere and are simply dropped from the queue
+        if not_due:
+            self._requeue(not_due, _utcnow() + timedelta(seconds=RETRY_SECONDS))
+        if not grants:
+            return 0
+
+        by_database = defaultdict(list)
+        for drop in drops:
+            by_database[drop['DatabaseName']].append(drop)
+        futures = [self._executor.submit(self._drop_database_members, name, items)
+                   for name, items in by_database.items()]
+        for future in futures:
+            future.result()
+
+        expired = self._record(grants, drops)
+
+        now = _utcnow()
+        lags = [(now - grants[grant_id]['ValidToUtc']).total_seconds() for grant_id in expired]
+        failed = sum(1 for d in drops if not d['DropSucceeded'])
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['grants_expired'] += len(expired)
+            self._stats['role_drops'] += len(drops)
+            self._stats['role_drop_failures'] += failed
+            if lags:
+                self._stats['lag_seconds_total'] += sum(lags)
+                self._stats['lag_seconds_max'] = max(self._stats['lag_seconds_max'], max(lags))
+                self._stats['lag_seconds_last'] = lags[-1]
+        if expired:
+            logger.info(f"Expired {len(expired)} grant(s) across {len(by_database)} database(s); "
+                        f"{failed} role drop failure(s); max lag {max(lags):.1f}s")
+        return len(expired)
+
+    # ---- lifecycle --------------------------------------------------------
+
+    def run_once(self):
+        """Reload the queue if due, then revoke everything that has expired"""
+        if time.monotonic() >= self._next_refresh:
+            self.refresh()
+        while not self._stop.is_set():
+            grant_ids = self._pop_due(_utcnow())
+            if not grant_ids:
+                break
+            self.expire(grant_ids)
+
+    def run_forever(self):
+        """Loop until stop() is called, sleeping until the next expiry or refresh"""
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                with self._lock:
+                    self._stats['errors'] += 1
+                logger.error(f"Expiry worker iteration failed: {e}")
+                # Back off and reload from the database on the next pass
+                self._next_refresh = 0.0
+                self._stop.wait(min(self.refresh_seconds, 30))
+                continue
+            self._stop.wait(self._seconds_until_next(_utcnow()))
+
+    def start(self):
+        """Run the loop on a background daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name='jit-expiry-worker', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the loop and wait for in-flight revocations"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._executor.shutdown(wait=True)
+
+    def stats(self):
+        """Snapshot of worker counters plus queue and revocation-lag gauges"""
+        now = _utcnow()
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['queue_size'] = len(self._due)
+            next_due = min(self._due.values()) if self._due else None
+        snapshot['next_due_in_seconds'] = (next_due - now).total_seconds() if next_due else None
+        snapshot['lag_seconds_avg'] = (
+            snapshot['lag_seconds_total'] / snapshot['grants_expired'] if snapshot['grants_expired'] else None
+        )
+        return snapshot
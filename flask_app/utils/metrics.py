@@ -0,0 +1,275 @@
+"""
+In-process metrics for JIT Access Framework, exposed in Prometheus text format
+
+Per-route request latency, per-statement database latency and rows fetched,
+database round trips per request and connection-acquire time. Everything lives
+in this process (one registry per Waitress process); /metrics renders it along
+with connection pool and audit writer gauges read at scrape time.
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+
+from flask import Response, current_app, g, has_request_context, request
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger('jit.slow_query')
+
+# Seconds; covers sub-millisecond identity cache hits up to multi-second reports
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ROUND_TRIP_BUCKETS = (0, 1, 2, 3, 4, 5, 8, 12, 20, 50)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_labels(self.label_names, k)} {_number(v)}' for k, v in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self):
+        """{label values: (count, sum)} for every series"""
+        with self._lock:
+            return {k: (v[2], v[1]) for k, v in self._series.items()}
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._series.items())
+        lines = []
+        for label_values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = 'le="%s"' % _number(float(bound))
+                lines.append(f'{self.name}_bucket{_labels(self.label_names, label_values, le)} {cumulative}')
+            inf = 'le="+Inf"'
+            lines.append(f'{self.name}_bucket{_labels(self.label_names, label_values, inf)} {count}')
+            lines.append(f'{self.name}_sum{_labels(self.label_names, label_values)} {_number(round(total, 6))}')
+            lines.append(f'{self.name}_count{_labels(self.label_names, label_values)} {count}')
+        return lines
+
+
+class Registry:
+    """Ordered collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.render())
+        return lines
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'jit_http_request_duration_seconds', 'Request latency by route', ('route', 'method', 'status')))
+HTTP_DB_ROUND_TRIPS = REGISTRY.register(Histogram(
+    'jit_http_request_db_round_trips', 'Database statements executed per request', ('route',),
+    buckets=ROUND_TRIP_BUCKETS))
+DB_STATEMENT_SECONDS = REGISTRY.register(Histogram(
+    'jit_db_statement_duration_seconds', 'Statement latency including fetch, by procedure or query fingerprint',
+    ('statement',)))
+DB_ROWS_FETCHED = REGISTRY.register(Counter(
+    'jit_db_rows_fetched_total', 'Rows fetched, by procedure or query fingerprint', ('statement',)))
+DB_ACQUIRE_SECONDS = REGISTRY.register(Histogram(
+    'jit_db_pool_acquire_duration_seconds', 'Time to check a connection out of the pool'))
+DB_READS = REGISTRY.register(Counter(
+    'jit_db_reads_total', 'Replica-eligible reads by where they ran (only counted with a read replica)',
+    ('target',)))
+
+
+_LITERALS = re.compile(r"N?'(?:[^']|'')*'|\b\d+\b")
+
+
+def statement_label(statement):
+    """
+    Bounded label for a statement: procedure names as-is, ad hoc SQL as 'sql:<hash>'
+
+    Literals are stripped before hashing so queries that differ only by inlined
+    values share a fingerprint.
+    """
+    if ' ' not in statement.strip():
+        return statement
+    normalized = _LITERALS.sub('?', ' '.join(statement.split()))
+    return 'sql:' + hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:10]
+
+
+def params_fingerprint(params):
+    """Shape of the bound parameters (names, types and lengths, never values)"""
+    if not params:
+        return ''
+    if isinstance(params, dict):
+        items = params.items()
+    else:
+        items = ((f'p{i + 1}', v) for i, v in enumerate(params))
+    parts = []
+    for name, value in items:
+        kind = type(value).__name__
+        if isinstance(value, (str, bytes, bytearray)):
+            kind += f'({len(value)})'
+        parts.append(f'{name}:{kind}')
+    return ','.join(parts)
+
+
+def record_statement(statement, started, rows=0, params=None):
+    """
+    Record one database round trip: latency histogram, rows fetched, the
+    current request's round-trip count and, above SLOW_QUERY_MS, the slow-query log
+
+    Returns:
+        Elapsed seconds
+    """
+    elapsed = time.monotonic() - started
+    label = statement_label(statement)
+    DB_STATEMENT_SECONDS.observe(elapsed, label)
+    if rows:
+        DB_ROWS_FETCHED.inc(rows, label)
+    if has_request_context():
+        g._metrics_round_trips = g.get('_metrics_round_trips', 0) + 1
+        threshold = current_app.config.get('SLOW_QUERY_MS', 0)
+        if threshold and elapsed * 1000 >= threshold and current_app.config.get('SLOW_QUERY_LOG', False):
+            slow_query_logger.warning(
+                f"slow statement {label} {elapsed * 1000:.1f}ms rows={rows} "
+                f"params=[{params_fingerprint(params)}] route={_route()} sql={' '.join(statement.split())[:300]}"
+            )
+    return elapsed
+
+
+def _route():
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+
+def _start_timer():
+    g._metrics_started = time.monotonic()
+
+
+def _observe_request(response):
+    started = g.get('_metrics_started')
+    if started is not None and request.endpoint not in ('static', 'metrics'):
+        route = _route()
+        HTTP_REQUEST_SECONDS.observe(time.monotonic() - started, route, request.method, response.status_code)
+        HTTP_DB_ROUND_TRIPS.observe(g.get('_metrics_round_trips', 0), route)
+    return response
+
+
+def _gauge_lines(name, help_text, values):
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+    lines.extend(f'{name}{_labels(("stat",), (k,))} {_number(v)}' for k, v in sorted(values.items())
+                 if isinstance(v, (int, float)) and not isinstance(v, bool))
+    return lines
+
+
+def render_metrics(app):
+    """Prometheus text exposition of the registry plus pool and audit writer stats"""
+    lines = REGISTRY.render()
+    pool = app.extensions.get('jit_db_pool')
+    if pool is not None:
+        lines.extend(_gauge_lines('jit_db_pool', 'Connection pool counters and gauges', pool.stats()))
+    replica = app.extensions.get('jit_db_read')
+    if replica is not None:
+        lines.extend(_gauge_lines('jit_db_read_pool', 'Read replica pool counters and fallbacks to the primary',
+                                  replica.stats()))
+    writer = app.extensions.get('jit_audit')
+    if writer is not None:
+        lines.extend(_gauge_lines('jit_audit_writer', 'Audit writer counters and queue depth', writer.stats()))
+    sessions = app.extensions.get('jit_sessions')
+    if sessions is not None:
+        lines.extend(_gauge_lines('jit_sessions', 'Server-side session store size and evictions', sessions.stats()))
+    return '\n'.join(lines) + '\n'
+
+
+def init_metrics(app):
+    """
+    Register request timing and the /metrics endpoint (METRICS_ENABLED)
+
+    With METRICS_TOKEN set, scrapers authenticate with a bearer token; without one,
+    /metrics is only served to signed-in admins, never anonymously.
+    """
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    app.before_request(_start_timer)
+    app.after_request(_observe_request)
+    token = app.config.get('METRICS_TOKEN')
+
+    def metrics():
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        return Response(render_metrics(app), mimetype='text/plain; version=0.0.4')
+
+    if not token:
+        # Imported here: utils.auth depends on this module
+        from .auth import admin_required
+        metrics = admin_required(metrics)
+
+    app.add_url_rule('/metrics', 'metrics', metrics)
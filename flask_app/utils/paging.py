@@ -0,0 +1,204 @@
+"""
+Keyset pagination for admin listings
+
+Each listing selects an explicit column list and pages with a seek predicate on
+its sort columns plus a unique key, so page N costs the same as page 1 no matter
+how large the table grows (no OFFSET, no COUNT(*), no SELECT *).
+"""
+import base64
+import binascii
+import datetime
+import decimal
+import json
+
+from utils.db import READ, execute_query
+
+
+class Listing:
+    """
+    Keyset-paginated listing over one table or join
+
+    Args:
+        source: FROM clause, e.g. 'jit.Users u'
+        columns: Explicit select list (expressions, optionally aliased)
+        key: Unique tie-breaker as (expression, 'ASC'|'DESC')
+        sorts: {name: [(expression, 'ASC'|'DESC'), ...]} - expressions must be
+            non-null strings or integers so cursor values round-trip through JSON;
+            an empty list sorts by key alone
+        default_sort: Key of sorts used when the request does not choose one
+        filters: {arg name: (predicate with one ?, converter)}
+        search: Expressions matched by prefix against the 'q' argument
+    """
+
+    def __init__(self, source, columns, key, sorts, default_sort, filters=None, search=None):
+        self.source = source
+        self.columns = columns
+        self.key = key
+        self.sorts = sorts
+        self.default_sort = default_sort
+        self.filters = filters or {}
+        self.search = search or []
+
+    def _order(self, sort, direction):
+        """Sort columns plus key, flipped when direction differs from the sort's natural direction"""
+        order = self.sorts[sort] + [self.key]
+        if direction != order[0][1]:
+            order = [(expr, 'ASC' if d == 'DESC' else 'DESC') for expr, d in order]
+        return order
+
+    def _where(self, args):
+        clauses, params = filter_clauses(self.filters, args)
+
+        q = args.get('q', '').strip()
+        if q and self.search:
+            pattern = _escape_like(q) + '%'
+            clauses.append('(' + ' OR '.join(f'{expr} LIKE ?' for expr in self.search) + ')')
+            params.extend([pattern] * len(self.search))
+        return clauses, params
+
+    def page(self, args, page_size=50, max_page_size=200):
+        """
+        Fetch one page
+
+        Args:
+            args: Request arguments (sort, dir, cursor, limit, q and the listing's filters)
+            page_size: Rows returned when the request does not pass limit
+            max_page_size: Upper bound for limit
+
+        Returns:
+            Dictionary with items, next_cursor (None on the last page), sort and dir
+
+        Raises:
+            ValueError: Unknown sort, bad limit/filter value or a cursor from another sort
+        """
+        sort = args.get('sort') or self.default_sort
+        if sort not in self.sorts:
+            raise ValueError(f'Unknown sort: {sort}')
+        direction = (args.get('dir') or (self.sorts[sort] + [self.key])[0][1]).upper()
+        if direction not in ('ASC', 'DESC'):
+            raise ValueError(f'Unknown sort direction: {direction}')
+        try:
+            limit = int(args.get('limit') or page_size)
+        except ValueError:
+            raise ValueError(f"Invalid limit: {args.get('limit')}")
+        limit = max(1, min(limit, max_page_size))
+
+        order = self._order(sort, direction)
+        clauses, params = self._where(args)
+
+        cursor = args.get('cursor')
+        if cursor:
+            values = _decode_cursor(cursor, sort, direction, len(order))
+            seek, seek_params = _seek_predicate(order, values)
+            clauses.append(seek)
+            params.extend(seek_params)
+
+        select_list = ', '.join(self.columns + [f'{expr} AS [_k{i}]' for i, (expr, _) in enumerate(order)])
+        sql = f"SELECT TOP (?) {select_list} FROM {self.source}"
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY ' + ', '.join(f'{expr} {d}' for expr, d in order)
+
+        # One extra row tells us whether another page exists without a COUNT(*)
+        rows = execute_query(sql, [limit + 1] + params, intent=READ)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = _encode_cursor(sort, direction, [last[f'_k{i}'] for i in range(len(order))])
+
+        items = [
+            {k: jsonable(v) for k, v in row.items() if not k.startswith('_k')}
+            for row in rows
+        ]
+        return {'items': items, 'next_cursor': next_cursor, 'sort': sort, 'dir': direction.lower()}
+
+
+def filter_clauses(filters, args):
+    """
+    WHERE clauses and parameters for the filters present in args
+
+    Args:
+        filters: {arg name: (predicate with one ?, converter)}
+        args: Request arguments
+
+    Returns:
+        (list of predicates, list of parameters)
+
+    Raises:
+        ValueError: A converter rejected its argument
+    """
+    clauses = []
+    params = []
+    for name, (predicate, convert) in filters.items():
+        raw = args.get(name, '').strip()
+        if raw == '':
+            continue
+        try:
+            params.append(convert(raw))
+        except ValueError:
+            raise ValueError(f'Invalid value for {name}: {raw}')
+        clauses.append(predicate)
+    return clauses, params
+
+
+def parse_flag(value):
+    """Converter for bit filters: 1/0/true/false"""
+    lowered = value.lower()
+    if lowered in ('1', 'true', 'yes'):
+        return 1
+    if lowered in ('0', 'false', 'no'):
+        return 0
+    raise ValueError(value)
+
+
+def parse_utc(value):
+    """Converter for datetime filters (ISO 8601, interpreted as UTC)"""
+    return datetime.datetime.fromisoformat(value.replace('Z', '')).replace(tzinfo=None)
+
+
+def _seek_predicate(order, values):
+    """Row-value comparison (a, b, k) > (?, ?, ?) expanded for SQL Server, honouring each column's direction"""
+    terms = []
+    params = []
+    for i, (expr, direction) in enumerate(order):
+        op = '>' if direction == 'ASC' else '<'
+        equals = [f'{prev} = ?' for prev, _ in order[:i]]
+        terms.append('(' + ' AND '.join(equals + [f'{expr} {op} ?']) + ')')
+        params.extend(values[:i + 1])
+    return '(' + ' OR '.join(terms) + ')', params
+
+
+def _encode_cursor(sort, direction, values):
+    payload = json.dumps({'s': sort, 'd': direction, 'v': values}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor, sort, direction, size):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        values = payload['v']
+        valid = payload['s'] == sort and payload['d'] == direction and len(values) == size
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        valid = False
+    if not valid:
+        raise ValueError('Invalid cursor for this sort order')
+    return values
+
+
+def _escape_like(value):
+    return value.replace('[', '[[]').replace('%', '[%]').replace('_', '[_]')
+
+
+def jsonable(value):
+    """Convert a pyodbc value to something jsonify emits consistently (ISO 8601 datetimes)"""
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    return value
@@ -0,0 +1,284 @@
+"""
+Recorded database responses for load tests without SQL Server
+
+RecordingConnector wraps the real connect function and keeps every statement's
+result sets and timing; ReplayConnector serves them back from the saved file,
+optionally sleeping for the recorded duration. Both plug into
+ConnectionPool.connect, so routes, templates, the pool and the audit writer run
+unchanged on top of them.
+"""
+import datetime
+import decimal
+import json
+import threading
+import time
+import uuid
+
+import pyodbc
+
+
+def _encode(value):
+    if isinstance(value, datetime.datetime):
+        return {'$t': 'datetime', 'v': value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {'$t': 'date', 'v': value.isoformat()}
+    if isinstance(value, datetime.time):
+        return {'$t': 'time', 'v': value.isoformat()}
+    if isinstance(value, decimal.Decimal):
+        return {'$t': 'decimal', 'v': str(value)}
+    if isinstance(value, (bytes, bytearray)):
+        return {'$t': 'bytes', 'v': bytes(value).hex()}
+    if isinstance(value, uuid.UUID):
+        return {'$t': 'uuid', 'v': str(value)}
+    return value
+
+
+_DECODERS = {
+    'datetime': datetime.datetime.fromisoformat,
+    'date': datetime.date.fromisoformat,
+    'time': datetime.time.fromisoformat,
+    'decimal': decimal.Decimal,
+    'bytes': bytes.fromhex,
+    'uuid': uuid.UUID,
+}
+
+
+def _decode(value):
+    if isinstance(value, dict) and '$t' in value:
+        return _DECODERS[value['$t']](value['v'])
+    return value
+
+
+def _params(args):
+    """pyodbc accepts execute(sql, [a, b]) and execute(sql, a, b)"""
+    if len(args) == 1 and isinstance(args[0], (list, tuple)):
+        return list(args[0])
+    return list(args)
+
+
+def _key(sql, params):
+    return ' '.join(sql.split()) + '\x00' + json.dumps([_encode(p) for p in params], default=str)
+
+
+class _BufferedCursor:
+    """Cursor over result sets already in memory (the pyodbc cursor surface the app uses)"""
+
+    def __init__(self):
+        self._sets = []
+        self._index = 0
+        self._position = 0
+        self.rowcount = -1
+        self.fast_executemany = False
+
+    def _load(self, sets, rowcount):
+        self._sets = sets
+        self._index = 0
+        self._position = 0
+        self.rowcount = rowcount
+
+    @property
+    def description(self):
+        if self._index >= len(self._sets) or self._sets[self._index]['columns'] is None:
+            return None
+        return [(name, None, None, None, None, None, True) for name in self._sets[self._index]['columns']]
+
+    def _rows(self):
+        if self.description is None:
+            raise pyodbc.ProgrammingError('No results.  Previous SQL was not a query.')
+        return self._sets[self._index]['rows']
+
+    def fetchone(self):
+        rows = self._rows()
+        if self._position >= len(rows):
+            return None
+        self._position += 1
+        return rows[self._position - 1]
+
+    def fetchmany(self, size=1):
+        rows = self._rows()
+        chunk = rows[self._position:self._position + size]
+        self._position += len(chunk)
+        return chunk
+
+    def fetchall(self):
+        rows = self._rows()
+        chunk = rows[self._position:]
+        self._position = len(rows)
+        return chunk
+
+    def nextset(self):
+        if self._index + 1 >= len(self._sets):
+            self._index = len(self._sets)
+            return False
+        self._index += 1
+        self._position = 0
+        return True
+
+    def setinputsizes(self, sizes):
+        pass
+
+    def close(self):
+        self._sets = []
+
+
+class _RecordingCursor(_BufferedCursor):
+    def __init__(self, connector, cursor):
+        super().__init__()
+        self._connector = connector
+        self._cursor = cursor
+
+    def execute(self, sql, *args):
+        params = _params(args)
+        started = time.monotonic()
+        if params:
+            self._cursor.execute(sql, params)
+        else:
+            self._cursor.execute(sql)
+        sets = []
+        while True:
+            if self._cursor.description is not None:
+                columns = [column[0] for column in self._cursor.description]
+                sets.append({'columns': columns, 'rows': [tuple(row) for row in self._cursor.fetchall()]})
+            if not self._cursor.nextset():
+                break
+        rowcount = self._cursor.rowcount
+        self._connector.record(sql, params, sets, rowcount, time.monotonic() - started)
+        self._load(sets, rowcount)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._cursor.fast_executemany = self.fast_executemany
+        self._cursor.executemany(sql, seq_of_params)
+        self.rowcount = self._cursor.rowcount
+
+    def setinputsizes(self, sizes):
+        self._cursor.setinputsizes(sizes)
+
+    def close(self):
+        super().close()
+        self._cursor.close()
+
+
+class _ReplayCursor(_BufferedCursor):
+    def __init__(self, connector):
+        super().__init__()
+        self._connector = connector
+
+    def execute(self, sql, *args):
+        entry = self._connector.lookup(sql, _params(args))
+        if self._connector.latency_scale:
+            time.sleep(entry['seconds'] * self._connector.latency_scale)
+        self._load(entry['sets'], entry['rowcount'])
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self.rowcount = len(seq_of_params)
+
+
+class _Connection:
+    def __init__(self, cursor_factory, conn=None):
+        self._cursor_factory = cursor_factory
+        self._conn = conn
+
+    def cursor(self):
+        return self._cursor_factory()
+
+    def commit(self):
+        if self._conn is not None:
+            self._conn.commit()
+
+    def rollback(self):
+        if self._conn is not None:
+            self._conn.rollback()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+
+
+class RecordingConnector:
+    """
+    connect() replacement that passes through to the database and records every response
+
+    Args:
+        connect: The real connect function (normally pyodbc.connect)
+    """
+
+    def __init__(self, connect=pyodbc.connect):
+        self._connect = connect
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def __call__(self, conn_str):
+        conn = self._connect(conn_str)
+        return _Connection(lambda: _RecordingCursor(self, conn.cursor()), conn)
+
+    def record(self, sql, params, sets, rowcount, seconds):
+        entry = {
+            'sql': ' '.join(sql.split()),
+            'params': [_encode(p) for p in params],
+            'sets': [{'columns': s['columns'], 'rows': [[_encode(v) for v in row] for row in s['rows']]}
+                     for s in sets],
+            'rowcount': rowcount,
+            'seconds': round(seconds, 6),
+        }
+        with self._lock:
+            self._entries[_key(sql, params)] = entry
+
+    def __len__(self):
+        return len(self._entries)
+
+    def save(self, path):
+        """Write the recording as JSON (one entry per distinct statement and parameter list)"""
+        with self._lock:
+            entries = list(self._entries.values())
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'entries': entries}, f, separators=(',', ':'))
+
+
+class ReplayConnector:
+    """
+    connect() replacement that answers from a recording instead of a database
+
+    A statement is matched on its text and parameters first; when those parameters
+    were never recorded (e.g. a different user), the last response recorded for the
+    same text is used so the route still renders a realistic page.
+
+    Args:
+        path: File written by RecordingConnector.save()
+        latency_scale: Multiplier for the recorded statement time slept per execute (0 = none)
+
+    Raises:
+        pyodbc.ProgrammingError: On execute, for a statement text that was never recorded
+    """
+
+    def __init__(self, path, latency_scale=1.0):
+        self.latency_scale = latency_scale
+        self._exact = {}
+        self._by_sql = {}
+        with open(path, encoding='utf-8') as f:
+            recording = json.load(f)
+        for entry in recording['entries']:
+            params = [_decode(p) for p in entry['params']]
+            loaded = {
+                'sets': [{'columns': s['columns'], 'rows': [tuple(_decode(v) for v in row) for row in s['rows']]}
+                         for s in entry['sets']],
+                'rowcount': entry['rowcount'],
+                'seconds': entry['seconds'],
+            }
+            self._exact[_key(entry['sql'], params)] = loaded
+            self._by_sql[entry['sql']] = loaded
+
+    def __call__(self, conn_str):
+        return _Connection(lambda: _ReplayCursor(self))
+
+    def __len__(self):
+        return len(self._exact)
+
+    def lookup(self, sql, params):
+        entry = self._exact.get(_key(sql, params))
+        if entry is None:
+            entry = self._by_sql.get(' '.join(sql.split()))
+        if entry is None:
+            raise pyodbc.ProgrammingError(f"No recorded response for: {' '.join(sql.split())[:200]}")
+        return entry
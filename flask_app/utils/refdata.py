@@ -0,0 +1,212 @@
+"""
+Cached reference data for JIT Access Framework
+
+The role catalog, role-to-database-role mappings and teams change rarely but are
+read on every request form and admin page. They are cached per process and
+tagged with the jit.Cache_Versions 'Reference' counter, which triggers on
+jit.Roles, jit.DB_Roles, jit.Role_To_DB_Roles and jit.Teams bump on every write.
+Per-user requestable roles are memoized on top of the catalog and also tagged
+with the 'Eligibility' counter (bumped when User_Effective_Eligibility changes).
+The counters are polled with one query at most once per poll interval.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+from .db import execute_procedure, execute_query
+
+logger = logging.getLogger(__name__)
+
+_DATASETS = {
+    'roles': """
+        SELECT RoleId, RoleName, Description, MaxDurationMinutes, RequiresTicket, TicketRegex,
+               RequiresJustification, RequiresApproval, AutoApproveMinSeniority, IsEnabled
+        FROM jit.Roles
+        ORDER BY RoleName
+    """,
+    'role_db_roles': """
+        SELECT rdr.RoleId, dr.DbRoleId, dr.DatabaseName, dr.DbRoleName, dr.HasUnmask, rdr.IsRequired
+        FROM jit.Role_To_DB_Roles rdr
+        INNER JOIN jit.DB_Roles dr ON rdr.DbRoleId = dr.DbRoleId
+        ORDER BY rdr.RoleId, dr.DatabaseName, dr.DbRoleName
+    """,
+    'teams': """
+        SELECT TeamId, TeamName, Description, Division, Department, IsActive
+        FROM jit.Teams
+        WHERE IsActive = 1
+        ORDER BY TeamName
+    """,
+}
+
+
+class ReferenceCache:
+    """
+    Versioned, in-process cache of reference datasets and per-user requestable roles
+
+    Datasets are replaced wholesale when the 'Reference' counter moves or their
+    TTL runs out. Requestable roles are kept as RoleId lists in an LRU keyed by
+    UserId and rebuilt from the cached catalog, so a role edit shows up without
+    re-running sp_Role_ListRequestable for every user.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._datasets = {}
+        self._requestable = OrderedDict()
+        self._versions = {}
+        self._version_checked_at = 0.0
+
+    def refresh_versions(self, poll_seconds):
+        """Re-read the Reference and Eligibility change counters if the poll interval has elapsed"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._version_checked_at < poll_seconds:
+                return
+            self._version_checked_at = now
+        try:
+            rows = execute_query(
+                "SELECT CacheName, Version FROM jit.Cache_Versions WHERE CacheName IN (?, ?)",
+                ['Reference', 'Eligibility']
+            )
+            versions = {row['CacheName']: row['Version'] for row in rows}
+        except Exception as e:
+            logger.warning(f"Reference cache version check failed: {e}")
+            self.invalidate()
+            return
+        with self._lock:
+            if versions.get('Reference') != self._versions.get('Reference'):
+                self._datasets.clear()
+                self._requestable.clear()
+            elif versions.get('Eligibility') != self._versions.get('Eligibility'):
+                self._requestable.clear()
+            self._versions = versions
+
+    def dataset(self, name, ttl):
+        """Rows of one reference dataset, loading it when missing or stale"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._datasets.get(name)
+            if entry is not None:
+                rows, loaded_at, version = entry
+                if now - loaded_at < ttl and version == self._versions.get('Reference'):
+                    return rows
+            version = self._versions.get('Reference')
+        rows = execute_query(_DATASETS[name]) or []
+        with self._lock:
+            # Only keep it if no newer counter arrived while loading
+            if version == self._versions.get('Reference'):
+                self._datasets[name] = (rows, now, version)
+        return rows
+
+    def get_requestable(self, user_id, ttl):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._requestable.get(user_id)
+            if entry is None:
+                return None
+            role_ids, loaded_at, versions = entry
+            if now - loaded_at >= ttl or versions != self._versions:
+                del self._requestable[user_id]
+                return None
+            self._requestable.move_to_end(user_id)
+            return role_ids
+
+    def set_requestable(self, user_id, role_ids, versions, max_entries):
+        with self._lock:
+            if versions != self._versions:
+                return
+            self._requestable[user_id] = (role_ids, time.monotonic(), versions)
+            self._requestable.move_to_end(user_id)
+            while len(self._requestable) > max_entries:
+                self._requestable.popitem(last=False)
+
+    def current_versions(self):
+        with self._lock:
+            return dict(self._versions)
+
+    def invalidate_requestable(self, user_id=None):
+        """Drop one user's requestable roles (or every user's when user_id is None)"""
+        with self._lock:
+            if user_id is None:
+                self._requestable.clear()
+            else:
+                self._requestable.pop(user_id, None)
+
+    def invalidate(self):
+        """Drop everything"""
+        with self._lock:
+            self._datasets.clear()
+            self._requestable.clear()
+
+
+reference_cache = ReferenceCache()
+
+
+def _get(name):
+    ttl = current_app.config.get('REFERENCE_CACHE_TTL_SECONDS', 0)
+    if ttl <= 0:
+        return execute_query(_DATASETS[name]) or []
+    reference_cache.refresh_versions(current_app.config.get('REFERENCE_CACHE_VERSION_POLL_SECONDS', 5))
+    return reference_cache.dataset(name, ttl)
+
+
+def get_roles():
+    """All roles (enabled and disabled) ordered by RoleName; treat the rows as read-only"""
+    return _get('roles')
+
+
+def get_teams():
+    """Active teams ordered by TeamName; treat the rows as read-only"""
+    return _get('teams')
+
+
+def get_role_db_roles():
+    """
+    Database roles granted by each business role
+
+    Returns:
+        dict: RoleId -> list of mapping rows (DatabaseName, DbRoleName, HasUnmask, IsRequired)
+    """
+    mapping = {}
+    for row in _get('role_db_roles'):
+        mapping.setdefault(row['RoleId'], []).append(row)
+    return mapping
+
+
+def requestable_roles(user_id):
+    """
+    Roles user_id can request now, in sp_Role_ListRequestable order
+
+    The RoleIds returned by the procedure are memoized per user for
+    REQUESTABLE_CACHE_TTL_SECONDS (0 disables) and the rows are filled in from
+    the cached role catalog. Call invalidate_requestable() after the user
+    creates or cancels a request; approvals, denials and expiry by other users
+    show up when the entry expires.
+
+    Returns:
+        list: Role rows as returned by sp_Role_ListRequestable
+    """
+    ttl = current_app.config.get('REQUESTABLE_CACHE_TTL_SECONDS', 0)
+    if ttl <= 0 or current_app.config.get('REFERENCE_CACHE_TTL_SECONDS', 0) <= 0:
+        return execute_procedure('jit.sp_Role_ListRequestable', {'UserId': user_id}) or []
+
+    reference_cache.refresh_versions(current_app.config.get('REFERENCE_CACHE_VERSION_POLL_SECONDS', 5))
+    role_ids = reference_cache.get_requestable(user_id, ttl)
+    if role_ids is None:
+        versions = reference_cache.current_versions()
+        rows = execute_procedure('jit.sp_Role_ListRequestable', {'UserId': user_id}) or []
+        reference_cache.set_requestable(user_id, [row['RoleId'] for row in rows], versions,
+                                        current_app.config.get('REQUESTABLE_CACHE_MAX_ENTRIES', 5000))
+        return rows
+
+    catalog = {role['RoleId']: role for role in get_roles()}
+    return [dict(catalog[role_id]) for role_id in role_ids
+            if role_id in catalog and catalog[role_id]['IsEnabled']]
+
+
+def invalidate_requestable(user_id=None):
+    """Invalidate memoized requestable roles for this process (one user or everyone)"""
+    reference_cache.invalidate_requestable(user_id)
@@ -0,0 +1,168 @@
+"""
+Server-side sessions for JIT Access Framework
+
+The cookie carries only a random session ID; session data (the resolved user
+row and pending flash messages) stays in a per-process store with an idle
+timeout and an entry cap. Nothing is serialized or signed per request, and the
+Set-Cookie header is only sent when a session is created or dropped.
+Sessions are local to the Waitress process that created them, like the
+identity and reference data caches; losing one only loses pending flash
+messages, since the user is re-resolved from X-Remote-User on every request.
+"""
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+# Entries older than the idle timeout are swept at most this often
+SWEEP_INTERVAL_SECONDS = 60
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    """Session dict that remembers its ID and whether it was changed"""
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(session):
+            session.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+
+class SessionStore:
+    """
+    In-process session store with idle expiry and LRU eviction
+
+    Reads slide the expiry; the least recently used session is dropped once
+    max_entries is reached.
+    """
+
+    def __init__(self, idle_seconds, max_entries):
+        self.idle_seconds = idle_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._swept_at = time.monotonic()
+        self._evicted = 0
+        self._expired = 0
+
+    def get(self, sid):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                return None
+            data, touched_at = entry
+            if now - touched_at >= self.idle_seconds:
+                del self._entries[sid]
+                self._expired += 1
+                return None
+            self._entries[sid] = (data, now)
+            self._entries.move_to_end(sid)
+            return dict(data)
+
+    def set(self, sid, data):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._swept_at >= SWEEP_INTERVAL_SECONDS:
+                self._sweep(now)
+            self._entries[sid] = (dict(data), now)
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evicted += 1
+
+    def delete(self, sid):
+        with self._lock:
+            self._entries.pop(sid, None)
+
+    def _sweep(self, now):
+        self._swept_at = now
+        stale = [sid for sid, (_, touched_at) in self._entries.items() if now - touched_at >= self.idle_seconds]
+        for sid in stale:
+            del self._entries[sid]
+        self._expired += len(stale)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self._entries),
+                'max_entries': self.max_entries,
+                'expired': self._expired,
+                'evicted': self._evicted,
+            }
+
+
+class ServerSessionInterface(SessionInterface):
+    """Flask session interface backed by a SessionStore; the cookie holds the session ID only"""
+
+    session_class = ServerSession
+
+    def __init__(self, store):
+        self.store = store
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            data = self.store.get(sid)
+            if data is not None:
+                return self.session_class(data, sid=sid)
+        # Unknown or expired ID: start over with a fresh one
+        return self.session_class(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        # Responses rendered for a session differ per cookie
+        if session or not session.new:
+            response.vary.add('Cookie')
+
+        if not session:
+            # Emptied (or never used): drop the stored copy and the cookie, if any
+            if not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path,
+                                       secure=self.get_cookie_secure(app),
+                                       samesite=self.get_cookie_samesite(app),
+                                       httponly=self.get_cookie_httponly(app))
+            return
+
+        if session.modified:
+            self.store.set(session.sid, session)
+
+        if session.new or (session.permanent and app.config.get('SESSION_REFRESH_EACH_REQUEST', True)):
+            response.set_cookie(
+                name,
+                session.sid,
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app),
+            )
+
+
+def init_sessions(app):
+    """Keep sessions server-side (SERVER_SESSIONS; False falls back to Flask's signed cookie)"""
+    if not app.config.get('SERVER_SESSIONS', True):
+        return
+    store = SessionStore(
+        idle_seconds=app.config.get('SESSION_IDLE_TIMEOUT_SECONDS', 28800),
+        max_entries=app.config.get('SESSION_MAX_ENTRIES', 50000),
+    )
+    app.session_interface = ServerSessionInterface(store)
+    app.extensions['jit_sessions'] = store
+
+
+def get_session_store():
+    """The server-side session store of the current app, or None when cookie sessions are in use"""
+    return current_app.extensions.get('jit_sessions')